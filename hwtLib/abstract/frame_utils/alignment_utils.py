@@ -208,11 +208,11 @@ class FrameAlignmentUtils():
                 frames.append(frame)
         return frames
 
-    def streams_to_all_possible_frame_formats(
-            self, streams: List[HStream], offset: int):
+    def _frame_formats_per_stream(self, streams: List[HStream], offset: int)\
+            ->List[List[Tuple[Tuple[ByteSrcInfo, ...], ...]]]:
         """
-        :see: :func:`FrameJoinUtils.stream_to_all_possible_frame_formats`
-            for multiple input streams
+        :return: list of all possible frame formats for each stream
+            (:see: :meth:`~.stream_to_all_possible_frame_formats`)
         """
         frames_per_stream = []
         prev_end_offsets = [offset, ]
@@ -241,6 +241,18 @@ class FrameAlignmentUtils():
 
             prev_end_offsets = sorted(prev_end_offsets)
 
+        return frames_per_stream
+
+    def streams_to_all_possible_frame_formats(
+            self, streams: List[HStream], offset: int):
+        """
+        :see: :func:`FrameJoinUtils.stream_to_all_possible_frame_formats`
+            for multiple input streams
+
+        :attention: The number of frames grows exponentially with the number of streams,
+            use :meth:`~.streams_to_representative_frame_formats` if all the frames are not required.
+        """
+        frames_per_stream = self._frame_formats_per_stream(streams, offset)
         res = set()
         for frame_combination in product(*frames_per_stream):
             res_frame = self.join_streams(frame_combination, offset)
@@ -249,8 +261,142 @@ class FrameAlignmentUtils():
         res = list(res)
         return res
 
+    @staticmethod
+    def _normalize_word(word: Tuple[Optional[ByteSrcInfo], ...]) -> Tuple[Optional[ByteSrcInfo], ...]:
+        """
+        Make word indexes of bytes relative to the first word of each input used in this word
+        (the same as time offset in :meth:`~._resolve_input_bytes_destinations`)
+        """
+        min_word_i = {}
+        for b in word:
+            if b is not None:
+                i = b.stream_i
+                min_word_i[i] = min(min_word_i.get(i, b.word_i), b.word_i)
+
+        return tuple(
+            None if b is None else
+            ByteSrcInfo(b.stream_i, b.word_i - min_word_i[b.stream_i], b.byte_i, b.is_from_last_input_word)
+            for b in word
+        )
+
+    def _join_step(self, state, data: Tuple[ByteSrcInfo, ...]):
+        """
+        Append bytes of a single input frame to a partially joined output frame
+
+        :param state: tuple (last byte of the word before, pending word, unfinished word),
+            the pending word is the last completed word if the first byte of the next word is not known yet,
+            the last byte of the word before is a last byte of the word before the pending word
+            or before the unfinished word if there is no pending word
+        :return: tuple (new state, list of completed words)
+        """
+        word_bytes = self.word_bytes
+        prev_last_B, pending, cur = state
+        if pending is None:
+            last_B0, last_B = None, prev_last_B
+        else:
+            last_B0, last_B = prev_last_B, pending[-1]
+
+        cur = list(cur)
+        completed = []
+        for b in data:
+            cur.append(b)
+            if len(cur) == word_bytes:
+                w = self._normalize_word(cur)
+                completed.append(w)
+                last_B0, last_B = last_B, w[-1]
+                cur = []
+
+        if completed:
+            pending = completed[-1]
+
+        if not cur and pending is not None:
+            # the first byte of the next word is not known yet
+            new_state = (last_B0, pending, ())
+        else:
+            new_state = (last_B, None, self._normalize_word(cur))
+
+        return new_state, completed
+
+    def _join_flush(self, state) -> List[Tuple[Optional[ByteSrcInfo], ...]]:
+        """
+        :return: the last word of the output frame (padded with None) if there is any unfinished word
+        """
+        cur = state[2]
+        if any(b is not None for b in cur):
+            return [(*cur, *(None for _ in range(self.word_bytes - len(cur))))]
+        else:
+            return []
+
+    def streams_to_representative_frame_formats(
+            self, streams: List[HStream], offset: int):
+        """
+        Incremental alternative to :meth:`~.streams_to_all_possible_frame_formats`.
+        Generates a subset of output frame formats which contains every output word
+        together with every variant of its context present in all possible output frames.
+        The context of the word is the last byte of the previous word and the first byte of the next word
+        (which is all the information used to build the state transitions of the join FSM,
+        :see: :func:`hwtLib.abstract.frame_utils.join.fsm.input_B_dst_to_fsm`).
+
+        The streams are joined one by one and partial joins are identified only by the data
+        which can still affect a state transition (:see: :meth:`~._join_step`, the unfinished word
+        also describes the end alignment). The partial joins with the same identification are merged,
+        the number of output frames is then given by the number of these partial joins
+        instead of the product of the number of the formats of each stream.
+
+        :note: byte word indexes in produced frames are already relative to the first word
+            of each input in each output word
+        """
+        frames_per_stream = self._frame_formats_per_stream(streams, offset)
+        data_per_stream = [
+            tuple(dict.fromkeys(
+                tuple(b for w in f for b in w if b is not None)
+                for f in frames
+            ))
+            for frames in frames_per_stream
+        ]
+
+        init_state = (None, None, tuple(None for _ in range(offset)))
+        # for each stream: dict partial join state -> words of some frame which leads to this state
+        prefix_words = [{init_state: ()}, ]
+        # for each stream: list of tuples (src state, dst state, completed words)
+        edges = []
+        for data in data_per_stream:
+            prefix = prefix_words[-1]
+            next_prefix = {}
+            _edges = []
+            for st, st_words in prefix.items():
+                for d in data:
+                    next_st, completed = self._join_step(st, d)
+                    _edges.append((st, next_st, completed))
+                    if next_st not in next_prefix:
+                        next_prefix[next_st] = (*st_words, *completed)
+            prefix_words.append(next_prefix)
+            edges.append(_edges)
+
+        # for each stream: dict partial join state -> words of some frame which follow this state
+        suffix_words = [{st: tuple(self._join_flush(st)) for st in prefix_words[-1].keys()}]
+        for _edges in reversed(edges):
+            suffix = suffix_words[0]
+            prev_suffix = {}
+            for st, next_st, completed in _edges:
+                if st not in prev_suffix:
+                    prev_suffix[st] = (*completed, *suffix[next_st])
+            suffix_words.insert(0, prev_suffix)
+
+        if not streams:
+            return [suffix_words[0][init_state]]
+
+        res = set()
+        for stream_i, _edges in enumerate(edges):
+            prefix = prefix_words[stream_i]
+            suffix = suffix_words[stream_i + 1]
+            for st, next_st, completed in _edges:
+                res.add((*prefix[st], *completed, *suffix[next_st]))
+
+        return list(res)
+
     def resolve_input_bytes_destinations(self, streams: List[HStream]):
-        frames = self.streams_to_all_possible_frame_formats(
+        frames = self.streams_to_representative_frame_formats(
             streams, self.out_offset)
         input_B_dst = self._resolve_input_bytes_destinations(
             frames, len(streams))
@@ -1,10 +1,18 @@
+import sys
 from typing import Tuple, Dict, Set, List
 
+from hwt.hdl.types.stream import HStream
 from hwt.pyUtils.arrayQuery import iter_with_last
+from hwtLib.abstract.frame_utils import alignment_utils, byte_src_info
+from hwtLib.abstract.frame_utils.alignment_utils import FrameAlignmentUtils
+from hwtLib.abstract.frame_utils.join import state_trans_info, state_trans_item, \
+    state_trans_table, input_reg_val
 from hwtLib.abstract.frame_utils.join.state_trans_info import StateTransInfo
 from hwtLib.abstract.frame_utils.join.state_trans_item import StateTransItem
 from hwtLib.abstract.frame_utils.join.state_trans_table import StateTransTable
 from hwtLib.abstract.frame_utils.join.input_reg_val import InputRegInputVal
+from hwtLib.abstract.persistent_cache import DEFAULT_PERSISTENT_CACHE, \
+    PersistentCache
 from copy import deepcopy
 
 
@@ -72,7 +80,8 @@ def input_B_dst_to_fsm(word_bytes: int,
     state_cnt = input_cnt
     tt = StateTransTable(
         word_bytes, max_lookahead_for_input, state_cnt)
-    states_for_relict_processing: List[StateTransInfo] = []
+    # labels of StateTransInfo
+    states_for_relict_processing: Set[Tuple[int, int]] = set()
     # for all possible in/out configurations
     for ss in sorted(sub_states.values(), key=lambda x: x.label):
         ss: StateTransInfo
@@ -119,7 +128,7 @@ def input_B_dst_to_fsm(word_bytes: int,
 
             if is_input_word_continuing_in_next_out_word:
                 assert next_ss is not None
-                states_for_relict_processing.append(next_ss)
+                states_for_relict_processing.add(next_ss.label)
 
             is_first_input_byte = is_from_different_input(o_prev, o)
             # is last byte from input byte in this output word
@@ -192,7 +201,7 @@ def input_B_dst_to_fsm(word_bytes: int,
                         in_keep_mask[in_i][B_i] = 0
 
         # mark relict flag
-        first_input_is_relict = ss in states_for_relict_processing
+        first_input_is_relict = ss.label in states_for_relict_processing
         for o in ss.outputs:
             if o is None:
                 # skip start padding
@@ -255,3 +264,27 @@ def input_B_dst_to_fsm(word_bytes: int,
     tt.assert_transitions_deterministic()
     return tt
 
+
+
+def resolve_frame_join_fsm(word_bytes: int, out_offset: int, streams: List[HStream],
+                           cache: PersistentCache=DEFAULT_PERSISTENT_CACHE) -> StateTransTable:
+    """
+    Resolve the state transition table of the frame join FSM (:see: :func:`~.input_B_dst_to_fsm`)
+    and store it in the persistent cache as the resolution is expensive for wide words and many inputs.
+
+    :param out_offset: offset of the first byte in output frame
+    :param streams: format of the input frames
+    """
+
+    def compute():
+        fju = FrameAlignmentUtils(word_bytes, out_offset)
+        input_B_dst = fju.resolve_input_bytes_destinations(streams)
+        return input_B_dst_to_fsm(word_bytes, len(streams), input_B_dst,
+                                  fju.can_produce_zero_len_frame(streams))
+
+    return cache.getOrCompute(
+        "frame_join_fsm",
+        (word_bytes, out_offset, list(streams)),
+        compute,
+        dependencies=(sys.modules[__name__], alignment_utils, byte_src_info,
+                      state_trans_info, state_trans_item, state_trans_table, input_reg_val))
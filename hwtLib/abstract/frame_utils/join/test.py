@@ -402,6 +402,24 @@ class FrameJoinUtilsTC(unittest.TestCase):
         ]]
         self.assertSequenceEqual(tt.state_trans, ref)
 
+    def test_representative_frames_same_fsm_as_all_frames(self):
+        for word_bytes, out_offset, streams in [
+                (2, 0, [HStream(HBits(8), (1, inf), [0, 1]), HStream(HBits(8), (0, 3))]),
+                (2, 1, [HStream(HBits(8), (1, 2)), HStream(HBits(16), (1, inf)), HStream(HBits(8), (1, inf))]),
+                (3, 0, [HStream(HBits(8), (1, inf)) for _ in range(3)]),
+                (4, 2, [HStream(HBits(8), (2, 5), [0, 1]), HStream(HBits(8), (1, inf)), HStream(HBits(8), (1, 2))]),
+                ]:
+            sju = FrameAlignmentUtils(word_bytes, out_offset)
+            all_frames = sju.streams_to_all_possible_frame_formats(streams, out_offset)
+            repr_frames = sju.streams_to_representative_frame_formats(streams, out_offset)
+            self.assertLessEqual(len(repr_frames), len(all_frames))
+            can_be_0B = sju.can_produce_zero_len_frame(streams)
+            tt_ref = input_B_dst_to_fsm(word_bytes, len(streams),
+                                        sju._resolve_input_bytes_destinations(all_frames, len(streams)), can_be_0B)
+            tt = input_B_dst_to_fsm(word_bytes, len(streams),
+                                    sju._resolve_input_bytes_destinations(repr_frames, len(streams)), can_be_0B)
+            self.assertSequenceEqual(tt.state_trans, tt_ref.state_trans)
+
 
 if __name__ == "__main__":
     testLoader = unittest.TestLoader()
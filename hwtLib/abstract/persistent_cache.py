@@ -0,0 +1,229 @@
+from hashlib import sha256
+from math import inf
+import os
+import pickle
+from types import FunctionType, ModuleType
+from typing import Any, Callable, Optional, Sequence
+
+from hwt.hdl.types.array import HArray
+from hwt.hdl.types.bits import HBits
+from hwt.hdl.types.stream import HStream
+from hwt.hdl.types.struct import HStruct
+from hwt.hdl.types.union import HUnion
+
+
+def stable_repr(obj) -> str:
+    """
+    Convert the configuration object to a string which does not depend on identity of objects
+    or on the python process (unlike :func:`hash` or :func:`repr` of some objects).
+
+    :raise TypeError: if the object type is not supported
+    """
+    if obj is None or isinstance(obj, (bool, int, str, bytes)):
+        return repr(obj)
+    elif isinstance(obj, float):
+        if obj == inf:
+            return "inf"
+        return repr(obj)
+    elif isinstance(obj, (tuple, list)):
+        return "(" + ",".join(stable_repr(o) for o in obj) + ")"
+    elif isinstance(obj, dict):
+        return "{" + ",".join(sorted(f"{stable_repr(k)}:{stable_repr(v)}" for k, v in obj.items())) + "}"
+    elif isinstance(obj, HBits):
+        return (f"HBits({obj.bit_length():d},{obj.signed},{obj.force_vector},{obj.negated},"
+                f"{getattr(obj, 'strict_sign', True)},{getattr(obj, 'strict_width', True)})")
+    elif isinstance(obj, HStream):
+        return (f"HStream({stable_repr(obj.element_t)},{stable_repr(obj.len_min)},"
+                f"{stable_repr(obj.len_max)},{stable_repr(obj.start_offsets)})")
+    elif isinstance(obj, HArray):
+        return f"HArray({stable_repr(obj.element_t)},{stable_repr(obj.size)})"
+    elif isinstance(obj, (HStruct, HUnion)):
+        fields = obj.fields
+        if isinstance(fields, dict):
+            fields = fields.values()
+        fields = ",".join(f"{stable_repr(f.name)}:{stable_repr(f.dtype)}" for f in fields)
+        return f"{obj.__class__.__name__:s}({stable_repr(obj.name)},{fields:s})"
+    elif isinstance(obj, (type, FunctionType)) and "<" not in obj.__qualname__:
+        # class or function which can be imported (not a lambda or local)
+        return f"{obj.__module__:s}.{obj.__qualname__:s}"
+    else:
+        raise TypeError("Object can not be used as a part of persistent cache key", obj)
+
+
+class PersistentCache():
+    """
+    Content addressed on disk cache for results of expensive elaboration time computations
+    (e.g. frame join FSM, frame templates).
+    The key is a hash of stable representation of the configuration
+    (:see: :func:`~.stable_repr`) and of the source code of the modules which compute the value,
+    the value is stored as a pickle file.
+
+    The cache can be configured by environment variables:
+
+    * HWTLIB_PERSISTENT_CACHE=0 disables the cache
+    * HWTLIB_PERSISTENT_CACHE_DIR sets the directory (default ~/.cache/hwtLib)
+    * HWTLIB_PERSISTENT_CACHE_SIZE sets the size limit in bytes
+
+    :ivar ~.path: directory where the cache files are stored
+    :ivar ~.maxSize: maximum size of all files in cache in bytes,
+        least recently used files are removed if the limit is exceeded
+    :ivar ~.enabled: if False the values are always computed
+    :ivar ~.hits: number of values loaded from the cache
+    :ivar ~.misses: number of values which had to be computed
+    """
+    FORMAT_VERSION = 1
+
+    def __init__(self, path: Optional[str]=None, maxSize: Optional[int]=None, enabled: Optional[bool]=None):
+        env = os.environ
+        if path is None:
+            path = env.get("HWTLIB_PERSISTENT_CACHE_DIR", None)
+            if path is None:
+                path = os.path.join(os.path.expanduser("~"), ".cache", "hwtLib")
+        if maxSize is None:
+            maxSize = int(env.get("HWTLIB_PERSISTENT_CACHE_SIZE", 256 * 1024 * 1024))
+        if enabled is None:
+            enabled = env.get("HWTLIB_PERSISTENT_CACHE", "1") not in ("0", "", "false", "False")
+
+        self.path = path
+        self.maxSize = maxSize
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._moduleDigests = {}
+
+    def _moduleDigest(self, m: ModuleType) -> str:
+        name = m.__name__
+        d = self._moduleDigests.get(name, None)
+        if d is None:
+            try:
+                with open(m.__file__, "rb") as f:
+                    d = sha256(f.read()).hexdigest()
+            except (OSError, TypeError):
+                # module without source file
+                d = name
+            self._moduleDigests[name] = d
+        return d
+
+    def key(self, namespace: str, config, dependencies: Sequence[ModuleType]=()) -> str:
+        """
+        :param namespace: name which identifies the type of the cached value
+        :param config: all parameters which affect the value
+        :param dependencies: modules with the code which computes the value
+            (the value is invalidated if the source code changes)
+        :raise TypeError: if config contains an object which can not be represented in stable way
+        """
+        h = sha256()
+        h.update(f"{self.FORMAT_VERSION:d}\0{namespace:s}\0".encode())
+        for m in dependencies:
+            h.update(self._moduleDigest(m).encode())
+        h.update(stable_repr(config).encode())
+        return h.hexdigest()
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, key[:2], key + ".pickle")
+
+    def get(self, key: str, default=None):
+        fn = self._file(key)
+        try:
+            with open(fn, "rb") as f:
+                v = pickle.load(f)
+            # mark as recently used
+            os.utime(fn)
+            return v
+        except Exception:
+            # missing or corrupted file
+            return default
+
+    def set(self, key: str, value):
+        fn = self._file(key)
+        tmp = f"{fn:s}.{os.getpid():d}.tmp"
+        try:
+            os.makedirs(os.path.dirname(fn), exist_ok=True)
+            with open(tmp, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, fn)
+        except (OSError, pickle.PicklingError, AttributeError, TypeError, RecursionError):
+            # the cache is only an optimization, the failure to store is not an error
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return
+        self.evict()
+
+    def remove(self, key: str):
+        try:
+            os.remove(self._file(key))
+        except OSError:
+            pass
+
+    def getOrCompute(self, namespace: str, config, compute: Callable[[], Any],
+                     dependencies: Sequence[ModuleType]=()):
+        """
+        Load the value from cache or compute it and store it in cache
+        """
+        if not self.enabled:
+            return compute()
+        try:
+            key = self.key(namespace, config, dependencies)
+        except TypeError:
+            # configuration can not be hashed
+            return compute()
+
+        _MISSING = self
+        v = self.get(key, _MISSING)
+        if v is _MISSING:
+            self.misses += 1
+            v = compute()
+            self.set(key, v)
+        else:
+            self.hits += 1
+        return v
+
+    def _files(self):
+        try:
+            dirs = os.listdir(self.path)
+        except OSError:
+            return
+        for d in dirs:
+            d = os.path.join(self.path, d)
+            try:
+                for fn in os.listdir(d):
+                    if fn.endswith(".pickle"):
+                        fn = os.path.join(d, fn)
+                        st = os.stat(fn)
+                        yield st.st_mtime, st.st_size, fn
+            except OSError:
+                continue
+
+    def size(self) -> int:
+        """
+        :return: size of all files in cache in bytes
+        """
+        return sum(size for _, size, _ in self._files())
+
+    def evict(self):
+        """
+        Remove least recently used files until the size of the cache is in the limit
+        """
+        files = sorted(self._files())
+        total = sum(size for _, size, _ in files)
+        for _, size, fn in files:
+            if total <= self.maxSize:
+                break
+            try:
+                os.remove(fn)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        for _, _, fn in list(self._files()):
+            try:
+                os.remove(fn)
+            except OSError:
+                pass
+
+
+# the cache used by the components of this library
+DEFAULT_PERSISTENT_CACHE = PersistentCache()
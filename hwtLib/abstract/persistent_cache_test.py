@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+from tempfile import TemporaryDirectory
+import unittest
+
+from hwt.hdl.frameTmpl import FrameTmpl
+from hwt.hdl.transTmpl import TransTmpl
+from hwt.hdl.types.bits import HBits
+from hwt.hdl.types.stream import HStream
+from hwt.hdl.types.struct import HStruct
+from hwtLib.abstract.frame_utils.alignment_utils import FrameAlignmentUtils
+from hwtLib.abstract.frame_utils.join.fsm import input_B_dst_to_fsm, \
+    resolve_frame_join_fsm
+from hwtLib.abstract.persistent_cache import PersistentCache, stable_repr
+from hwtLib.abstract.template_configured import FrameTmpl_framesFromTransTmpl_cached
+from hwtLib.types.ctypes import uint8_t, uint16_t, uint32_t, uint64_t
+
+
+class PersistentCache_TC(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = TemporaryDirectory()
+        self.cache = PersistentCache(self._dir.name, maxSize=1024 * 1024, enabled=True)
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_hit_miss(self):
+        c = self.cache
+        computed = []
+
+        def compute():
+            computed.append(1)
+            return {"a": [1, 2, 3]}
+
+        for _ in range(3):
+            v = c.getOrCompute("test", (1, "x", HBits(8)), compute)
+            self.assertEqual(v, {"a": [1, 2, 3]})
+
+        self.assertEqual(len(computed), 1)
+        self.assertEqual((c.hits, c.misses), (2, 1))
+
+        # same cache in an other process
+        c2 = PersistentCache(c.path, maxSize=c.maxSize, enabled=True)
+        c2.getOrCompute("test", (1, "x", HBits(8)), compute)
+        self.assertEqual(len(computed), 1)
+        # a different configuration
+        c2.getOrCompute("test", (1, "x", HBits(9)), compute)
+        self.assertEqual(len(computed), 2)
+
+    def test_disabled(self):
+        c = PersistentCache(self.cache.path, enabled=False)
+        computed = []
+        for _ in range(2):
+            c.getOrCompute("test", 1, lambda: computed.append(1))
+        self.assertEqual(len(computed), 2)
+        self.assertEqual(c.size(), 0)
+
+    def test_unsupported_config(self):
+        computed = []
+        for _ in range(2):
+            self.cache.getOrCompute("test", object(), lambda: computed.append(1))
+        self.assertEqual(len(computed), 2)
+        self.assertEqual(self.cache.size(), 0)
+
+    def test_eviction(self):
+        c = self.cache
+        c.maxSize = 5000
+        for i in range(10):
+            c.set(c.key("test", i), bytes(1000))
+            self.assertLessEqual(c.size(), c.maxSize)
+
+        self.assertIsNone(c.get(c.key("test", 0)))
+        self.assertIsNotNone(c.get(c.key("test", 9)))
+        c.clear()
+        self.assertEqual(c.size(), 0)
+
+    def test_corrupted_file(self):
+        c = self.cache
+        k = c.key("test", 0)
+        c.set(k, 1)
+        with open(c._file(k), "wb") as f:
+            f.write(b"\x00not a pickle")
+        self.assertEqual(c.getOrCompute("test", 0, lambda: 2), 2)
+
+    def test_stable_repr(self):
+        t0 = HStruct((uint8_t, "a"), (HStream(uint8_t, frame_len=(1, 3)), "b"))
+        t1 = HStruct((uint8_t, "a"), (HStream(uint8_t, frame_len=(1, 3)), "b"))
+        self.assertEqual(stable_repr(t0), stable_repr(t1))
+        t2 = HStruct((uint8_t, "a"), (HStream(uint8_t, frame_len=(1, 4)), "b"))
+        self.assertNotEqual(stable_repr(t0), stable_repr(t2))
+        self.assertEqual(stable_repr({"b": 1, "a": 2}), stable_repr({"a": 2, "b": 1}))
+        with self.assertRaises(TypeError):
+            stable_repr(object())
+        self.assertEqual(stable_repr(PersistentCache), "hwtLib.abstract.persistent_cache.PersistentCache")
+        with self.assertRaises(TypeError):
+            stable_repr(lambda x: x)
+
+    def test_frame_join_fsm(self):
+        word_bytes = 2
+        streams = [
+            HStream(HBits(8), frame_len=(1, 3)),
+            HStream(HBits(8), frame_len=(1, 3), start_offsets=[0, 1]),
+        ]
+        fju = FrameAlignmentUtils(word_bytes, 0)
+        ref = input_B_dst_to_fsm(word_bytes, len(streams),
+                                 fju.resolve_input_bytes_destinations(streams),
+                                 fju.can_produce_zero_len_frame(streams))
+        for _ in range(2):
+            tt = resolve_frame_join_fsm(word_bytes, 0, streams, cache=self.cache)
+            self.assertSequenceEqual(tt.state_trans, ref.state_trans)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def _frames_repr(self, frames):
+        return [(f.startBitAddr, f.endBitAddr,
+                 [(p.tmpl.getFieldPath() if p.tmpl is not None else None,
+                   p.canBeRemoved, p.startOfPart, p.endOfPart, p.inFieldOffset)
+                  for p in f.parts])
+                for f in frames]
+
+    def test_frames_from_TransTmpl(self):
+        t = HStruct(
+            (uint64_t, "item0"),
+            (uint64_t, None),  # padding
+            (uint32_t, "item1"),
+            (uint16_t[3], "arr"),
+            (uint8_t, "item2"),
+        )
+        for kwargs in [{}, {"trimPaddingWordsOnStart": True, "trimPaddingWordsOnEnd": True}]:
+            ref = self._frames_repr(FrameTmpl.framesFromTransTmpl(TransTmpl(t), 32, **kwargs))
+            for _ in range(2):
+                tmpl = TransTmpl(t)
+                frames = FrameTmpl_framesFromTransTmpl_cached(tmpl, 32, cache=self.cache, **kwargs)
+                self.assertEqual(self._frames_repr(frames), ref)
+                for f in frames:
+                    for p in f.parts:
+                        self.assertIs(p.parent, f)
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 2))
+        self.assertTrue(os.listdir(self.cache.path))
+
+
+if __name__ == "__main__":
+    testLoader = unittest.TestLoader()
+    # suite = unittest.TestSuite([PersistentCache_TC("test_eviction")])
+    suite = testLoader.loadTestsFromTestCase(PersistentCache_TC)
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
@@ -0,0 +1,181 @@
+from collections import deque
+from typing import Any, Callable, Deque, Iterable, Optional, Union
+
+from hwt.hdl.const import HConst
+from hwtLib.abstract.simFrameUtils import SimFrameUtils
+
+
+class SimFrameSource():
+    """
+    A replacement for the "data" deque of a driver simulation agent which pulls the frames
+    from an iterator/generator on demand instead of storing all words of all frames in memory.
+
+    .. code-block:: python
+
+        def frames():
+            for i in range(1000000):
+                yield bytes(...)
+
+        fu = Axi4StreamSimFrameUtils.from_HwIO(dut.rx)
+        dut.rx._ag.data = SimFrameSource(frames(), fu)
+
+    The object wraps a deque and implements the part of its API used by agents and tests
+    (len, bool, popleft, appendleft, append, extend, indexing, iteration and clear).
+    The words added by :meth:`~.append`/:meth:`~.extend` follow after all frames from the iterator.
+
+    :attention: a negative index pulls all remaining frames from the iterator
+
+    :ivar ~.frameUtils: :class:`hwtLib.abstract.simFrameUtils.SimFrameUtils` instance used to convert frames to words,
+        if it is None the items of the iterator are directly the words of the agent (e.g. for handshaked agents)
+    :ivar ~.lookahead: minimal number of words which are prepared in advance
+        (the frame is always converted to words as a whole)
+    :ivar ~.frameCnt: number of frames pulled from the iterator
+    """
+
+    def __init__(self, frames: Iterable[Union[bytes, list[int], HConst, Any]],
+                 frameUtils: Optional[SimFrameUtils]=None, lookahead: int=2):
+        assert lookahead >= 1, lookahead
+        self._frames = iter(frames)
+        self.frameUtils = frameUtils
+        self.lookahead = lookahead
+        self.frameCnt = 0
+        # words prepared for the agent
+        self._words: Deque[Any] = deque()
+        # words appended by user which follow after the frames from the iterator
+        self._appended: Deque[Any] = deque()
+
+    def _fill(self, wordCnt: Optional[int]):
+        """
+        Pull frames from the iterator until there are at least wordCnt words prepared
+
+        :param wordCnt: if None all frames are pulled
+        """
+        words = self._words
+        fu = self.frameUtils
+        while self._frames is not None and (wordCnt is None or len(words) < wordCnt):
+            try:
+                f = next(self._frames)
+            except StopIteration:
+                self._frames = None
+                break
+
+            self.frameCnt += 1
+            if fu is None:
+                words.append(f)
+            elif isinstance(f, HConst):
+                words.extend(fu.pack_frame(f))
+            else:
+                fu.send_bytes(f, words)
+
+        if self._frames is None and self._appended:
+            words.extend(self._appended)
+            self._appended.clear()
+
+    def isExhausted(self) -> bool:
+        """
+        :return: True if all frames were pulled from the iterator and all words were consumed
+        """
+        self._fill(1)
+        return self._frames is None and not self._words
+
+    def __len__(self) -> int:
+        """
+        :return: number of prepared words (not the number of all remaining words)
+        """
+        self._fill(self.lookahead)
+        return len(self._words)
+
+    def __bool__(self) -> bool:
+        self._fill(1)
+        return bool(self._words)
+
+    def popleft(self):
+        self._fill(self.lookahead)
+        return self._words.popleft()
+
+    def appendleft(self, word):
+        self._words.appendleft(word)
+
+    def append(self, word):
+        if self._frames is None and not self._appended:
+            self._words.append(word)
+        else:
+            self._appended.append(word)
+
+    def extend(self, words: Iterable):
+        for w in words:
+            self.append(w)
+
+    def clear(self):
+        """
+        Drop all prepared words and all frames which were not pulled from the iterator yet
+        """
+        self._frames = None
+        self._words.clear()
+        self._appended.clear()
+
+    def __getitem__(self, i: int):
+        self._fill(i + 1 if i >= 0 else None)
+        return self._words[i]
+
+    def __setitem__(self, i: int, word):
+        self._fill(i + 1 if i >= 0 else None)
+        self._words[i] = word
+
+    def __iter__(self):
+        """
+        Iterate all remaining words (without consuming them), the frames are pulled from the iterator lazily
+        """
+        i = 0
+        words = self._words
+        while True:
+            self._fill(i + 1)
+            if i >= len(words):
+                return
+            yield words[i]
+            i += 1
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__:s} frameCnt={self.frameCnt:d}, prepared={list(self._words)}>"
+
+
+class SimFrameSink(deque):
+    """
+    A replacement for the "data" deque of a monitor simulation agent which passes every received frame to a callback
+    instead of storing all received words.
+
+    .. code-block:: python
+
+        fu = Axi4StreamSimFrameUtils.from_HwIO(dut.tx)
+        dut.tx._ag.data = SimFrameSink(fu, lambda frame: self.assertEqual(frame, (0, expected.popleft())))
+
+    :ivar ~.frameUtils: :class:`hwtLib.abstract.simFrameUtils.SimFrameUtils` instance used to convert words to frames,
+        if it is None the callback is called for every word
+    :ivar ~.callback: function called with the value returned by :meth:`SimFrameUtils.receive_bytes`
+        (e.g. tuple (offset, data)) for each received frame, it may also be a "send" method of a generator
+        which consumes the frames
+    :ivar ~.frameCnt: number of received frames
+    """
+
+    def __init__(self, frameUtils: Optional[SimFrameUtils], callback: Callable[[Any], None]):
+        super(SimFrameSink, self).__init__()
+        self.frameUtils = frameUtils
+        self.callback = callback
+        self.frameCnt = 0
+
+    def append(self, word):
+        fu = self.frameUtils
+        if fu is None:
+            self.frameCnt += 1
+            self.callback(word)
+            return
+
+        deque.append(self, word)
+        for _ in range(fu.count_frame_ends(word)):
+            frame = fu.receive_bytes(self)
+            self.frameCnt += 1
+            self.callback(frame)
+
+    def extend(self, words: Iterable):
+        for w in words:
+            self.append(w)
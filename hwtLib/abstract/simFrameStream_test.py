@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from collections import deque
+import unittest
+
+from hwtLib.abstract.simFrameStream import SimFrameSource, SimFrameSink
+from hwtLib.amba.axi4sSimFrameUtils import Axi4StreamSimFrameUtils
+
+
+class SimFrameStream_TC(unittest.TestCase):
+
+    @staticmethod
+    def _frame(i: int):
+        return bytes((i + j) & 0xff for j in range(i % 13 + 1))
+
+    def test_source_to_sink(self):
+        fu = Axi4StreamSimFrameUtils(32, USE_KEEP=True)
+        FRAME_CNT = 200
+        pulled = []
+
+        def frames():
+            for i in range(FRAME_CNT):
+                pulled.append(i)
+                yield self._frame(i)
+
+        src = SimFrameSource(frames(), fu, lookahead=2)
+        self.assertEqual(pulled, [], "Frames are pulled lazily")
+        received = []
+        sink = SimFrameSink(fu, received.append)
+
+        maxBuffered = 0
+        while src:
+            maxBuffered = max(maxBuffered, len(src._words))
+            # simulates a driver and a monitor agent connected together
+            sink.append(src.popleft())
+
+        self.assertTrue(src.isExhausted())
+        self.assertLessEqual(maxBuffered, 2 + 13 // 4 + 1)
+        self.assertEqual(len(sink), 0)
+        self.assertEqual(sink.frameCnt, FRAME_CNT)
+        self.assertEqual(src.frameCnt, FRAME_CNT)
+        self.assertSequenceEqual(received, [(0, list(self._frame(i))) for i in range(FRAME_CNT)])
+
+    def test_raw_words(self):
+        src = SimFrameSource(iter(range(10)), lookahead=3)
+        received = []
+        sink = SimFrameSink(None, received.append)
+        self.assertEqual(len(src), 3)
+        sink.extend(src.popleft() for _ in range(10))
+        self.assertSequenceEqual(received, list(range(10)))
+        self.assertFalse(src)
+        with self.assertRaises(IndexError):
+            src.popleft()
+
+    def test_source_deque_api(self):
+        pulled = []
+
+        def frames():
+            for i in range(6):
+                pulled.append(i)
+                yield i
+
+        src = SimFrameSource(frames(), lookahead=1)
+        # peek does not consume the word
+        self.assertEqual(src[0], 0)
+        self.assertEqual(src[2], 2)
+        self.assertEqual(pulled, [0, 1, 2])
+        self.assertEqual(src.popleft(), 0)
+        src.appendleft(-1)
+        # appended words follow after all frames from the iterator
+        src.extend([10, 11])
+        self.assertEqual(pulled, [0, 1, 2])
+        self.assertSequenceEqual(list(src), [-1, 1, 2, 3, 4, 5, 10, 11])
+        self.assertEqual(src[-1], 11)
+        src[0] = -2
+        self.assertEqual(src.popleft(), -2)
+        src.clear()
+        self.assertFalse(src)
+        self.assertTrue(src.isExhausted())
+        src.append(20)
+        self.assertSequenceEqual(list(src), [20])
+
+    def test_sink_generator_consumer(self):
+        fu = Axi4StreamSimFrameUtils(16)
+        received = []
+
+        def consumer():
+            while True:
+                received.append((yield))
+
+        c = consumer()
+        next(c)
+        sink = SimFrameSink(fu, c.send)
+        beats = deque()
+        fu.send_bytes(b"abcd", beats)
+        sink.append(beats.popleft())
+        self.assertEqual(received, [])
+        sink.append(beats.popleft())
+        self.assertEqual(received, [(0, [ord(c) for c in "abcd"])])
+
+
+if __name__ == "__main__":
+    testLoader = unittest.TestLoader()
+    # suite = unittest.TestSuite([SimFrameStream_TC("test_source_to_sink")])
+    suite = testLoader.loadTestsFromTestCase(SimFrameStream_TC)
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
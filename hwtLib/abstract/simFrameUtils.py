@@ -1,6 +1,6 @@
 from math import ceil
 from typing import Self, Union, Sequence, Generator, Generic, TypeVar, \
-    Deque
+    Deque, Iterable, Optional
 
 from hwt.hdl.const import HConst
 from hwt.hdl.types.bits import HBits
@@ -8,12 +8,64 @@ from hwt.hdl.types.bitsConst import HBitsConst
 from hwt.hdl.types.hdlType import HdlType
 from hwt.hdl.types.utils import HConst_from_words
 from hwt.hwIO import HwIO
+from pyMathBitPrecise.bit_utils import mask
 
 WordTupleTy = TypeVar('WordTupleTy')  # a type representing a word used by simulation agent for a target hwio
 
 b8_t = HBits(8)
 
 
+class SimFramePackingReport():
+    """
+    Statistics about packing of frames into words of a segmented stream
+    (produced by batched send, e.g. :meth:`hwtLib.amba.axi4SSegmentedSimFrameUtils.Axi4StreamSegmentedFrameUtils.send_frames_bytes`)
+
+    :ivar ~.SEGMENT_CNT: number of segments in a single word
+    :ivar ~.SEGMENT_BYTE_CNT: number of bytes in a single segment
+    :ivar ~.frameCnt: number of packed frames
+    :ivar ~.byteCnt: number of data bytes in all frames
+    :ivar ~.segmentCnt: number of segments occupied by the frames
+    """
+
+    def __init__(self, SEGMENT_CNT: int, SEGMENT_BYTE_CNT: int, frameCnt: int=0, byteCnt: int=0, segmentCnt: int=0):
+        self.SEGMENT_CNT = SEGMENT_CNT
+        self.SEGMENT_BYTE_CNT = SEGMENT_BYTE_CNT
+        self.frameCnt = frameCnt
+        self.byteCnt = byteCnt
+        self.segmentCnt = segmentCnt
+
+    def getWordCnt(self) -> int:
+        """
+        :return: minimal number of words required to transfer all segments
+        """
+        return ceil(self.segmentCnt / self.SEGMENT_CNT)
+
+    def getWastedBandwidthPercent(self) -> float:
+        """
+        :return: ratio of unused bytes in the segments occupied by the frames
+            (:see: :meth:`hwtLib.amba.axi4SSegmented.Axi4StreamSegmented.getWastedBandwidthPercent`
+            which computes the same for a single frame size)
+        """
+        capacity = self.segmentCnt * self.SEGMENT_BYTE_CNT
+        if capacity == 0:
+            return 0.0
+        return (capacity - self.byteCnt) / capacity
+
+    def getEfficiency(self) -> float:
+        """
+        :return: ratio of data bytes to the capacity of all words (including unused segments in the last word)
+        """
+        capacity = self.getWordCnt() * self.SEGMENT_CNT * self.SEGMENT_BYTE_CNT
+        if capacity == 0:
+            return 1.0
+        return self.byteCnt / capacity
+
+    def __repr__(self):
+        return (f"<{self.__class__.__name__:s} frames:{self.frameCnt:d}, bytes:{self.byteCnt:d},"
+                f" segments:{self.segmentCnt:d}, words:{self.getWordCnt():d},"
+                f" wasted:{self.getWastedBandwidthPercent() * 100:.2f}%, efficiency:{self.getEfficiency() * 100:.2f}%>")
+
+
 class SimFrameUtils(Generic[WordTupleTy]):
     """
     This class is a base class for utility classes which converts between pythonic formats of frames
@@ -95,6 +147,14 @@ class SimFrameUtils(Generic[WordTupleTy]):
         """
         raise NotImplementedError("Override this in your implementation of this abstract class")
 
+    def count_frame_ends(self, word: WordTupleTy) -> int:
+        """
+        :return: number of frames which are terminated in this word
+            (used to detect complete frames in a stream of words received by a monitor agent)
+        :note: The default implementation expects the last/eof flag to be the last member of the word tuple.
+        """
+        return int(word[-1])
+
     def send_bytes(self, data_B: Union[bytes, list[int]], ag_data: Deque[WordTupleTy], offset:int=0)\
             ->list[WordTupleTy]:
         """
@@ -112,3 +172,146 @@ class SimFrameUtils(Generic[WordTupleTy]):
         f = self.pack_frame(_data_B)
         ag_data.extend(f)
         return f
+
+    def _iterFramesBytesSegments(self, frames: Iterable[Union[bytes, Sequence[int]]], offset: int,
+                                 report: SimFramePackingReport)\
+            ->Generator[tuple[Union[int, HBitsConst, None], bool, bool, int], None, None]:
+        """
+        Cut frames to segments using int/bytes operations (used by :meth:`~.send_frames_bytes`)
+
+        :param frames: frames as bytes-like objects or lists of ints (None is not supported)
+        :param offset: number of invalid bytes before each frame (may be larger than a segment)
+        :param report: the report where frame and byte counters are updated
+        :return: generator of tuples (data, sof, eof, empty) for each segment,
+            data is an int if all bytes of segment are valid, None for zero length frame
+        """
+        assert self.BYTE_WIDTH == 8, ("Only 8b bytes are supported", self.BYTE_WIDTH)
+        B = self.SEGMENT_BYTE_CNT
+        dataFromPy = self.dataT.from_py
+        offsetPadding = bytes(offset)
+        for frame in frames:
+            report.frameCnt += 1
+            if not isinstance(frame, (bytes, bytearray, memoryview)):
+                frame = bytes(frame)
+            frameLen = len(frame)
+            if frameLen == 0:
+                assert self.SUPPORT_ZLP
+                yield (None, True, True, B)
+                continue
+
+            report.byteCnt += frameLen
+            if offset:
+                frame = offsetPadding + frame
+                frameLen += offset
+
+            lastStart = (frameLen - 1) // B * B
+            for start in range(0, frameLen, B):
+                chunk = frame[start:start + B]
+                chunkLen = len(chunk)
+                d = int.from_bytes(chunk, "little")
+                if start < offset:
+                    # the padding may span over multiple segments
+                    paddingLen = min(offset - start, chunkLen)
+                    d = dataFromPy(d, mask(chunkLen * 8) & ~mask(paddingLen * 8))
+                elif chunkLen != B:
+                    d = dataFromPy(d, mask(chunkLen * 8))
+                isLast = start == lastStart
+                yield (d, start == 0, isLast, B - chunkLen if isLast else 0)
+
+    def send_frames_bytes(self, frames: Iterable[Union[bytes, Sequence[int]]],
+                          ag_data: Deque[WordTupleTy],
+                          offset: int=0) -> SimFramePackingReport:
+        """
+        Batched version of :meth:`~.send_bytes`, pack all frames into words at once
+
+        :param frames: frames as bytes-like objects or lists of ints (None is not supported)
+        :param offset: number of invalid bytes before each frame
+        :return: the report about the packing efficiency
+        """
+        raise NotImplementedError("Override this in your implementation of this abstract class")
+
+    def _getWordSegments(self, word: WordTupleTy)\
+            ->tuple[int, Sequence[Optional[tuple[Union[int, HBitsConst], Optional[int], int, int, int]]]]:
+        """
+        Decode word received by monitor agent (used by :meth:`~.receive_frames_bytes`)
+
+        :return: tuple (index of the first segment, segments) where each segment is a tuple
+            (data, sof, eof, empty, err) or None if the segment is not enabled,
+            sof is None if the hwio does not have sof flag
+        """
+        raise NotImplementedError("Override this in your implementation of this abstract class")
+
+    def _getWordRest(self, word: WordTupleTy, segmentI: int) -> WordTupleTy:
+        """
+        :return: the word with the segments starting from segmentI
+            (used to return unprocessed part of the word back to agent data)
+        """
+        raise NotImplementedError("Override this in your implementation of this abstract class")
+
+    def receive_frames_bytes(self, ag_data: Deque[WordTupleTy],
+                             frameCnt: Optional[int]=None) -> list[tuple[int, bytes, int]]:
+        """
+        Batched version of :meth:`~.receive_bytes`, unpack frames from words received by monitor agent
+        using int/bytes operations.
+
+        :param frameCnt: maximum number of frames to receive, if None all frames are received
+        :return: list of tuples (startSegmentIndex, data bytes, error)
+        """
+        assert self.BYTE_WIDTH == 8, ("Only 8b bytes are supported", self.BYTE_WIDTH)
+        B = self.SEGMENT_BYTE_CNT
+        fullMask = mask(B * 8)
+        getWordSegments = self._getWordSegments
+
+        res = []
+        cur: Optional[bytearray] = None
+        err = 0
+        segmentIndex = 0
+        while ag_data and (frameCnt is None or len(res) < frameCnt):
+            w = ag_data.popleft()
+            firstSegmentI, segments = getWordSegments(w)
+            for i, seg in enumerate(segments):
+                if frameCnt is not None and len(res) == frameCnt:
+                    # return rest of the word back for later use
+                    ag_data.appendleft(self._getWordRest(w, i))
+                    break
+
+                if seg is None:
+                    assert cur is None, "All segments between sof-eof must have enable=1 or whole word must have valid=0"
+                    continue
+
+                data, sof, eof, empty, segErr = seg
+                isFirst = cur is None
+                if sof is not None:
+                    assert bool(sof) == isFirst, ("Sof must be 1 in the first segment of the frame", sof, isFirst)
+                if isFirst:
+                    cur = bytearray()
+                    err = 0
+                    segmentIndex = firstSegmentI + i
+
+                err |= segErr
+                if empty != 0:
+                    assert eof, "non-full word in the middle of the packet"
+
+                byteCnt = B - empty
+                if byteCnt:
+                    if isinstance(data, int):
+                        val = data
+                        vldMask = fullMask
+                    else:
+                        val = data.val
+                        vldMask = data.vld_mask
+                    m = mask(byteCnt * 8)
+                    if vldMask & m != m:
+                        raise AssertionError(
+                            "Data not valid but it should be"
+                            f' based on value of "empty" empty:{empty:d}, vld_mask:0x{vldMask:x}')
+                    cur += (val & m).to_bytes(B, "little")[:byteCnt]
+
+                if eof:
+                    res.append((segmentIndex, bytes(cur), err))
+                    cur = None
+
+        if cur is not None:
+            raise ValueError("Unfinished frame", cur)
+
+        return res
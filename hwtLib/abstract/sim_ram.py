@@ -1,21 +1,63 @@
+from functools import lru_cache
+from io import IOBase
 from math import ceil
-from typing import Optional, Union
+from typing import BinaryIO, Iterable, List, MutableMapping, NamedTuple, \
+    Optional, Sequence, Tuple, Union
 
 from hwt.hdl.transTmpl import TransTmpl
-from hwt.hdl.types.array import HArray
 from hwt.hdl.types.bits import HBits
 from hwt.hdl.types.bitsConst import HBitsConst
 from hwt.hdl.types.struct import HStruct
 from hwt.math import shiftIntArray
 from hwt.pyUtils.arrayQuery import grouper
-from pyMathBitPrecise.bit_utils import mask, get_bit_range, int_list_to_int
+from hwtLib.abstract.sim_ram_access_plan import getAccessPlan
+from hwtLib.abstract.sim_ram_allocator import AllocationError, SimRamAllocation, \
+    SimRamAllocator
+from hwtLib.abstract.sim_ram_monitor import SimRamAccessMonitor
+from hwtLib.abstract.sim_ram_paged import SimRamPagedStorage
+from pyMathBitPrecise.bit_utils import mask, get_bit_range, int_list_to_int, \
+    ValidityError
 
 
-class AllocationError(Exception):
+# bit mask for every possible byte of strobe signal (bit i in strobe -> byte i in mask)
+_STRB_BYTE_TO_MASK = tuple(
+    sum(0xff << (8 * i) for i in range(8) if (s >> i) & 1)
+    for s in range(256)
+)
+
+
+@lru_cache(maxsize=4096)
+def strb_to_bit_mask(strb: int) -> int:
+    """
+    Convert byte strobe/byte enable (1 bit per byte) to a bit mask (8 bits per byte)
+    """
+    m = 0
+    shift = 0
+    while strb:
+        m |= _STRB_BYTE_TO_MASK[strb & 0xff] << shift
+        strb >>= 8
+        shift += 64
+    return m
+
+
+class SimRamOp(NamedTuple):
     """
-    Exception which says that requested allocation can not be performed
+    Transaction level memory operation (e.g. a bus burst), :see: :meth:`SimRam.execute`
+
+    :ivar ~.addr: address of the first byte (does not have to be aligned to a word)
+    :ivar ~.len: number of memory words (bus data beats)
+    :ivar ~.data: None for read, sequence of word values for write
+    :ivar ~.byteMask: None if all bytes of all words are written, else sequence
+        of byte strobes (1 bit per byte) for each written word
     """
-    pass
+    addr: int
+    len: int
+    data: Optional[Sequence[Union[None, int, HBitsConst]]] = None
+    byteMask: Optional[Sequence[int]] = None
+
+    @property
+    def isWrite(self) -> bool:
+        return self.data is not None
 
 
 def reshapedInitItems(actualCellSize, requestedCellSize, values):
@@ -41,27 +83,103 @@ class SimRam():
     """
     Dense memory for simulation purposes with data pump interfaces
 
-    :ivar ~.data: memory dict
+    :ivar ~.data: memory dict (word index -> word value) or an object with the same interface
+        (e.g. :class:`hwtLib.abstract.sim_ram_paged.SimRamPagedStorage`)
+    :ivar ~.allocator: allocator which keeps track of allocated blocks of memory
+    :ivar ~.monitor: optional instrumentation of the accesses from the bus (:see: :meth:`~.attachMonitor`)
     """
 
-    def __init__(self, cellSize:int, parent=None):
+    def __init__(self, cellSize:int, parent=None,
+                 storage: Optional[MutableMapping[int, Union[None, int, HBitsConst]]]=None):
         """
         :param cellSize: specifies the number of bytes of word
             (byte is unit of the addres and it does not have to be 8b)
         :param clk: clk signal for synchronization
         :param parent: parent instance of SimRam
                        (memory will be shared with this instance)
+        :param storage: optional object used to store memory words instead of dict
+            (e.g. :class:`hwtLib.abstract.sim_ram_paged.SimRamPagedStorage` for large memories)
         """
 
         self.parent = parent
         if parent is None:
-            self.data: dict[int, Union[int, HBitsConst]] = {}
+            if storage is None:
+                storage = {}
+            else:
+                _cellSize = getattr(storage, "cellSize", cellSize)
+                assert _cellSize == cellSize, ("Storage word size does not match", _cellSize, cellSize)
+            self.data: MutableMapping[int, Union[None, int, HBitsConst]] = storage
+            self.allocator = SimRamAllocator(cellSize)
         else:
-            self.data: dict[int, Union[int, HBitsConst]] = parent.data
+            assert storage is None, "Memory storage is inherited from parent"
+            assert parent.cellSize == cellSize, ("Parent word size does not match", parent.cellSize, cellSize)
+            self.data: MutableMapping[int, Union[None, int, HBitsConst]] = parent.data
+            self.allocator = parent.allocator
         self.cellSize = cellSize
-        self.prevAllocatedAddrEnd = 0
+        self.word_t = HBits(cellSize * 8)
+        self._strbAllMask = mask(cellSize)
+        self._wordBitMask = mask(cellSize * 8)
+        self.monitor: Optional[SimRamAccessMonitor] = None
+
+    def attachMonitor(self, monitor: Optional[SimRamAccessMonitor]=None) -> SimRamAccessMonitor:
+        """
+        Start to collect statistics about the accesses to this memory from the bus
+
+        :param monitor: optional monitor object, if None a new one is created
+        :return: the monitor
+        """
+        if monitor is None:
+            monitor = SimRamAccessMonitor()
+        if monitor.now is None:
+            monitor.now = self._getSimTime
+        self.monitor = monitor
+        return monitor
+
+    def _getSimTime(self) -> Optional[int]:
+        """
+        :return: actual simulation time (None if the memory is not connected to simulator)
+        """
+        return None
+
+    @property
+    def prevAllocatedAddrEnd(self) -> int:
+        return self.allocator.lastAllocatedEnd
+
+    def _isOccupied(self, addr: int, size: int) -> bool:
+        """
+        Check if any word of the block is already present in the memory
+        """
+        d = self.data
+        cellSize = self.cellSize
+        for i in range(addr // cellSize, ceil((addr + size) / cellSize)):
+            if i in d:
+                return True
+        return False
+
+    def _allocate(self, size: int, keepOut: Optional[int], align: Optional[int]) -> int:
+        """
+        Allocate block of memory in allocator and check that it does not collide
+        with the data which were written directly to memory (without allocation)
+        """
+        a = self.allocator
+        addr = a.malloc(size, keepOut=keepOut, align=align)
+        if self._isOccupied(addr, size):
+            # somebody wrote to memory without allocation, allocate behind all used memory,
+            # the colliding block is not released so it can not be allocated again
+            a.discard(addr)
+            if isinstance(self.data, SimRamPagedStorage):
+                maxIndex = self.data.maxIndex()
+            else:
+                maxIndex = max(self.data.keys())
+            a.skipTo((maxIndex + 1) * self.cellSize)
+            addr = a.malloc(size, keepOut=keepOut, align=align, fromFreeList=False)
+            if self._isOccupied(addr, size):
+                a.free(addr)
+                raise AllocationError(
+                    "Address 0x%x is already occupied" % addr)
+        return addr
 
-    def malloc(self, size, keepOut=None):
+    def malloc(self, size, keepOut=None, align=None):
         """
         Allocates a block of memory of size and initialize it
         with None (invalid value)
@@ -69,35 +187,19 @@ class SimRam():
         :param size: Size of memory block to allocate.
         :param keepOut: optional memory spacing between this memory region
                         and lastly allocated
+        :param align: optional alignment of the address of the block
+            (if None the block starts at the word boundary + keepOut)
         :return: address of allocated memory
         """
-        addr = self.prevAllocatedAddrEnd
-        k = self.data.keys()
-        if k:
-            addr = (max(k) + 1) * self.cellSize
-
-        if keepOut:
-            addr += keepOut
-
-        indx = addr // self.cellSize
-        if indx * self.cellSize != addr:
-            NotImplementedError(
-                f"unaligned allocations not implemented (0x{addr:x})")
-
+        addr = self._allocate(size, keepOut, align)
         d = self.data
-        for i in range(size // self.cellSize):
-            tmp = indx + i
+        cellSize = self.cellSize
+        for i in range(addr // cellSize, ceil((addr + size) / cellSize)):
+            d[i] = None
 
-            if tmp in d.keys():
-                raise AllocationError(
-                    "Address 0x%x is already occupied" % (tmp * self.cellSize))
-
-            d[tmp] = None
-
-        self.prevAllocatedAddrEnd = addr
         return addr
 
-    def calloc(self, num, size, keepOut=None, initValues=None) -> int:
+    def calloc(self, num, size, keepOut=None, initValues=None, align=None) -> int:
         """
         Allocates a block of memory for an array of num elements, each of them
         size bytes long, and initializes all its bits to zero.
@@ -107,44 +209,479 @@ class SimRam():
         :param keepOut: optional memory spacing between this memory region
                         and lastly allocated (number of bit between last allocated segment to avoid)
         :param initValues: iterable of word values to init memory with
+        :param align: optional alignment of the address of the block
+            (if None the block starts at the word boundary + keepOut)
         :return: address (byte step) of allocated memory
         """
-        addr = self.prevAllocatedAddrEnd
-        k = self.data.keys()
-        if k:
-            addr = (max(k) + 1) * self.cellSize
-
-        if keepOut:
-            addr += keepOut
-
-        indx = addr // self.cellSize
-        shift = addr % self.cellSize
-        wordCnt = ceil((num * size) / self.cellSize)
+        a = self.allocator
+        cellSize = self.cellSize
+        # resolve the address of the block to know the number of words before allocation
+        if align is None:
+            shift = (keepOut or 0) % cellSize
+        else:
+            shift = 0
+        wordCnt = ceil((num * size) / cellSize)
         if shift:
-            # shift all data in init values
-            initValues = shiftIntArray(initValues, self.cellSize * 8, shift * 8)
             wordCnt += 1
+        addr = self._allocate(wordCnt * cellSize - shift, keepOut, align)
+        assert addr % cellSize == shift, (addr, shift, "unaligned allocations with explicit alignment are not supported")
+
+        indx = addr // cellSize
+        if shift and initValues is not None:
+            # shift all data in init values
+            initValues = shiftIntArray(initValues, cellSize * 8, shift * 8)
 
         if initValues is not None:
-            if size != self.cellSize:
+            if size != cellSize:
                 initValues = list(reshapedInitItems(
-                    size, self.cellSize, initValues))
-            assert len(initValues) == wordCnt, (len(initValues), wordCnt)
+                    size, cellSize, initValues))
+            if len(initValues) != wordCnt:
+                a.free(addr)
+                raise AssertionError(len(initValues), wordCnt)
 
         d = self.data
-        for i in range(wordCnt):
-            tmp = indx + i
+        if initValues is None:
+            for i in range(indx, indx + wordCnt):
+                d[i] = 0
+        else:
+            for i, v in enumerate(initValues, start=indx):
+                d[i] = v
 
-            if tmp in d.keys():
-                raise AllocationError(
-                    "Address 0x%x is already occupied" % (tmp * self.cellSize))
-            if initValues is None:
-                d[tmp] = 0
+        return addr
+
+    def free(self, addr: int):
+        """
+        Release block of memory allocated by :meth:`~.malloc` or :meth:`~.calloc`
+        and remove its content from memory
+        """
+        b = self.allocator.free(addr)
+        d = self.data
+        cellSize = self.cellSize
+        for i in range(b.addr // cellSize, b.end // cellSize):
+            d.pop(i, None)
+
+    def realloc(self, addr: int, size: int) -> int:
+        """
+        Change the size of the block of memory allocated by :meth:`~.malloc` or :meth:`~.calloc`,
+        the content of the block is preserved (up to the smaller of old and new size),
+        the new memory is uninitialized.
+
+        :return: new address of the block (the block is moved if it can not be resized in place)
+        """
+        a = self.allocator
+        b = a.findBlock(addr)
+        if b is None or b.addr != addr:
+            raise AllocationError(f"Address 0x{addr:x} is not a beginning of allocated block")
+        cellSize = self.cellSize
+        d = self.data
+        oldStartIndex = addr // cellSize
+        oldEndIndex = b.end // cellSize
+        if a.tryResize(addr, size):
+            newEndIndex = ceil((addr + size) / cellSize)
+            if newEndIndex > oldEndIndex:
+                for i in range(oldEndIndex, newEndIndex):
+                    d[i] = None
+            else:
+                for i in range(newEndIndex, oldEndIndex):
+                    d.pop(i, None)
+            return addr
+
+        newAddr = self._allocate(size, addr % cellSize, None)
+        newStartIndex = newAddr // cellSize
+        newWordCnt = ceil((newAddr + size) / cellSize) - newStartIndex
+        oldWordCnt = oldEndIndex - oldStartIndex
+        for i in range(newWordCnt):
+            if i < oldWordCnt:
+                v = d.get(oldStartIndex + i, None)
             else:
-                d[tmp] = initValues[i]
+                v = None
+            d[newStartIndex + i] = v
 
-        self.prevAllocatedAddrEnd = (indx + wordCnt) * self.cellSize
-        return addr
+        self.free(addr)
+        return newAddr
+
+    def allocationMap(self) -> List[SimRamAllocation]:
+        """
+        :return: list of allocated blocks sorted by address
+        """
+        return self.allocator.allocationMap()
+
+    def _writeBytesToWords(self, addr: int, buff: memoryview):
+        """
+        Implementation of :meth:`~.load_bytes` for storage which stores words as Python objects
+        """
+        cellSize = self.cellSize
+        wordMask = mask(cellSize * 8)
+        d = self.data
+        size = len(buff)
+        offset = 0
+        while offset < size:
+            wordIndex, inWordOffset = divmod(addr + offset, cellSize)
+            chunk = min(size - offset, cellSize - inWordOffset)
+            v = int.from_bytes(buff[offset:offset + chunk], "little")
+            if chunk != cellSize:
+                # merge with current value of the word
+                cur = d.get(wordIndex, None)
+                if cur is None:
+                    cur_val = 0
+                    cur_mask = 0
+                elif isinstance(cur, int):
+                    cur_val = cur
+                    cur_mask = wordMask
+                else:
+                    cur_val = cur.val
+                    cur_mask = cur.vld_mask
+                m = mask(chunk * 8) << (inWordOffset * 8)
+                cur_val = (cur_val & ~m) | (v << (inWordOffset * 8))
+                cur_mask |= m
+                if cur_mask == wordMask:
+                    v = cur_val
+                else:
+                    v = HBits(cellSize * 8).from_py(cur_val, cur_mask)
+            d[wordIndex] = v
+            offset += chunk
+
+    def _readBytesFromWords(self, addr: int, size: int) -> Tuple[bytearray, Optional[bytearray]]:
+        """
+        Implementation of :meth:`~.readBytes` for storage which stores words as Python objects
+        """
+        cellSize = self.cellSize
+        wordMask = mask(cellSize * 8)
+        d = self.data
+        startIndex = addr // cellSize
+        endIndex = ceil((addr + size) / cellSize)
+        val = 0
+        vld = 0
+        allValid = True
+        for i in range(endIndex - 1, startIndex - 1, -1):
+            v = d.get(i, None)
+            val <<= cellSize * 8
+            vld <<= cellSize * 8
+            if v is None:
+                allValid = False
+            elif isinstance(v, int):
+                val |= v
+                vld |= wordMask
+            else:
+                val |= v.val & wordMask
+                vld |= v.vld_mask & wordMask
+                allValid &= v.vld_mask & wordMask == wordMask
+
+        inWordOffset = (addr % cellSize) * 8
+        data = bytearray((val >> inWordOffset).to_bytes(
+            (endIndex - startIndex) * cellSize, "little")[:size])
+        if allValid:
+            return data, None
+        vld = bytearray((vld >> inWordOffset).to_bytes(
+            (endIndex - startIndex) * cellSize, "little")[:size])
+        if vld.count(0xff) == size:
+            return data, None
+        return data, vld
+
+    def readBytes(self, addr: int, size: int) -> Tuple[bytearray, Optional[bytearray]]:
+        """
+        Read bytes from memory together with their validity
+
+        :param addr: address of the first byte
+        :param size: number of bytes to read
+        :return: tuple (data, validity mask), validity mask is None if all bits are valid
+        """
+        if isinstance(self.data, SimRamPagedStorage):
+            return self.data.readBytes(addr, size)
+        else:
+            return self._readBytesFromWords(addr, size)
+
+    def load_bytes(self, addr: int, buff: Union[bytes, bytearray, memoryview]):
+        """
+        Write bytes to memory (without allocation, :see: :meth:`~.malloc`)
+
+        :param addr: address of the first byte
+        :param buff: any object which supports buffer protocol
+        """
+        buff = memoryview(buff).cast("B")
+        if isinstance(self.data, SimRamPagedStorage):
+            self.data.writeBytes(addr, buff)
+        else:
+            self._writeBytesToWords(addr, buff)
+
+    def dump_bytes(self, addr: int, size: int, allowInvalid=False) -> memoryview:
+        """
+        Read bytes from memory
+
+        :param addr: address of the first byte
+        :param size: number of bytes to read
+        :param allowInvalid: if True invalid bits are read as 0 else an exception is raised
+        :raise ValidityError: if any bit of the data is not valid and allowInvalid is False
+        """
+        data, vld = self.readBytes(addr, size)
+        if vld is not None:
+            if not allowInvalid:
+                firstInvalid = next(i for i, b in enumerate(vld) if b != 0xff)
+                raise ValidityError(
+                    "Invalid read of uninitialized value on addr 0x%x"
+                    % (addr + firstInvalid))
+            data = bytearray((int.from_bytes(data, "little") & int.from_bytes(vld, "little"))
+                             .to_bytes(size, "little"))
+        return memoryview(data)
+
+    def load_ndarray(self, addr: int, arr: "numpy.ndarray", byteorder: Optional[str]=None):
+        """
+        Write content of numpy array to memory
+
+        :param addr: address of the first byte
+        :param arr: numpy array (or anything convertible to it), items are stored in C order
+        :param byteorder: optional byte order ("<", ">", "=") to convert items to before storing,
+            if None the byte order of the array is used
+        """
+        import numpy as np
+        arr = np.ascontiguousarray(arr)
+        if byteorder is not None:
+            arr = arr.astype(arr.dtype.newbyteorder(byteorder), copy=False)
+        self.load_bytes(addr, arr.reshape(-1).view(np.uint8))
+
+    def dump_ndarray(self, addr: int, count: int, dtype, byteorder: Optional[str]=None,
+                     allowInvalid=False) -> "numpy.ndarray":
+        """
+        Read memory as a numpy array
+
+        :param addr: address of the first byte
+        :param count: number of items to read
+        :param dtype: numpy dtype of items
+        :param byteorder: optional byte order of items in memory ("<", ">", "="),
+            if None the byte order of the dtype is used
+        :param allowInvalid: :see: :meth:`~.dump_bytes`
+        """
+        import numpy as np
+        dtype = np.dtype(dtype)
+        if byteorder is not None:
+            dtype = dtype.newbyteorder(byteorder)
+        data = self.dump_bytes(addr, count * dtype.itemsize, allowInvalid=allowInvalid)
+        return np.frombuffer(data, dtype=dtype, count=count)
+
+    def load_file(self, addr: int, file: Union[str, BinaryIO], size: Optional[int]=None) -> int:
+        """
+        Write content of a binary file to memory
+
+        :param addr: address of the first byte
+        :param file: file name or binary file object
+        :param size: optional number of bytes to read from file, if None whole file is read
+        :return: number of bytes written to memory
+        """
+        if size is None:
+            size = -1
+        if isinstance(file, IOBase):
+            data = file.read(size)
+        else:
+            with open(file, "rb") as f:
+                data = f.read(size)
+        self.load_bytes(addr, data)
+        return len(data)
+
+    def dump_file(self, addr: int, size: int, file: Union[str, BinaryIO], allowInvalid=False):
+        """
+        Write content of the memory to a binary file
+
+        :param addr: address of the first byte
+        :param size: number of bytes to write
+        :param file: file name or binary file object
+        :param allowInvalid: :see: :meth:`~.dump_bytes`
+        """
+        data = self.dump_bytes(addr, size, allowInvalid=allowInvalid)
+        if isinstance(file, IOBase):
+            file.write(data)
+        else:
+            with open(file, "wb") as f:
+                f.write(data)
+
+    def _write_single_word(self, data: Union[int, HBitsConst], strb: int, word_i: int):
+        """
+        Write a word to memory, only the bytes with strb bit set are written
+
+        :param strb: byte strobe (bits above the cellSize are ignored)
+        """
+        if strb == 0:
+            return
+
+        if strb != self._strbAllMask:
+            wordMask = self._wordBitMask
+            m = strb_to_bit_mask(strb) & wordMask
+            if m == wordMask:
+                # bits of strobe above the word width are not important
+                self.data[word_i] = data
+                return
+
+            cur = self.data.get(word_i, None)
+            if cur is None:
+                cur_val = 0
+                cur_mask = 0
+            elif isinstance(cur, int):
+                cur_val = cur
+                cur_mask = wordMask
+            else:
+                cur_val = cur.val
+                cur_mask = cur.vld_mask
+
+            if data is None:
+                d_val = 0
+                d_mask = 0
+            elif isinstance(data, int):
+                d_val = data
+                d_mask = wordMask
+            else:
+                d_val = data.val
+                d_mask = data.vld_mask
+
+            nm = ~m
+            cur_val = (cur_val & nm) | (d_val & m)
+            cur_mask = (cur_mask & nm) | (d_mask & m)
+            if cur_mask == wordMask:
+                data = cur_val
+            else:
+                data = self.word_t.from_py(cur_val & cur_mask, cur_mask)
+
+        self.data[word_i] = data
+
+    def _bytesToWords(self, data: bytearray, vld: Optional[bytearray]) -> List[Union[None, int, HBitsConst]]:
+        """
+        Convert bytes and their validity (:see: :meth:`~.readBytes`) to a list of memory words
+        """
+        cellSize = self.cellSize
+        if vld is None:
+            return [int.from_bytes(data[i:i + cellSize], "little")
+                    for i in range(0, len(data), cellSize)]
+
+        wordMask = self._wordBitMask
+        word_t = self.word_t
+        res = []
+        for i in range(0, len(data), cellSize):
+            m = int.from_bytes(vld[i:i + cellSize], "little")
+            if m == 0:
+                v = None
+            else:
+                v = int.from_bytes(data[i:i + cellSize], "little")
+                if m != wordMask:
+                    v = word_t.from_py(v & m, m)
+            res.append(v)
+        return res
+
+    def readWords(self, addr: int, wordCnt: int, _id: Optional[int]=None) -> List[Union[None, int, HBitsConst]]:
+        """
+        Read a burst of memory words
+
+        :param addr: address of the first byte, if it is not aligned to a word
+            the words are composed from the bytes of two neighbor words
+        :param wordCnt: number of words to read
+        :param _id: optional transaction id (for :attr:`~.monitor`)
+        :return: list of words, int for fully valid word, :class:`hwt.hdl.types.bitsConst.HBitsConst`
+            for partially valid and None for uninitialized word
+        """
+        cellSize = self.cellSize
+        d = self.data
+        if addr % cellSize == 0 and not isinstance(d, SimRamPagedStorage):
+            baseIndex = addr // cellSize
+            res = [d.get(i, None) for i in range(baseIndex, baseIndex + wordCnt)]
+        else:
+            data, vld = self.readBytes(addr, wordCnt * cellSize)
+            res = self._bytesToWords(data, vld)
+
+        if self.monitor is not None:
+            # the words written from bus are stored as HBitsConst even if they are fully valid
+            wordMask = self._wordBitMask
+            self.monitor.onRead(addr, wordCnt * cellSize, _id,
+                                tuple(addr + i * cellSize
+                                      for i, v in enumerate(res)
+                                      if v is None or (not isinstance(v, int) and v.vld_mask != wordMask)))
+        return res
+
+    def writeWords(self, addr: int, data: Sequence[Union[None, int, HBitsConst]],
+                   byteMask: Optional[Sequence[int]]=None, _id: Optional[int]=None):
+        """
+        Write a burst of memory words
+
+        :param addr: address of the first byte, if it is not aligned to a word
+            every word is split to two neighbor memory words
+        :param data: values of words (None for invalid word)
+        :param byteMask: optional byte strobe for each word (1 bit per byte), if None all bytes are written
+        :param _id: optional transaction id (for :attr:`~.monitor`)
+        """
+        cellSize = self.cellSize
+        strbAllMask = self._strbAllMask
+        d = self.data
+        baseIndex, offset = divmod(addr, cellSize)
+        if byteMask is not None and all(strb == strbAllMask for strb in byteMask):
+            byteMask = None
+
+        if self.monitor is not None:
+            if byteMask is None:
+                maskedBytes = 0
+            else:
+                maskedBytes = sum(cellSize - bin(strb & strbAllMask).count("1") for strb in byteMask)
+            self.monitor.onWrite(addr, len(data) * cellSize, _id, maskedBytes)
+
+        if offset == 0 and not isinstance(d, SimRamPagedStorage):
+            if byteMask is None:
+                for i, v in enumerate(data, start=baseIndex):
+                    d[i] = v
+            else:
+                for i, (v, strb) in enumerate(zip(data, byteMask), start=baseIndex):
+                    self._write_single_word(v, strb, i)
+            return
+
+        if byteMask is None and all(isinstance(v, int) for v in data):
+            # whole burst is a continuous block of valid bytes
+            self.load_bytes(addr, b"".join(v.to_bytes(cellSize, "little") for v in data))
+            return
+
+        if byteMask is None:
+            byteMask = (strbAllMask for _ in range(len(data)))
+
+        if offset == 0:
+            for i, (v, strb) in enumerate(zip(data, byteMask), start=baseIndex):
+                self._write_single_word(v, strb, i)
+            return
+
+        # each word is split between two memory words
+        wordMask = self._wordBitMask
+        word_t = self.word_t
+        lowShift = offset * 8
+        highShift = (cellSize - offset) * 8
+        for i, (v, strb) in enumerate(zip(data, byteMask), start=baseIndex):
+            if v is None:
+                val = 0
+                vld = 0
+            elif isinstance(v, int):
+                val = v
+                vld = wordMask
+            else:
+                val = v.val
+                vld = v.vld_mask
+
+            for wordIndex, _val, _vld, _strb in (
+                    (i, val << lowShift, vld << lowShift, strb << offset),
+                    (i + 1, val >> highShift, vld >> highShift, strb >> (cellSize - offset))):
+                _vld &= wordMask
+                if _vld == wordMask:
+                    w = _val & wordMask
+                else:
+                    w = word_t.from_py(_val & _vld, _vld)
+                self._write_single_word(w, _strb & strbAllMask, wordIndex)
+
+    def execute(self, ops: Iterable[SimRamOp]) -> List[Optional[List[Union[None, int, HBitsConst]]]]:
+        """
+        Execute a batch of transaction level operations in the specified order
+
+        :return: list with the read words for every read operation and None for every write operation
+        """
+        res = []
+        for op in ops:
+            if op.data is None:
+                res.append(self.readWords(op.addr, op.len))
+            else:
+                assert len(op.data) == op.len, op
+                assert op.byteMask is None or len(op.byteMask) == op.len, op
+                self.writeWords(op.addr, op.data, op.byteMask)
+                res.append(None)
+        return res
 
     def getArray(self, addr: int, item_size: int, item_cnt: int):
         """
@@ -152,7 +689,9 @@ class SimRam():
         """
         baseIndex = addr // self.cellSize
         if item_size != self.cellSize or baseIndex * self.cellSize != addr:
-            return self._getArray(addr * 8, TransTmpl(HBits(item_size * 8)[item_cnt]))
+            plan = getAccessPlan(HBits(item_size * 8)[item_cnt])
+            val, vld = self._readBitRange(addr * 8, addr * 8 + plan.bitWidth)
+            return plan.decode(val, vld)
         else:
             out = []
             for i in range(baseIndex, baseIndex + item_cnt):
@@ -207,48 +746,80 @@ class SimRam():
 
         return value
 
+    def _readBitRange(self, start: int, end: int) -> Tuple[int, int]:
+        """
+        Read a continuous range of bits from memory in a single pass
+
+        :param start: bit address of the first bit
+        :param end: bit address of the first bit behind the range
+        :return: tuple (value, validity mask), bit 0 corresponds to start
+        """
+        byteStart = start // 8
+        byteEnd = ceil(end / 8)
+        data, vld = self.readBytes(byteStart, byteEnd - byteStart)
+        shift = start - byteStart * 8
+        m = mask(end - start)
+        val = (int.from_bytes(data, "little") >> shift) & m
+        if vld is None:
+            vld = m
+        else:
+            vld = (int.from_bytes(vld, "little") >> shift) & m
+        return val, vld
+
+    def _writeBitRange(self, start: int, end: int, val: int, vld: int):
+        """
+        Write a continuous range of bits to memory, bits of the words outside of the range are preserved
+        """
+        wordWidth = self.cellSize * 8
+        wordMask = self._wordBitMask
+        word_t = self.word_t
+        d = self.data
+        firstWord = start // wordWidth
+        lastWord = (end - 1) // wordWidth
+        shift = start - firstWord * wordWidth
+        rangeMask = mask(end - start) << shift
+        val <<= shift
+        vld <<= shift
+        for i in range(firstWord, lastWord + 1):
+            off = (i - firstWord) * wordWidth
+            m = (rangeMask >> off) & wordMask
+            w_val = (val >> off) & m
+            w_vld = (vld >> off) & m
+            if m != wordMask:
+                cur = d.get(i, None)
+                if isinstance(cur, int):
+                    w_val |= cur & ~m
+                    w_vld |= wordMask & ~m
+                elif cur is not None:
+                    w_val |= cur.val & ~m
+                    w_vld |= cur.vld_mask & ~m
+
+            if w_vld == wordMask:
+                d[i] = w_val & wordMask
+            elif w_vld == 0:
+                d[i] = None
+            else:
+                d[i] = word_t.from_py(w_val & w_vld, w_vld)
+
     def _getArray(self, offset, transTmpl):
         """
         :param offset: global offset of this transTmpl (and struct)
         :param transTmpl: instance of TransTmpl which specifies items in array
         """
-        t = transTmpl.dtype
-        c = transTmpl.children
-        arr_offset = offset
-        item_width = c.bitAddrEnd - c.bitAddr
-        value = []
-        if not isinstance(t.element_t, HBits):
-            raise NotImplementedError(t.element_t)
-
-        for _ in range(t.size):
-            v = self.getBits(arr_offset, arr_offset + item_width, None)
-            value.append(v)
-            arr_offset += item_width
-        return value
+        plan = getAccessPlan(transTmpl)
+        start = offset + plan.bitAddr
+        val, vld = self._readBitRange(start, start + plan.bitWidth)
+        return plan.decode(val, vld)
 
     def _getStruct(self, offset, transTmpl):
         """
         :param offset: global offset of this transTmpl (and struct)
         :param transTmpl: instance of TransTmpl which specifies items in struct
         """
-        dataDict = {}
-        for subTmpl in transTmpl.children:
-            t = subTmpl.dtype
-            name = subTmpl.origin[-1].name
-            if isinstance(t, HBits):
-                value = self.getBits(
-                    subTmpl.bitAddr + offset, subTmpl.bitAddrEnd + offset, t.signed)
-            elif isinstance(t, HArray):
-                value = self._getArray(subTmpl.bitAddr + offset, subTmpl)
-
-            elif isinstance(t, HStruct):
-                value = self._getStruct(offset, subTmpl)
-            else:
-                raise NotImplementedError(t)
-
-            dataDict[name] = value
-
-        return transTmpl.dtype.from_py(dataDict)
+        plan = getAccessPlan(transTmpl)
+        start = offset + plan.bitAddr
+        val, vld = self._readBitRange(start, start + plan.bitWidth)
+        return plan.decode(val, vld)
 
     def getStruct(self, addr, structT, bitAddr=None):
         """
@@ -266,11 +837,51 @@ class SimRam():
         else:
             assert addr is not None
 
-        if isinstance(structT, TransTmpl):
-            transTmpl = structT
-            structT = transTmpl.origin
+        assert isinstance(structT, (HStruct, TransTmpl)), structT
+        plan = getAccessPlan(structT)
+
+        start = bitAddr + plan.bitAddr
+        val, vld = self._readBitRange(start, start + plan.bitWidth)
+        return plan.decode(val, vld)
+
+    def getStructs(self, addr: int, structT: Union[HStruct, TransTmpl], n: int, itemSize: Optional[int]=None) -> list:
+        """
+        Get n consecutive HStruct values from memory (the memory is read only once)
+
+        :param addr: address of the first struct
+        :param itemSize: size of the item in bytes, if None the items are packed
+            without gaps (bit_length of the struct)
+        """
+        plan = getAccessPlan(structT)
+        if itemSize is None:
+            bitStride = plan.bitWidth
         else:
-            assert isinstance(structT, HStruct)
-            transTmpl = TransTmpl(structT)
+            bitStride = itemSize * 8
+            assert bitStride >= plan.bitWidth, (itemSize, plan.bitWidth)
+
+        start = addr * 8 + plan.bitAddr
+        if n == 0:
+            return []
+        val, vld = self._readBitRange(start, start + (n - 1) * bitStride + plan.bitWidth)
+        m = mask(plan.bitWidth)
+        res = []
+        for _ in range(n):
+            res.append(plan.decode(val & m, vld & m))
+            val >>= bitStride
+            vld >>= bitStride
+        return res
+
+    def setStruct(self, addr: int, structT: Union[HStruct, TransTmpl], value, bitAddr=None):
+        """
+        Write HStruct value to memory
 
-        return self._getStruct(bitAddr, transTmpl)
+        :param value: value of the struct or a dict (nested dicts/lists for nested types),
+            missing fields are written as invalid
+        :param bitAddr: optional bit precise address, :see: :meth:`~.getStruct`
+        """
+        if bitAddr is None:
+            bitAddr = addr * 8
+        plan = getAccessPlan(structT)
+        val, vld = plan.encode(value)
+        start = bitAddr + plan.bitAddr
+        self._writeBitRange(start, start + plan.bitWidth, val, vld)
@@ -0,0 +1,178 @@
+from functools import lru_cache
+from typing import List, NamedTuple, Tuple, Union
+
+from hwt.hdl.transTmpl import TransTmpl
+from hwt.hdl.types.array import HArray
+from hwt.hdl.types.bits import HBits
+from hwt.hdl.types.hdlType import HdlType
+from hwt.hdl.types.struct import HStruct
+from pyMathBitPrecise.bit_utils import mask
+
+
+class SimRamFieldAccessor(NamedTuple):
+    """
+    Location of a single bit vector field in the memory
+
+    :ivar ~.path: names of struct fields and indexes of array items from the root type
+    :ivar ~.bitAddr: offset of the first bit of the field from the beginning of the root type
+    :ivar ~.width: number of bits
+    :ivar ~.dtype: type of the value of the field
+    """
+    path: Tuple[Union[str, int], ...]
+    bitAddr: int
+    width: int
+    dtype: HBits
+
+    def wordIndex(self, wordWidth: int) -> int:
+        """
+        :return: index of the memory word with the first bit of the field (relatively to the beginning of the root type)
+        """
+        return self.bitAddr // wordWidth
+
+
+class SimRamAccessPlan():
+    """
+    Precompiled flat description of the memory layout of a :class:`hwt.hdl.types.hdlType.HdlType`
+    which allows to decode/encode the value from/to the memory in a single pass
+    (:see: :meth:`hwtLib.abstract.sim_ram.SimRam.getStruct`)
+
+    :ivar ~.dtype: the type described by this plan
+    :ivar ~.bitAddr: offset of the type in its TransTmpl (the offsets of fields are relative to it)
+    :ivar ~.bitWidth: number of bits of the type in the memory
+    :ivar ~.fields: list of all bit vector fields in the order of the memory
+    :ivar ~._tree: nested lists which describe how the decoded values of fields
+        are composed to a value of the type, the item is a tuple (name, index of field) for
+        bit vectors, (name, tree, None) for structs and (name, list of trees, True) for arrays
+    """
+
+    def __init__(self, transTmpl: TransTmpl):
+        self.dtype = transTmpl.dtype
+        self.bitAddr = transTmpl.bitAddr
+        self.bitWidth = transTmpl.bitAddrEnd - transTmpl.bitAddr
+        self.fields: List[SimRamFieldAccessor] = []
+        self._tree = self._compile(transTmpl, (), 0)
+
+    def _addField(self, path, bitAddr: int, t: HBits):
+        i = len(self.fields)
+        self.fields.append(SimRamFieldAccessor(path, bitAddr, t.bit_length(), t))
+        return i
+
+    def _compile(self, transTmpl: TransTmpl, path: Tuple[Union[str, int], ...], offset: int):
+        """
+        :param offset: offset of the transTmpl relatively to the beginning of the plan
+        """
+        t = transTmpl.dtype
+        if isinstance(t, HBits):
+            return self._addField(path, offset, t)
+
+        elif isinstance(t, HArray):
+            c = transTmpl.children
+            item_width = c.bitAddrEnd - c.bitAddr
+            if isinstance(c.dtype, HBits):
+                item_t = HBits(item_width, signed=None)
+                return [self._addField((*path, i), offset + i * item_width, item_t)
+                        for i in range(t.size)]
+            else:
+                return [self._compile(c, (*path, i), offset + i * item_width - c.bitAddr)
+                        for i in range(t.size)]
+
+        elif isinstance(t, HStruct):
+            items = []
+            for subTmpl in transTmpl.children:
+                name = subTmpl.origin[-1].name
+                subPath = (*path, name)
+                subOffset = offset + subTmpl.bitAddr - transTmpl.bitAddr
+                items.append((name, self._compile(subTmpl, subPath, subOffset), subTmpl.dtype))
+            return items
+
+        else:
+            raise NotImplementedError(t)
+
+    def _build(self, tree, dtype: HdlType, values: list):
+        if isinstance(tree, int):
+            return values[tree]
+        elif isinstance(dtype, HArray):
+            return [self._build(t, dtype.element_t, values) for t in tree]
+        else:
+            return dtype.from_py({
+                name: self._build(t, subType, values)
+                for name, t, subType in tree
+            })
+
+    def decode(self, val: int, vld: int):
+        """
+        Convert the raw value of the memory to a value of the type
+
+        :param val: value of the bits (bit 0 is the first bit of the type in the memory)
+        :param vld: validity mask for val
+        """
+        values = []
+        for f in self.fields:
+            m = mask(f.width)
+            v = f.dtype.from_py(None)
+            v.val = (val >> f.bitAddr) & m
+            v.vld_mask = (vld >> f.bitAddr) & m
+            values.append(v)
+
+        return self._build(self._tree, self.dtype, values)
+
+    @staticmethod
+    def _getChild(value, key: Union[str, int]):
+        if value is None:
+            return None
+        elif isinstance(key, int):
+            items = getattr(value, "val", value)
+            if isinstance(items, dict):
+                return items.get(key, None)
+            return items[key]
+        elif isinstance(value, dict):
+            return value.get(key, None)
+        else:
+            return getattr(value, key, None)
+
+    def encode(self, value) -> Tuple[int, int]:
+        """
+        Convert a value of the type (or an equivalent dict/list structure) to the raw value of the memory
+
+        :return: tuple (value, validity mask), bit 0 is the first bit of the type in the memory
+        """
+        val = 0
+        vld = 0
+        for f in self.fields:
+            v = value
+            for k in f.path:
+                v = self._getChild(v, k)
+
+            m = mask(f.width)
+            if v is None:
+                continue
+            elif isinstance(v, int):
+                v_val = v & m
+                v_vld = m
+            else:
+                v_vld = v.vld_mask & m
+                v_val = v.val & v_vld
+            val |= v_val << f.bitAddr
+            vld |= v_vld << f.bitAddr
+
+        return val, vld
+
+
+@lru_cache(maxsize=None)
+def _getAccessPlanCached(dtype: HdlType) -> SimRamAccessPlan:
+    return SimRamAccessPlan(TransTmpl(dtype))
+
+
+def getAccessPlan(t: Union[HdlType, TransTmpl]) -> SimRamAccessPlan:
+    """
+    Get the access plan for the type, plans for types are cached
+
+    :param t: the type or a TransTmpl (plans for TransTmpl are not cached)
+    """
+    if isinstance(t, TransTmpl):
+        return SimRamAccessPlan(t)
+    try:
+        return _getAccessPlanCached(t)
+    except TypeError:
+        # unhashable type
+        return SimRamAccessPlan(TransTmpl(t))
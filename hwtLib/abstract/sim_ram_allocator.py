@@ -0,0 +1,278 @@
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from sortedcontainers import SortedList
+
+
+class AllocationError(Exception):
+    """
+    Exception which says that requested allocation can not be performed
+    """
+    pass
+
+
+class SimRamAllocation(NamedTuple):
+    """
+    Record about allocated block of memory
+
+    :ivar ~.addr: address of the first byte of the block
+    :ivar ~.size: size of the block as requested by user
+    :ivar ~.end: address of the first byte behind the block (the block is always extended
+        to the end of the memory word)
+    """
+    addr: int
+    size: int
+    end: int
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__:s} 0x{self.addr:x}-0x{self.end:x} (size={self.size:d})>"
+
+
+def align_up(addr: int, alignment: int) -> int:
+    """
+    Round address up to nearest multiple of alignment
+    """
+    r = addr % alignment
+    if r:
+        addr += alignment - r
+    return addr
+
+
+class SimRamAllocator():
+    """
+    Memory allocator for :class:`hwtLib.abstract.sim_ram.SimRam`
+
+    Allocates from a bump pointer and reuses released blocks using a best fit search in
+    a size sorted free list, the blocks are stored in :class:`sortedcontainers.SortedList`
+    so all lookups and updates are O(log n) in the number of blocks and do not depend
+    on the amount of data stored in the memory.
+
+    :ivar ~.cellSize: size of memory word (allocated blocks are always extended to the end of the word)
+    :ivar ~.bumpAddr: address of the first byte behind all allocated and released blocks
+    :ivar ~.lastAllocatedEnd: end address of the last allocated block
+    :ivar ~._starts: sorted list of start addresses of allocated blocks
+    :ivar ~._blocks: dictionary start address -> allocation record
+    :ivar ~._freeBySize: sorted list of tuples (size, start) of free blocks
+    :ivar ~._freeStarts: sorted list of start addresses of free blocks
+    :ivar ~._freeEnd: dictionary start address -> end address for free blocks
+    """
+
+    def __init__(self, cellSize: int, baseAddr: int=0):
+        self.cellSize = cellSize
+        self.bumpAddr = baseAddr
+        self.lastAllocatedEnd = baseAddr
+        self._starts: SortedList[int] = SortedList()
+        self._blocks: Dict[int, SimRamAllocation] = {}
+        self._freeBySize: SortedList[Tuple[int, int]] = SortedList()
+        self._freeStarts: SortedList[int] = SortedList()
+        self._freeEnd: Dict[int, int] = {}
+
+    def _resolveAddr(self, base: int, keepOut: int, align: Optional[int]) -> int:
+        """
+        :param align: if None the base is aligned to cellSize and keepOut is added to it,
+            else keepOut is added to base and the result is aligned
+        """
+        if align is None:
+            return align_up(base, self.cellSize) + keepOut
+        else:
+            return align_up(base + keepOut, align)
+
+    def _addFree(self, start: int, end: int):
+        """
+        Add block to free list and merge it with neighbors
+        """
+        assert start < end, (start, end)
+        fs = self._freeStarts
+        i = fs.bisect_left(start)
+        # merge with the predecessor
+        if i > 0:
+            prevStart = fs[i - 1]
+            prevEnd = self._freeEnd[prevStart]
+            if prevEnd == start:
+                self._removeFree(prevStart)
+                start = prevStart
+                i -= 1
+        # merge with the successor
+        if i < len(fs) and fs[i] == end:
+            nextEnd = self._freeEnd[end]
+            self._removeFree(end)
+            end = nextEnd
+
+        if end == self.bumpAddr:
+            # the block is at the end of used memory, return it to bump pointer
+            self.bumpAddr = start
+        else:
+            fs.add(start)
+            self._freeEnd[start] = end
+            self._freeBySize.add((end - start, start))
+
+    def _removeFree(self, start: int):
+        end = self._freeEnd.pop(start)
+        self._freeStarts.remove(start)
+        self._freeBySize.remove((end - start, start))
+
+    def _allocFromFreeList(self, size: int, keepOut: int, align: Optional[int]) -> Optional[int]:
+        # space lost by alignment of the start and by extension of the end to the end of word
+        worstCaseSize = size + keepOut + (align or self.cellSize) - 1 + self.cellSize - 1
+        fbs = self._freeBySize
+        i = fbs.bisect_left((worstCaseSize, -1))
+        if i == len(fbs):
+            return None
+        _, start = fbs[i]
+        end = self._freeEnd[start]
+        self._removeFree(start)
+
+        addr = self._resolveAddr(start, keepOut, align)
+        blockEnd = align_up(addr + size, self.cellSize)
+        assert blockEnd <= end, (start, end, addr, blockEnd)
+        if blockEnd < end:
+            self._addFree(blockEnd, end)
+        if start < addr:
+            # the space skipped because of keepOut or alignment stays available for other blocks
+            self._addFree(start, addr)
+        return addr
+
+    def malloc(self, size: int, keepOut: Optional[int]=None, align: Optional[int]=None,
+               fromFreeList: bool=True) -> int:
+        """
+        Allocate block of memory
+
+        :param size: size of block in bytes
+        :param keepOut: optional number of bytes to skip before the beginning of the block
+        :param align: optional alignment of the block (in bytes, applied after keepOut)
+        :param fromFreeList: if False the block is always allocated from the bump pointer
+            (behind all allocated and released blocks)
+        :return: address of allocated block
+        """
+        if size <= 0:
+            raise AllocationError("Invalid allocation size", size)
+        if align is not None and align <= 0:
+            raise AllocationError("Invalid alignment", align)
+        if keepOut is None:
+            keepOut = 0
+
+        if fromFreeList:
+            addr = self._allocFromFreeList(size, keepOut, align)
+        else:
+            addr = None
+
+        if addr is None:
+            addr = self._resolveAddr(self.bumpAddr, keepOut, align)
+            end = align_up(addr + size, self.cellSize)
+            self.bumpAddr = end
+        else:
+            end = align_up(addr + size, self.cellSize)
+
+        self._addBlock(SimRamAllocation(addr, size, end))
+        return addr
+
+    def _addBlock(self, b: SimRamAllocation):
+        self._starts.add(b.addr)
+        self._blocks[b.addr] = b
+        self.lastAllocatedEnd = b.end
+
+    def skipTo(self, addr: int):
+        """
+        Move bump pointer behind specified address (the skipped memory is not used for allocation)
+        """
+        if addr > self.bumpAddr:
+            self.bumpAddr = addr
+
+    def free(self, addr: int) -> SimRamAllocation:
+        """
+        Release block of memory allocated by :meth:`~.malloc`
+
+        :return: the allocation record of released block
+        """
+        b = self._blocks.pop(addr, None)
+        if b is None:
+            raise AllocationError(f"Address 0x{addr:x} is not a beginning of allocated block")
+        self._starts.remove(addr)
+        self._addFree(b.addr, b.end)
+        return b
+
+    def discard(self, addr: int) -> SimRamAllocation:
+        """
+        Forget the block allocated by :meth:`~.malloc` without releasing its memory
+        (e.g. because the memory is used by something else), the memory of the block is never allocated again
+
+        :return: the allocation record of discarded block
+        """
+        b = self._blocks.pop(addr, None)
+        if b is None:
+            raise AllocationError(f"Address 0x{addr:x} is not a beginning of allocated block")
+        self._starts.remove(addr)
+        return b
+
+    def tryResize(self, addr: int, size: int) -> bool:
+        """
+        Try to change the size of allocated block without moving it
+
+        :return: True if the resize was successful
+        """
+        b = self._blocks.get(addr, None)
+        if b is None:
+            raise AllocationError(f"Address 0x{addr:x} is not a beginning of allocated block")
+        if size <= 0:
+            raise AllocationError("Invalid allocation size", size)
+        newEnd = align_up(addr + size, self.cellSize)
+        if newEnd > b.end:
+            if b.end == self.bumpAddr:
+                self.bumpAddr = newEnd
+            else:
+                nextFreeEnd = self._freeEnd.get(b.end, None)
+                if nextFreeEnd is None or nextFreeEnd < newEnd:
+                    return False
+                self._removeFree(b.end)
+                if newEnd < nextFreeEnd:
+                    self._addFree(newEnd, nextFreeEnd)
+        elif newEnd < b.end:
+            self._addFree(newEnd, b.end)
+
+        self._blocks[addr] = SimRamAllocation(addr, size, newEnd)
+        return True
+
+    def findBlock(self, addr: int) -> Optional[SimRamAllocation]:
+        """
+        Find the allocated block which contains specified address
+        """
+        s = self._starts
+        i = s.bisect_right(addr)
+        if i == 0:
+            return None
+        b = self._blocks[s[i - 1]]
+        if addr < b.end:
+            return b
+        return None
+
+    def isAllocated(self, start: int, end: int) -> bool:
+        """
+        :return: True if any allocated block overlaps with the range [start, end)
+        """
+        s = self._starts
+        i = s.bisect_right(start)
+        if i > 0 and self._blocks[s[i - 1]].end > start:
+            return True
+        return i < len(s) and s[i] < end
+
+    def allocationMap(self) -> List[SimRamAllocation]:
+        """
+        :return: list of allocated blocks sorted by address
+        """
+        blocks = self._blocks
+        return [blocks[a] for a in self._starts]
+
+    def freeList(self) -> List[Tuple[int, int]]:
+        """
+        :return: list of tuples (start, end) of released blocks sorted by address
+        """
+        fe = self._freeEnd
+        return [(s, fe[s]) for s in self._freeStarts]
+
+    def __repr__(self):
+        buff = [f"<{self.__class__.__name__:s} bumpAddr=0x{self.bumpAddr:x}"]
+        for b in self.allocationMap():
+            buff.append(f"    {b}")
+        for s, e in self.freeList():
+            buff.append(f"    free 0x{s:x}-0x{e:x}")
+        buff.append(">")
+        return "\n".join(buff)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from hwtLib.abstract.sim_ram import SimRam
+from hwtLib.abstract.sim_ram_allocator import SimRamAllocator, AllocationError, \
+    SimRamAllocation
+
+
+class SimRamAllocator_TC(unittest.TestCase):
+
+    def test_bump(self):
+        a = SimRamAllocator(4)
+        self.assertEqual(a.malloc(10), 0)
+        self.assertEqual(a.malloc(4), 12)
+        self.assertEqual(a.malloc(4, keepOut=2), 18)
+        self.assertEqual(a.malloc(4, align=64), 64)
+        self.assertSequenceEqual(a.allocationMap(), [
+            SimRamAllocation(0, 10, 12),
+            SimRamAllocation(12, 4, 16),
+            SimRamAllocation(18, 4, 24),
+            SimRamAllocation(64, 4, 68),
+        ])
+        self.assertEqual(a.findBlock(13), SimRamAllocation(12, 4, 16))
+        self.assertIsNone(a.findBlock(16))
+        self.assertTrue(a.isAllocated(8, 13))
+        self.assertFalse(a.isAllocated(24, 64))
+
+    def test_free_reuse(self):
+        a = SimRamAllocator(4)
+        b0 = a.malloc(16)
+        b1 = a.malloc(16)
+        b2 = a.malloc(16)
+        a.free(b1)
+        self.assertSequenceEqual(a.freeList(), [(16, 32)])
+        # best fit from free list
+        self.assertEqual(a.malloc(8), b1)
+        self.assertSequenceEqual(a.freeList(), [(24, 32)])
+        a.free(b1)
+        a.free(b0)
+        # neighbor free blocks are merged
+        self.assertSequenceEqual(a.freeList(), [(0, 32)])
+        a.free(b2)
+        # free block at the end of memory is returned to bump pointer
+        self.assertSequenceEqual(a.freeList(), [])
+        self.assertEqual(a.bumpAddr, 0)
+
+        with self.assertRaises(AllocationError):
+            a.free(b2)
+
+    def test_free_reuse_aligned_does_not_leak(self):
+        a = SimRamAllocator(4)
+        b0 = a.malloc(256)
+        a.malloc(4)
+        a.free(b0)
+        for _ in range(16):
+            b = a.malloc(16, keepOut=8, align=64)
+            # the space in front of the block is not lost
+            self.assertSequenceEqual(a.freeList()[0], (0, b))
+            a.free(b)
+            self.assertSequenceEqual(a.freeList(), [(0, 256)])
+        self.assertEqual(a.bumpAddr, 260)
+
+    def test_tryResize(self):
+        a = SimRamAllocator(4)
+        b0 = a.malloc(8)
+        self.assertTrue(a.tryResize(b0, 16))
+        self.assertEqual(a.bumpAddr, 16)
+        b1 = a.malloc(8)
+        self.assertFalse(a.tryResize(b0, 20))
+        self.assertTrue(a.tryResize(b0, 4))
+        self.assertSequenceEqual(a.freeList(), [(4, 16)])
+        self.assertTrue(a.tryResize(b0, 12))
+        self.assertSequenceEqual(a.freeList(), [(12, 16)])
+        a.free(b1)
+        self.assertEqual(a.bumpAddr, 12)
+
+    def test_SimRam(self):
+        m = SimRam(4)
+        a0 = m.calloc(4, 4, initValues=[1, 2, 3, 4])
+        a1 = m.malloc(8)
+        self.assertDictEqual(m.data, {0: 1, 1: 2, 2: 3, 3: 4, 4: None, 5: None})
+
+        a0 = m.realloc(a0, 8)
+        self.assertEqual(a0, 0)
+        self.assertDictEqual(m.data, {0: 1, 1: 2, 4: None, 5: None})
+
+        a0 = m.realloc(a0, 20)
+        self.assertEqual(a0, 24)
+        self.assertDictEqual(m.data, {4: None, 5: None, 6: 1, 7: 2, 8: None, 9: None, 10: None})
+
+        m.free(a1)
+        m.free(a0)
+        self.assertDictEqual(m.data, {})
+        self.assertSequenceEqual(m.allocationMap(), [])
+
+    def test_SimRam_write_without_alloc(self):
+        m = SimRam(4)
+        for i in range(4):
+            m.data[i] = i
+        # allocation is placed behind the memory which was written without allocation
+        self.assertEqual(m.malloc(4), 16)
+
+    def test_SimRam_write_without_alloc_to_free_block(self):
+        m = SimRam(4)
+        a0 = m.malloc(16)
+        m.malloc(4)
+        m.free(a0)
+        # the released block is used without allocation
+        m.data[1] = 1
+        # the colliding block from free list is not reused again
+        self.assertEqual(m.malloc(8), 20)
+        self.assertEqual(m.malloc(8), 28)
+        # the rest of the released block is still available
+        self.assertSequenceEqual(m.allocator.freeList(), [(8, 16)])
+        self.assertEqual(m.malloc(2), 8)
+
+
+if __name__ == "__main__":
+    testLoader = unittest.TestLoader()
+    # suite = unittest.TestSuite([SimRamAllocator_TC("test_free_reuse")])
+    suite = testLoader.loadTestsFromTestCase(SimRamAllocator_TC)
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
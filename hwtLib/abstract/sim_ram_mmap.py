@@ -0,0 +1,216 @@
+import mmap
+import os
+from typing import Callable, List, Optional, Union
+
+from hwtLib.abstract.sim_ram_paged import SimRamPagedStorage, SimRamPage
+
+
+class SimRamMmapStorage(SimRamPagedStorage):
+    """
+    :class:`~.SimRamPagedStorage` which has a part of the memory backed by a memory mapped file
+    (an image of the memory). The file content is a raw content of the memory starting
+    at baseAddr, all words in the file are fully valid.
+
+    The file is mapped lazily by OS, which means that only the parts which are accessed are loaded
+    and that the physical memory is shared between all processes which map the same file.
+    In copyOnWrite mode the writes are private for this storage and the file is not modified,
+    otherwise the writes are visible to other processes which have the file mapped and they are
+    written to the file.
+
+    :note: The memory outside of the file is stored in regular pages.
+
+    :ivar ~.fileName: name of the memory image file
+    :ivar ~.baseAddr: address of the first byte of the file in memory
+    :ivar ~.imageSize: size of the image file in bytes
+    :ivar ~.copyOnWrite: if True the file is not modified by writes
+    """
+
+    def __init__(self, cellSize: int, fileName: str, baseAddr: int=0,
+                 copyOnWrite: bool=True, pageSize: int=64 * 1024):
+        """
+        :param cellSize: number of bytes in a single memory word
+        :param fileName: name of the memory image file
+        :param baseAddr: address of the first byte of the file in memory (has to be aligned to pageSize)
+        :param copyOnWrite: if True the file is not modified by writes
+        :param pageSize: number of bytes in a single page
+        """
+        super(SimRamMmapStorage, self).__init__(cellSize, pageSize=pageSize)
+        assert baseAddr % pageSize == 0, ("Base address has to be aligned to page size", baseAddr, pageSize)
+        self.fileName = fileName
+        self.baseAddr = baseAddr
+        self.copyOnWrite = copyOnWrite
+
+        self._file = open(fileName, "rb" if copyOnWrite else "r+b")
+        size = os.fstat(self._file.fileno()).st_size
+        # only whole pages are mapped, the rest of the file is copied to a regular page
+        mappedSize = size - size % pageSize
+        self.imageSize = size
+        if mappedSize:
+            self._mmap = mmap.mmap(self._file.fileno(), mappedSize,
+                                   access=mmap.ACCESS_COPY if copyOnWrite else mmap.ACCESS_WRITE)
+            self._view = memoryview(self._mmap)
+        else:
+            self._mmap = None
+            self._view = None
+        self._imagePages: List[SimRamPage] = []
+
+        wordsPerPage = self.wordsPerPage
+        firstPageIndex = self._firstPageIndex = baseAddr // pageSize
+        for i in range(mappedSize // pageSize):
+            p = SimRamPage(0, 0)
+            p.data = self._view[i * pageSize:(i + 1) * pageSize]
+            p.present = bytearray(b"\x01" * wordsPerPage)
+            p.presentCnt = wordsPerPage
+            self.pages[firstPageIndex + i] = p
+            self._imagePages.append(p)
+        self._len += len(self._imagePages) * wordsPerPage
+
+        if mappedSize != size:
+            # the end of the file which is smaller than page is stored in a regular page
+            self._file.seek(mappedSize)
+            self.writeBytes(baseAddr + mappedSize, self._file.read())
+            self._imagePages.append(self.pages[firstPageIndex + mappedSize // pageSize])
+
+    def _releasePage(self, pageIndex: int):
+        # pages of the image stay in memory as the file is still mapped
+        if not (self._firstPageIndex <= pageIndex < self._firstPageIndex + len(self._imagePages)):
+            super(SimRamMmapStorage, self)._releasePage(pageIndex)
+
+    def clear(self):
+        self.close()
+        super(SimRamMmapStorage, self).clear()
+
+    def flush(self):
+        """
+        Write changes to the file (if not in copyOnWrite mode)
+        """
+        if self.copyOnWrite:
+            return
+        if self._mmap is not None:
+            self._mmap.flush()
+        tailSize = self.imageSize % self.pageSize
+        if tailSize:
+            # the last page which is not mapped
+            p = self._imagePages[-1]
+            self._file.seek(self.imageSize - tailSize)
+            self._file.write(p.data[:tailSize])
+            self._file.flush()
+
+    def close(self):
+        """
+        Release the mapping of the file, the pages of the image are removed from memory
+        """
+        if self._file is None:
+            return
+        self.flush()
+        firstPageIndex = self._firstPageIndex
+        for i, p in enumerate(self._imagePages):
+            self.pages.pop(firstPageIndex + i, None)
+            self._len -= p.presentCnt
+            if isinstance(p.data, memoryview):
+                p.data.release()
+        self._imagePages.clear()
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @staticmethod
+    def getOrCreateImage(fileName: str, generator: Callable[[], Union[bytes, bytearray, memoryview]]) -> str:
+        """
+        Create the memory image file if it does not exist yet. The file is created atomically,
+        if multiple processes are generating the same image only one of them is used.
+
+        :param generator: function which returns the content of the image
+        :return: fileName
+        """
+        if not os.path.exists(fileName):
+            tmpName = f"{fileName:s}.{os.getpid():d}.tmp"
+            with open(tmpName, "wb") as f:
+                f.write(generator())
+            os.replace(tmpName, fileName)
+        return fileName
+
+    def __repr__(self):
+        return (f"<{self.__class__.__name__:s} {self.fileName:s} at 0x{self.baseAddr:x}, "
+                f"cellSize={self.cellSize:d}, pageSize={self.pageSize:d}, "
+                f"pages={len(self.pages):d}, words={self._len:d}>")
+
+
+def save_image(mem: "SimRam", fileName: str, saveValidity: Optional[bool]=None):
+    """
+    Save the content of the memory to a file in a format which can be used by :class:`~.SimRamMmapStorage`
+    (raw memory content where the offset in file is the address). The unused parts of the memory are
+    written as holes, which means that they do not consume the space on disk (for filesystems which support it).
+
+    :param mem: instance of :class:`hwtLib.abstract.sim_ram.SimRam`
+    :param saveValidity: if True the validity mask of the memory is also saved to file fileName + ".vld"
+        in the same format (bytes with 0xff are valid), if None the file is created only if there are invalid bytes
+    """
+    d = mem.data
+    if isinstance(d, SimRamPagedStorage):
+        pageSize = d.pageSize
+        chunks = [(pageIndex * pageSize, pageSize) for pageIndex in sorted(d.pages.keys())]
+    else:
+        cellSize = mem.cellSize
+        chunks = [(i * cellSize, cellSize) for i in sorted(d.keys())]
+
+    vldFileName = fileName + ".vld"
+    vldFile = None
+    with open(fileName, "wb") as f:
+        for i, (addr, size) in enumerate(chunks):
+            data, vld = mem.readBytes(addr, size)
+            f.seek(addr)
+            f.write(data)
+            if saveValidity or (saveValidity is None and vld is not None):
+                if vldFile is None:
+                    vldFile = open(vldFileName, "wb")
+                    # all previous chunks were valid
+                    for _addr, _size in chunks[:i]:
+                        vldFile.seek(_addr)
+                        vldFile.write(b"\xff" * _size)
+                vldFile.seek(addr)
+                vldFile.write(b"\xff" * size if vld is None else vld)
+
+    if vldFile is not None:
+        vldFile.close()
+    elif os.path.exists(vldFileName):
+        # remove the validity file from previous run
+        os.remove(vldFileName)
+
+
+class SimRamPostMortem():
+    """
+    Context manager which saves the content of the memory to a file if an exception occurs
+    (e.g. an assertion in test), :see: :func:`~.save_image`
+
+    .. code-block:: python
+
+        with SimRamPostMortem(mem, "tmp/mem.bin"):
+            self.runSim(100 * CLK_PERIOD)
+            self.assertEqual(...)
+    """
+
+    def __init__(self, mem: "SimRam", fileName: str):
+        self.mem = mem
+        self.fileName = fileName
+
+    def __enter__(self):
+        return self.mem
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            d = os.path.dirname(self.fileName)
+            if d:
+                os.makedirs(d, exist_ok=True)
+            save_image(self.mem, self.fileName)
+        return False
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+from tempfile import TemporaryDirectory
+import unittest
+
+from hwtLib.abstract.sim_ram import SimRam
+from hwtLib.abstract.sim_ram_mmap import SimRamMmapStorage, SimRamPostMortem, \
+    save_image
+from hwtLib.abstract.sim_ram_paged import SimRamPagedStorage
+
+
+class SimRamMmapStorage_TC(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpDir = TemporaryDirectory()
+        self.IMG = bytes(i & 0xff for i in range(4 * 16 + 6))
+        self.imgFile = SimRamMmapStorage.getOrCreateImage(
+            os.path.join(self.tmpDir.name, "img.bin"), lambda: self.IMG)
+
+    def tearDown(self):
+        self.tmpDir.cleanup()
+
+    def readImg(self):
+        with open(self.imgFile, "rb") as f:
+            return f.read()
+
+    def test_copyOnWrite(self):
+        with SimRamMmapStorage(4, self.imgFile, baseAddr=64, pageSize=16) as s:
+            m = SimRam(4, storage=s)
+            self.assertEqual(len(s), 16 + 2)
+            self.assertEqual(m.data[16], 0x03020100)
+            self.assertNotIn(15, m.data)
+            self.assertEqual(bytes(m.dump_bytes(64, len(self.IMG))), self.IMG)
+            # the image is not deallocated if all words are removed
+            for i in range(16, 20):
+                del m.data[i]
+            self.assertIn(4, s.pages)
+            m.data[16] = 0xffffffff
+            m.load_bytes(64 + 64, b"\x00\x00")
+            self.assertEqual(m.data[16], 0xffffffff)
+            # memory before the image is free
+            self.assertEqual(m.malloc(64), 0)
+            # allocation is placed behind the image
+            self.assertEqual(m.malloc(4), 64 + 4 * 18)
+
+        self.assertEqual(self.readImg(), self.IMG)
+
+    def test_shared_write(self):
+        s0 = SimRamMmapStorage(4, self.imgFile, pageSize=16, copyOnWrite=False)
+        s1 = SimRamMmapStorage(4, self.imgFile, pageSize=16)
+        s0[0] = 0xaabbccdd
+        s0[16] = 0x11223344
+        # the other mapping of the same file sees the change
+        self.assertEqual(s1[0], 0xaabbccdd)
+        s1.close()
+        s0.close()
+        img = self.readImg()
+        self.assertEqual(img[:4], b"\xdd\xcc\xbb\xaa")
+        self.assertEqual(img[4:64], self.IMG[4:64])
+        self.assertEqual(img[64:], b"\x44\x33\x22\x11" + self.IMG[68:])
+
+    def test_save_image(self):
+        for storage in [None, SimRamPagedStorage(4, pageSize=16)]:
+            m = SimRam(4, storage=storage)
+            m.load_bytes(0, b"\x01\x02\x03\x04\x05\x06\x07\x08")
+            m.load_bytes(62, b"\x09\x0a")
+            fName = os.path.join(self.tmpDir.name, "dump.bin")
+            save_image(m, fName)
+            with open(fName, "rb") as f:
+                img = f.read()
+            self.assertEqual(len(img), 64)
+            self.assertEqual(img[:8], b"\x01\x02\x03\x04\x05\x06\x07\x08")
+            self.assertEqual(img[60:], b"\x00\x00\x09\x0a")
+            with open(fName + ".vld", "rb") as f:
+                vld = f.read()
+            self.assertEqual(vld[:8], b"\xff" * 8)
+            self.assertEqual(vld[60:], b"\x00\x00\xff\xff")
+
+    def test_postMortem(self):
+        m = SimRam(4)
+        m.data[1] = 0x04030201
+        fName = os.path.join(self.tmpDir.name, "pm", "mem.bin")
+        with SimRamPostMortem(m, fName):
+            pass
+        self.assertFalse(os.path.exists(fName))
+
+        with self.assertRaises(AssertionError):
+            with SimRamPostMortem(m, fName):
+                raise AssertionError()
+
+        with open(fName, "rb") as f:
+            self.assertEqual(f.read(), b"\x00\x00\x00\x00\x01\x02\x03\x04")
+        self.assertFalse(os.path.exists(fName + ".vld"))
+
+
+if __name__ == "__main__":
+    testLoader = unittest.TestLoader()
+    # suite = unittest.TestSuite([SimRamMmapStorage_TC("test_shared_write")])
+    suite = testLoader.loadTestsFromTestCase(SimRamMmapStorage_TC)
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
@@ -0,0 +1,211 @@
+import json
+import struct
+from typing import BinaryIO, Callable, Dict, List, NamedTuple, Optional, TextIO, Tuple
+
+
+class SimRamAccess(NamedTuple):
+    """
+    Record about a single access to :class:`hwtLib.abstract.sim_ram.SimRam`
+
+    :ivar ~.time: simulation time of the access (None if the time is not known)
+    :ivar ~.isWrite: True for write
+    :ivar ~.id: transaction id (None if the bus does not have id)
+    :ivar ~.addr: address of the first byte
+    :ivar ~.size: number of bytes
+    """
+    time: Optional[int]
+    isWrite: bool
+    id: Optional[int]
+    addr: int
+    size: int
+
+    @property
+    def end(self) -> int:
+        return self.addr + self.size
+
+
+class SimRamHazard(NamedTuple):
+    """
+    Record about two overlapping transactions which were in progress at the same time
+
+    :ivar ~.kind: "RAW" (read requested while a write to the same memory was pending),
+        "WAR" (write requested while a read of the same memory was pending)
+        or "WAW" (write requested while other write to the same memory was pending)
+    :ivar ~.first: the older transaction (which was pending)
+    :ivar ~.second: the new transaction
+    """
+    kind: str
+    first: SimRamAccess
+    second: SimRamAccess
+
+
+class SimRamAccessMonitor():
+    """
+    Opt-in instrumentation for simulation memories (:see: :meth:`hwtLib.abstract.sim_ram.SimRam.attachMonitor`)
+
+    Collects the number of bytes read/written for each memory page and for each transaction id,
+    reads of uninitialized memory, overlaps of transactions which were in progress at the same time
+    and optionally a time stamped log of all accesses.
+
+    :ivar ~.pageSize: size of page for per page statistics (in bytes)
+    :ivar ~.now: function which returns actual simulation time
+    :ivar ~.pageReads: dictionary page index -> number of bytes read
+    :ivar ~.pageWrites: dictionary page index -> number of bytes written
+    :ivar ~.idReadBytes: dictionary transaction id -> number of bytes read
+    :ivar ~.idWriteBytes: dictionary transaction id -> number of bytes written
+    :ivar ~.maskedWriteBytes: number of bytes which were transferred in write transactions
+        but they were not written because of byte strobe/byte enable (wasted bandwidth)
+    :ivar ~.uninitializedReads: list of tuples (access, address of the word) for every read of a word
+        which is not fully initialized
+    :ivar ~.hazards: list of detected overlaps of pending transactions
+    :ivar ~.log: list of all accesses (if logging is enabled)
+    """
+    # time, isWrite, id, addr, size (time and id are -1 if they are None)
+    _BIN_RECORD = struct.Struct("<qBqQI")
+    _BIN_MAGIC = b"SRAMLOG1"
+
+    def __init__(self, pageSize: int=4096, logAccesses: bool=True,
+                 now: Optional[Callable[[], Optional[int]]]=None):
+        """
+        :param logAccesses: if True every access is stored in log
+        :param now: function which returns the actual simulation time, if None the time is
+            resolved by the memory to which the monitor is attached
+        """
+        assert pageSize > 0, pageSize
+        self.pageSize = pageSize
+        self.logAccesses = logAccesses
+        self.now = now
+        self.pageReads: Dict[int, int] = {}
+        self.pageWrites: Dict[int, int] = {}
+        self.idReadBytes: Dict[Optional[int], int] = {}
+        self.idWriteBytes: Dict[Optional[int], int] = {}
+        self.maskedWriteBytes = 0
+        self.uninitializedReads: List[Tuple[SimRamAccess, int]] = []
+        self.hazards: List[SimRamHazard] = []
+        self.log: List[SimRamAccess] = []
+        self._pending: List[SimRamAccess] = []
+
+    def _mkAccess(self, isWrite: bool, _id: Optional[int], addr: int, size: int) -> SimRamAccess:
+        now = self.now
+        return SimRamAccess(None if now is None else now(), isWrite, _id, addr, size)
+
+    def _countPages(self, counters: Dict[int, int], addr: int, size: int):
+        pageSize = self.pageSize
+        end = addr + size
+        while addr < end:
+            pageIndex = addr // pageSize
+            chunkEnd = min((pageIndex + 1) * pageSize, end)
+            counters[pageIndex] = counters.get(pageIndex, 0) + chunkEnd - addr
+            addr = chunkEnd
+
+    def onRequest(self, isWrite: bool, _id: Optional[int], addr: int, size: int):
+        """
+        Called when the memory accepts a transaction which will be processed later,
+        the transaction is checked for the overlap with other pending transactions
+        """
+        a = self._mkAccess(isWrite, _id, addr, size)
+        for p in self._pending:
+            if p.addr < a.end and a.addr < p.end:
+                if isWrite:
+                    kind = "WAW" if p.isWrite else "WAR"
+                elif p.isWrite:
+                    kind = "RAW"
+                else:
+                    continue
+                self.hazards.append(SimRamHazard(kind, p, a))
+        self._pending.append(a)
+
+    def _access(self, a: SimRamAccess):
+        for i, p in enumerate(self._pending):
+            if p.isWrite == a.isWrite and p.id == a.id and p.addr == a.addr:
+                del self._pending[i]
+                break
+
+        if self.logAccesses:
+            self.log.append(a)
+
+    def onRead(self, addr: int, size: int, _id: Optional[int]=None, uninitializedWords: Tuple[int, ...]=()):
+        """
+        :param uninitializedWords: addresses of words which were not fully initialized
+        """
+        a = self._mkAccess(False, _id, addr, size)
+        self._access(a)
+        self._countPages(self.pageReads, addr, size)
+        self.idReadBytes[_id] = self.idReadBytes.get(_id, 0) + size
+        for wAddr in uninitializedWords:
+            self.uninitializedReads.append((a, wAddr))
+
+    def onWrite(self, addr: int, size: int, _id: Optional[int]=None, maskedBytes: int=0):
+        """
+        :param maskedBytes: number of bytes which were not written because of byte strobe
+        """
+        a = self._mkAccess(True, _id, addr, size)
+        self._access(a)
+        self._countPages(self.pageWrites, addr, size)
+        self.idWriteBytes[_id] = self.idWriteBytes.get(_id, 0) + size
+        self.maskedWriteBytes += maskedBytes
+
+    def pendingTransactions(self) -> List[SimRamAccess]:
+        """
+        :return: transactions which were requested but not processed yet
+        """
+        return list(self._pending)
+
+    def report(self) -> str:
+        """
+        :return: human readable summary of the collected statistics
+        """
+        buff = []
+        pages = sorted(set(self.pageReads.keys()).union(self.pageWrites.keys()))
+        buff.append(f"pages (size 0x{self.pageSize:x}):")
+        for p in pages:
+            buff.append(f"    0x{p * self.pageSize:x}: read {self.pageReads.get(p, 0):d}B, "
+                        f"written {self.pageWrites.get(p, 0):d}B")
+        ids = sorted(set(self.idReadBytes.keys()).union(self.idWriteBytes.keys()),
+                     key=lambda i: -1 if i is None else i)
+        buff.append("ids:")
+        for i in ids:
+            buff.append(f"    {i}: read {self.idReadBytes.get(i, 0):d}B, "
+                        f"written {self.idWriteBytes.get(i, 0):d}B")
+        buff.append(f"masked write bytes: {self.maskedWriteBytes:d}")
+        buff.append(f"uninitialized reads: {len(self.uninitializedReads):d}")
+        for a, wAddr in self.uninitializedReads:
+            buff.append(f"    0x{wAddr:x} (time {a.time}, id {a.id})")
+        buff.append(f"hazards: {len(self.hazards):d}")
+        for h in self.hazards:
+            buff.append(f"    {h.kind:s} {h.first} {h.second}")
+        return "\n".join(buff)
+
+    def dumpJson(self, file: TextIO):
+        """
+        Write the access log to file in JSON format (list of objects)
+        """
+        json.dump([a._asdict() for a in self.log], file)
+
+    @staticmethod
+    def loadJson(file: TextIO) -> List[SimRamAccess]:
+        return [SimRamAccess(**a) for a in json.load(file)]
+
+    def dumpBinary(self, file: BinaryIO):
+        """
+        Write the access log to file in a compact binary format
+        (magic header followed by fixed size little endian records)
+        """
+        rec = self._BIN_RECORD
+        file.write(self._BIN_MAGIC)
+        for a in self.log:
+            file.write(rec.pack(-1 if a.time is None else a.time,
+                                a.isWrite,
+                                -1 if a.id is None else a.id,
+                                a.addr, a.size))
+
+    @classmethod
+    def loadBinary(cls, file: BinaryIO) -> List[SimRamAccess]:
+        magic = file.read(len(cls._BIN_MAGIC))
+        if magic != cls._BIN_MAGIC:
+            raise ValueError("Not a SimRam access log", magic)
+        res = []
+        for time, isWrite, _id, addr, size in cls._BIN_RECORD.iter_unpack(file.read()):
+            res.append(SimRamAccess(None if time == -1 else time, bool(isWrite),
+                                    None if _id == -1 else _id, addr, size))
+        return res
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from io import BytesIO, StringIO
+import unittest
+
+from hwtLib.abstract.sim_ram import SimRam
+from hwtLib.abstract.sim_ram_monitor import SimRamAccessMonitor, SimRamAccess
+
+
+class SimRamAccessMonitor_TC(unittest.TestCase):
+
+    def mkRam(self):
+        m = SimRam(4)
+        self.time = 0
+        mon = m.attachMonitor(SimRamAccessMonitor(pageSize=16, now=lambda: self.time))
+        return m, mon
+
+    def test_counters(self):
+        m, mon = self.mkRam()
+        m.writeWords(8, [1, 2, 3, 4], _id=1)
+        self.time = 10
+        m.writeWords(0, [0xffffffff], [0b0011], _id=2)
+        self.time = 20
+        m.readWords(8, 2, _id=1)
+
+        self.assertDictEqual(mon.pageWrites, {0: 12, 1: 8})
+        self.assertDictEqual(mon.pageReads, {0: 8})
+        self.assertDictEqual(mon.idWriteBytes, {1: 16, 2: 4})
+        self.assertDictEqual(mon.idReadBytes, {1: 8})
+        self.assertEqual(mon.maskedWriteBytes, 2)
+        self.assertSequenceEqual(mon.log, [
+            SimRamAccess(0, True, 1, 8, 16),
+            SimRamAccess(10, True, 2, 0, 4),
+            SimRamAccess(20, False, 1, 8, 8),
+        ])
+        self.assertIn("masked write bytes: 2", mon.report())
+
+    def test_uninitialized_reads(self):
+        m, mon = self.mkRam()
+        m.writeWords(4, [1])
+        m.writeWords(12, [0xff], [0b0001])
+        m.readWords(0, 4)
+        self.assertSequenceEqual([wAddr for _, wAddr in mon.uninitializedReads], [0, 8, 12])
+
+    def test_bus_written_words_are_initialized(self):
+        m, mon = self.mkRam()
+        t = m.word_t
+        # the bus memories (e.g. Mi32SimRam.on_write) write the values read from the simulation signals
+        m.writeWords(0, [t.from_py(0x11223344)], [0b1111])
+        m.writeWords(4, [t.from_py(0x55667788), t.from_py(0x99aabbcc)])
+        m._write_single_word(t.from_py(0xddeeff00), 0b1111, 3)
+        m.writeWords(16, [t.from_py(0x00000011, 0x000000ff)], [0b1111])
+        res = m.readWords(0, 5)
+        self.assertSequenceEqual([int(v) for v in res[:4]], [0x11223344, 0x55667788, 0x99aabbcc, 0xddeeff00])
+        # only the partially valid word is reported
+        self.assertSequenceEqual([wAddr for _, wAddr in mon.uninitializedReads], [16])
+
+    def test_hazards(self):
+        m, mon = self.mkRam()
+        mon.onRequest(True, 0, 0, 16)
+        mon.onRequest(False, 1, 8, 4)
+        mon.onRequest(False, 2, 16, 4)
+        mon.onRequest(True, 3, 12, 8)
+        self.assertSequenceEqual([(h.kind, h.first.id, h.second.id) for h in mon.hazards], [
+            ("RAW", 0, 1),
+            ("WAW", 0, 3),
+            ("WAR", 2, 3),
+        ])
+        m.writeWords(0, [0, 0, 0, 0], _id=0)
+        m.readWords(8, 1, _id=1)
+        self.assertSequenceEqual([(a.id, a.addr) for a in mon.pendingTransactions()], [(2, 16), (3, 12)])
+
+        # the write is done, no hazard
+        mon.onRequest(False, 4, 0, 4)
+        self.assertEqual(len(mon.hazards), 3)
+
+    def test_log_serialization(self):
+        m, mon = self.mkRam()
+        m.writeWords(0, [1, 2])
+        self.time = 5
+        m.readWords(4, 1, _id=3)
+
+        f = StringIO()
+        mon.dumpJson(f)
+        f.seek(0)
+        self.assertSequenceEqual(SimRamAccessMonitor.loadJson(f), mon.log)
+
+        f = BytesIO()
+        mon.dumpBinary(f)
+        f.seek(0)
+        self.assertSequenceEqual(SimRamAccessMonitor.loadBinary(f), mon.log)
+
+
+if __name__ == "__main__":
+    testLoader = unittest.TestLoader()
+    # suite = unittest.TestSuite([SimRamAccessMonitor_TC("test_hazards")])
+    suite = testLoader.loadTestsFromTestCase(SimRamAccessMonitor_TC)
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
@@ -0,0 +1,304 @@
+from collections.abc import MutableMapping
+from math import ceil
+from typing import Dict, Iterator, Optional, Tuple, Union
+
+from hwt.hdl.types.bits import HBits
+from hwt.hdl.types.bitsConst import HBitsConst
+from pyMathBitPrecise.bit_utils import mask
+
+
+class SimRamPage():
+    """
+    Continuous block of words of :class:`~.SimRamPagedStorage`
+
+    :ivar ~.data: raw value of all words in page (little endian, word after word)
+    :ivar ~.present: flag for every word which tells if the word was written/allocated
+        (corresponds to a presence of key in dict based storage)
+    :ivar ~.vld: optional bit validity mask with same layout as data,
+        None means that all present words are fully valid
+    :ivar ~.presentCnt: number of present words in this page
+    """
+    __slots__ = ["data", "present", "vld", "presentCnt"]
+
+    def __init__(self, wordsPerPage: int, cellSize: int):
+        self.data = bytearray(wordsPerPage * cellSize)
+        self.present = bytearray(wordsPerPage)
+        self.vld: Optional[bytearray] = None
+        self.presentCnt = 0
+
+    def getVld(self) -> bytearray:
+        """
+        Get validity mask, allocate it if it does not exist yet
+        """
+        vld = self.vld
+        if vld is None:
+            # all words which are present are fully valid
+            vld = self.vld = bytearray(b"\xff" * len(self.data))
+        return vld
+
+
+class SimRamPagedStorage(MutableMapping):
+    """
+    Storage for :class:`hwtLib.abstract.sim_ram.SimRam` which stores memory words in lazily
+    allocated pages (bytearray) instead of using a dict with a Python object for each word.
+
+    The object behaves like dict used as a default storage, key is an index of a word
+    and the value is int (fully valid word), :class:`hwt.hdl.types.bitsConst.HBitsConst`
+    (partially valid word) or None (allocated, but uninitialized word).
+
+    :note: The values are converted on each access, the value written and then read
+        does not have to be the same object. Fully valid values are always returned as int
+        and fully invalid values are returned as None.
+
+    :ivar ~.cellSize: number of bytes in a single memory word
+    :ivar ~.wordsPerPage: number of words in a single page
+    :ivar ~.pages: dictionary page index -> page
+    """
+
+    def __init__(self, cellSize: int, pageSize: int=64 * 1024):
+        """
+        :param cellSize: number of bytes in a single memory word
+        :param pageSize: number of bytes in a single page
+        """
+        assert cellSize > 0, cellSize
+        assert pageSize >= cellSize and pageSize % cellSize == 0, (
+            "Page size has to be multiple of word size", pageSize, cellSize)
+        self.cellSize = cellSize
+        self.pageSize = pageSize
+        self.wordsPerPage = pageSize // cellSize
+        self.pages: Dict[int, SimRamPage] = {}
+        self.word_t = HBits(cellSize * 8)
+        self._wordMask = mask(cellSize * 8)
+        self._len = 0
+
+    def _getPage(self, pageIndex: int) -> SimRamPage:
+        """
+        Get page of specified index, allocate it if it does not exist yet
+        """
+        p = self.pages.get(pageIndex, None)
+        if p is None:
+            p = self.pages[pageIndex] = SimRamPage(self.wordsPerPage, self.cellSize)
+        return p
+
+    def __getitem__(self, index: int) -> Union[None, int, HBitsConst]:
+        pageIndex, wordIndex = divmod(index, self.wordsPerPage)
+        p = self.pages.get(pageIndex, None)
+        if p is None or not p.present[wordIndex]:
+            raise KeyError(index)
+
+        cellSize = self.cellSize
+        start = wordIndex * cellSize
+        end = start + cellSize
+        val = int.from_bytes(p.data[start:end], "little")
+        if p.vld is None:
+            return val
+
+        vld = int.from_bytes(p.vld[start:end], "little")
+        if vld == self._wordMask:
+            return val
+        elif vld == 0:
+            return None
+        else:
+            return self.word_t.from_py(val, vld)
+
+    def __setitem__(self, index: int, value: Union[None, int, HBitsConst]):
+        pageIndex, wordIndex = divmod(index, self.wordsPerPage)
+        p = self._getPage(pageIndex)
+        cellSize = self.cellSize
+        start = wordIndex * cellSize
+        end = start + cellSize
+        if value is None:
+            val = 0
+            vld = 0
+        elif isinstance(value, int):
+            val = value
+            vld = self._wordMask
+        elif isinstance(value, HBitsConst):
+            vld = value.vld_mask & self._wordMask
+            val = value.val & vld
+        else:
+            raise TypeError("Unsupported type of memory word", value)
+
+        p.data[start:end] = val.to_bytes(cellSize, "little")
+        if vld != self._wordMask or p.vld is not None:
+            p.getVld()[start:end] = vld.to_bytes(cellSize, "little")
+
+        if not p.present[wordIndex]:
+            p.present[wordIndex] = 1
+            p.presentCnt += 1
+            self._len += 1
+
+    def __delitem__(self, index: int):
+        pageIndex, wordIndex = divmod(index, self.wordsPerPage)
+        p = self.pages.get(pageIndex, None)
+        if p is None or not p.present[wordIndex]:
+            raise KeyError(index)
+
+        p.present[wordIndex] = 0
+        p.presentCnt -= 1
+        self._len -= 1
+        if p.presentCnt == 0:
+            self._releasePage(pageIndex)
+        else:
+            cellSize = self.cellSize
+            start = wordIndex * cellSize
+            end = start + cellSize
+            p.data[start:end] = bytes(cellSize)
+            if p.vld is not None:
+                p.vld[start:end] = b"\xff" * cellSize
+
+    def _releasePage(self, pageIndex: int):
+        """
+        Release page which does not contain any word
+        """
+        del self.pages[pageIndex]
+
+    def maxIndex(self) -> Optional[int]:
+        """
+        :return: the highest index of present word or None if the storage is empty
+        """
+        pages = self.pages
+        for pageIndex in sorted(pages.keys(), reverse=True):
+            p = pages[pageIndex]
+            if p.presentCnt:
+                return pageIndex * self.wordsPerPage + p.present.rfind(1)
+        return None
+
+    def __contains__(self, index: int) -> bool:
+        if not isinstance(index, int):
+            return False
+        pageIndex, wordIndex = divmod(index, self.wordsPerPage)
+        p = self.pages.get(pageIndex, None)
+        return p is not None and bool(p.present[wordIndex])
+
+    def get(self, index: int, default=None):
+        try:
+            return self[index]
+        except KeyError:
+            return default
+
+    def __iter__(self) -> Iterator[int]:
+        wordsPerPage = self.wordsPerPage
+        for pageIndex in sorted(self.pages.keys()):
+            p = self.pages[pageIndex]
+            base = pageIndex * wordsPerPage
+            present = p.present
+            for i in range(wordsPerPage):
+                if present[i]:
+                    yield base + i
+
+    def _writePageBytes(self, p: SimRamPage, start: int, buff: memoryview):
+        """
+        Write bytes to a single page
+
+        :param start: offset of the first byte in page
+        """
+        cellSize = self.cellSize
+        end = start + len(buff)
+        firstWord = start // cellSize
+        endWord = ceil(end / cellSize)
+        present = p.present
+        # words which are written only partially and were not present before
+        # have the rest of the bytes invalid
+        if start % cellSize and not present[firstWord]:
+            wStart = firstWord * cellSize
+            p.getVld()[wStart:wStart + cellSize] = bytes(cellSize)
+        if end % cellSize and not present[endWord - 1]:
+            wStart = (endWord - 1) * cellSize
+            p.getVld()[wStart:wStart + cellSize] = bytes(cellSize)
+
+        p.data[start:end] = buff
+        if p.vld is not None:
+            p.vld[start:end] = b"\xff" * len(buff)
+
+        wordCnt = endWord - firstWord
+        newlyPresent = wordCnt - present[firstWord:endWord].count(1)
+        if newlyPresent:
+            present[firstWord:endWord] = b"\x01" * wordCnt
+            p.presentCnt += newlyPresent
+            self._len += newlyPresent
+
+    def writeBytes(self, addr: int, buff: Union[bytes, bytearray, memoryview]):
+        """
+        Write bytes to memory, the bytes are copied page by page
+
+        :param addr: address of the first byte
+        """
+        buff = memoryview(buff).cast("B")
+        size = len(buff)
+        pageSize = self.pageSize
+        offset = 0
+        while offset < size:
+            pageIndex, start = divmod(addr + offset, pageSize)
+            chunk = min(size - offset, pageSize - start)
+            self._writePageBytes(self._getPage(pageIndex), start, buff[offset:offset + chunk])
+            offset += chunk
+
+    def _readPageVld(self, p: SimRamPage, start: int, end: int) -> Optional[bytearray]:
+        """
+        :return: validity mask for the bytes in page or None if all bytes are valid
+        """
+        cellSize = self.cellSize
+        firstWord = start // cellSize
+        endWord = ceil(end / cellSize)
+        present = p.present[firstWord:endWord]
+        if p.vld is None:
+            if present.count(0) == 0:
+                return None
+            vld = bytearray(b"\xff" * (end - start))
+        else:
+            vld = p.vld[start:end]
+
+        # mark bytes of the words which are not present as invalid
+        i = present.find(0)
+        while i != -1:
+            wStart = max((firstWord + i) * cellSize, start) - start
+            wEnd = min((firstWord + i + 1) * cellSize, end) - start
+            vld[wStart:wEnd] = bytes(wEnd - wStart)
+            i = present.find(0, i + 1)
+
+        if vld.count(0xff) == len(vld):
+            return None
+        return vld
+
+    def readBytes(self, addr: int, size: int) -> Tuple[bytearray, Optional[bytearray]]:
+        """
+        Read bytes from memory, the bytes are copied page by page
+
+        :param addr: address of the first byte
+        :return: tuple (data, validity mask), validity mask is None if all bits are valid
+            (bytes which were never written are invalid and have value 0)
+        """
+        data = bytearray(size)
+        vld = None
+        pageSize = self.pageSize
+        pages = self.pages
+        offset = 0
+        while offset < size:
+            pageIndex, start = divmod(addr + offset, pageSize)
+            chunk = min(size - offset, pageSize - start)
+            p = pages.get(pageIndex, None)
+            if p is None:
+                chunkVld = bytes(chunk)
+            else:
+                data[offset:offset + chunk] = p.data[start:start + chunk]
+                chunkVld = self._readPageVld(p, start, start + chunk)
+
+            if chunkVld is not None:
+                if vld is None:
+                    vld = bytearray(b"\xff" * size)
+                vld[offset:offset + chunk] = chunkVld
+            offset += chunk
+
+        return data, vld
+
+    def __len__(self) -> int:
+        return self._len
+
+    def clear(self):
+        self.pages.clear()
+        self._len = 0
+
+    def __repr__(self):
+        return (f"<{self.__class__.__name__:s} cellSize={self.cellSize:d}, "
+                f"pageSize={self.pageSize:d}, pages={len(self.pages):d}, words={self._len:d}>")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from hwt.hdl.types.bits import HBits
+from hwtLib.abstract.sim_ram import SimRam
+from hwtLib.abstract.sim_ram_paged import SimRamPagedStorage
+
+
+class SimRamPagedStorage_TC(unittest.TestCase):
+
+    def test_dict_semantic(self):
+        s = SimRamPagedStorage(4, pageSize=16)
+        self.assertEqual(len(s), 0)
+        self.assertNotIn(0, s)
+        with self.assertRaises(KeyError):
+            s[0]
+
+        s[0] = 5
+        s[10] = None
+        s[7] = 0xffffffff
+        self.assertEqual(len(s), 3)
+        self.assertEqual(len(s.pages), 3)
+        self.assertIn(10, s)
+        self.assertNotIn(1, s)
+        self.assertIsNone(s.get(1))
+        self.assertIsNone(s[10])
+        self.assertEqual(max(s.keys()), 10)
+        self.assertDictEqual(dict(s), {0: 5, 7: 0xffffffff, 10: None})
+
+        s[7] = 1
+        self.assertEqual(s[7], 1)
+        self.assertEqual(len(s), 3)
+
+        del s[10]
+        self.assertNotIn(10, s)
+        # page is released if it does not contain any word
+        self.assertEqual(len(s.pages), 2)
+        self.assertSequenceEqual(list(s.keys()), [0, 7])
+
+        s.clear()
+        self.assertEqual(len(s), 0)
+        self.assertEqual(len(s.pages), 0)
+
+    def test_partially_valid(self):
+        s = SimRamPagedStorage(4, pageSize=64)
+        t = HBits(32)
+        s[1] = 2
+        self.assertIsNone(s.pages[0].vld)
+
+        s[0] = t.from_py(0x12, 0xff)
+        v = s[0]
+        self.assertEqual(v.val, 0x12)
+        self.assertEqual(v.vld_mask, 0xff)
+        self.assertEqual(s[1], 2)
+
+        # fully valid value is stored as int
+        s[0] = t.from_py(0x12345678)
+        self.assertEqual(s[0], 0x12345678)
+        # fully invalid value is stored as None
+        s[0] = t.from_py(None)
+        self.assertIsNone(s[0])
+        self.assertIn(0, s)
+
+    def test_overflow(self):
+        s = SimRamPagedStorage(1, pageSize=16)
+        with self.assertRaises(OverflowError):
+            s[0] = 256
+
+    def test_SimRam_calloc(self):
+        m = SimRam(4, storage=SimRamPagedStorage(4, pageSize=16))
+        addr0 = m.calloc(8, 4, initValues=list(range(8)))
+        addr1 = m.malloc(8)
+        self.assertEqual(addr0, 0)
+        self.assertEqual(addr1, 8 * 4)
+        self.assertSequenceEqual(m.getArray(addr0, 4, 8), list(range(8)))
+        self.assertSequenceEqual(m.getArray(addr1, 4, 2), [None, None])
+        self.assertEqual(m.getBits(16, 48, None).val, 0x10000)
+
+        m2 = SimRam(4, parent=m)
+        self.assertIs(m2.data, m.data)
+
+
+if __name__ == "__main__":
+    testLoader = unittest.TestLoader()
+    # suite = unittest.TestSuite([SimRamPagedStorage_TC("test_dict_semantic")])
+    suite = testLoader.loadTestsFromTestCase(SimRamPagedStorage_TC)
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
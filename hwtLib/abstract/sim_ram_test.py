@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from io import BytesIO
+import os
+from tempfile import TemporaryDirectory
+import unittest
+
+from hwt.hdl.transTmpl import TransTmpl
+from hwt.hdl.types.bits import HBits
+from hwt.hdl.types.struct import HStruct
+from hwtLib.abstract.sim_ram import SimRam, SimRamOp, strb_to_bit_mask
+from hwtLib.abstract.sim_ram_access_plan import getAccessPlan
+from hwtLib.abstract.sim_ram_paged import SimRamPagedStorage
+from pyMathBitPrecise.bit_utils import ValidityError
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class SimRamStrbMerge_TC(unittest.TestCase):
+
+    def test_strb_to_bit_mask(self):
+        self.assertEqual(strb_to_bit_mask(0), 0)
+        self.assertEqual(strb_to_bit_mask(0b101), 0xff00ff)
+        self.assertEqual(strb_to_bit_mask(1 << 63 | 1 << 8), 0xff << (63 * 8) | 0xff << 64)
+        self.assertEqual(strb_to_bit_mask((1 << 64) - 1), (1 << 512) - 1)
+
+    def test_write_single_word(self):
+        m = SimRam(4)
+        t = HBits(32)
+        m._write_single_word(t.from_py(0x11223344), 0b0101, 0)
+        v = m.data[0]
+        self.assertEqual(v.val, 0x00220044)
+        self.assertEqual(v.vld_mask, 0x00ff00ff)
+
+        m._write_single_word(t.from_py(0xaabbccdd, 0xffff00ff), 0b1010, 0)
+        v = m.data[0]
+        self.assertEqual(v.val, 0xaa220044)
+        self.assertEqual(v.vld_mask, 0xffff00ff)
+
+        m._write_single_word(t.from_py(0x00ff0000), 0b0110, 0)
+        self.assertEqual(m.data[0], 0xaaff0044)
+        m._write_single_word(t.from_py(0x12345678), 0, 0)
+        self.assertEqual(m.data[0], 0xaaff0044)
+        m._write_single_word(0x12345678, 0b0001, 0)
+        self.assertEqual(m.data[0], 0xaaff0078)
+        m._write_single_word(0x12345678, 0b1111, 0)
+        self.assertEqual(m.data[0], 0x12345678)
+
+
+class SimRamBulkAccess_TC(unittest.TestCase):
+
+    def mkRam(self, cellSize: int):
+        return SimRam(cellSize)
+
+    def test_load_dump_bytes_aligned(self):
+        m = self.mkRam(4)
+        ref = bytes(range(64))
+        m.load_bytes(16, ref)
+        self.assertEqual(m.data[4], 0x03020100)
+        self.assertEqual(m.data[19], 0x3f3e3d3c)
+        self.assertNotIn(3, m.data)
+        self.assertNotIn(20, m.data)
+        self.assertEqual(bytes(m.dump_bytes(16, 64)), ref)
+
+    def test_load_dump_bytes_unaligned(self):
+        m = self.mkRam(4)
+        m.data[0] = 0x44332211
+        m.load_bytes(2, b"\xaa\xbb\xcc\xdd\xee")
+        self.assertEqual(m.data[0], 0xbbaa2211)
+        v = m.data[1]
+        self.assertEqual(v.val, 0xeeddcc)
+        self.assertEqual(v.vld_mask, 0xffffff)
+        self.assertNotIn(2, m.data)
+        self.assertEqual(bytes(m.dump_bytes(1, 6)), b"\x22\xaa\xbb\xcc\xdd\xee")
+        with self.assertRaises(ValidityError):
+            m.dump_bytes(0, 8)
+        self.assertEqual(bytes(m.dump_bytes(6, 4, allowInvalid=True)), b"\xee\x00\x00\x00")
+
+        data, vld = m.readBytes(6, 4)
+        self.assertEqual(bytes(data), b"\xee\x00\x00\x00")
+        self.assertEqual(bytes(vld), b"\xff\x00\x00\x00")
+
+    def test_partially_valid_word(self):
+        m = self.mkRam(4)
+        m.data[0] = HBits(32).from_py(0x1200, 0xff00)
+        data, vld = m.readBytes(0, 4)
+        self.assertEqual(bytes(data), b"\x00\x12\x00\x00")
+        self.assertEqual(bytes(vld), b"\x00\xff\x00\x00")
+
+    def test_load_dump_file(self):
+        m = self.mkRam(8)
+        ref = bytes(i & 0xff for i in range(1000))
+        with TemporaryDirectory() as d:
+            fName = os.path.join(d, "mem.bin")
+            with open(fName, "wb") as f:
+                f.write(ref)
+            self.assertEqual(m.load_file(8, fName), len(ref))
+            fName2 = os.path.join(d, "mem2.bin")
+            m.dump_file(8, len(ref), fName2)
+            with open(fName2, "rb") as f:
+                self.assertEqual(f.read(), ref)
+
+        f = BytesIO()
+        m.dump_file(16, 8, f)
+        self.assertEqual(f.getvalue(), ref[8:16])
+
+    @unittest.skipIf(np is None, "numpy not installed")
+    def test_load_dump_ndarray(self):
+        m = self.mkRam(8)
+        arr = np.arange(100, dtype=np.uint32)
+        m.load_ndarray(0, arr, byteorder=">")
+        self.assertEqual(m.data[0], 0x01000000_00000000)
+        self.assertSequenceEqual(m.dump_ndarray(0, 100, np.uint32, byteorder=">").tolist(), arr.tolist())
+        self.assertSequenceEqual(m.dump_ndarray(0, 2, np.uint32).tolist(), [0, 0x01000000])
+
+    def test_burst_aligned(self):
+        m = self.mkRam(4)
+        m.writeWords(8, [0x11111111, 0x22222222, 0x33333333])
+        m.writeWords(12, [0xaabbccdd, 0xaabbccdd], [0b0011, 0b1000])
+        self.assertSequenceEqual(m.readWords(8, 3), [0x11111111, 0x2222ccdd, 0xaa333333])
+        self.assertSequenceEqual(m.readWords(0, 2), [None, None])
+
+    def test_burst_unaligned(self):
+        m = self.mkRam(4)
+        m.writeWords(0, [0x44332211, 0x88776655, 0xccbbaa99])
+        m.writeWords(2, [0xddccbbaa, 0x11ffee], [0b1111, 0b0111])
+        self.assertSequenceEqual(m.readWords(0, 3), [0xbbaa2211, 0xffeeddcc, 0xccbbaa11])
+        self.assertSequenceEqual(m.readWords(1, 2), [0xccbbaa22, 0x11ffeedd])
+
+        # the bytes behind the written data stay invalid
+        m.writeWords(0x21, [0x332211])
+        v0, v1 = m.readWords(0x20, 2)
+        self.assertEqual(v0.val, 0x33221100)
+        self.assertEqual(v0.vld_mask, 0xffffff00)
+        self.assertEqual(v1.val, 0)
+        self.assertEqual(v1.vld_mask, 0xff)
+
+        v, = m.readWords(0x22, 1)
+        self.assertEqual(v.val, 0x3322)
+        self.assertEqual(v.vld_mask, 0xffffff)
+        self.assertIsNone(m.readWords(0x28, 1)[0])
+
+    def test_execute(self):
+        m = self.mkRam(4)
+        res = m.execute([
+            SimRamOp(0, 2, [1, 2]),
+            SimRamOp(4, 1, [0xffffffff], [0b0100]),
+            SimRamOp(0, 2),
+        ])
+        self.assertSequenceEqual(res, [None, None, [1, 0xff0002]])
+
+
+class SimRamPagedBulkAccess_TC(SimRamBulkAccess_TC):
+
+    def mkRam(self, cellSize: int):
+        return SimRam(cellSize, storage=SimRamPagedStorage(cellSize, pageSize=cellSize * 4))
+
+
+class SimRamStructAccess_TC(unittest.TestCase):
+    s0 = HStruct(
+        (HBits(8), "a"),
+        (HBits(16), "b"),
+        (HBits(8)[3], "arr"),
+        (HStruct(
+            (HBits(4), "x"),
+            (HBits(4), "y"),
+        ), "s"),
+    )
+
+    def test_plan(self):
+        plan = getAccessPlan(self.s0)
+        self.assertIs(plan, getAccessPlan(self.s0))
+        self.assertEqual(plan.bitWidth, 56)
+        self.assertSequenceEqual([(f.path, f.bitAddr, f.width) for f in plan.fields], [
+            (("a",), 0, 8),
+            (("b",), 8, 16),
+            (("arr", 0), 24, 8),
+            (("arr", 1), 32, 8),
+            (("arr", 2), 40, 8),
+            (("s", "x"), 48, 4),
+            (("s", "y"), 52, 4),
+        ])
+        self.assertEqual(plan.fields[3].wordIndex(32), 1)
+
+    def test_set_get_struct(self):
+        m = SimRam(4)
+        m.data[5] = 0xffffffff
+        m.setStruct(0x10, self.s0, {"a": 1, "b": 0x1234, "arr": [5, 6, 7], "s": {"x": 3, "y": 0xa}})
+        self.assertEqual(m.data[4], 0x05123401)
+        # the byte behind the struct is preserved
+        self.assertEqual(m.data[5], 0xffa30706)
+
+        v = m.getStruct(0x10, self.s0)
+        self.assertEqual(int(v.a), 1)
+        self.assertEqual(int(v.b), 0x1234)
+        self.assertSequenceEqual([int(i) for i in v.arr], [5, 6, 7])
+        self.assertEqual(int(v.s.y), 0xa)
+        v = m.getStruct(0x10, TransTmpl(self.s0))
+        self.assertEqual(int(v.s.x), 3)
+
+    def test_getStructs(self):
+        m = SimRam(4)
+        for i in range(3):
+            m.setStruct(0x10 + i * 8, self.s0, {"a": i, "b": i + 1, "arr": [0, 0, 0], "s": {"x": 0, "y": 0}})
+        self.assertSequenceEqual([(int(v.a), int(v.b)) for v in m.getStructs(0x10, self.s0, 3, itemSize=8)],
+                                 [(0, 1), (1, 2), (2, 3)])
+
+        t = HStruct((HBits(8), "a"), (HBits(8), "b"))
+        m.load_bytes(0x40, bytes(range(8)))
+        self.assertSequenceEqual([(int(v.a), int(v.b)) for v in m.getStructs(0x40, t, 4)],
+                                 [(0, 1), (2, 3), (4, 5), (6, 7)])
+
+    def test_getArray_unaligned(self):
+        m = SimRam(4)
+        m.load_bytes(0, bytes(range(8)))
+        self.assertSequenceEqual([int(v) for v in m.getArray(1, 2, 3)], [0x0201, 0x0403, 0x0605])
+
+
+SimRamBulkAccess_TCs = [
+    SimRamStrbMerge_TC,
+    SimRamBulkAccess_TC,
+    SimRamPagedBulkAccess_TC,
+    SimRamStructAccess_TC,
+]
+
+if __name__ == "__main__":
+    testLoader = unittest.TestLoader()
+    # suite = unittest.TestSuite([SimRamBulkAccess_TC("test_load_dump_bytes_unaligned")])
+    loadedTcs = [testLoader.loadTestsFromTestCase(tc) for tc in SimRamBulkAccess_TCs]
+    suite = unittest.TestSuite(loadedTcs)
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
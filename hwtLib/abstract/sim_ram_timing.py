@@ -0,0 +1,338 @@
+from collections import deque
+from math import ceil
+from random import Random
+from typing import Callable, Deque, Dict, List, Optional, Tuple, Union
+
+
+class SimRamTransaction():
+    """
+    Record about a transaction processed by :class:`~.SimRamTimingModel`
+
+    :note: all times are in clock cycles from the start of the simulation
+
+    :ivar ~.isWrite: True for write transaction
+    :ivar ~.id: transaction id
+    :ivar ~.size: number of data beats
+    :ivar ~.req: original request tuple parsed by the memory
+    :ivar ~.reqTime: time when the request was received by the memory
+    :ivar ~.issueTime: time when the transaction was accepted by the timing model
+        (it may have to wait on the limit of outstanding transactions)
+    :ivar ~.readyTime: time when the data of read transaction can be sent
+    :ivar ~.dataTime: time when the data was passed to the bus agent (read) or received and written (write)
+    :ivar ~.endTime: time when the last data beat was sent (read) or write response was sent (write)
+    """
+    __slots__ = ["isWrite", "id", "size", "req",
+                 "reqTime", "issueTime", "readyTime", "dataTime", "endTime"]
+
+    def __init__(self, isWrite: bool, _id: int, size: int, req: tuple, reqTime: float):
+        self.isWrite = isWrite
+        self.id = _id
+        self.size = size
+        self.req = req
+        self.reqTime = reqTime
+        self.issueTime = None
+        self.readyTime = None
+        self.dataTime = None
+        self.endTime = None
+
+    def latency(self) -> float:
+        """
+        :return: time from the request to the completion of the transaction
+        """
+        return self.endTime - self.reqTime
+
+    def __repr__(self):
+        return (f"<{self.__class__.__name__:s} {'W' if self.isWrite else 'R'} id={self.id:d} size={self.size:d}"
+                f" req={self.reqTime} end={self.endTime}>")
+
+
+class SimRamTimingModel():
+    """
+    Timing model for simulation memories (:class:`hwtLib.amba.datapump.sim_ram.AxiDpSimRam`, :class:`hwtLib.amba.axi_comp.sim.ram.Axi4SimRam`)
+    which delays the processing of the transactions to simulate the behavior of the real memory.
+
+    * Read data are sent after latency from the moment when the transaction was issued.
+    * Write response is sent after latency from the moment when the write data was written.
+    * The transactions which exceed the limit of outstanding transactions wait in a queue
+      (the requests are still accepted by the bus interface).
+    * The bandwidth is shared between reads and writes, the burst is always transferred at once
+      (the bus agent then sends the beats) and the bandwidth is consumed from a token bucket.
+    * The read transaction is completed once its last data beat is sent,
+      the read data channel sends one beat per clock cycle (or beatsPerCycle if it is lower)
+      and the beats of the bursts are sent one after another
+      (the back-pressure on the bus is not considered).
+    * If outOfOrder is True, the transactions with a different id may complete out of order,
+      the transactions with the same id are always completed in order.
+    * The write transactions are always issued in order of the requests
+      (the write data does not have an id and it comes in order of the write requests).
+
+    :cvar TICKS_PER_CLK: the memory process is executed on every change of clk signal
+    :ivar ~.now: actual time in clock cycles
+    :ivar ~.completed: list of completed transactions (for statistics)
+    """
+    TICKS_PER_CLK = 2
+
+    def __init__(self, latency: Union[int, Tuple[int, int], Callable[[SimRamTransaction], int]]=0,
+                 writeLatency: Union[None, int, Tuple[int, int], Callable[[SimRamTransaction], int]]=None,
+                 maxOutstanding: Optional[int]=None,
+                 maxOutstandingPerId: Optional[int]=None,
+                 beatsPerCycle: Optional[float]=None,
+                 outOfOrder: bool=False,
+                 rand: Optional[Random]=None):
+        """
+        :param latency: read latency in clock cycles, int for fixed latency, tuple (min, max) for uniformly distributed
+            random latency or a function which returns the latency for the transaction
+        :param writeLatency: same as latency just for write transactions, if None the latency is used
+        :param maxOutstanding: maximum number of transactions processed at once (reads and writes together)
+        :param maxOutstandingPerId: maximum number of transactions processed at once for a single id and direction
+        :param beatsPerCycle: bandwidth limit (data beats per clock cycle, shared by read and write),
+            None for unlimited
+        :param outOfOrder: if True the transactions with different id may complete out of order
+        :param rand: random generator used for random latency
+        """
+        self.latency = latency
+        self.writeLatency = latency if writeLatency is None else writeLatency
+        assert maxOutstanding is None or maxOutstanding > 0, maxOutstanding
+        assert maxOutstandingPerId is None or maxOutstandingPerId > 0, maxOutstandingPerId
+        assert beatsPerCycle is None or beatsPerCycle > 0, beatsPerCycle
+        self.maxOutstanding = maxOutstanding
+        self.maxOutstandingPerId = maxOutstandingPerId
+        self.beatsPerCycle = beatsPerCycle
+        self.outOfOrder = outOfOrder
+        if rand is None:
+            rand = Random(0)
+        self.rand = rand
+
+        self._ticks = 0
+        self.now = 0.0
+        self._credit = 0.0
+        self._waiting: Deque[SimRamTransaction] = deque()
+        self._outstandingCnt = 0
+        self._outstandingPerId: Dict[Tuple[bool, int], int] = {}
+        # issued read transactions in issue order
+        self._reads: List[SimRamTransaction] = []
+        # read transactions which data were passed to the bus agent, but the last beat was not sent yet
+        self._readsSending: Deque[SimRamTransaction] = deque()
+        # time when the read data channel can send the next beat
+        self._readDataFreeTime = 0.0
+        # issued write transactions in issue order (waiting for data)
+        self._writes: Deque[SimRamTransaction] = deque()
+        self._writeInProgress: Optional[SimRamTransaction] = None
+        # written transactions waiting for the write response
+        self._writeAcks: List[SimRamTransaction] = []
+        self._lastAckTime: Dict[Optional[int], float] = {}
+        self.completed: List[SimRamTransaction] = []
+
+    def _resolveLatency(self, latency, trans: SimRamTransaction) -> int:
+        if isinstance(latency, int):
+            return latency
+        elif isinstance(latency, tuple):
+            return self.rand.randint(*latency)
+        else:
+            return latency(trans)
+
+    def tick(self):
+        """
+        Advance time, (called from the memory on each change of clk signal)
+        """
+        self._ticks += 1
+        self.now = self._ticks / self.TICKS_PER_CLK
+        if self.beatsPerCycle is not None and self._credit < self.beatsPerCycle:
+            self._credit = min(self._credit + self.beatsPerCycle / self.TICKS_PER_CLK, self.beatsPerCycle)
+        rs = self._readsSending
+        while rs and rs[0].endTime <= self.now:
+            self._complete(rs.popleft())
+        self._issue()
+
+    def _canIssue(self, t: SimRamTransaction):
+        if self.maxOutstanding is not None and self._outstandingCnt >= self.maxOutstanding:
+            return False
+        if self.maxOutstandingPerId is not None and \
+                self._outstandingPerId.get((t.isWrite, t.id), 0) >= self.maxOutstandingPerId:
+            return False
+        return True
+
+    def _issue(self):
+        """
+        Move transactions from waiting queue to the processing if the limits allow it
+        """
+        w = self._waiting
+        if not w:
+            return
+        blockedIds = set()
+        writesBlocked = False
+        readsBlocked = False
+        for t in list(w):
+            if self.maxOutstanding is not None and self._outstandingCnt >= self.maxOutstanding:
+                break
+            k = (t.isWrite, t.id)
+            if t.isWrite:
+                blocked = writesBlocked
+            else:
+                blocked = readsBlocked or k in blockedIds
+            if blocked or not self._canIssue(t):
+                # the younger transactions with same id can not bypass this one,
+                # the writes are always issued in order because the write data does not have an id
+                # and it comes in the order of the write requests,
+                # the reads are issued in order if they can not complete out of order
+                blockedIds.add(k)
+                if t.isWrite:
+                    writesBlocked = True
+                elif not self.outOfOrder:
+                    readsBlocked = True
+                continue
+
+            w.remove(t)
+            self._outstandingCnt += 1
+            self._outstandingPerId[k] = self._outstandingPerId.get(k, 0) + 1
+            t.issueTime = self.now
+            if t.isWrite:
+                self._writes.append(t)
+            else:
+                t.readyTime = self.now + self._resolveLatency(self.latency, t)
+                self._reads.append(t)
+
+    def _complete(self, t: SimRamTransaction):
+        if t.endTime is None:
+            t.endTime = self.now
+        self._outstandingCnt -= 1
+        k = (t.isWrite, t.id)
+        self._outstandingPerId[k] -= 1
+        self.completed.append(t)
+        # the released slot can be used immediately
+        self._issue()
+
+    def _consumeBandwidth(self, t: SimRamTransaction) -> bool:
+        if self.beatsPerCycle is None:
+            return True
+        elif self._credit > 0:
+            # the credit may become negative and the next transaction has to wait until it is refilled
+            self._credit -= t.size
+            return True
+        else:
+            return False
+
+    def addRequest(self, isWrite: bool, _id: int, size: int, req: tuple):
+        """
+        Add new transaction received on the bus
+        """
+        self._waiting.append(SimRamTransaction(isWrite, _id, size, req, self.now))
+        self._issue()
+
+    def popRead(self) -> Optional[tuple]:
+        """
+        :return: the request of the read transaction which data should be sent now (or None)
+        """
+        blockedIds = set()
+        for t in self._reads:
+            if t.readyTime <= self.now and t.id not in blockedIds:
+                if not self._consumeBandwidth(t):
+                    return None
+                self._reads.remove(t)
+                t.dataTime = self.now
+                self._sendReadData(t)
+                return t.req
+            elif not self.outOfOrder:
+                return None
+            blockedIds.add(t.id)
+
+        return None
+
+    def _sendReadData(self, t: SimRamTransaction):
+        """
+        Resolve the time when the last data beat of the read transaction is sent
+        and complete the transaction after it
+        """
+        beatsPerCycle = self.beatsPerCycle
+        if beatsPerCycle is None or beatsPerCycle > 1:
+            beatsPerCycle = 1
+        beatTime = 1 / beatsPerCycle
+        start = max(self.now, self._readDataFreeTime)
+        t.endTime = start + (t.size - 1) * beatTime
+        self._readDataFreeTime = t.endTime + beatTime
+        if t.endTime <= self.now:
+            self._complete(t)
+        else:
+            # the bursts are sent in order so the end times are ordered
+            self._readsSending.append(t)
+
+    def popWrite(self, isDataReady: Callable[[tuple], bool]) -> Optional[tuple]:
+        """
+        :param isDataReady: function which tells if all data for the write request are available
+        :return: the request of the write transaction which data should be written now (or None)
+        """
+        w = self._writes
+        if not w or self._writeInProgress is not None:
+            return None
+        t = w[0]
+        if not isDataReady(t.req) or not self._consumeBandwidth(t):
+            return None
+        w.popleft()
+        self._writeInProgress = t
+        return t.req
+
+    def writeDone(self):
+        """
+        Notify the timing model that the data of the write transaction returned
+        from :meth:`~.popWrite` was written
+        """
+        t = self._writeInProgress
+        assert t is not None
+        self._writeInProgress = None
+        t.dataTime = self.now
+        ackTime = self.now + self._resolveLatency(self.writeLatency, t)
+        # keep the order of the responses with the same id (or all responses if not outOfOrder)
+        k = t.id if self.outOfOrder else None
+        ackTime = max(ackTime, self._lastAckTime.get(k, ackTime))
+        self._lastAckTime[k] = ackTime
+        t.readyTime = ackTime
+        self._writeAcks.append(t)
+
+    def popWriteAck(self) -> Optional[int]:
+        """
+        :return: id of the write transaction which response should be sent now (or None)
+        """
+        best = None
+        for t in self._writeAcks:
+            if t.readyTime <= self.now and (best is None or t.readyTime < best.readyTime):
+                best = t
+        if best is None:
+            return None
+        self._writeAcks.remove(best)
+        self._complete(best)
+        return best.id
+
+    def isIdle(self):
+        return not (self._waiting or self._reads or self._readsSending or
+                    self._writes or self._writeAcks or self._writeInProgress)
+
+    def latencies(self, isWrite: Optional[bool]=None) -> List[float]:
+        """
+        :return: latencies of completed transactions (in clock cycles)
+        """
+        return [t.latency() for t in self.completed if isWrite is None or t.isWrite == isWrite]
+
+    def latencyPercentile(self, q: float, isWrite: Optional[bool]=None) -> Optional[float]:
+        """
+        :param q: percentile (0-100)
+        :return: latency of the specified percentile of completed transactions (nearest rank method)
+        """
+        lat = sorted(self.latencies(isWrite))
+        if not lat:
+            return None
+        i = max(ceil(q / 100 * len(lat)) - 1, 0)
+        return lat[i]
+
+    def achievedBandwidth(self, isWrite: Optional[bool]=None) -> Optional[float]:
+        """
+        :return: average number of data beats per clock cycle from the first request to the last completion
+        """
+        trans = [t for t in self.completed if isWrite is None or t.isWrite == isWrite]
+        if not trans:
+            return None
+        start = min(t.reqTime for t in trans)
+        end = max(t.endTime for t in trans)
+        beats = sum(t.size for t in trans)
+        if end == start:
+            return float(beats)
+        return beats / (end - start)
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from hwtLib.abstract.sim_ram_timing import SimRamTimingModel
+
+
+class SimRamTimingModel_TC(unittest.TestCase):
+
+    def _runClk(self, t: SimRamTimingModel, clkCnt: int, onTick):
+        for _ in range(clkCnt * t.TICKS_PER_CLK):
+            t.tick()
+            onTick()
+
+    def test_fixed_latency(self):
+        t = SimRamTimingModel(latency=4)
+        t.addRequest(False, 0, 1, "r0")
+        served = []
+
+        def onTick():
+            r = t.popRead()
+            if r is not None:
+                served.append((t.now, r))
+
+        self._runClk(t, 10, onTick)
+        self.assertSequenceEqual(served, [(4.0, "r0")])
+        self.assertSequenceEqual(t.latencies(), [4.0])
+        self.assertTrue(t.isIdle())
+
+    def test_random_latency_range(self):
+        t = SimRamTimingModel(latency=(2, 6))
+        for i in range(20):
+            t.addRequest(False, i, 1, i)
+
+        def onTick():
+            t.popRead()
+
+        self._runClk(t, 200, onTick)
+        self.assertTrue(t.isIdle())
+        for trans in t.completed:
+            self.assertTrue(2 <= trans.readyTime - trans.issueTime <= 6, trans)
+
+    def test_in_order_and_out_of_order(self):
+        def lat(trans):
+            # first transaction is slow
+            return 10 if trans.req == "slow" else 1
+
+        for outOfOrder, expected in [(False, ["slow", "fast"]),
+                                     (True, ["fast", "slow"])]:
+            t = SimRamTimingModel(latency=lat, outOfOrder=outOfOrder)
+            t.addRequest(False, 0, 1, "slow")
+            t.addRequest(False, 1, 1, "fast")
+            served = []
+
+            def onTick():
+                r = t.popRead()
+                if r is not None:
+                    served.append(r)
+
+            self._runClk(t, 20, onTick)
+            self.assertSequenceEqual(served, expected, outOfOrder)
+
+    def test_same_id_stays_in_order(self):
+        def lat(trans):
+            return 10 if trans.req == "slow" else 1
+
+        t = SimRamTimingModel(latency=lat, outOfOrder=True)
+        t.addRequest(False, 0, 1, "slow")
+        t.addRequest(False, 0, 1, "fast")
+        served = []
+
+        def onTick():
+            r = t.popRead()
+            if r is not None:
+                served.append(r)
+
+        self._runClk(t, 20, onTick)
+        self.assertSequenceEqual(served, ["slow", "fast"])
+
+    def test_max_outstanding(self):
+        t = SimRamTimingModel(latency=3, maxOutstanding=1)
+        for i in range(3):
+            t.addRequest(False, i, 1, i)
+        served = []
+
+        def onTick():
+            r = t.popRead()
+            if r is not None:
+                served.append(t.now)
+
+        self._runClk(t, 20, onTick)
+        # each transaction has to wait on the previous one
+        self.assertSequenceEqual(served, [3.0, 6.0, 9.0])
+
+    def test_max_outstanding_per_id(self):
+        for outOfOrder, expected in [
+                # b0 can not bypass a1 which is blocked by the limit for id 0
+                (False, [(3.0, "a0"), (6.0, "a1"), (6.5, "b0")]),
+                (True, [(3.0, "a0"), (3.5, "b0"), (6.0, "a1")]),
+            ]:
+            t = SimRamTimingModel(latency=3, maxOutstandingPerId=1, outOfOrder=outOfOrder)
+            t.addRequest(False, 0, 1, "a0")
+            t.addRequest(False, 0, 1, "a1")
+            t.addRequest(False, 1, 1, "b0")
+            served = []
+
+            def onTick():
+                r = t.popRead()
+                if r is not None:
+                    served.append((t.now, r))
+
+            self._runClk(t, 20, onTick)
+            self.assertSequenceEqual(served, expected, outOfOrder)
+
+    def test_max_outstanding_per_id_write_order(self):
+        for outOfOrder in (False, True):
+            t = SimRamTimingModel(latency=1, writeLatency=3, maxOutstandingPerId=1, outOfOrder=outOfOrder)
+            t.addRequest(True, 0, 1, "w0a")
+            t.addRequest(True, 0, 1, "w0b")
+            t.addRequest(True, 1, 1, "w1")
+            written = []
+
+            def onTick():
+                r = t.popWrite(lambda req: True)
+                if r is not None:
+                    written.append(r)
+                    t.writeDone()
+                t.popWriteAck()
+
+            self._runClk(t, 30, onTick)
+            self.assertTrue(t.isIdle())
+            # the write data does not have an id, the writes have to be processed in order of requests
+            self.assertSequenceEqual(written, ["w0a", "w0b", "w1"], outOfOrder)
+
+    def test_read_completes_after_last_beat(self):
+        for maxOutstanding, expectedServed, expectedLatencies in [
+                # the beats of the second burst have to wait on the first burst
+                (None, [(2.0, "r0"), (2.5, "r1")], [5.0, 9.0]),
+                # the second transaction is issued after the last beat of the first one
+                (1, [(2.0, "r0"), (7.0, "r1")], [5.0, 10.0]),
+            ]:
+            t = SimRamTimingModel(latency=2, maxOutstanding=maxOutstanding)
+            t.addRequest(False, 0, 4, "r0")
+            t.addRequest(False, 1, 4, "r1")
+            served = []
+
+            def onTick():
+                r = t.popRead()
+                if r is not None:
+                    served.append((t.now, r))
+
+            self._runClk(t, 20, onTick)
+            self.assertTrue(t.isIdle())
+            self.assertSequenceEqual(served, expectedServed, maxOutstanding)
+            self.assertSequenceEqual(t.latencies(), expectedLatencies, maxOutstanding)
+
+    def test_bandwidth(self):
+        t = SimRamTimingModel(beatsPerCycle=1)
+        for i in range(10):
+            t.addRequest(False, 0, 4, i)
+
+        def onTick():
+            t.popRead()
+
+        self._runClk(t, 100, onTick)
+        self.assertTrue(t.isIdle())
+        bw = t.achievedBandwidth()
+        self.assertLessEqual(bw, 1.25)
+        self.assertGreaterEqual(bw, 0.75)
+
+    def test_write(self):
+        t = SimRamTimingModel(latency=1, writeLatency=5)
+        t.addRequest(True, 3, 2, "w0")
+        dataAvailable = []
+        acks = []
+
+        def onTick():
+            r = t.popWrite(lambda req: len(dataAvailable) >= 2)
+            if r is not None:
+                t.writeDone()
+            _id = t.popWriteAck()
+            if _id is not None:
+                acks.append((t.now, _id))
+
+        self._runClk(t, 2, onTick)
+        self.assertSequenceEqual(acks, [])
+        dataAvailable.extend([0, 1])
+        self._runClk(t, 10, onTick)
+        self.assertSequenceEqual(acks, [(7.5, 3)])
+        self.assertSequenceEqual(t.latencies(True), [7.5])
+        self.assertEqual(t.latencyPercentile(50, True), 7.5)
+
+
+if __name__ == "__main__":
+    testLoader = unittest.TestLoader()
+    # suite = unittest.TestSuite([SimRamTimingModel_TC("test_fixed_latency")])
+    suite = testLoader.loadTestsFromTestCase(SimRamTimingModel_TC)
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
@@ -1,4 +1,5 @@
 from copy import copy
+import sys
 from typing import Optional, List, Callable, Generator, Tuple, Union
 
 from hwt.hdl.frameTmpl import FrameTmpl
@@ -10,6 +11,8 @@ from hwt.hdl.types.hdlType import HdlType
 from hwt.hdl.types.stream import HStream
 from hwt.hdl.types.struct import HStruct
 from hwt.pyUtils.arrayQuery import iter_with_last
+from hwtLib.abstract.persistent_cache import DEFAULT_PERSISTENT_CACHE, \
+    PersistentCache
 
 
 class TemplateConfigured():
@@ -48,10 +51,9 @@ class TemplateConfigured():
             self._tmpl = TransTmpl(self._structT)
 
         if self._frames is None:
-            frames = FrameTmpl.framesFromTransTmpl(
+            self._frames = FrameTmpl_framesFromTransTmpl_cached(
                 self._tmpl,
                 self.DATA_WIDTH)
-            self._frames = list(frames)
 
     def chainFrameWords(self) -> Generator[Tuple[int, List[Union[TransPart, ChoicesOfFrameParts]], bool], None, None]:
         offset = 0
@@ -62,6 +64,67 @@ class TemplateConfigured():
             offset += wi + 1
 
 
+def FrameTmpl_framesFromTransTmpl_cached(tmpl: TransTmpl, wordWidth: int,
+                                         cache: PersistentCache=DEFAULT_PERSISTENT_CACHE,
+                                         **kwargs) -> List[FrameTmpl]:
+    """
+    Cached version of :meth:`hwt.hdl.frameTmpl.FrameTmpl.framesFromTransTmpl`
+
+    Only the layout of the frames (bit addresses of frames and parts) is stored in the cache,
+    the parts are then connected to the leaf TransTmpl instances of the tmpl.
+    Frames with unions (:class:`hwt.hdl.frameTmplUtils.ChoicesOfFrameParts`) are not cached.
+
+    :param kwargs: other arguments for framesFromTransTmpl
+    """
+    frames = None
+
+    def compute():
+        nonlocal frames
+        frames = list(FrameTmpl.framesFromTransTmpl(tmpl, wordWidth, **kwargs))
+        layout = []
+        for f in frames:
+            parts = []
+            for p in f.parts:
+                if not isinstance(p, TransPart):
+                    # union, the parts can not be restored only from the address
+                    return None
+                if p.tmpl is None:
+                    base = None
+                else:
+                    base = p.startOfPart - p.inFieldOffset
+                parts.append((base, p.canBeRemoved, p.startOfPart, p.endOfPart, p.inFieldOffset))
+            layout.append((f.startBitAddr, f.endBitAddr, parts))
+        return layout
+
+    layout = cache.getOrCompute(
+        "frames_from_TransTmpl",
+        (tmpl.dtype, tmpl.bitAddr, wordWidth, kwargs),
+        compute,
+        dependencies=(sys.modules[__name__], sys.modules[FrameTmpl.__module__],
+                      sys.modules[TransTmpl.__module__]))
+    if frames is not None:
+        # computed now
+        return frames
+    elif layout is None:
+        return list(FrameTmpl.framesFromTransTmpl(tmpl, wordWidth, **kwargs))
+
+    leafs = {}
+    for item in tmpl.walkFlatten():
+        if not isinstance(item, tuple) or item[0][0] in leafs:
+            # union or ambiguous address (0b fields), the parts can not be restored
+            return list(FrameTmpl.framesFromTransTmpl(tmpl, wordWidth, **kwargs))
+        (base, _), leaf = item
+        leafs[base] = leaf
+
+    frames = []
+    for startBitAddr, endBitAddr, parts in layout:
+        _parts = [TransPart(None, None if base is None else leafs[base], canBeRemoved,
+                            startOfPart, endOfPart, inFieldOffset)
+                  for (base, canBeRemoved, startOfPart, endOfPart, inFieldOffset) in parts]
+        frames.append(FrameTmpl(tmpl, wordWidth, startBitAddr, endBitAddr, _parts))
+    return frames
+
+
 def HdlType_separate(t: HdlType, do_separate_query: Callable[[HdlType], bool])\
         ->Generator[Tuple[bool, HdlType], None, None]:
     """
@@ -1,13 +1,16 @@
-from typing import Union, Sequence, Generator, Deque, Self
+from collections import deque
+from itertools import islice
+from typing import Union, Sequence, Generator, Deque, Self, Iterable, Optional
 
 from hdlConvertorAst.to.hdlUtils import iter_with_last
 from hwt.code import Concat
 from hwt.hdl.const import HConst
+from hwt.hdl.types.bits import HBits
 from hwt.hdl.types.bitsConst import HBitsConst
 from hwt.hdl.types.struct import HStruct
 from hwt.pyUtils.typingFuture import override
 from hwt.synthesizer.vectorUtils import iterBits
-from hwtLib.abstract.simFrameUtils import SimFrameUtils
+from hwtLib.abstract.simFrameUtils import SimFrameUtils, SimFramePackingReport
 from hwtLib.amba.axi4SSegmented import Axi4StreamSegmented, \
     _Axi4StreamSegmentedWord, Axi4StreamSegmentedAgentWordType
 from hwtLib.types.ctypes import uint8_t
@@ -30,6 +33,8 @@ class Axi4StreamSegmentedFrameUtils(SimFrameUtils[Axi4StreamSegmentedAgentWordTy
         self.PACK_SEGMENT_BITS = PACK_SEGMENT_BITS
         self.USE_EMPTY = Axi4StreamSegmented._hasEmpty(SEGMENT_DATA_WIDTH, BYTE_WIDTH, SUPPORT_ZLP)
         self.USE_ENABLE = Axi4StreamSegmented._hasEnable(SEGMENT_CNT)
+        self.dataT = HBits(SEGMENT_DATA_WIDTH)
+        self._userSegmentTable: Optional[list[list[list[HConst]]]] = None
 
     @override
     @classmethod
@@ -169,6 +174,131 @@ class Axi4StreamSegmentedFrameUtils(SimFrameUtils[Axi4StreamSegmentedAgentWordTy
             if segments:
                 ag_data.append(tuple(segments))
 
+    def _getUserSegmentTable(self) -> list[list[list[HConst]]]:
+        """
+        :return: table of user values for each segment indexed by [sof][eof][empty]
+        """
+        t = self._userSegmentTable
+        if t is None:
+            USER_SEGMENT_T = self.USER_SEGMENT_T
+            USE_ENABLE = self.USE_ENABLE
+            USE_EMPTY = self.USE_EMPTY
+            USE_SOF = self.USE_SOF
+            ERROR_WIDTH = self.ERROR_WIDTH
+            t = []
+            for sof in (0, 1):
+                tSof = []
+                t.append(tSof)
+                for eof in (0, 1):
+                    tEof = []
+                    tSof.append(tEof)
+                    for empty in range(self.SEGMENT_BYTE_CNT + 1):
+                        if (empty and not USE_EMPTY) or (empty == self.SEGMENT_BYTE_CNT and not self.SUPPORT_ZLP):
+                            # can not be represented
+                            tEof.append(None)
+                            continue
+                        userData = {"eof": eof}
+                        if USE_ENABLE:
+                            userData["enable"] = 1
+                        if USE_EMPTY:
+                            userData["empty"] = empty
+                        if USE_SOF:
+                            userData["sof"] = sof
+                        if ERROR_WIDTH:
+                            userData["err"] = 0
+                        tEof.append(USER_SEGMENT_T.from_py(userData))
+            self._userSegmentTable = t
+        return t
+
+    @override
+    def send_frames_bytes(self, frames: Iterable[Union[bytes, Sequence[int]]],
+                          ag_data: Deque[Axi4StreamSegmentedAgentWordType],
+                          offset: int=0) -> SimFramePackingReport:
+        """
+        Batched version of :meth:`~.send_bytes`, pack all frames into segments and words at once.
+        The segment data is build using int/bytes operations and the user part of segment is taken from
+        a precomputed table (:see: :meth:`~._getUserSegmentTable`).
+
+        :param frames: frames as bytes-like objects or lists of ints (None is not supported)
+        :param offset: number of invalid bytes before each frame
+        :return: the report about the packing efficiency
+        """
+        SEGMENT_CNT = self.SEGMENT_CNT
+        userTable = self._getUserSegmentTable()
+        report = SimFramePackingReport(SEGMENT_CNT, self.SEGMENT_BYTE_CNT)
+        segments = [(d, userTable[sof][eof][empty])
+                    for d, sof, eof, empty in self._iterFramesBytesSegments(frames, offset, report)]
+
+        report.segmentCnt = len(segments)
+        segmentI = 0
+        if ag_data and segments:
+            # possibly fill unused segments into existing last word
+            lastWord = ag_data[-1]
+            freeSegmentCnt = SEGMENT_CNT - len(lastWord)
+            if freeSegmentCnt > 0:
+                ag_data[-1] = (*lastWord, *segments[:freeSegmentCnt])
+                segmentI = freeSegmentCnt
+
+        for i in range(segmentI, len(segments), SEGMENT_CNT):
+            ag_data.append(tuple(segments[i:i + SEGMENT_CNT]))
+
+        return report
+
+    @override
+    def _getWordSegments(self, word: Axi4StreamSegmentedAgentWordType):
+        if isinstance(word, _Axi4StreamSegmentedWord):
+            datas, users = word.segmentWords
+            firstSegmentI = self.SEGMENT_CNT - len(datas)
+        else:
+            datas, users = word
+            firstSegmentI = 0
+
+        USE_ENABLE = self.USE_ENABLE
+        USE_EMPTY = self.USE_EMPTY
+        USE_SOF = self.USE_SOF
+        ERROR_WIDTH = self.ERROR_WIDTH
+        segments = []
+        for data, user in zip(datas, users):
+            if USE_ENABLE and not int(user.enable):
+                segments.append(None)
+                continue
+            segments.append((data,
+                             int(user.sof) if USE_SOF else None,
+                             int(user.eof),
+                             int(user.empty) if USE_EMPTY else 0,
+                             int(user.err) if ERROR_WIDTH else 0))
+
+        return firstSegmentI, segments
+
+    @override
+    def _getWordRest(self, word: Axi4StreamSegmentedAgentWordType, segmentI: int) -> _Axi4StreamSegmentedWord:
+        if isinstance(word, _Axi4StreamSegmentedWord):
+            datas, users = word.segmentWords
+        else:
+            datas, users = word
+        rest = (deque(islice(datas, segmentI, None)), deque(islice(users, segmentI, None)))
+        return _Axi4StreamSegmentedWord(rest, self.SEGMENT_CNT)
+
+    @override
+    def count_frame_ends(self, word:Axi4StreamSegmentedAgentWordType) -> int:
+        if isinstance(word, _Axi4StreamSegmentedWord):
+            users = word.segmentWords[1]
+        else:
+            _, users = word
+        USE_ENABLE = self.USE_ENABLE
+        frameEnds = 0
+        for user in users:
+            if user is None:
+                continue
+            if USE_ENABLE:
+                en = user.enable
+                if not en.vld_mask or not int(en):
+                    continue
+            eof = user.eof
+            if eof.vld_mask and int(eof):
+                frameEnds += 1
+        return frameEnds
+
     @override
     def receive_bytes(self, ag_data:Deque[Axi4StreamSegmentedAgentWordType]) -> tuple[int, list[Union[int, HBitsConst]], bool]:
         """
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from collections import deque
+import unittest
+
+from hwt.hdl.types.bits import HBits
+from hwt.hdl.types.defs import BIT
+from hwt.hdl.types.struct import HStruct
+from hwtLib.amba.axi4SSegmented import Axi4StreamSegmented
+from hwtLib.amba.axi4SSegmentedSimFrameUtils import Axi4StreamSegmentedFrameUtils
+
+
+def _mkFrameUtils(SEGMENT_DATA_WIDTH: int, SEGMENT_CNT: int, USE_SOF=False, ERROR_WIDTH=0, SUPPORT_ZLP=False):
+    USE_EMPTY = Axi4StreamSegmented._hasEmpty(SEGMENT_DATA_WIDTH, 8, SUPPORT_ZLP)
+    EMPTY_WIDTH = Axi4StreamSegmented._getWidthOfEmpty(SEGMENT_DATA_WIDTH, 8, SUPPORT_ZLP)
+    USER_SEGMENT_T = HStruct(
+        * (((BIT, "enable"),) if Axi4StreamSegmented._hasEnable(SEGMENT_CNT) else ()),
+        * (((BIT, "sof"),) if USE_SOF else ()),
+        (BIT, "eof"),
+        * (((HBits(ERROR_WIDTH), "err"),) if ERROR_WIDTH else ()),
+        * (((HBits(EMPTY_WIDTH), "empty"),) if USE_EMPTY else ()),
+    )
+    return Axi4StreamSegmentedFrameUtils(SEGMENT_DATA_WIDTH, SEGMENT_CNT, USER_SEGMENT_T,
+                                         SUPPORT_ZLP=SUPPORT_ZLP, USE_SOF=USE_SOF, ERROR_WIDTH=ERROR_WIDTH)
+
+
+def _toMonitorFormat(fu: Axi4StreamSegmentedFrameUtils, words):
+    """
+    Convert words from format used by driver agent to format used by monitor agent
+    """
+    dataT = fu.dataT
+    return deque((tuple(dataT.from_py(d) if isinstance(d, int) else d for d, _ in w),
+                  tuple(u for _, u in w)) for w in words)
+
+
+class Axi4StreamSegmentedFrameUtils_TC(unittest.TestCase):
+
+    def _assertWordsEqual(self, fu: Axi4StreamSegmentedFrameUtils, words, refWords):
+        self.assertEqual(len(words), len(refWords))
+        for w, refW in zip(words, refWords):
+            self.assertEqual(len(w), len(refW))
+            for (d, u), (refD, refU) in zip(w, refW):
+                if refD is None:
+                    self.assertIsNone(d)
+                else:
+                    if isinstance(d, int):
+                        d = fu.dataT.from_py(d)
+                    self.assertEqual(d.vld_mask, refD.vld_mask)
+                    self.assertEqual(d.val & d.vld_mask, refD.val & refD.vld_mask)
+                for f in fu.USER_SEGMENT_T.fields:
+                    self.assertEqual(int(getattr(u, f.name)), int(getattr(refU, f.name)), f.name)
+
+    def _frames(self, frameCnt: int, maxLen: int, minLen: int=1):
+        return [bytes((i + j) & 0xff for j in range(minLen + (i * 7) % (maxLen - minLen + 1)))
+                for i in range(frameCnt)]
+
+    def test_send_frames_bytes_same_as_send_bytes(self):
+        for kwargs in [{}, {"USE_SOF": True, "ERROR_WIDTH": 2}, {"SUPPORT_ZLP": True}]:
+            for SEGMENT_DATA_WIDTH, SEGMENT_CNT in [(8, 1), (32, 1), (32, 3), (64, 4)]:
+                fu = _mkFrameUtils(SEGMENT_DATA_WIDTH, SEGMENT_CNT, **kwargs)
+                minLen = 0 if kwargs.get("SUPPORT_ZLP", False) else 1
+                frames = self._frames(20, 3 * SEGMENT_DATA_WIDTH // 8 + 1, minLen=minLen)
+                # offset may span over multiple segments
+                for offset in ((0,) if minLen == 0 else range(3 * SEGMENT_DATA_WIDTH // 8 + 2)):
+                    words = deque()
+                    report = fu.send_frames_bytes(frames, words, offset=offset)
+                    refWords = deque()
+                    for f in frames:
+                        fu.send_bytes(list(f), refWords, offset=offset)
+                    self._assertWordsEqual(fu, words, refWords)
+
+                    self.assertEqual(report.frameCnt, len(frames))
+                    self.assertEqual(report.byteCnt, sum(len(f) for f in frames))
+                    self.assertEqual(report.segmentCnt, sum(len(w) for w in refWords))
+                    self.assertEqual(report.getWordCnt(), len(refWords))
+
+                    if offset == 0:
+                        received = fu.receive_frames_bytes(_toMonitorFormat(fu, words))
+                        self.assertSequenceEqual([(d, e) for (_, d, e) in received], [(f, 0) for f in frames])
+                        if fu.USE_ENABLE and fu.USE_EMPTY:
+                            # (the original receive_bytes requires enable and empty)
+                            monitorWords = _toMonitorFormat(fu, refWords)
+                            for f in frames:
+                                _, d, _ = fu.receive_bytes(monitorWords)
+                                self.assertEqual(d, list(f))
+
+    def test_receive_frames_bytes_partially(self):
+        fu = _mkFrameUtils(32, 4, USE_SOF=True)
+        frames = self._frames(10, 9)
+        words = deque()
+        fu.send_frames_bytes(frames, words)
+        words = _toMonitorFormat(fu, words)
+        received = fu.receive_frames_bytes(words, frameCnt=3)
+        self.assertEqual([d for (_, d, _) in received], frames[:3])
+        # the rest can be received by the original method
+        _, d, _ = fu.receive_bytes(words)
+        self.assertEqual(bytes(d), frames[3])
+        received = fu.receive_frames_bytes(words)
+        self.assertEqual([d for (_, d, _) in received], frames[4:])
+        self.assertEqual(len(words), 0)
+
+    def test_send_frames_bytes_continues_last_word(self):
+        fu = _mkFrameUtils(32, 4)
+        words = deque()
+        fu.send_bytes([1, 2, 3, 4, 5], words)
+        report = fu.send_frames_bytes([b"\x06", b"\x07\x08"], words)
+        self.assertEqual(len(words), 1)
+        self.assertEqual(report.segmentCnt, 2)
+        received = fu.receive_frames_bytes(_toMonitorFormat(fu, words))
+        self.assertSequenceEqual(received, [(0, b"\x01\x02\x03\x04\x05", 0), (2, b"\x06", 0), (3, b"\x07\x08", 0)])
+
+    def test_packing_report(self):
+        SEGMENT_CNT = 4
+        DATA_WIDTH = 4 * 64
+        fu = _mkFrameUtils(DATA_WIDTH // SEGMENT_CNT, SEGMENT_CNT)
+        for frameLen in (1, 7, 9, 65):
+            report = fu.send_frames_bytes([bytes(frameLen) for _ in range(10)], deque())
+            self.assertAlmostEqual(report.getWastedBandwidthPercent(),
+                                   Axi4StreamSegmented.getWastedBandwidthPercent(SEGMENT_CNT, DATA_WIDTH, frameLen * 8))
+
+        report = fu.send_frames_bytes([bytes(64) for _ in range(3)], deque())
+        self.assertEqual(report.getWastedBandwidthPercent(), 0.0)
+        self.assertEqual(report.getWordCnt(), 6)
+        self.assertEqual(report.getEfficiency(), 1.0)
+
+
+if __name__ == "__main__":
+    testLoader = unittest.TestLoader()
+    # suite = unittest.TestSuite([Axi4StreamSegmentedFrameUtils_TC("test_packing_report")])
+    suite = testLoader.loadTestsFromTestCase(Axi4StreamSegmentedFrameUtils_TC)
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
@@ -1,4 +1,5 @@
-from typing import Union, Deque, Generator, Sequence
+from functools import lru_cache
+from typing import Optional, Union, Deque, Generator, Sequence
 
 from hwt.code import Concat
 from hwt.hdl.const import HConst
@@ -9,11 +10,27 @@ from hwt.pyUtils.arrayQuery import iter_with_last
 from hwt.pyUtils.typingFuture import override
 from hwt.synthesizer.vectorUtils import iterBits
 from hwtLib.abstract.simFrameUtils import SimFrameUtils
+from hwtLib.abstract.sim_ram import strb_to_bit_mask
 from hwtLib.amba.axi4s import Axi4Stream, Axi4StreamAgentWordType
 from pyMathBitPrecise.bit_utils import mask, get_bit, \
     get_bit_range, set_bit
 
 
+@lru_cache(maxsize=1024)
+def _continuous_mask_range(m: int) -> Optional[tuple[int, int]]:
+    """
+    :return: tuple (index of the first set bit, index of the bit behind the last set bit)
+        if set bits of m are continuous else None
+    """
+    if m == 0:
+        return None
+    start = (m & -m).bit_length() - 1
+    end = m.bit_length()
+    if m >> start != mask(end - start):
+        return None
+    return start, end
+
+
 class Axi4StreamSimFrameUtils(SimFrameUtils[Axi4StreamAgentWordType]):
 
     def __init__(self, DATA_WIDTH: int, USE_STRB=False, USE_KEEP=False, USE_ID=False, BYTE_WIDTH=8):
@@ -24,6 +41,7 @@ class Axi4StreamSimFrameUtils(SimFrameUtils[Axi4StreamAgentWordType]):
         self.USE_KEEP = USE_KEEP
         self.USE_ID = USE_ID
         self.maskT = HBits(DATA_WIDTH // self.BYTE_WIDTH)
+        self.dataT = HBits(DATA_WIDTH)
 
     @override
     @classmethod
@@ -83,6 +101,59 @@ class Axi4StreamSimFrameUtils(SimFrameUtils[Axi4StreamAgentWordType]):
             else:
                 yield (d, last)
 
+    @override
+    def send_bytes(self, data_B: Union[bytes, bytearray, memoryview, list[int]], ag_data: Deque[Axi4StreamAgentWordType], offset:int=0)\
+            ->list[Axi4StreamAgentWordType]:
+        """
+        :see: :meth:`hwtLib.abstract.simFrameUtils.SimFrameUtils.send_bytes`
+
+        The frame of fully valid bytes is packed directly to beat ints,
+        the generic path is used only for frames with invalid bytes (None in list).
+        """
+        if not data_B or self.BYTE_WIDTH != 8:
+            return super(Axi4StreamSimFrameUtils, self).send_bytes(data_B, ag_data, offset=offset)
+        try:
+            data_B = memoryview(data_B).cast("B")
+        except TypeError:
+            try:
+                data_B = memoryview(bytes(data_B))
+            except (TypeError, ValueError):
+                # contains None or non byte values
+                return super(Axi4StreamSimFrameUtils, self).send_bytes(data_B, ag_data, offset=offset)
+
+        BYTE_CNT = self.BYTE_CNT
+        dataT = self.dataT
+        withStrb = self.USE_STRB or self.USE_KEEP
+        mask_all = mask(BYTE_CNT)
+        frameEnd = offset + len(data_B)
+        words = []
+        for wordStart in range(0, frameEnd, BYTE_CNT):
+            isLast = wordStart + BYTE_CNT >= frameEnd
+            if wordStart + BYTE_CNT <= offset:
+                # the word is entirely before the beginning of the data
+                if withStrb:
+                    words.append((dataT.from_py(None), 0, isLast))
+                else:
+                    words.append((dataT.from_py(None), isLast))
+                continue
+
+            start = max(offset - wordStart, 0)
+            end = min(frameEnd - wordStart, BYTE_CNT)
+            d = int.from_bytes(data_B[wordStart + start - offset:wordStart + end - offset], "little") << (start * 8)
+            if start == 0 and end == BYTE_CNT:
+                word_mask = mask_all
+            else:
+                word_mask = mask(end) & ~mask(start)
+                d = dataT.from_py(d, strb_to_bit_mask(word_mask))
+
+            if withStrb:
+                words.append((d, word_mask, isLast))
+            else:
+                words.append((d, isLast))
+
+        ag_data.extend(words)
+        return words
+
     @override
     def concatWordBits(self, frameBeats: Sequence[Axi4StreamAgentWordType]):
         maskT = self.maskT
@@ -123,6 +194,23 @@ class Axi4StreamSimFrameUtils(SimFrameUtils[Axi4StreamAgentWordType]):
         """
         :param ag_data: list of axi stream words, number of item in tuple depends on use_keep and use_id
         """
+        return self._receive_bytes(ag_data, False)
+
+    def receive_frame_bytes(self, ag_data: Deque[Axi4StreamAgentWordType]) -> tuple[int, Union[bytes, list[Optional[int]]]]:
+        """
+        Same as :meth:`~.receive_bytes` but the data is returned as bytes
+        (if the frame contains a byte with strb=0 in the middle of the frame
+        the data is returned as a list with None for such a byte)
+        """
+        return self._receive_bytes(ag_data, True)
+
+    def _receive_bytes(self, ag_data: Deque[Axi4StreamAgentWordType], asBytes: bool):
+        """
+        :param asBytes: if True the data is returned as bytes if possible
+
+        :note: beats where all bytes marked by keep are also marked by strb, are fully valid and continuous
+            are converted using int.to_bytes, the rest is converted byte by byte
+        """
         offset = None
         data_B = []
         last = False
@@ -135,6 +223,8 @@ class Axi4StreamSimFrameUtils(SimFrameUtils[Axi4StreamAgentWordType]):
         use_id = self.USE_ID
         use_keep = self.USE_KEEP
         use_strb = self.USE_STRB
+        fastPathAvailable = BYTE_WIDTH == 8
+        wordByteCnt = BYTE_CNT * BYTE_WIDTH // 8
         while ag_data:
             _d = ag_data.popleft()
             if use_id:
@@ -179,23 +269,42 @@ class Axi4StreamSimFrameUtils(SimFrameUtils[Axi4StreamAgentWordType]):
                         break
                 assert offset is not None, (strb, keep)
 
-            for i in range(BYTE_CNT):
-                if get_bit(keep, i):
-                    if get_bit(strb, i):
-                        d = get_bit_range(data.val, i * BYTE_WIDTH, BYTE_WIDTH)
-                        if get_bit_range(data.vld_mask, i * BYTE_WIDTH, BYTE_WIDTH) != BYTE_MASK:
-                            raise AssertionError(
-                                "Data not valid but it should be"
-                                f" based on strb/keep B_i:{i:d}, 0x{keep:x}, 0x{data.vld_mask:x}")
+            keepRange = None
+            if fastPathAvailable and keep & strb == keep:
+                keepRange = _continuous_mask_range(keep)
+                if keepRange is not None:
+                    if isinstance(data, int):
+                        d_val = data
                     else:
-                        if last and get_bit_range(strb, i, BYTE_CNT - i) == 0:
-                            # skip invalid suffix bytes in last word
-                            break
-                        if first and not data_B:
-                            # skip prefix of invalid bytes in first word
-                            continue
-                        d = None
-                    data_B.append(d)
+                        keepBitMask = strb_to_bit_mask(keep)
+                        if data.vld_mask & keepBitMask != keepBitMask:
+                            # some byte is invalid, resolve it in the byte by byte path
+                            keepRange = None
+                        d_val = data.val
+
+            if keepRange is not None:
+                start, end = keepRange
+                data_B.extend(d_val.to_bytes(wordByteCnt, "little")[start:end])
+            else:
+                if isinstance(data, int):
+                    data = self.dataT.from_py(data)
+                for i in range(BYTE_CNT):
+                    if get_bit(keep, i):
+                        if get_bit(strb, i):
+                            d = get_bit_range(data.val, i * BYTE_WIDTH, BYTE_WIDTH)
+                            if get_bit_range(data.vld_mask, i * BYTE_WIDTH, BYTE_WIDTH) != BYTE_MASK:
+                                raise AssertionError(
+                                    "Data not valid but it should be"
+                                    f" based on strb/keep B_i:{i:d}, 0x{keep:x}, 0x{data.vld_mask:x}")
+                        else:
+                            if last and get_bit_range(strb, i, BYTE_CNT - i) == 0:
+                                # skip invalid suffix bytes in last word
+                                break
+                            if first and not data_B:
+                                # skip prefix of invalid bytes in first word
+                                continue
+                            d = None
+                        data_B.append(d)
 
             if first:
                 offset_mask = mask(offset)
@@ -215,6 +324,9 @@ class Axi4StreamSimFrameUtils(SimFrameUtils[Axi4StreamAgentWordType]):
             else:
                 raise ValueError("No frame available")
 
+        if asBytes and None not in data_B:
+            data_B = bytes(data_B)
+
         if use_id:
             return offset, id_, data_B
         else:
@@ -231,6 +343,15 @@ def axi4s_receive_bytes(axis: Axi4Stream) -> tuple[int, list[int]]:
     return fu.receive_bytes(ag_data)
 
 
+def axi4s_receive_frame_bytes(axis: Axi4Stream) -> tuple[int, Union[bytes, list[Optional[int]]]]:
+    """
+    Same as :func:`~.axi4s_receive_bytes` but the data is returned as bytes if the frame does not contain invalid bytes
+    """
+    ag_data = axis._ag.data
+    fu = Axi4StreamSimFrameUtils.from_HwIO(axis)
+    return fu.receive_frame_bytes(ag_data)
+
+
 def axi4s_send_bytes(axis: Axi4Stream, data_B: Union[list[int], bytes], offset=0) -> None:
     """
     :param axis: Axi4Stream master which is driver from the simulation
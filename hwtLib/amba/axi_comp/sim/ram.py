@@ -1,12 +1,11 @@
 from collections import deque
+from typing import Optional
 
-from hwt.hdl.const import HConst
-from hwt.hdl.types.bits import HBits
 from hwtLib.abstract.sim_ram import SimRam
+from hwtLib.abstract.sim_ram_timing import SimRamTimingModel
 from hwtLib.amba.constants import RESP_OKAY
 from hwtLib.amba.datapump.sim_ram import AxiDpSimRam
-from pyMathBitPrecise.bit_utils import mask, set_bit_range, get_bit, \
-    get_bit_range
+from pyMathBitPrecise.bit_utils import mask
 
 
 class Axi4SimRam(AxiDpSimRam):
@@ -15,7 +14,8 @@ class Axi4SimRam(AxiDpSimRam):
     """
 
     def __init__(self, axi=None, axiAR=None, axiR=None, axiAW=None,
-                 axiW=None, axiB=None, parent=None, allow_unaligned_addr=False):
+                 axiW=None, axiB=None, parent=None, allow_unaligned_addr=False,
+                 storage=None, timing: Optional[SimRamTimingModel]=None):
         """
         :param clk: clk which should this memory use in simulation
         :param axi: axi (Axi3/4 master) interface to listen on
@@ -24,6 +24,9 @@ class Axi4SimRam(AxiDpSimRam):
         :attention: use axi or axi parts not bouth
         :param parent: parent instance of this memory, memory will operate
             with same memory as parent one
+        :param storage: optional storage object for memory words
+            (:see: :class:`hwtLib.abstract.sim_ram.SimRam`)
+        :param timing: optional timing model (:see: :class:`hwtLib.amba.datapump.sim_ram.AxiDpSimRam`)
         :attention: memories are commiting into memory in "data" property
             after transaction is complete
         """
@@ -72,14 +75,14 @@ class Axi4SimRam(AxiDpSimRam):
         else:
             self.HAS_W_ID = False
         self.allow_unaligned_addr = allow_unaligned_addr
-        SimRam.__init__(self, DW // 8, parent=parent)
+        SimRam.__init__(self, DW // 8, parent=parent, storage=storage)
 
         self.allMask = mask(self.cellSize)
-        self.word_t = HBits(self.cellSize * 8)
 
         self.rPending = deque()
         self.wPending = deque()
         self.clk = clk
+        self.timing = timing
         self._registerOnClock()
 
     def parseReq(self, req):
@@ -100,46 +103,16 @@ class Axi4SimRam(AxiDpSimRam):
     def doRead(self):
         _id, addr, size, _ = self.rPending.popleft()
 
-        baseIndex = addr // self.cellSize
-        if baseIndex * self.cellSize != addr:
-            if not self.allow_unaligned_addr:
-                raise ValueError("not aligned", addr)
-            offset = addr % self.cellSize
-            word_t = self.word_t
-            word_mask0 = mask(8 * self.cellSize)
-            word_mask1 = mask((self.cellSize - offset) * 8)
-        else:
-            offset = 0
-
-        mem = self.data
-        for i in range(size):
-            isLast = i == size - 1
-            data = mem.get(baseIndex + i, None)
-            if offset != 0:
-                data1 = mem.get(baseIndex + i + 1, None)
-                if data is None:
-                    if data1 is None:
-                        # data = None
-                        pass
-                    else:
-                        data = data1 << ((self.cellSize - offset) * 8)
-                        data = data & word_mask1
-                else:
-                    if data1 is None:
-                        if isinstance(data, int):
-                            data = word_t.from_py(
-                                data >> (offset * 8),
-                                word_mask0)
-                    else:
-                        data = ((data >> (offset * 8)) & word_mask0) \
-                            | ((data1 << ((self.cellSize - offset) * 8)) & word_mask1)
+        if addr % self.cellSize and not self.allow_unaligned_addr:
+            raise ValueError("not aligned", addr)
 
+        for i, data in enumerate(self.readWords(addr, size, _id=_id)):
             if data is None:
                 raise AssertionError(
                     "Invalid read of uninitialized value on addr 0x%x"
                     % (addr + i * self.cellSize))
 
-            self.add_r_ag_data(_id, data, isLast)
+            self.add_r_ag_data(_id, data, i == size - 1)
 
     def pop_w_ag_data(self, _id):
         if self.HAS_W_ID:
@@ -150,61 +123,24 @@ class Axi4SimRam(AxiDpSimRam):
             data, strb, last = self.wAg.data.popleft()
         return (data, strb, last)
 
-    def _write_single_word(self, data: HConst, strb: int, word_i: int):
-        if strb == 0:
-            return
-        if strb != self.allMask:
-            cur = self.data.get(word_i, None)
-            if cur is None:
-                cur_val = 0
-                cur_mask = 0
-            elif isinstance(cur, int):
-                cur_val = cur
-                cur_mask = self.allMask
-            else:
-                cur_val = cur.val
-                cur_mask = cur.vld_mask
-
-            for i in range(self.cellSize):
-                if get_bit(strb, i):
-                    cur_val = set_bit_range(
-                        cur_val, i * 8, 8, get_bit_range(data.val, i * 8, 8))
-                    cur_mask = set_bit_range(
-                        cur_mask, i * 8, 8, get_bit_range(data.vld_mask, i * 8, 8))
-            if cur_mask == self.allMask:
-                data = cur_val
-            else:
-                data = self.word_t.from_py(cur_val, cur_mask)
-        # print(f"data[{word_i:d}] = {data}")
-        self.data[word_i] = data
-
     def doWrite(self):
         _id, addr, size, _ = self.wPending.popleft()
 
-        baseIndex = addr // self.cellSize
-        offset = addr % self.cellSize
-        if offset and not self.allow_unaligned_addr:
+        if addr % self.cellSize and not self.allow_unaligned_addr:
             raise ValueError("not aligned", addr)
+
+        words = []
+        strbs = []
         for i in range(size):
             data, strb, last = self.pop_w_ag_data(_id)
-            strb = int(strb)
-            last = int(last)
-            last = bool(last)
+            last = bool(int(last))
             isLast = i == size - 1
             assert last == isLast, (addr, size, i)
-            if offset == 0:
-                # print("alig", data, strb)
-                self._write_single_word(data, strb, baseIndex + i)
-            else:
-                # print("init", data, strb)
-                d0 = data << (offset * 8)
-                strb0 = strb << offset
-                d1 = (data >> (offset * 8)) & self.allMask
-                strb1 = (strb >> offset) & mask(self.cellSize)
-                # print("split", d0, d1, strb0, strb1)
-                self._write_single_word(d0, strb0, baseIndex + i)
-                self._write_single_word(d1, strb1, baseIndex + i + 1)
-        self.doWriteAck(_id)
+            words.append(data)
+            strbs.append(int(strb))
+
+        self.writeWords(addr, words, strbs, _id=_id)
+        self.onWriteDone(_id)
 
     def doWriteAck(self, _id):
         self.wAckAg.data.append((_id, RESP_OKAY))
@@ -16,8 +16,7 @@ from hwt.hwParam import HwParam
 from hwt.math import log2ceil
 from hwt.pyUtils.typingFuture import override
 from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
-from hwtLib.abstract.frame_utils.alignment_utils import FrameAlignmentUtils
-from hwtLib.abstract.frame_utils.join.fsm import input_B_dst_to_fsm
+from hwtLib.abstract.frame_utils.join.fsm import resolve_frame_join_fsm
 from hwtLib.abstract.frame_utils.join.state_trans_item import StateTransItem
 from hwtLib.amba.axi4s import Axi4Stream
 from hwtLib.amba.axis_comp.frame_join.input_reg import FrameJoinInputReg, \
@@ -64,11 +63,8 @@ class Axi4S_FrameJoin(HwModule):
         word_bytes = self.word_bytes = self.DATA_WIDTH // 8
         input_cnt = self.input_cnt = len(t.fields)
         streams = [f.dtype for f in t.fields]
-        fju = FrameAlignmentUtils(word_bytes, self.OUT_OFFSET)
-        input_B_dst = fju.resolve_input_bytes_destinations(
-            streams)
-        self.state_trans_table = input_B_dst_to_fsm(
-            word_bytes, input_cnt, input_B_dst, fju.can_produce_zero_len_frame(streams))
+        self.state_trans_table = resolve_frame_join_fsm(
+            word_bytes, self.OUT_OFFSET, streams)
         addClkRstn(self)
         with self._hwParamsShared():
             self.dataOut = Axi4Stream()._m()
@@ -1,6 +1,8 @@
 from collections import deque
+from typing import Optional
 
 from hwtLib.abstract.sim_ram import SimRam
+from hwtLib.abstract.sim_ram_timing import SimRamTimingModel
 from hwtSimApi.triggers import WaitWriteOnly
 from pyMathBitPrecise.bit_utils import mask, ValidityError
 
@@ -13,15 +15,21 @@ class AxiDpSimRam(SimRam):
     """
 
     def __init__(self, cellWidth, clk, rDatapumpHwIO=None,
-                 wDatapumpHwIO=None, parent=None):
+                 wDatapumpHwIO=None, parent=None, storage=None,
+                 timing: Optional[SimRamTimingModel]=None):
         """
         :param cellWidth: width of items in memory
         :param clk: clk signal for synchronization
         :param parent: parent instance of SimRam
                        (memory will be shared with this instance)
+        :param storage: optional storage object for memory words
+            (:see: :class:`hwtLib.abstract.sim_ram.SimRam`)
+        :param timing: optional timing model which specifies latency, bandwidth
+            and ordering of the transactions, if None the transactions are processed
+            as soon as possible in order
         """
         assert cellWidth % 8 == 0
-        super(AxiDpSimRam, self).__init__(cellWidth // 8, parent=parent)
+        super(AxiDpSimRam, self).__init__(cellWidth // 8, parent=parent, storage=storage)
         self.allMask = mask(self.cellSize)
 
         assert rDatapumpHwIO is not None or wDatapumpHwIO is not None, \
@@ -62,6 +70,7 @@ class AxiDpSimRam(SimRam):
             raise AssertionError("Need at least some interface")
         self.ID_WIDTH = hwIO.ID_WIDTH
         self.MAX_LEN = hwIO.MAX_LEN
+        self.timing = timing
 
         self._registerOnClock()
 
@@ -73,6 +82,11 @@ class AxiDpSimRam(SimRam):
         Check if any request has appeared on interfaces
         """
         yield WaitWriteOnly()
+        if self.timing is not None:
+            self._checkRequestsTimed()
+            self._registerOnClock()
+            return
+
         if self.arAg is not None:
             if self.arAg.data:
                 self.onReadReq()
@@ -88,6 +102,39 @@ class AxiDpSimRam(SimRam):
                 self.doWrite()
         self._registerOnClock()
 
+    def _isWriteDataReady(self, req):
+        return req[2] <= len(self.wAg.data)
+
+    def _checkRequestsTimed(self):
+        """
+        Version of :meth:`~.checkRequests` for the memory with the timing model,
+        the requests are stored in the timing model and they are moved
+        to rPending/wPending once they should be processed
+        """
+        t = self.timing
+        t.tick()
+        if self.arAg is not None:
+            if self.arAg.data:
+                self.onReadReq()
+
+            req = t.popRead()
+            if req is not None:
+                self.rPending.append(req)
+                self.doRead()
+
+        if self.awAg is not None:
+            if self.awAg.data:
+                self.onWriteReq()
+
+            req = t.popWrite(self._isWriteDataReady)
+            if req is not None:
+                self.wPending.append(req)
+                self.doWrite()
+
+            _id = t.popWriteAck()
+            if _id is not None:
+                self.doWriteAck(_id)
+
     def parseReq(self, req):
         for i, v in enumerate(req):
             assert v._is_full_valid(), (i, v)
@@ -126,29 +173,47 @@ class AxiDpSimRam(SimRam):
 
         return (_id, addr, size, lastWordBitmask)
 
+    def _getSimTime(self):
+        ag = self.arAg if self.arAg is not None else self.awAg
+        return ag.sim.now
+
     def onReadReq(self):
-        readReq = self.arAg.data.pop()
-        self.rPending.append(self.parseReq(readReq))
+        readReq = self.parseReq(self.arAg.data.pop())
+        if self.monitor is not None:
+            self.monitor.onRequest(False, readReq[0], readReq[1], readReq[2] * self.cellSize)
+        if self.timing is None:
+            self.rPending.append(readReq)
+        else:
+            self.timing.addRequest(False, readReq[0], readReq[2], readReq)
 
     def onWriteReq(self):
-        writeReq = self.awAg.data.pop()
-        self.wPending.append(self.parseReq(writeReq))
+        writeReq = self.parseReq(self.awAg.data.pop())
+        if self.monitor is not None:
+            self.monitor.onRequest(True, writeReq[0], writeReq[1], writeReq[2] * self.cellSize)
+        if self.timing is None:
+            self.wPending.append(writeReq)
+        else:
+            self.timing.addRequest(True, writeReq[0], writeReq[2], writeReq)
+
+    def onWriteDone(self, _id):
+        """
+        Called once data of write transaction is written to memory
+        """
+        if self.timing is None:
+            self.doWriteAck(_id)
+        else:
+            # write response is sent later from the timing model
+            self.timing.writeDone()
 
     def doRead(self):
         _id, addr, size, lastWordBitmask = self.rPending.popleft()
         HAS_ID = self.rAg.hwIO.ID_WIDTH > 0
-        baseIndex = addr // self.cellSize
-        if baseIndex * self.cellSize != addr:
+        if addr % self.cellSize:
             raise NotImplementedError(
                 f"unaligned transaction not implemented (0x{addr:x})")
 
-        for i in range(size):
+        for i, data in enumerate(self.readWords(addr, size, _id=_id)):
             isLast = i == size - 1
-            try:
-                data = self.data[baseIndex + i]
-            except KeyError:
-                data = None
-
             if data is None:
                 raise AssertionError(
                     "Invalid read of uninitialized value on addr 0x%x" %
@@ -177,9 +242,9 @@ class AxiDpSimRam(SimRam):
     def doWrite(self):
         _id, addr, size, lastWordBitmask = self.wPending.popleft()
 
-        baseIndex = addr // self.cellSize
-        if baseIndex * self.cellSize != addr:
+        if addr % self.cellSize:
             raise NotImplementedError("unaligned transaction not implemented")
+        words = []
         for i in range(size):
             if self.w_use_strb:
                 data, strb, last = self.wAg.data.popleft()
@@ -215,6 +280,7 @@ class AxiDpSimRam(SimRam):
             if self.w_use_strb:
                 assert strb == expectedStrb
 
-            self.data[baseIndex + i] = data
+            words.append(data)
 
-        self.doWriteAck(_id)
+        self.writeWords(addr, words, _id=_id)
+        self.onWriteDone(_id)
@@ -1,4 +1,4 @@
-from typing import Union, Sequence, Generator, Deque, Self
+from typing import Union, Sequence, Generator, Deque, Self, Iterable, Optional
 
 from hdlConvertorAst.to.hdlUtils import iter_with_last
 from hwt.code import Concat
@@ -8,7 +8,7 @@ from hwt.hdl.types.bitsConst import HBitsConst
 from hwt.hdl.types.defs import BIT
 from hwt.pyUtils.typingFuture import override
 from hwt.synthesizer.vectorUtils import iterBits
-from hwtLib.abstract.simFrameUtils import SimFrameUtils
+from hwtLib.abstract.simFrameUtils import SimFrameUtils, SimFramePackingReport
 from hwtLib.avalon.st import AvalonST, AvalonSTAgentWordType
 from pyMathBitPrecise.bit_utils import get_bit_range
 
@@ -29,6 +29,8 @@ class AvalonStSimFrameUtils(SimFrameUtils[AvalonSTAgentWordType]):
         self.USE_SOF = USE_SOF
         self.ERROR_WIDTH = ERROR_WIDTH
         self.USE_EMPTY = USE_EMPTY
+        self.dataT = HBits(SEGMENT_DATA_WIDTH)
+        self._flagsTable: Optional[list[list[list[tuple[int, ...]]]]] = None
 
     @override
     @classmethod
@@ -133,6 +135,75 @@ class AvalonStSimFrameUtils(SimFrameUtils[AvalonSTAgentWordType]):
                     for data, eof in frameBeats:
                         yield Concat(b(eof), data)
 
+    def _getFlagsTable(self) -> list[list[list[tuple[int, ...]]]]:
+        """
+        :return: table of word members behind data indexed by [sof][eof][empty]
+        """
+        t = self._flagsTable
+        if t is None:
+            USE_EMPTY = self.USE_EMPTY
+            ERROR_WIDTH = self.ERROR_WIDTH
+            USE_SOF = self.USE_SOF
+            t = []
+            for sof in (0, 1):
+                tSof = []
+                t.append(tSof)
+                for eof in (0, 1):
+                    tEof = []
+                    tSof.append(tEof)
+                    for empty in range(self.SEGMENT_BYTE_CNT + 1):
+                        flags = []
+                        if USE_EMPTY:
+                            flags.append(empty)
+                        if ERROR_WIDTH:
+                            flags.append(0)
+                        if USE_SOF:
+                            flags.append(sof)
+                        flags.append(eof)
+                        tEof.append(tuple(flags))
+            self._flagsTable = t
+        return t
+
+    @override
+    def send_frames_bytes(self, frames: Iterable[Union[bytes, Sequence[int]]],
+                          ag_data: Deque[AvalonSTAgentWordType],
+                          offset: int=0) -> SimFramePackingReport:
+        """
+        Batched version of :meth:`~.send_bytes`, pack all frames into words at once
+        using int/bytes operations and precomputed table of empty/error/sof/eof members of the word.
+
+        :param frames: frames as bytes-like objects or lists of ints (None is not supported)
+        :param offset: number of invalid bytes before each frame
+        :return: the report about the packing efficiency (each word is a single segment)
+        """
+        flagsTable = self._getFlagsTable()
+        report = SimFramePackingReport(1, self.SEGMENT_BYTE_CNT)
+        wordCnt = len(ag_data)
+        ag_data.extend((d, *flagsTable[sof][eof][empty])
+                       for d, sof, eof, empty in self._iterFramesBytesSegments(frames, offset, report))
+        report.segmentCnt = len(ag_data) - wordCnt
+        return report
+
+    @override
+    def _getWordSegments(self, word: AvalonSTAgentWordType):
+        i = 1
+        if self.USE_EMPTY:
+            empty = int(word[i])
+            i += 1
+        else:
+            empty = 0
+        if self.ERROR_WIDTH:
+            err = int(word[i])
+            i += 1
+        else:
+            err = 0
+        sof = int(word[i]) if self.USE_SOF else None
+        return 0, ((word[0], sof, int(word[-1]), empty, err),)
+
+    @override
+    def _getWordRest(self, word: AvalonSTAgentWordType, segmentI: int) -> AvalonSTAgentWordType:
+        raise AssertionError("Word has only a single segment and it should be never split", word, segmentI)
+
     @override
     def receive_bytes(self, ag_data:Deque[AvalonSTAgentWordType]) -> tuple[int, list[Union[int, HBitsConst]], bool]:
         data_B = []
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from collections import deque
+import unittest
+
+from hwtLib.avalon.stSimFrameUtils import AvalonStSimFrameUtils
+
+
+class AvalonStSimFrameUtils_TC(unittest.TestCase):
+
+    def _assertWordsEqual(self, fu: AvalonStSimFrameUtils, words, refWords):
+        self.assertEqual(len(words), len(refWords))
+        for w, refW in zip(words, refWords):
+            d, *flags = w
+            refD, *refFlags = refW
+            if refD is None:
+                self.assertIsNone(d)
+            else:
+                if isinstance(d, int):
+                    d = fu.dataT.from_py(d)
+                self.assertEqual(d.vld_mask, refD.vld_mask)
+                self.assertEqual(d.val & d.vld_mask, refD.val & refD.vld_mask)
+            self.assertSequenceEqual([int(f) for f in flags], [int(f) for f in refFlags])
+
+    def test_send_frames_bytes_same_as_send_bytes(self):
+        for kwargs in [{"USE_EMPTY": True}, {"USE_EMPTY": True, "ERROR_WIDTH": 1, "USE_SOF": False},
+                       {"USE_EMPTY": True, "SUPPORT_ZLP": True}, {"USE_EMPTY": False}]:
+            for DATA_WIDTH in (8, 32, 64):
+                if not kwargs["USE_EMPTY"] and DATA_WIDTH != 8:
+                    continue
+                fu = AvalonStSimFrameUtils(DATA_WIDTH, **kwargs)
+                minLen = 0 if kwargs.get("SUPPORT_ZLP", False) else 1
+                frames = [bytes((i + j) & 0xff for j in range(minLen + (i * 5) % (3 * DATA_WIDTH // 8)))
+                          for i in range(20)]
+                words = deque()
+                report = fu.send_frames_bytes(frames, words)
+                refWords = deque()
+                for f in frames:
+                    fu.send_bytes(list(f), refWords)
+                self._assertWordsEqual(fu, words, refWords)
+                self.assertEqual(report.segmentCnt, len(refWords))
+                self.assertEqual(report.byteCnt, sum(len(f) for f in frames))
+
+                received = fu.receive_frames_bytes(words)
+                self.assertSequenceEqual([(d, e) for (_, d, e) in received], [(f, 0) for f in frames])
+                self.assertEqual(len(words), 0)
+
+    def test_send_frames_bytes_offset(self):
+        for DATA_WIDTH in (8, 32, 64):
+            fu = AvalonStSimFrameUtils(DATA_WIDTH, True)
+            frames = [bytes((i + j) & 0xff for j in range(1 + (i * 5) % (3 * DATA_WIDTH // 8)))
+                      for i in range(10)]
+            # offset may span over multiple words
+            for offset in range(3 * DATA_WIDTH // 8 + 2):
+                words = deque()
+                report = fu.send_frames_bytes(frames, words, offset=offset)
+                refWords = deque()
+                for f in frames:
+                    fu.send_bytes(list(f), refWords, offset=offset)
+                self._assertWordsEqual(fu, words, refWords)
+                self.assertEqual(report.segmentCnt, len(refWords))
+
+    def test_receive_frames_bytes_partially(self):
+        fu = AvalonStSimFrameUtils(32, True)
+        frames = [b"abcdefg", b"h", b"ijklmnopq"]
+        words = deque()
+        fu.send_frames_bytes(frames, words, offset=0)
+        self.assertEqual(fu.receive_frames_bytes(words, frameCnt=1), [(0, b"abcdefg", 0)])
+        _, d, _ = fu.receive_bytes(words)
+        self.assertEqual(bytes(d), b"h")
+        self.assertEqual(fu.receive_frames_bytes(words), [(0, b"ijklmnopq", 0)])
+
+    def test_packing_report(self):
+        fu = AvalonStSimFrameUtils(64, True)
+        report = fu.send_frames_bytes([bytes(9) for _ in range(4)], deque())
+        self.assertEqual(report.getWordCnt(), 8)
+        self.assertAlmostEqual(report.getWastedBandwidthPercent(), 7 / 16)
+        self.assertAlmostEqual(report.getEfficiency(), 9 / 16)
+
+
+if __name__ == "__main__":
+    testLoader = unittest.TestLoader()
+    # suite = unittest.TestSuite([AvalonStSimFrameUtils_TC("test_packing_report")])
+    suite = testLoader.loadTestsFromTestCase(AvalonStSimFrameUtils_TC)
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
@@ -0,0 +1,9 @@
+"""
+Benchmarks of elaboration, simulation model build and simulation throughput of the components of this library.
+
+.. code-block:: bash
+
+    python3 -m hwtLib.benchmarks.run -o results.json
+    python3 -m hwtLib.benchmarks.run -o results.json --baseline baseline.json --threshold 0.2
+
+"""
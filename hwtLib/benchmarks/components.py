@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from math import ceil
+from random import Random
+
+from hwt.constants import NOP
+from hwt.hwIOs.std import HwIODataRdVld
+from hwt.math import log2ceil
+from hwtLib.amba.axi4 import Axi4
+from hwtLib.amba.axi4sSimFrameUtils import Axi4StreamSimFrameUtils, \
+    axi4s_send_bytes, axi4s_receive_bytes
+from hwtLib.amba.axi_comp.interconnect.matrixR import AxiInterconnectMatrixR
+from hwtLib.amba.axi_comp.sim.ram import Axi4SimRam
+from hwtLib.amba.axis_comp.frame_parser import Axi4S_frameParser
+from hwtLib.amba.axis_comp.frame_parser.test_types import structManyInts, \
+    ref0_structManyInts, ref1_structManyInts
+from hwtLib.amba.datapump.r import Axi_rDatapump
+from hwtLib.benchmarks.sim_benchmark import SimBenchmark
+from hwtLib.handshaked.fifo import HandshakedFifo
+from hwtLib.logic.crcPoly import CRC_32
+from hwtLib.mem.cuckooHashTablWithRam import CuckooHashTableWithRam
+from hwtLib.mem.hashTableCoreMultiPortWithRam import HashTableCoreMultiPortWithRam
+from hwtLib.peripheral.ethernet.mac import EthernetMac
+
+
+class HandshakedFifo_Benchmark(SimBenchmark):
+
+    def mkDut(self):
+        dut = HandshakedFifo(HwIODataRdVld)
+        dut.DEPTH = 16
+        dut.DATA_WIDTH = 64
+        return dut
+
+    def prepare(self):
+        self.dut.dataIn._ag.data.extend(range(self.CLK_CYCLES))
+
+    def payloadBytes(self):
+        dut = self.dut
+        return len(dut.dataOut._ag.data) * dut.DATA_WIDTH // 8
+
+
+class Axi4S_frameParser_Benchmark(SimBenchmark):
+    DATA_WIDTH = 64
+
+    def mkDut(self):
+        dut = Axi4S_frameParser(structManyInts)
+        dut.DATA_WIDTH = self.DATA_WIDTH
+        return dut
+
+    def prepare(self):
+        fu = Axi4StreamSimFrameUtils(self.DATA_WIDTH)
+        t = structManyInts
+        frames = [list(fu.pack_frame(t.from_py(v))) for v in (ref0_structManyInts, ref1_structManyInts)]
+        data = self.dut.dataIn._ag.data
+        i = 0
+        while len(data) < self.CLK_CYCLES:
+            data.extend(frames[i % 2])
+            i += 1
+        self._inputWords = len(data)
+
+    def payloadBytes(self):
+        consumed = self._inputWords - len(self.dut.dataIn._ag.data)
+        return consumed * self.DATA_WIDTH // 8
+
+
+class AxiInterconnectMatrixR_Benchmark(SimBenchmark):
+    """
+    2 masters reading from 2 slaves
+    """
+    TRANS_LEN = 8
+
+    def mkDut(self):
+        dut = AxiInterconnectMatrixR(Axi4)
+        dut.MASTERS = ({0, 1}, {0, 1})
+        dut.SLAVES = (
+            (0x0000, 0x1000),
+            (0x1000, 0x1000),
+        )
+        dut.ADDR_WIDTH = log2ceil(0x4000 - 1)
+        return dut
+
+    def prepare(self):
+        dut = self.dut
+        DW = dut.DATA_WIDTH
+        memory = [Axi4SimRam(axi=s) for s in dut.m]
+        # the data in memory is reused as the content is not checked
+        addrs = []
+        for (offset, _), m in zip(dut.SLAVES, memory):
+            a = m.calloc(self.TRANS_LEN, DW // 8, initValues=list(range(self.TRANS_LEN)))
+            addrs.append(offset + a)
+
+        transCnt = ceil(self.CLK_CYCLES / self.TRANS_LEN)
+        for master_i, s in enumerate(dut.s):
+            ar = s.ar._ag
+            for i in range(transCnt):
+                addr = addrs[(i + master_i) % len(addrs)]
+                ar.data.append(ar.create_addr_req(addr, self.TRANS_LEN - 1, _id=0, DATA_WIDTH=DW))
+
+    def payloadBytes(self):
+        dut = self.dut
+        return sum(len(s.r._ag.data) for s in dut.s) * dut.DATA_WIDTH // 8
+
+
+class CuckooHashTableWithRam_Benchmark(SimBenchmark):
+    """
+    Insert of items followed by a continuous lookup, the payload are the looked up keys
+    """
+
+    def mkDut(self):
+        dut = CuckooHashTableWithRam([CRC_32, CRC_32])
+        dut.KEY_WIDTH = 16
+        dut.DATA_WIDTH = 8
+        dut.LOOKUP_KEY = True
+        dut.TABLE_SIZE = 32 * 2
+        return dut
+
+    def prepare(self):
+        dut = self.dut
+        CNT = dut.TABLE_SIZE // 2
+        for k in range(1, CNT + 1):
+            dut.insert._ag.data.append((k, k & 0xff))
+        # wait for inserts
+        lookup = dut.lookup._ag.data
+        lookup.extend(NOP for _ in range(CNT * 4))
+        lookup.extend((i % (2 * CNT)) + 1 for i in range(self.CLK_CYCLES))
+
+    def payloadBytes(self):
+        dut = self.dut
+        return len(dut.lookupRes._ag.data) * ceil(dut.KEY_WIDTH / 8)
+
+
+class HashTableCoreMultiPortWithRam_Benchmark(SimBenchmark):
+    """
+    Continuous lookups on all ports with uniformly distributed keys,
+    the processed items are the lookup results (reported as lookups per clock)
+    """
+    LOOKUP_PORT_CNT = 4
+    BANK_CNT = 8
+    KEY_CNT = 1024
+
+    def mkDut(self):
+        dut = HashTableCoreMultiPortWithRam(CRC_32)
+        dut.ITEMS_CNT = 256
+        dut.KEY_WIDTH = 16
+        dut.DATA_WIDTH = 8
+        dut.LOOKUP_ID_WIDTH = 8
+        dut.LOOKUP_PORT_CNT = self.LOOKUP_PORT_CNT
+        dut.BANK_CNT = self.BANK_CNT
+        dut.BANK_QUEUE_DEPTH = 4
+        return dut
+
+    def genKeys(self, rand: Random, n: int):
+        return [rand.randrange(self.KEY_CNT) for _ in range(n)]
+
+    def prepare(self):
+        rand = Random(0)
+        for lookup in self.dut.lookup:
+            keys = self.genKeys(rand, self.CLK_CYCLES)
+            lookup._ag.data.extend((i & 0xff, k) for i, k in enumerate(keys))
+
+    def processedItems(self):
+        return sum(len(r._ag.data) for r in self.dut.lookupRes)
+
+    def payloadBytes(self):
+        return self.processedItems() * ceil(self.dut.KEY_WIDTH / 8)
+
+
+class HashTableCoreMultiPortWithRam_skewed_Benchmark(HashTableCoreMultiPortWithRam_Benchmark):
+    """
+    Same as :class:`~.HashTableCoreMultiPortWithRam_Benchmark` but the keys have Zipf distribution
+    (a few keys are used very often and they cause conflicts in banks)
+    """
+    ZIPF_S = 1.0
+
+    def genKeys(self, rand: Random, n: int):
+        weights = [1.0 / (k + 1) ** self.ZIPF_S for k in range(self.KEY_CNT)]
+        return rand.choices(range(self.KEY_CNT), weights=weights, k=n)
+
+
+class Axi_rDatapump_Benchmark(SimBenchmark):
+    """
+    Reads of the max length transactions from Axi4SimRam
+    """
+    DATA_WIDTH = 64
+    LEN_MAX_VAL = 255
+
+    def mkDut(self):
+        dut = Axi_rDatapump(axiCls=Axi4)
+        dut.DATA_WIDTH = self.DATA_WIDTH
+        dut.CHUNK_WIDTH = self.DATA_WIDTH
+        dut.MAX_CHUNKS = self.LEN_MAX_VAL + 1
+        dut.ALIGNAS = self.DATA_WIDTH
+        return dut
+
+    def prepare(self):
+        dut = self.dut
+        m = Axi4SimRam(axi=dut.axi)
+        words = self.LEN_MAX_VAL + 1
+        a = m.calloc(words, self.DATA_WIDTH // 8, initValues=list(range(words)))
+        req = dut.driver.req._ag.data
+        for _ in range(ceil(self.CLK_CYCLES / words)):
+            req.append((a, self.LEN_MAX_VAL, 0))
+
+    def payloadBytes(self):
+        return len(self.dut.driver.r._ag.data) * self.DATA_WIDTH // 8
+
+
+class EthernetMac_Benchmark(SimBenchmark):
+    """
+    TX path (FCS append) of MAC
+    """
+    DATA_WIDTH = 64
+    FRAME_LEN = 64
+
+    def mkDut(self):
+        dut = EthernetMac()
+        dut.HAS_RX = False
+        dut.DATA_WIDTH = self.DATA_WIDTH
+        return dut
+
+    def prepare(self):
+        DW_B = self.DATA_WIDTH // 8
+        f = [x & 0xff for x in range(1, self.FRAME_LEN + 1)]
+        for _ in range(ceil(self.CLK_CYCLES * DW_B / self.FRAME_LEN)):
+            axi4s_send_bytes(self.dut.eth.tx, f)
+
+    def payloadBytes(self):
+        phy_tx = self.dut.phy_tx
+        size = 0
+        while phy_tx._ag.data:
+            try:
+                _, f = axi4s_receive_bytes(phy_tx)
+            except ValueError:
+                # unfinished frame at the end of simulation
+                break
+            size += len(f)
+        return size
+
+
+BENCHMARKS = [
+    HandshakedFifo_Benchmark,
+    Axi4S_frameParser_Benchmark,
+    AxiInterconnectMatrixR_Benchmark,
+    CuckooHashTableWithRam_Benchmark,
+    HashTableCoreMultiPortWithRam_Benchmark,
+    HashTableCoreMultiPortWithRam_skewed_Benchmark,
+    Axi_rDatapump_Benchmark,
+    EthernetMac_Benchmark,
+]
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+from typing import List, Optional, Sequence, Type
+
+from hwtLib.benchmarks.components import BENCHMARKS
+from hwtLib.benchmarks.sim_benchmark import BenchmarkResult, SimBenchmark, \
+    compare_benchmark_results, load_benchmark_results, save_benchmark_results
+
+
+def run_benchmarks(benchmarks: Sequence[Type[SimBenchmark]], repeat: int=1, clkCycles: Optional[int]=None,
+                   log=sys.stdout) -> List[BenchmarkResult]:
+    """
+    :param repeat: number of executions of each benchmark, the best value of each metric is used
+    :param clkCycles: if specified it overrides the number of simulated clock cycles of the benchmarks
+    """
+    results = []
+    for bCls in benchmarks:
+        res = None
+        for _ in range(repeat):
+            b = bCls()
+            if clkCycles is not None:
+                b.CLK_CYCLES = clkCycles
+            r = b.runBenchmark()
+            res = r if res is None else res.best(r)
+        if log is not None:
+            log.write(f"{res}\n")
+            log.flush()
+        results.append(res)
+    return results
+
+
+def main(argv: Optional[List[str]]=None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description="Run simulation benchmarks of hwtLib components.")
+    parser.add_argument("benchmarks", metavar="NAME", nargs="*",
+                        help="names of benchmarks to run (default all)")
+    parser.add_argument("-o", "--output", default=None, type=str,
+                        help="path of json file where the results should be stored")
+    parser.add_argument("--baseline", default=None, type=str,
+                        help="path of json file with results of previous run to compare with")
+    parser.add_argument("--threshold", default=0.2, type=float,
+                        help="relative degradation of metric considered as a regression (default 0.2 = 20%%)")
+    parser.add_argument("--repeat", default=1, type=int,
+                        help="number of executions of each benchmark, the best result is used")
+    parser.add_argument("--clk-cycles", dest="clk_cycles", default=None, type=int,
+                        help="override the number of simulated clock cycles")
+    args = parser.parse_args(argv)
+
+    benchmarks = {b.getName(): b for b in BENCHMARKS}
+    if args.benchmarks:
+        try:
+            selected = [benchmarks[n] for n in args.benchmarks]
+        except KeyError as e:
+            parser.error(f"Unknown benchmark {e.args[0]:s}, available: {', '.join(benchmarks.keys()):s}")
+    else:
+        selected = BENCHMARKS
+
+    results = run_benchmarks(selected, repeat=args.repeat, clkCycles=args.clk_cycles)
+    if args.output:
+        save_benchmark_results(args.output, results)
+
+    if args.baseline:
+        regressions = compare_benchmark_results(load_benchmark_results(args.baseline), results, args.threshold)
+        for name, metric, bv, v in regressions:
+            print(f"REGRESSION {name:s}.{metric:s}: {bv:g} -> {v:g}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import platform
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+
+from hwt.hwModule import HwModule
+from hwt.serializer.serializer_filter import SerializerFilterDoNotExclude
+from hwt.serializer.simModel import SimModelSerializer
+from hwt.serializer.store_manager import StoreManager
+from hwt.simulator.rtlSimulatorVcd import BasicRtlSimulatorVcd
+from hwt.simulator.simTestCase import SimTestCase
+from hwt.synth import to_rtl
+from hwtSimApi.constants import CLK_PERIOD
+
+
+class _ElaborateOnly(StoreManager):
+    """
+    Store manager which only elaborates the component (to measure the time of the elaboration)
+    and does not serialize anything
+    """
+
+    def write(self, obj):
+        pass
+
+
+class BenchmarkResult():
+    """
+    :ivar ~.name: name of the benchmark
+    :ivar ~.elaboration_s: time of the elaboration of the component (to_rtl without serialization)
+    :ivar ~.build_s: time of the serialization and compilation of the simulation model
+    :ivar ~.clk_cycles: number of simulated clock cycles
+    :ivar ~.sim_s: wall clock time of the simulation
+    :ivar ~.payload_bytes: number of bytes of payload data transferred by the component in simulation
+    :ivar ~.items: number of items (e.g. lookups) processed by the component in simulation
+    """
+    # metric name -> True if higher value is better
+    METRICS = {
+        "elaboration_s": False,
+        "build_s": False,
+        "cycles_per_s": True,
+        "bytes_per_s": True,
+        "items_per_clk": True,
+    }
+
+    def __init__(self, name: str, elaboration_s: float, build_s: float,
+                 clk_cycles: int, sim_s: float, payload_bytes: int, items: int=0):
+        self.name = name
+        self.elaboration_s = elaboration_s
+        self.build_s = build_s
+        self.clk_cycles = clk_cycles
+        self.sim_s = sim_s
+        self.payload_bytes = payload_bytes
+        self.items = items
+
+    @property
+    def cycles_per_s(self) -> float:
+        return self.clk_cycles / self.sim_s if self.sim_s > 0 else 0.0
+
+    @property
+    def bytes_per_s(self) -> float:
+        return self.payload_bytes / self.sim_s if self.sim_s > 0 else 0.0
+
+    @property
+    def items_per_clk(self) -> float:
+        return self.items / self.clk_cycles if self.clk_cycles > 0 else 0.0
+
+    def best(self, other: "BenchmarkResult") -> "BenchmarkResult":
+        """
+        :return: the result with the best value of each metric from self and other (used to filter the noise of repeated runs)
+        """
+        assert self.name == other.name, (self.name, other.name)
+        if self.sim_s <= other.sim_s:
+            sim = self
+        else:
+            sim = other
+        return BenchmarkResult(self.name,
+                               min(self.elaboration_s, other.elaboration_s),
+                               min(self.build_s, other.build_s),
+                               sim.clk_cycles, sim.sim_s, sim.payload_bytes, sim.items)
+
+    def to_json(self) -> dict:
+        return {
+            "elaboration_s": self.elaboration_s,
+            "build_s": self.build_s,
+            "clk_cycles": self.clk_cycles,
+            "sim_s": self.sim_s,
+            "payload_bytes": self.payload_bytes,
+            "items": self.items,
+            "cycles_per_s": self.cycles_per_s,
+            "bytes_per_s": self.bytes_per_s,
+            "items_per_clk": self.items_per_clk,
+        }
+
+    @classmethod
+    def from_json(cls, name: str, d: dict) -> "BenchmarkResult":
+        return cls(name, d["elaboration_s"], d["build_s"], d["clk_cycles"], d["sim_s"], d["payload_bytes"],
+                   d.get("items", 0))
+
+    def __repr__(self):
+        items = f" {self.items_per_clk:.3f}items/clk" if self.items else ""
+        return (f"<{self.__class__.__name__:s} {self.name:s} elaboration:{self.elaboration_s:.3f}s"
+                f" build:{self.build_s:.3f}s {self.cycles_per_s:.1f}clk/s {self.bytes_per_s:.1f}B/s{items:s}>")
+
+
+class SimBenchmark(SimTestCase):
+    """
+    Base class of simulation benchmarks, the benchmark instantiates the component and measures
+    the elaboration, the build of simulation model and the simulation separately.
+
+    :attention: The elaboration can be performed only once for each component instance,
+        the elaboration time is measured on a separate instance and subtracted from the build time.
+        The simulation model cache is not used so the build time is always measured.
+    :cvar CLK_CYCLES: number of clock cycles to simulate
+    """
+    DEFAULT_BUILD_DIR = None
+    DEFAULT_LOG_DIR = None
+    DEFAULT_SIMULATOR = BasicRtlSimulatorVcd
+    CLK_CYCLES = 2000
+
+    def __init__(self, methodName="runBenchmark"):
+        super(SimBenchmark, self).__init__(methodName)
+
+    @classmethod
+    def getName(cls) -> str:
+        return cls.__name__
+
+    def mkDut(self) -> HwModule:
+        """
+        :return: a new instance of the component with the configuration used for the benchmark
+        """
+        raise NotImplementedError("Implement this in your implementation of benchmark", self)
+
+    def prepare(self):
+        """
+        Prepare the data for the simulation agents (called after the simulation is restarted)
+        """
+        raise NotImplementedError("Implement this in your implementation of benchmark", self)
+
+    def payloadBytes(self) -> int:
+        """
+        :return: number of bytes of payload transferred in simulation (called after the simulation)
+        """
+        raise NotImplementedError("Implement this in your implementation of benchmark", self)
+
+    def processedItems(self) -> int:
+        """
+        :return: number of items (e.g. lookups) processed in simulation (called after the simulation)
+        """
+        return 0
+
+    def runBenchmark(self) -> BenchmarkResult:
+        dut = self.mkDut()
+        t0 = perf_counter()
+        to_rtl(dut,
+               name=dut._getDefaultName(),
+               store_manager=_ElaborateOnly(SimModelSerializer, _filter=SerializerFilterDoNotExclude()))
+        elaboration_s = perf_counter() - t0
+
+        dut = self.mkDut()
+        t0 = perf_counter()
+        self.compileSim(dut)
+        build_s = max(perf_counter() - t0 - elaboration_s, 0.0)
+
+        self.setUp()
+        self.prepare()
+        t0 = perf_counter()
+        self.runSim(self.CLK_CYCLES * CLK_PERIOD)
+        sim_s = perf_counter() - t0
+        payload_bytes = self.payloadBytes()
+        items = self.processedItems()
+        self.rmSim()
+
+        return BenchmarkResult(self.getName(), elaboration_s, build_s, self.CLK_CYCLES, sim_s, payload_bytes, items)
+
+
+BENCHMARK_RESULTS_FORMAT_VERSION = 1
+
+
+def save_benchmark_results(path: str, results: List[BenchmarkResult]):
+    d = {
+        "version": BENCHMARK_RESULTS_FORMAT_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": {r.name: r.to_json() for r in results},
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(d, f, indent=2, sort_keys=True)
+
+
+def load_benchmark_results(path: str) -> Dict[str, BenchmarkResult]:
+    with open(path) as f:
+        d = json.load(f)
+    if d.get("version", None) != BENCHMARK_RESULTS_FORMAT_VERSION:
+        raise ValueError("Unsupported format of benchmark results", path, d.get("version", None))
+    return {name: BenchmarkResult.from_json(name, r) for name, r in d["results"].items()}
+
+
+def compare_benchmark_results(baseline: Dict[str, BenchmarkResult],
+                              results: List[BenchmarkResult],
+                              threshold: float=0.2,
+                              minTime: float=0.05) -> List[Tuple[str, str, float, float]]:
+    """
+    :param threshold: relative degradation of metric which is considered as a regression (0.2 = 20%)
+    :param minTime: absolute difference of times in seconds which is ignored (too small to be measured reliably)
+    :return: list of regressions (benchmark name, metric name, baseline value, new value),
+        benchmarks missing in baseline are ignored
+    """
+    regressions = []
+    for r in results:
+        b: Optional[BenchmarkResult] = baseline.get(r.name, None)
+        if b is None:
+            continue
+        for metric, higherIsBetter in BenchmarkResult.METRICS.items():
+            bv = getattr(b, metric)
+            v = getattr(r, metric)
+            if higherIsBetter:
+                isRegression = v < bv * (1 - threshold)
+            else:
+                isRegression = v > bv * (1 + threshold) and v - bv > minTime
+            if isRegression:
+                regressions.append((r.name, metric, bv, v))
+    return regressions
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+from tempfile import TemporaryDirectory
+import unittest
+
+from hwtLib.benchmarks.components import HandshakedFifo_Benchmark
+from hwtLib.benchmarks.sim_benchmark import BenchmarkResult, \
+    compare_benchmark_results, load_benchmark_results, save_benchmark_results
+
+
+class SimBenchmark_TC(unittest.TestCase):
+
+    def test_save_load(self):
+        res = [
+            BenchmarkResult("a", 1.0, 2.0, 1000, 0.5, 8000, 2500),
+            BenchmarkResult("b", 0.1, 0.2, 100, 0.0, 0),
+        ]
+        with TemporaryDirectory() as d:
+            p = os.path.join(d, "results.json")
+            save_benchmark_results(p, res)
+            loaded = load_benchmark_results(p)
+
+        self.assertEqual(sorted(loaded.keys()), ["a", "b"])
+        for r in res:
+            self.assertDictEqual(loaded[r.name].to_json(), r.to_json())
+        self.assertEqual(loaded["a"].cycles_per_s, 2000.0)
+        self.assertEqual(loaded["a"].bytes_per_s, 16000.0)
+        self.assertEqual(loaded["b"].cycles_per_s, 0.0)
+        self.assertEqual(loaded["a"].items_per_clk, 2.5)
+        self.assertEqual(loaded["b"].items_per_clk, 0.0)
+
+    def test_from_json_without_items(self):
+        r = BenchmarkResult.from_json("a", {"elaboration_s": 1.0, "build_s": 2.0, "clk_cycles": 1000,
+                                            "sim_s": 0.5, "payload_bytes": 8000})
+        self.assertEqual(r.items, 0)
+
+    def test_best(self):
+        a = BenchmarkResult("a", 1.0, 3.0, 1000, 0.5, 8000)
+        b = BenchmarkResult("a", 2.0, 2.0, 1000, 0.4, 7000)
+        r = a.best(b)
+        self.assertEqual((r.elaboration_s, r.build_s, r.sim_s, r.payload_bytes), (1.0, 2.0, 0.4, 7000))
+
+    def test_compare(self):
+        baseline = {
+            "a": BenchmarkResult("a", 1.0, 2.0, 1000, 0.5, 8000),
+            "b": BenchmarkResult("b", 0.01, 0.2, 100, 0.1, 100),
+        }
+        results = [
+            # slower simulation, faster elaboration
+            BenchmarkResult("a", 0.5, 2.1, 1000, 1.0, 8000),
+            # small absolute change of elaboration time is not a regression
+            BenchmarkResult("b", 0.02, 0.2, 100, 0.1, 100),
+            # not in baseline
+            BenchmarkResult("c", 10.0, 10.0, 1, 10.0, 1),
+        ]
+        regressions = compare_benchmark_results(baseline, results, threshold=0.2)
+        self.assertListEqual(regressions, [
+            ("a", "cycles_per_s", 2000.0, 1000.0),
+            ("a", "bytes_per_s", 16000.0, 8000.0),
+        ])
+        self.assertListEqual(compare_benchmark_results(baseline, results, threshold=1.0), [])
+
+    def test_HandshakedFifo_Benchmark(self):
+        b = HandshakedFifo_Benchmark()
+        b.CLK_CYCLES = 100
+        r = b.runBenchmark()
+        self.assertEqual(r.name, "HandshakedFifo_Benchmark")
+        self.assertEqual(r.clk_cycles, 100)
+        self.assertGreater(r.elaboration_s, 0)
+        self.assertGreater(r.sim_s, 0)
+        # the fifo is passing one 64b word per clock after it is filled
+        self.assertGreater(r.payload_bytes, 50 * 8)
+        self.assertLessEqual(r.payload_bytes, 100 * 8)
+
+
+if __name__ == "__main__":
+    testLoader = unittest.TestLoader()
+    # suite = unittest.TestSuite([SimBenchmark_TC("test_compare")])
+    suite = testLoader.loadTestsFromTestCase(SimBenchmark_TC)
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
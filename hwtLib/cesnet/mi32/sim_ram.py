@@ -7,14 +7,17 @@ from hwtSimApi.triggers import WaitWriteOnly
 
 class Mi32SimRam(SimRam):
 
-    def __init__(self, mi32: Mi32, parent=None):
-        super(Mi32SimRam, self).__init__(mi32.DATA_WIDTH // 8, parent=parent)
+    def __init__(self, mi32: Mi32, parent=None, storage=None):
+        super(Mi32SimRam, self).__init__(mi32.DATA_WIDTH // 8, parent=parent, storage=storage)
         self.hwIO = mi32
         self.clk = mi32._getAssociatedClk()
         self._word_bytes = mi32.DATA_WIDTH // 8
         self._word_mask = mask(self._word_bytes)
         self._registerOnClock()
 
+    def _getSimTime(self):
+        return self.hwIO._ag.sim.now
+
     def _registerOnClock(self):
         self.clk._sigInside.wait(self.checkRequests())
 
@@ -34,7 +37,9 @@ class Mi32SimRam(SimRam):
         if addr % self._word_bytes != 0:
             raise NotImplementedError("Unaligned read")
 
-        d = self.data[int(addr) // self._word_bytes]
+        d, = self.readWords(addr, 1)
+        if d is None:
+            raise KeyError("Read of uninitialized memory word", addr)
         self.hwIO._ag.r_data.append(d)
 
     def on_write(self, addr, val, byteen):
@@ -42,10 +47,7 @@ class Mi32SimRam(SimRam):
         if addr % self._word_bytes != 0:
             raise NotImplementedError("Unaligned write", addr)
 
-        if int(byteen) == self._word_mask:
-            self.data[addr // self._word_bytes] = val
-        else:
-            raise NotImplementedError("Masked write")
+        self.writeWords(addr, [val], [int(byteen)])
 
     def on_req(self, req):
         mode, addr, val, byteen = req.popleft()
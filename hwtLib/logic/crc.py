@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from typing import List
+from typing import List, Optional, Sequence, Tuple
 
 from hwt.code import If, Concat, Switch
 from hwt.code_utils import rename_signal
@@ -16,10 +16,76 @@ from hwt.serializer.mode import serializeParamsUniq
 from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
 from hwt.synthesizer.vectorUtils import iterBits
 from hwtLib.commonHwIO.data_mask_last_hs import HwIODataMaskLastRdVld
-from hwtLib.logic.crcComb import CrcComb
+from hwtLib.logic.crcComb import CrcComb, CrcXorMatrixPackedRow
 from hwtLib.logic.crcPoly import CRC_32
 from pyMathBitPrecise.bit_utils import get_bit, bit_list_reversed_endianity, \
-    mask
+    mask, bit_list_reversed_bits_in_bytes
+
+
+class CrcPipelineMatrices():
+    """
+    Matrices for the pipelined CRC computation (:class:`~.Crc` with LATENCY > 1).
+    All matrices have rows packed to integers (bit i of row selects input bit i),
+    data bits are in the order after the endianity conversion (upper bits are processed first).
+
+    The data word is split to lanes, for each lane the partial CRC (with zero state) is computed.
+    The partial CRCs are shifted to the end of the word and combined.
+    For a word with only the upper k chunks valid the lower chunks are zeroed and the effect
+    of the trailing zeros is removed by the "zero-shift" correction (inverse of the state matrix for zero data).
+    The state update in the feedback loop then uses only the small state matrix for the k valid chunks.
+
+    :ivar ~.lanes: list of (low bit index, high bit index) of each lane
+    :ivar ~.laneRows: for each lane the matrix lane data bits -> partial CRC
+    :ivar ~.combineRows: matrix concatenated partial CRCs -> CRC of data word (with zero state)
+    :ivar ~.stateRows: for each number of valid chunks (1..DATA_WIDTH//MASK_GRANULARITY)
+        the matrix for the state in the feedback loop (single item if mask is not used)
+    :ivar ~.correctionRows: for each number of valid chunks the matrix which removes the effect
+        of the invalid lower chunks from the CRC of data word (single identity if mask is not used)
+    """
+
+    def __init__(self, data_width: int, poly_bits: Sequence[int],
+                 lane_width: int, mask_granularity: Optional[int]=None):
+        poly_bits = tuple(int(b) for b in poly_bits)
+        assert poly_bits[0], ("x^0 coefficient is required for the state matrix to be invertible", poly_bits)
+        PW = len(poly_bits)
+        DW = data_width
+        assert lane_width > 0, lane_width
+        self.lanes: List[Tuple[int, int]] = [
+            (lo, min(lo + lane_width, DW)) for lo in range(0, DW, lane_width)
+        ]
+        self.laneRows: List[Tuple[int, ...]] = [
+            tuple(d for _, d in CrcComb.buildCrcXorMatrixPacked(hi - lo, poly_bits))
+            for lo, hi in self.lanes
+        ]
+        combineRows = [0 for _ in range(PW)]
+        for lane_i, (lo, _) in enumerate(self.lanes):
+            # the partial CRC of the lane is followed by lo data bits
+            shift = self._stateMatrix(lo, poly_bits)
+            for r, row in enumerate(shift):
+                combineRows[r] |= row << (lane_i * PW)
+        self.combineRows: Tuple[int, ...] = tuple(combineRows)
+
+        if mask_granularity is None or mask_granularity == DW:
+            self.stateRows: List[Tuple[int, ...]] = [self._stateMatrix(DW, poly_bits)]
+            self.correctionRows: List[Tuple[int, ...]] = [self._stateMatrix(0, poly_bits)]
+        else:
+            G = mask_granularity
+            assert DW % G == 0, (DW, G)
+            self.stateRows = []
+            self.correctionRows = []
+            for vld_cnt in range(1, DW // G + 1):
+                self.stateRows.append(self._stateMatrix(vld_cnt * G, poly_bits))
+                self.correctionRows.append(
+                    CrcComb.gf2MatrixInverse(self._stateMatrix(DW - vld_cnt * G, poly_bits)))
+
+    @staticmethod
+    def _stateMatrix(data_width: int, poly_bits: Tuple[int, ...]) -> Tuple[int, ...]:
+        """
+        :return: matrix state -> next state for data_width zero data bits
+        """
+        if data_width == 0:
+            return tuple(1 << i for i in range(len(poly_bits)))
+        return tuple(s for s, _ in CrcComb.buildCrcXorMatrixPacked(data_width, poly_bits))
 
 
 # http://www.rightxlight.co.jp/technical/crc-verilog-hdl
@@ -32,7 +98,10 @@ class Crc(HwModule):
     polynome can be string in usual format or integer ("x^3+x+1" or 0b1011)
 
     :note: See :class:`hwtLib.logic.crcComb.CrcComb`
-    :ivar LATENCY: number of cycles from data in to data out
+    :ivar LATENCY: number of cycles from data in to data out,
+        LATENCY > 1 enables the pipelined implementation (see :class:`~.CrcPipelineMatrices`)
+        which adds LATENCY - 1 register stages in front of the state register
+    :ivar PIPELINE_LANE_WIDTH: number of data bits processed by a single partial CRC in pipelined implementation
     :ivar DATA_WIDTH: number of bits of data in
     :ivar MASK_GRANULARITY: if None, there is no mask for data in,
         else it must be an int which represents number of bits per 1 bit of mask signal,
@@ -51,6 +120,7 @@ class Crc(HwModule):
         self.DATA_WIDTH = 32
         self.MASK_GRANULARITY = HwParam(None)
         self.CONTAINS_STATE_REG = HwParam(True)
+        self.PIPELINE_LANE_WIDTH = HwParam(64)
 
     @override
     def hwDeclr(self):
@@ -58,6 +128,9 @@ class Crc(HwModule):
             addClkRstn(self)
         else:
             assert self.LATENCY == 0
+        if self.LATENCY > 1:
+            assert self.MASK_GRANULARITY is None or self.DATA_WIDTH % self.MASK_GRANULARITY == 0, (
+                self.DATA_WIDTH, self.MASK_GRANULARITY)
 
         with self._hwParamsShared():
             if self.MASK_GRANULARITY is None:
@@ -77,12 +150,16 @@ class Crc(HwModule):
 
     def build_crc_xor_matrix(self,
                              state_in_bits: List[RtlSignal],
-                             poly_bits: List[int], data_in_bits: List[RtlSignal])\
+                             poly_bits: List[int], data_in_bits: List[RtlSignal],
+                             crcMatrix: Optional[Sequence[CrcXorMatrixPackedRow]]=None)\
             ->List[RtlSignal]:
         """
         build xor tree for CRC computation
+
+        :param crcMatrix: optional precomputed matrix from :meth:`hwtLib.logic.crcComb.CrcComb.buildCrcXorMatrixPacked`
         """
-        crcMatrix = CrcComb.buildCrcXorMatrix(len(data_in_bits), poly_bits)
+        if crcMatrix is None:
+            crcMatrix = CrcComb.buildCrcXorMatrixPacked(len(data_in_bits), poly_bits)
         res = CrcComb.applyCrcXorMatrix(
             crcMatrix, data_in_bits,
             state_in_bits, self.REFIN)
@@ -95,8 +172,139 @@ class Crc(HwModule):
             stateNext.append(b)
         return stateNext
 
+    def _pipelineStage(self, name: str, bits: List[RtlSignal],
+                       sideband: List[RtlSignal]) -> Tuple[List[RtlSignal], List[RtlSignal]]:
+        """
+        Register bits and sideband signals [valid, last, mask] (last and mask are optional)
+
+        :note: valid is the only sideband signal with the reset value
+        """
+        r = self._reg(name, HBits(len(bits)))
+        r(Concat(*reversed(bits)))
+        _sideband = []
+        for i, (sName, s) in enumerate(zip(("vld", "last", "mask"), sideband)):
+            sr = self._reg(f"{name:s}_{sName:s}", s._dtype, def_val=0 if i == 0 else None)
+            sr(s)
+            _sideband.append(sr)
+        return list(iterBits(r)), _sideband
+
+    def _hwImplPipelined(self):
+        """
+        Implementation for LATENCY > 1, the data is processed in the pipeline before the state register
+        so the feedback loop contains only the state matrix (and the selection of the matrix by the mask)
+
+        * stage 0: partial CRC for each data lane
+        * stage 1: combination of partial CRCs
+        * stage 2 (if the mask is used): "zero-shift" correction of the CRC for invalid lower chunks
+
+        If there is less pipeline registers than stages the last stages are merged,
+        the extra pipeline registers are added at the end of the pipeline.
+        """
+        PW = self.POLY_WIDTH
+        DW = self.DATA_WIDTH
+        G = self.MASK_GRANULARITY
+        poly_bits, _ = CrcComb.parsePoly(self.POLY, PW)
+        useMask = G is not None and G != DW
+        m = CrcPipelineMatrices(DW, poly_bits, self.PIPELINE_LANE_WIDTH, G if useMask else None)
+
+        din = self.dataIn
+        _d = rename_signal(self, din.data, "d")
+        data_in_bits = list(iterBits(_d))
+        if not self.IN_IS_BIGENDIAN:
+            data_in_bits = bit_list_reversed_endianity(data_in_bits)
+
+        sideband = [din.vld, ]
+        if G:
+            din.rd(1)
+            sideband.append(din.last)
+        if useMask:
+            mask_in = din.mask
+            mask_width = mask_in._dtype.bit_length()
+            # zero invalid chunks, because bytes are already reversed in bit vector of input bits
+            # the data_in_bits[(mask_width - vld_byte_cnt) * G:] are valid
+            data_in_bits = [b & mask_in[mask_width - 1 - i // G] for i, b in enumerate(data_in_bits)]
+            sideband.append(mask_in)
+
+        if self.REFIN:
+            data_in_bits = bit_list_reversed_bits_in_bytes(data_in_bits, extend=False)
+
+        def laneCrcs(bits: List[RtlSignal], sideband: List[RtlSignal]):
+            res = []
+            for (lo, hi), rows in zip(m.lanes, m.laneRows):
+                res.extend(CrcComb.applyXorMatrix(rows, bits[lo:hi]))
+            return res
+
+        def combine(bits: List[RtlSignal], sideband: List[RtlSignal]):
+            return CrcComb.applyXorMatrix(m.combineRows, bits)
+
+        def correct(bits: List[RtlSignal], sideband: List[RtlSignal]):
+            res = self._sig("crc_corrected", HBits(PW))
+            Switch(sideband[2]).add_cases(
+                (mask(vld_cnt), res(Concat(*reversed(CrcComb.applyXorMatrix(rows, bits)))))
+                for vld_cnt, rows in enumerate(m.correctionRows, start=1)
+            ).Default(
+                res(None)
+            )
+            return list(iterBits(res))
+
+        stages = [laneCrcs, combine]
+        if useMask:
+            stages.append(correct)
+
+        bits = data_in_bits
+        regCnt = self.LATENCY - 1
+        for stage_i, stageFn in enumerate(stages):
+            bits = stageFn(bits, sideband)
+            if stage_i < regCnt:
+                bits, sideband = self._pipelineStage(f"pipe{stage_i:d}", bits, sideband)
+
+        for stage_i in range(len(stages), regCnt):
+            bits, sideband = self._pipelineStage(f"pipe{stage_i:d}", bits, sideband)
+
+        crc_data = [rename_signal(self, b, f"crc_d_{i:d}") for i, b in enumerate(bits)]
+
+        # feedback loop
+        vld = sideband[0]
+        if G:
+            rst = self.rst_n._isOn() | (vld & sideband[1])
+        else:
+            rst = self.rst_n
+        state = self._reg("c", HBits(PW), self.INIT, rst=rst)
+        loop_in_bits = list(iterBits(state)) + crc_data
+
+        def stateNext(stateRows):
+            # state bits are followed by CRC of data
+            rows = [s | (1 << (PW + i)) for i, s in enumerate(stateRows)]
+            return state(Concat(*reversed(CrcComb.applyXorMatrix(rows, loop_in_bits))))
+
+        if useMask:
+            If(vld,
+                Switch(sideband[2]).add_cases(
+                    (mask(vld_cnt), stateNext(rows))
+                    for vld_cnt, rows in enumerate(m.stateRows, start=1)
+                ).Default(
+                    state(None)
+                )
+            )
+        else:
+            If(vld,
+               stateNext(m.stateRows[0])
+            )
+
+        if G:
+            # to avoid the case where the state is restarted by dataIn.last
+            state_tmp = self._reg("state_tmp", state._dtype)
+            state_tmp(state._rtlNextSig)
+            state = state_tmp
+
+        self.dataOut(self._aply_REFOUT_and_XOROUT(state, PW, self.REFOUT, self.XOROUT))
+
     @override
     def hwImpl(self):
+        if self.LATENCY > 1:
+            self._hwImplPipelined()
+            return
+
         # prepare constants and bit arrays for inputs
         poly_bits, _ = CrcComb.parsePoly(self.POLY, self.POLY_WIDTH)
         din = self.dataIn
@@ -145,13 +353,18 @@ class Crc(HwModule):
             mask_in = din.mask
             mask_width = mask_in._dtype.bit_length()
             state_next_cases = []
-            for vld_byte_cnt in range(1, mask_width + 1):
-                # because bytes are already reversed in bit vector of input bits
-                _data_in_bits = data_in_bits[
-                     (mask_width - vld_byte_cnt) * self.MASK_GRANULARITY:
-                ]
+            # because bytes are already reversed in bit vector of input bits
+            data_in_bits_for_byte_cnt = [
+                data_in_bits[(mask_width - vld_byte_cnt) * self.MASK_GRANULARITY:]
+                for vld_byte_cnt in range(1, mask_width + 1)
+            ]
+            # matrices derived incrementally from each other
+            crcMatrices = CrcComb.buildCrcXorMatricesForWidths(
+                [len(_data_in_bits) for _data_in_bits in data_in_bits_for_byte_cnt], poly_bits)
+            for vld_byte_cnt, (_data_in_bits, crcMatrix) in enumerate(
+                    zip(data_in_bits_for_byte_cnt, crcMatrices), start=1):
                 state_next = self.build_crc_xor_matrix(
-                    state_in_bits, poly_bits, _data_in_bits)
+                    state_in_bits, poly_bits, _data_in_bits, crcMatrix)
                 # reversed because of because of MSB..LSB
                 state_next_cases.append((
                     mask(vld_byte_cnt), stateOut(Concat(*reversed(state_next)))
@@ -180,8 +393,6 @@ class Crc(HwModule):
                     state = state_tmp
                 else:
                     raise NotImplementedError()
-        else:
-            raise NotImplementedError(self.LATENCY)
 
         if self.CONTAINS_STATE_REG:
             dataOut = self._aply_REFOUT_and_XOROUT(state, self.POLY_WIDTH, self.REFOUT, self.XOROUT)
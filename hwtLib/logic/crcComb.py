@@ -1,8 +1,7 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from collections import deque
-from typing import List, Tuple, Union
+from typing import Dict, List, Sequence, Tuple, Union
 
 from hwt.hdl.types.bits import HBits
 from hwt.hdl.types.bitsConst import HBitsConst
@@ -16,10 +15,20 @@ from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
 from hwt.synthesizer.vectorUtils import iterBits
 from hwtLib.logic.crcPoly import CRC_5_USB, CRC_POLY
 from hwtLib.logic.crcUtils import parsePolyStr
+from hwtLib.logic.xorNetwork import XorNetwork, XOR_NETWORK_LUT_SIZE
 from pyMathBitPrecise.bit_utils import get_bit, bit_list_reversed_bits_in_bytes, \
     bit_list_reversed_endianity
 
 
+# row of CRC xor matrix, (mask for state bits, mask for data bits), bit i of mask corresponds to input bit i
+CrcXorMatrixPackedRow = Tuple[int, int]
+# cache of CRC xor matrices shared between all instances, (data width, poly bits) -> matrix
+_CRC_XOR_MATRIX_CACHE: Dict[Tuple[int, Tuple[int, ...]], Tuple[CrcXorMatrixPackedRow, ...]] = {}
+# cache of CRC xor matrices for data widths, (data widths, poly bits) -> matrices
+_CRC_XOR_MATRICES_FOR_WIDTHS_CACHE: Dict[Tuple[Tuple[int, ...], Tuple[int, ...]],
+                                          Tuple[Tuple[CrcXorMatrixPackedRow, ...], ...]] = {}
+
+
 # http://www.sunshine2k.de/coding/javascript/crc/crc_js.html
 # http://www.easics.be/webtools/crctool
 # http://www.ijsret.org/pdf/121757.pdf
@@ -92,9 +101,109 @@ class CrcComb(HwModule):
     # based on
     # hhttps://github.com/alexforencich/fpga-utils/blob/master/crcgen.py
     @staticmethod
-    def buildCrcXorMatrix(data_width: int,
-                          polyBits: List[bool]) -> List[Tuple[List[bool],
-                                                              List[bool]]]:
+    def buildCrcXorMatrixPacked(data_width: int,
+                                polyBits: Sequence[int]) -> Tuple[CrcXorMatrixPackedRow, ...]:
+        """
+        Same as :meth:`~.buildCrcXorMatrix` but the rows are packed to integers
+        (bit i of the mask corresponds to input bit i), the result is cached and shared between all instances.
+
+        :note: The matrix does not depend on REFIN, the input bits are reflected in :meth:`~.applyCrcXorMatrix`
+        """
+        polyBits = tuple(int(b) for b in polyBits)
+        key = (data_width, polyBits)
+        m = _CRC_XOR_MATRIX_CACHE.get(key, None)
+        if m is not None:
+            return m
+
+        PW = len(polyBits)
+        # list index is output bit index
+        # initial state is 1:1 mapping from previous state to next state
+        state = [1 << x for x in range(PW)]
+        data = [0 for _ in range(PW)]
+        # index 0 is the feedback itself
+        polyIndexes = [i for i, pb in enumerate(polyBits) if pb and i != 0]
+        for i in range(data_width - 1, -1, -1):
+            # determine shift in value
+            # current value in last FF, XOR with input data bit (MSB first)
+            val_s = state.pop()
+            val_d = data.pop() ^ (1 << i)
+            # shift
+            state.insert(0, val_s)
+            data.insert(0, val_d)
+            # add XOR inputs at correct indicies
+            for pi in polyIndexes:
+                state[pi] ^= val_s
+                data[pi] ^= val_d
+
+        m = _CRC_XOR_MATRIX_CACHE[key] = tuple(zip(state, data))
+        return m
+
+    @staticmethod
+    def composeCrcXorMatrix(first: Sequence[CrcXorMatrixPackedRow], first_data_width: int,
+                            second: Sequence[CrcXorMatrixPackedRow], second_data_width: int)\
+            ->Tuple[CrcXorMatrixPackedRow, ...]:
+        """
+        Compose the matrices of two CRC steps, the first processes the upper data bits
+        (which are processed first), the second processes lower data bits with the state from the first step
+
+        :return: matrix for data of width first_data_width + second_data_width
+        """
+        res = []
+        for s2, d2 in second:
+            s = 0
+            d = 0
+            k = 0
+            while s2:
+                if s2 & 1:
+                    s1, d1 = first[k]
+                    s ^= s1
+                    d ^= d1
+                s2 >>= 1
+                k += 1
+            res.append((s, d2 | (d << second_data_width)))
+        return tuple(res)
+
+    @classmethod
+    def buildCrcXorMatricesForWidths(cls, data_widths: Sequence[int],
+                                     polyBits: Sequence[int]) -> Tuple[Tuple[CrcXorMatrixPackedRow, ...], ...]:
+        """
+        Build CRC xor matrices for every data width (e.g. for every number of valid bytes)
+        the matrix for a wider data is derived from the previous one by prepending of the matrix for the extra bits.
+        The result is cached and shared between all instances.
+
+        :param data_widths: data widths in ascending order
+        :return: matrix for each data width
+        """
+        polyBits = tuple(int(b) for b in polyBits)
+        data_widths = tuple(data_widths)
+        key = (data_widths, polyBits)
+        res = _CRC_XOR_MATRICES_FOR_WIDTHS_CACHE.get(key, None)
+        if res is not None:
+            return res
+
+        res = []
+        prev = None
+        prevW = 0
+        for w in data_widths:
+            assert w >= prevW, ("Widths have to be sorted", data_widths)
+            if prev is None:
+                m = cls.buildCrcXorMatrixPacked(w, polyBits)
+            elif w == prevW:
+                m = prev
+            else:
+                step = cls.buildCrcXorMatrixPacked(w - prevW, polyBits)
+                m = cls.composeCrcXorMatrix(step, w - prevW, prev, prevW)
+            res.append(m)
+            prev = m
+            prevW = w
+
+        res = _CRC_XOR_MATRICES_FOR_WIDTHS_CACHE[key] = tuple(res)
+        return res
+
+    @classmethod
+    def buildCrcXorMatrix(cls, data_width: int,
+                          polyBits: List[bool]) -> List[Tuple[List[int],
+                                                              List[int]]]:
         """
         :param data_width: number of bits in input
             (excluding bits of signal wit current crc state)
@@ -103,60 +212,94 @@ class CrcComb(HwModule):
         :return: crc_mask contains rows where each row describes which bits
             should be XORed to get bit of result
             row is [mask_for_state_reg, mask_for_data]
+        :note: :meth:`~.buildCrcXorMatrixPacked` is faster and the result is cached
         """
-        DW = data_width
         PW = len(polyBits)
-        # list index is output bit index
-        # initial state is 1:1 mapping from previous state to next state
-        crc_mask = deque([
-            [[int(x == y) for y in range(PW)], [0] * DW]
-            for x in range(PW)
-        ])
+        return [
+            [[get_bit(s, i) for i in range(PW)], [get_bit(d, i) for i in range(data_width)]]
+            for s, d in cls.buildCrcXorMatrixPacked(data_width, polyBits)
+        ]
 
-        for i in range(DW - 1, -1, -1):
-            # determine shift in value
-            # current value in last FF, XOR with input data bit (MSB first)
-            val = crc_mask[-1]
-            val[1][i] = int(not val[1][i])
+    @staticmethod
+    def gf2MatrixMul(a: Sequence[int], b: Sequence[int]) -> Tuple[int, ...]:
+        """
+        Product of two GF(2) matrices with rows packed to integers,
+        the result computes a(b(x)) (bit k in row of a selects the row k of b)
+        """
+        res = []
+        for row in a:
+            v = 0
+            k = 0
+            while row:
+                if row & 1:
+                    v ^= b[k]
+                row >>= 1
+                k += 1
+            res.append(v)
+        return tuple(res)
 
-            # shift
-            crc_mask.appendleft(val)
-            crc_mask.pop()
+    @staticmethod
+    def gf2MatrixInverse(rows: Sequence[int]) -> Tuple[int, ...]:
+        """
+        Inverse of the square GF(2) matrix with rows packed to integers (Gauss-Jordan elimination)
 
-            # add XOR inputs at correct indicies
-            first = True
-            val_s, val_d = val
-            for cm, pb in zip(crc_mask, polyBits):
-                if first:
-                    first = False
-                elif pb:
-                    cm[0] = [a ^ b for a, b in zip(cm[0], val_s)]
-                    cm[1] = [a ^ b for a, b in zip(cm[1], val_d)]
+        :raise ValueError: if the matrix is singular
+        """
+        n = len(rows)
+        m = list(rows)
+        inv = [1 << i for i in range(n)]
+        for col in range(n):
+            bit = 1 << col
+            for pivot in range(col, n):
+                if m[pivot] & bit:
+                    break
+            else:
+                raise ValueError("Matrix is singular", rows)
+            m[col], m[pivot] = m[pivot], m[col]
+            inv[col], inv[pivot] = inv[pivot], inv[col]
+            for r in range(n):
+                if r != col and m[r] & bit:
+                    m[r] ^= m[col]
+                    inv[r] ^= inv[col]
+        return tuple(inv)
 
-        return crc_mask
+    @staticmethod
+    def applyXorMatrix(rows: Sequence[int], inBits: List[Union[RtlSignal, HBitsConst]],
+                       lutSize: int=XOR_NETWORK_LUT_SIZE) -> List:
+        """
+        :param rows: rows packed to integers, bit i of the row selects the input bit i
+        :param lutSize: number of inputs of LUT of the target, used for the optimization of the xor network
+        :return: list of xor of selected input bits for each row
+        :note: The common subexpressions are shared between rows and the xors are organized in balanced trees,
+            see :class:`hwtLib.logic.xorNetwork.XorNetwork` (:code:`XorNetwork.get(rows, len(inBits), lutSize)`
+            returns the cached network with the gate count and depth).
+        """
+        return XorNetwork.get(rows, len(inBits), lutSize).apply(inBits)
 
     @classmethod
-    def applyCrcXorMatrix(cls, crcMatrix: List[List[List[int]]],
+    def applyCrcXorMatrix(cls, crcMatrix: Sequence[Union[CrcXorMatrixPackedRow, Tuple[List[int], List[int]]]],
                           inBits: List[RtlSignal], stateBits: List[Union[RtlSignal, HBitsConst]],
                           refin: bool) -> List:
         if refin:
             inBits = bit_list_reversed_bits_in_bytes(inBits, extend=False)
-        outBits = []
+        PW = len(stateBits)
+        DW = len(inBits)
+        rows = []
         for (stateMask, dataMask) in crcMatrix:
-            v = BIT.from_py(0)  # neutral value for XOR
-            assert len(stateMask) == len(stateBits)
-            for useBit, b in zip(stateMask, stateBits):
-                if useBit:
-                    v = v ^ b
-
-            assert len(dataMask) == len(inBits), (len(dataMask), len(inBits))
-            for useBit, b in zip(dataMask, inBits):
-                if useBit:
-                    v = v ^ b
-
-            outBits.append(v)
+            if not isinstance(stateMask, int):
+                # unpacked row from buildCrcXorMatrix
+                assert len(stateMask) == PW
+                assert len(dataMask) == DW, (len(dataMask), DW)
+                stateMask = sum(1 << i for i, useBit in enumerate(stateMask) if useBit)
+                dataMask = sum(1 << i for i, useBit in enumerate(dataMask) if useBit)
+            else:
+                assert stateMask >> PW == 0, (stateMask, PW)
+                assert dataMask >> DW == 0, (dataMask, DW)
+            # state bits are followed by data bits
+            rows.append(stateMask | (dataMask << PW))
 
-        assert len(outBits) == len(stateBits)
+        outBits = cls.applyXorMatrix(rows, list(stateBits) + list(inBits))
+        assert len(outBits) == PW
         return outBits
 
     @override
@@ -179,7 +322,7 @@ class CrcComb(HwModule):
             # we need to process lower byte first
             inBits = bit_list_reversed_endianity(inBits, extend=False)
 
-        crcMatrix = self.buildCrcXorMatrix(DW, polyBits)
+        crcMatrix = self.buildCrcXorMatrixPacked(DW, polyBits)
         res = self.applyCrcXorMatrix(
             crcMatrix, inBits,
             initBits, bool(self.REFIN))
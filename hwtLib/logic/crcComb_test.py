@@ -2,14 +2,16 @@
 # -*- coding: utf-8 -*-
 
 from binascii import crc32, crc_hqx
+from collections import deque
 import os
+import unittest
 
 from hwt.constants import Time
 from hwt.hdl.types.bits import HBits
 from hwt.simulator.simTestCase import SimTestCase
 from hwtLib.logic.crcComb import CrcComb
 from hwtLib.logic.crcPoly import CRC_1, CRC_8_CCITT, CRC_16_CCITT, CRC_32, \
-    CRC_8_SAE_J1850, CRC_5_USB
+    CRC_8_SAE_J1850, CRC_5_USB, CRC_64_ECMA
 from hwtLib.logic.crc_test_utils import NaiveCrcAccumulator, naive_crc
 from hwtSimApi.constants import CLK_PERIOD
 from pyMathBitPrecise.bit_utils import get_bit, mask, \
@@ -235,8 +237,62 @@ class CrcCombTC(SimTestCase):
             self.assertValEqual(d, ref, (inp, "0x{:x} 0x{:x}".format(int(d), ref)))
 
 
+def buildCrcXorMatrix_lists(data_width, polyBits):
+    """
+    The original list based implementation of :meth:`CrcComb.buildCrcXorMatrix` used as a reference
+    """
+    DW = data_width
+    PW = len(polyBits)
+    crc_mask = deque([
+        [[int(x == y) for y in range(PW)], [0] * DW]
+        for x in range(PW)
+    ])
+
+    for i in range(DW - 1, -1, -1):
+        val = crc_mask[-1]
+        val[1][i] = int(not val[1][i])
+        crc_mask.appendleft(val)
+        crc_mask.pop()
+        first = True
+        val_s, val_d = val
+        for cm, pb in zip(crc_mask, polyBits):
+            if first:
+                first = False
+            elif pb:
+                cm[0] = [a ^ b for a, b in zip(cm[0], val_s)]
+                cm[1] = [a ^ b for a, b in zip(cm[1], val_d)]
+
+    return [list(r) for r in crc_mask]
+
+
+class CrcCombXorMatrixTC(unittest.TestCase):
+
+    def test_buildCrcXorMatrix_same_as_lists(self):
+        for poly in [CRC_1, CRC_5_USB, CRC_8_CCITT, CRC_16_CCITT, CRC_32, CRC_64_ECMA]:
+            polyBits = crcToBf(poly)
+            for DW in [1, 5, 8, 11, 32, 64, 72]:
+                self.assertListEqual(
+                    CrcComb.buildCrcXorMatrix(DW, polyBits),
+                    buildCrcXorMatrix_lists(DW, polyBits),
+                    (poly, DW))
+
+    def test_buildCrcXorMatrixPacked_cached(self):
+        polyBits = crcToBf(CRC_32)
+        m0 = CrcComb.buildCrcXorMatrixPacked(64, polyBits)
+        m1 = CrcComb.buildCrcXorMatrixPacked(64, list(polyBits))
+        self.assertIs(m0, m1)
+
+    def test_buildCrcXorMatricesForWidths(self):
+        for poly in [CRC_5_USB, CRC_32]:
+            polyBits = crcToBf(poly)
+            widths = [8 * i for i in range(1, 9)] + [64, 67]
+            ms = CrcComb.buildCrcXorMatricesForWidths(widths, polyBits)
+            self.assertEqual(len(ms), len(widths))
+            for w, m in zip(widths, ms):
+                self.assertEqual(m, CrcComb.buildCrcXorMatrixPacked(w, polyBits), (poly, w))
+
+
 if __name__ == "__main__":
-    import unittest
     testLoader = unittest.TestLoader()
     # suite = unittest.TestSuite([CrcCombTC("test_crc5_usb")])
     suite = testLoader.loadTestsFromTestCase(CrcCombTC)
@@ -118,6 +118,7 @@ class CRC_5_EPC(CRC_POLY):
     Gen 2 RFID EPC-C1G2
     """
     POLY = 0x09
+    INIT = 0x09
     WIDTH = 5
     CHECK = 0x00
     RESIDUE = 0x00
@@ -375,7 +376,7 @@ class CRC_16_IBM(CRC_POLY):
     WIDTH = 16
 
 
-class CRC_16_USB:
+class CRC_16_USB(CRC_POLY):
     POLY = 0x8005
     INIT = 0XFFFF
     REFIN = True
@@ -2,16 +2,24 @@
 # -*- coding: utf-8 -*-
 
 from binascii import crc32
+from random import Random
 import sys
+from time import perf_counter
+import unittest
 
 from hwt.constants import Time
 from hwt.hdl.types.bits import HBits
-from hwt.pyUtils.arrayQuery import grouper
+from hwt.pyUtils.arrayQuery import grouper, iter_with_last
 from hwt.simulator.simTestCase import SimTestCase
-from hwtLib.logic.crc import Crc
+from hwt.synth import to_rtl_str
+from hwtLib.logic.crc import Crc, CrcPipelineMatrices
+from hwtLib.logic.crcComb import CrcComb
 from hwtLib.logic.crcComb_test import stoi
-from hwtLib.logic.crcPoly import CRC_32
-from pyMathBitPrecise.bit_utils import mask
+from hwtLib.logic.crcPoly import CRC_32, CRC_32C, CRC_16_CCITT, CRC_POLY
+from hwtLib.logic.crc_test_utils import TableCrcEngine
+from hwtLib.logic.xorNetwork import XorNetwork, _XOR_NETWORK_CACHE
+from pyMathBitPrecise.bit_utils import mask, get_bit, bit_list_reversed_endianity, \
+    bit_list_reversed_bits_in_bytes, reverse_bits
 
 
 # , crc_hqx
@@ -48,7 +56,9 @@ class CrcTC(SimTestCase):
                  refin=None, refout=None,
                  initval=None, finxor=None,
                  use_mask=False,
-                 is_bigendian=False):
+                 is_bigendian=False,
+                 latency=1,
+                 laneWidth=None):
         if dataWidth is None:
             dataWidth = poly.WIDTH
 
@@ -65,6 +75,9 @@ class CrcTC(SimTestCase):
             dut.XOROUT = HBits(poly.WIDTH).from_py(finxor)
         dut.MASK_GRANULARITY = 8 if use_mask else None
         dut.IN_IS_BIGENDIAN = is_bigendian
+        dut.LATENCY = latency
+        if laneWidth is not None:
+            dut.PIPELINE_LANE_WIDTH = laneWidth
 
         self.compileSimAndStart(dut)
         return dut
@@ -269,12 +282,142 @@ class CrcTC(SimTestCase):
         ref = crc32(C_240B)
         self.assertEqual(out, ref, "0x{:08X} 0x{:08X}".format(out, ref))
 
+    def test_pipelined_240B_CRC32_64b(self):
+        for latency in (2, 3, 4):
+            dut = self.setUpCrc(CRC_32, 64, latency=latency, laneWidth=16)
+            dut.dataIn._ag.data += [stoi(d) for d in grouper(8, C_240B)]
+            self.runSim((latency + 2 + len(dut.dataIn._ag.data)) * 10 * Time.ns)
+            out = int(dut.dataOut._ag.data[-1])
+            ref = crc32(C_240B)
+            self.assertEqual(out, ref, "latency={:d} 0x{:08X} 0x{:08X}".format(latency, out, ref))
+
+    def test_pipelined_mask(self):
+        frames = [b"a", b"abcdefg", C_240B[:13], C_240B[:64]]
+        # latency 1 is the reference for the timing of the output
+        for latency in (1, 2, 3, 4):
+            dut = self.setUpCrc(CRC_32, 32, use_mask=True, latency=latency, laneWidth=16)
+            lastWordIndexes = []
+            for f in frames:
+                for last, w in iter_with_last(grouper(4, f, padvalue=None)):
+                    w = [b for b in w if b is not None]
+                    dut.dataIn._ag.data.append((stoi(w), mask(len(w)), int(last)))
+                    if last:
+                        lastWordIndexes.append(len(dut.dataIn._ag.data) - 1)
+            wordCnt = len(dut.dataIn._ag.data)
+            self.runSim((wordCnt + latency + 1) * 10 * Time.ns)
+            # the CRC of the frame is valid only in a single clock cycle, latency + 1 cycles after the last word,
+            # the last sample is the CRC of the last frame
+            out = dut.dataOut._ag.data
+            res = [int(out[i - wordCnt]) for i in lastWordIndexes]
+            ref = [crc32(f) for f in frames]
+            self.assertSequenceEqual(res, ref, f"latency={latency:d}")
+
+
+def crc_pipelined_model(params: CRC_POLY, data: bytes, data_width: int, lane_width: int, mask_granularity: int=8):
+    """
+    Software model of the pipelined CRC (:meth:`hwtLib.logic.crc.Crc._hwImplPipelined`)
+    which uses the same matrices as the hardware
+    """
+    poly_bits, PW = CrcComb.parsePoly(params.POLY, params.WIDTH)
+    m = CrcPipelineMatrices(data_width, poly_bits, lane_width, mask_granularity)
+    DW_B = data_width // 8
+    mask_width = data_width // mask_granularity
+
+    def apply(rows, bits):
+        v = sum(b << i for i, b in enumerate(bits))
+        return [bin(row & v).count("1") & 1 for row in rows]
+
+    state = [get_bit(params.INIT, i) for i in range(PW)]
+    for w in grouper(DW_B, data, padvalue=None):
+        w = [b for b in w if b is not None]
+        vld_cnt = len(w) * 8 // mask_granularity
+        bits = [get_bit(stoi(w), i) for i in range(data_width)]
+        bits = bit_list_reversed_endianity(bits)
+        bits = [b & get_bit(mask(vld_cnt), mask_width - 1 - i // mask_granularity) for i, b in enumerate(bits)]
+        if params.REFIN:
+            bits = bit_list_reversed_bits_in_bytes(bits, extend=False)
+
+        lanes = []
+        for (lo, hi), rows in zip(m.lanes, m.laneRows):
+            lanes.extend(apply(rows, bits[lo:hi]))
+        crc_d = apply(m.combineRows, lanes)
+        if len(m.correctionRows) > 1:
+            crc_d = apply(m.correctionRows[vld_cnt - 1], crc_d)
+            state_rows = m.stateRows[vld_cnt - 1]
+        else:
+            state_rows = m.stateRows[0]
+        state = [s ^ d for s, d in zip(apply(state_rows, state), crc_d)]
+
+    res = sum(b << i for i, b in enumerate(state))
+    if params.REFOUT:
+        res = reverse_bits(res, PW)
+    return res ^ params.XOROUT
+
+
+class CrcElaborationTC(unittest.TestCase):
+
+    def test_wide_masked_CRC32_512b(self):
+        _XOR_NETWORK_CACHE.clear()
+        dut = Crc()
+        dut.setConfig(CRC_32)
+        dut.DATA_WIDTH = 512
+        dut.MASK_GRANULARITY = 8
+        to_rtl_str(dut)
+
+        # a network for each number of valid bytes
+        networks = list(_XOR_NETWORK_CACHE.items())
+        self.assertEqual(len(networks), 512 // 8)
+        start = perf_counter()
+        for (rows, inputCnt, lutSize, maxSharedNodes), n in networks:
+            self.assertLess(n.gateCount, n.naiveGateCount)
+            XorNetwork(rows, inputCnt, lutSize, maxSharedNodes)
+        self.assertLess(perf_counter() - start, 10.0)
+
+
+class CrcPipelineMatricesTC(unittest.TestCase):
+
+    def test_gf2MatrixInverse(self):
+        poly_bits, PW = CrcComb.parsePoly(CRC_32.POLY, CRC_32.WIDTH)
+        for dw in (1, 8, 24, 100):
+            a = CrcPipelineMatrices._stateMatrix(dw, tuple(poly_bits))
+            a_inv = CrcComb.gf2MatrixInverse(a)
+            self.assertTupleEqual(CrcComb.gf2MatrixMul(a, a_inv), tuple(1 << i for i in range(PW)))
+            self.assertTupleEqual(CrcComb.gf2MatrixMul(a_inv, a), tuple(1 << i for i in range(PW)))
+
+        with self.assertRaises(ValueError):
+            CrcComb.gf2MatrixInverse((0b01, 0b01))
+
+    def test_model_vs_table(self):
+        rand = Random(0)
+        for p in (CRC_32, CRC_32C, CRC_16_CCITT):
+            e = TableCrcEngine.get(p)
+            for data_width, lane_width, mask_granularity in [
+                    (32, 32, None),
+                    (64, 16, None),
+                    (64, 24, 8),
+                    (128, 64, 8),
+                    (32, 8, 32),
+                    (48, 48, 16),
+                ]:
+                for size in (1, 2, 7, 16, 33, 61):
+                    if mask_granularity is None or mask_granularity == data_width:
+                        size = data_width // 8 * max(1, size // (data_width // 8))
+                    elif (size * 8) % mask_granularity:
+                        continue
+                    d = bytes(rand.getrandbits(8) for _ in range(size))
+                    ref = e.crc(d)
+                    self.assertEqual(
+                        crc_pipelined_model(p, d, data_width, lane_width,
+                                            data_width if mask_granularity is None else mask_granularity),
+                        ref, (p, data_width, lane_width, mask_granularity, size))
+        self.assertEqual(crc_pipelined_model(CRC_32, C_240B, 64, 16), crc32(C_240B))
+
 
 if __name__ == "__main__":
-    import unittest
+    _ALL_TCs = [CrcTC, CrcElaborationTC, CrcPipelineMatricesTC]
     testLoader = unittest.TestLoader()
-    
     # suite = unittest.TestSuite([CrcTC("test_simple_mask_3_outof_4")])
-    suite = testLoader.loadTestsFromTestCase(CrcTC)
+    loadedTcs = [testLoader.loadTestsFromTestCase(tc) for tc in _ALL_TCs]
+    suite = unittest.TestSuite(loadedTcs)
     runner = unittest.TextTestRunner(verbosity=3)
     runner.run(suite)
@@ -1,4 +1,5 @@
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Type, Union
+
 from hwtLib.logic.crcPoly import CRC_POLY
 from pyMathBitPrecise.bit_utils import reverse_bits, mask, \
     bit_list_reversed_endianity, bit_list_reversed_bits_in_bytes, \
@@ -107,6 +108,199 @@ class NaiveCrcAccumulator:
         return v
 
 
+class TableCrcEngine:
+    """
+    Table driven software CRC (slicing-by-N) for any :class:`hwtLib.logic.crcPoly.CRC_POLY`,
+    the result is the same as in http://reveng.sourceforge.net/crc-catalogue/all.htm (CHECK is a CRC of b"123456789").
+
+    The N tables are shared between all instances with same POLY, WIDTH, REFIN and N (:see: :meth:`~.get`).
+
+    .. code-block:: python
+
+        e = TableCrcEngine.get(CRC_32)
+        assert e.crc(b"123456789") == 0xCBF43926
+        # incremental computation
+        v = e.update(e.init(), b"1234")
+        v = e.update(v, b"56789")
+        assert e.finalize(v) == 0xCBF43926
+
+    :ivar ~.slices: number of bytes processed in a single step (N)
+    :ivar ~.tables: slices tables, tables[k][b] is a value of the register after processing of byte b followed by k zero bytes
+    :note: the register (value returned from :meth:`~.init` and :meth:`~.update`) is stored bit reversed if REFIN
+        and aligned to 8 bits if WIDTH < 8 and not REFIN
+    """
+    _TABLES: Dict[Tuple[int, int, bool, int], List[List[int]]] = {}
+    _INSTANCES: Dict[Tuple[int, int, int, bool, bool, int, int], "TableCrcEngine"] = {}
+
+    def __init__(self, params: Type[CRC_POLY], slices: int=8):
+        assert slices >= 1, slices
+        W = params.WIDTH
+        self.params = params
+        self.slices = slices
+        self.REFIN = bool(params.REFIN)
+        self.REFOUT = bool(params.REFOUT)
+        self.XOROUT = params.XOROUT
+        if self.REFIN:
+            self.regWidth = W
+            self.initValue = reverse_bits(params.INIT, W)
+        else:
+            # the register is extended to 8b so the byte can be xored with its MSB
+            self.regWidth = max(W, 8)
+            self.initValue = params.INIT << (self.regWidth - W)
+
+        k = (params.POLY & mask(W), W, self.REFIN, slices)
+        tables = self._TABLES.get(k, None)
+        if tables is None:
+            tables = self._TABLES[k] = self._buildTables(params.POLY & mask(W), W, self.REFIN, slices)
+        self.tables = tables
+
+    @classmethod
+    def get(cls, params: Type[CRC_POLY], slices: int=8) -> "TableCrcEngine":
+        """
+        Get a cached instance of the engine for specified CRC
+        """
+        k = (params.POLY, params.WIDTH, params.INIT, bool(params.REFIN), bool(params.REFOUT), params.XOROUT, slices)
+        e = cls._INSTANCES.get(k, None)
+        if e is None:
+            e = cls._INSTANCES[k] = cls(params, slices)
+        return e
+
+    @staticmethod
+    def _buildTables(poly: int, width: int, refin: bool, slices: int) -> List[List[int]]:
+        t0 = []
+        if refin:
+            polyR = reverse_bits(poly, width)
+            for b in range(256):
+                r = b
+                for _ in range(8):
+                    if r & 1:
+                        r = (r >> 1) ^ polyR
+                    else:
+                        r >>= 1
+                t0.append(r)
+            tables = [t0]
+            for _ in range(slices - 1):
+                prev = tables[-1]
+                tables.append([(r >> 8) ^ t0[r & 0xff] for r in prev])
+        else:
+            regWidth = max(width, 8)
+            regMask = mask(regWidth)
+            topBit = 1 << (regWidth - 1)
+            polyA = poly << (regWidth - width)
+            for b in range(256):
+                r = b << (regWidth - 8)
+                for _ in range(8):
+                    if r & topBit:
+                        r = ((r << 1) ^ polyA) & regMask
+                    else:
+                        r = (r << 1) & regMask
+                t0.append(r)
+            tables = [t0]
+            sh = regWidth - 8
+            for _ in range(slices - 1):
+                prev = tables[-1]
+                tables.append([((r << 8) & regMask) ^ t0[r >> sh] for r in prev])
+        return tables
+
+    def init(self) -> int:
+        """
+        :return: the initial value of the register
+        """
+        return self.initValue
+
+    def update(self, reg: int, data: Union[bytes, bytearray, memoryview, Sequence[int]]) -> int:
+        """
+        Process the data bytes
+
+        :param reg: the value of the register from :meth:`~.init` or previous call of this function
+        :return: the new value of the register
+        """
+        if not isinstance(data, (bytes, bytearray, memoryview)):
+            data = bytes(data)
+        data = memoryview(data)
+        tables = self.tables
+        t0 = tables[0]
+        N = self.slices
+        N8 = N * 8
+        dataLen = len(data)
+        if N == 1:
+            # the byte by byte loop is faster than a generic slicing loop with a single table
+            end = 0
+        else:
+            end = dataLen - dataLen % N
+        from_bytes = int.from_bytes
+        # the table for the first byte of the slice is the one with the most trailing zero bytes
+        tablesForBytes = tables[::-1]
+        if self.REFIN:
+            maskN = mask(N8)
+            for off in range(0, end, N):
+                x = (reg ^ from_bytes(data[off:off + N], "little")) & maskN
+                r = reg >> N8
+                for t, b in zip(tablesForBytes, x.to_bytes(N, "little")):
+                    r ^= t[b]
+                reg = r
+            for b in data[end:]:
+                reg = (reg >> 8) ^ t0[(reg ^ b) & 0xff]
+        else:
+            W = self.regWidth
+            regMask = mask(W)
+            sh = W - 8
+            if W >= N8:
+                shN = W - N8
+                for off in range(0, end, N):
+                    x = (reg >> shN) ^ from_bytes(data[off:off + N], "big")
+                    r = (reg << N8) & regMask
+                    for t, b in zip(tablesForBytes, x.to_bytes(N, "big")):
+                        r ^= t[b]
+                    reg = r
+            else:
+                shN = N8 - W
+                for off in range(0, end, N):
+                    x = (reg << shN) ^ from_bytes(data[off:off + N], "big")
+                    r = 0
+                    for t, b in zip(tablesForBytes, x.to_bytes(N, "big")):
+                        r ^= t[b]
+                    reg = r
+            for b in data[end:]:
+                reg = ((reg << 8) & regMask) ^ t0[(reg >> sh) ^ b]
+        return reg
+
+    def finalize(self, reg: int) -> int:
+        """
+        :return: the CRC value from the register (with REFOUT and XOROUT applied)
+        """
+        W = self.params.WIDTH
+        if self.REFIN:
+            if not self.REFOUT:
+                reg = reverse_bits(reg, W)
+        else:
+            reg >>= self.regWidth - W
+            if self.REFOUT:
+                reg = reverse_bits(reg, W)
+        return reg ^ self.XOROUT
+
+    def crc(self, data: Union[bytes, bytearray, memoryview, Sequence[int]]) -> int:
+        return self.finalize(self.update(self.initValue, data))
+
+    def crc_many(self, frames: Iterable[Union[bytes, bytearray, memoryview, Sequence[int]]]) -> List[int]:
+        """
+        :return: CRC for each frame
+        """
+        update = self.update
+        init = self.initValue
+        finalize = self.finalize
+        return [finalize(update(init, f)) for f in frames]
+
+
+def crc_many(params: Type[CRC_POLY],
+             frames: Iterable[Union[bytes, bytearray, memoryview, Sequence[int]]],
+             slices: int=8) -> List[int]:
+    """
+    Compute CRC of each frame using :class:`~.TableCrcEngine`
+    """
+    return TableCrcEngine.get(params, slices).crc_many(frames)
+
+
 def naive_crc(dataBits, crcBits, polyBits,
               refin=False, refout=False):
     crc_mask = CrcComb.buildCrcXorMatrix(len(dataBits), polyBits)
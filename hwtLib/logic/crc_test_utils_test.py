@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from binascii import crc32, crc_hqx
+import inspect
+from random import Random
+import unittest
+
+from hwtLib.logic import crcPoly
+from hwtLib.logic.crcPoly import CRC_POLY, CRC_32, CRC_32C, CRC_16_USB
+from hwtLib.logic.crc_test_utils import TableCrcEngine, NaiveCrcAccumulator, \
+    crc_many
+from pyMathBitPrecise.bit_utils import reverse_bits, mask
+
+
+ALL_CRC_POLYS = [
+    c for _, c in inspect.getmembers(crcPoly, inspect.isclass)
+    if issubclass(c, CRC_POLY) and c is not CRC_POLY
+]
+
+
+def bitwise_crc(params: CRC_POLY, data: bytes):
+    """
+    Straightforward bit by bit CRC as described in http://reveng.sourceforge.net/crc-catalogue/all.htm
+    """
+    W = params.WIDTH
+    poly = params.POLY & mask(W)
+    reg = params.INIT
+    for b in data:
+        if params.REFIN:
+            b = reverse_bits(b, 8)
+        for i in range(7, -1, -1):
+            top = (reg >> (W - 1)) & 1
+            reg = (reg << 1) & mask(W)
+            if top ^ ((b >> i) & 1):
+                reg ^= poly
+    if params.REFOUT:
+        reg = reverse_bits(reg, W)
+    return reg ^ params.XOROUT
+
+
+class TableCrcEngine_TC(unittest.TestCase):
+
+    def test_check(self):
+        for p in ALL_CRC_POLYS:
+            check = getattr(p, "CHECK", None)
+            if check is not None:
+                self.assertEqual(TableCrcEngine.get(p).crc(b"123456789"), check, p)
+
+    def test_all_polys_vs_bitwise(self):
+        rand = Random(0)
+        for p in ALL_CRC_POLYS:
+            for slices in (1, 3, 4, 8):
+                e = TableCrcEngine.get(p, slices)
+                for size in (0, 1, 7, 8, 9, 33):
+                    d = bytes(rand.getrandbits(8) for _ in range(size))
+                    self.assertEqual(e.crc(d), bitwise_crc(p, d), (p, slices, size))
+
+    def test_vs_binascii(self):
+        rand = Random(1)
+        d = bytes(rand.getrandbits(8) for _ in range(4096))
+        self.assertEqual(TableCrcEngine.get(CRC_32).crc(d), crc32(d))
+
+        class CRC_16_XMODEM(CRC_POLY):
+            POLY = 0x1021
+            WIDTH = 16
+
+        self.assertEqual(TableCrcEngine.get(CRC_16_XMODEM).crc(d), crc_hqx(d, 0))
+
+    def test_vs_NaiveCrcAccumulator(self):
+        rand = Random(2)
+        d = [rand.getrandbits(8) for _ in range(64)]
+        r = NaiveCrcAccumulator(CRC_16_USB)
+        for b in d:
+            r.takeWord(b, 8)
+        # NaiveCrcAccumulator returns bit reversed value for CRCs with REFIN
+        self.assertEqual(reverse_bits(TableCrcEngine.get(CRC_16_USB).crc(d), 16), r.getFinalValue())
+
+    def test_incremental(self):
+        e = TableCrcEngine.get(CRC_32C, 4)
+        d = b"123456789"
+        for split in range(len(d) + 1):
+            v = e.update(e.init(), d[:split])
+            v = e.update(v, d[split:])
+            self.assertEqual(e.finalize(v), CRC_32C.CHECK)
+
+    def test_crc_many(self):
+        frames = [b"", b"1", b"123456789", bytearray(range(256)), list(range(100))]
+        self.assertListEqual(crc_many(CRC_32, frames), [crc32(bytes(f)) for f in frames])
+
+    def test_tables_shared(self):
+        self.assertIs(TableCrcEngine.get(CRC_32), TableCrcEngine.get(CRC_32))
+        self.assertIs(TableCrcEngine.get(CRC_32).tables,
+                      TableCrcEngine.get(CRC_32.without_XOROUT()).tables)
+
+
+if __name__ == "__main__":
+    testLoader = unittest.TestLoader()
+    # suite = unittest.TestSuite([TableCrcEngine_TC("test_check")])
+    suite = testLoader.loadTestsFromTestCase(TableCrcEngine_TC)
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
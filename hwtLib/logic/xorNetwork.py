@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from heapq import heapify, heappop, heappush
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from hwt.hdl.types.bitsConst import HBitsConst
+from hwt.hdl.types.defs import BIT
+from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
+
+
+# default number of inputs of LUT (6-input LUTs are used in most of the current FPGAs)
+XOR_NETWORK_LUT_SIZE = 6
+# cache of optimized networks shared between all instances, (rows, input cnt, lut size, max shared nodes) -> network
+_XOR_NETWORK_CACHE: Dict[Tuple[Tuple[int, ...], int, int, Optional[int]], "XorNetwork"] = {}
+
+
+class XorNetwork():
+    """
+    Network of XOR gates which computes xor of selected inputs for each output
+    (e.g. for the CRC xor matrix).
+
+    The network is constructed in two steps:
+
+    * common subexpression elimination, the pair of variables which is used in the most outputs
+      is replaced by a new shared 2-input xor until there is no pair used more than once
+      (greedy pair sharing, C. Paar, "Optimized arithmetic for Reed-Solomon encoders", 1997),
+      only the pairs which depend on at most lutSize inputs are shared so the sharing does not increase the depth
+    * the remaining terms of each output are reduced by a tree of xors with at most lutSize inputs,
+      the terms with the lowest logic level are always reduced first, which results in a balanced tree
+
+    :ivar ~.inputCnt: number of inputs, variable i < inputCnt is the input i
+    :ivar ~.lutSize: max number of inputs of xor gate which is considered to be a single level of logic
+    :ivar ~.nodes: xor gates, the node i is the variable inputCnt + i, item is the tuple of variables to xor
+    :ivar ~.outputs: for each output the variable with its value or None if the output is constant 0
+    :ivar ~.level: logic level of each variable (inputs have 0), the variable which depends on at most lutSize inputs
+        has level 1 as it can be implemented in a single LUT
+    :ivar ~.support: upper bound of number of inputs the variable depends on
+    :ivar ~.naiveGateCount: number of 2-input xors without optimization (a chain for each output)
+    :ivar ~.naiveDepth: number of levels of 2-input xors without optimization
+    """
+
+    def __init__(self, rows: Sequence[int], inputCnt: int,
+                 lutSize: int=XOR_NETWORK_LUT_SIZE, maxSharedNodes: Optional[int]=None):
+        """
+        :param rows: rows packed to integers, bit i of the row selects the input i
+        :param lutSize: number of inputs of LUT of the target (the shared subexpressions are limited to this size
+            and the trees are build from the xors of this size)
+        :param maxSharedNodes: max number of shared xors found by common subexpression elimination
+            (None for unlimited, 0 to disable the sharing and only balance the trees)
+        """
+        assert lutSize >= 2, lutSize
+        self.inputCnt = inputCnt
+        self.lutSize = lutSize
+        self.nodes: List[Tuple[int, ...]] = []
+        self.level: List[int] = [0 for _ in range(inputCnt)]
+        self.support: List[int] = [1 for _ in range(inputCnt)]
+
+        terms = []
+        for row in rows:
+            assert row >> inputCnt == 0, (row, inputCnt)
+            terms.append({i for i in range(row.bit_length()) if (row >> i) & 1})
+        self.naiveGateCount = sum(max(len(t) - 1, 0) for t in terms)
+        self.naiveDepth = max((max(len(t) - 1, 0) for t in terms), default=0)
+
+        if maxSharedNodes is None or maxSharedNodes > 0:
+            self._shareCommonPairs(terms, maxSharedNodes)
+        self.outputs: List[Optional[int]] = [self._balancedTree(t) for t in terms]
+        self._inlineSingleUseNodes()
+
+    @classmethod
+    def get(cls, rows: Sequence[int], inputCnt: int,
+            lutSize: int=XOR_NETWORK_LUT_SIZE, maxSharedNodes: Optional[int]=None) -> "XorNetwork":
+        """
+        :return: cached network for specified rows
+        """
+        key = (tuple(rows), inputCnt, lutSize, maxSharedNodes)
+        n = _XOR_NETWORK_CACHE.get(key, None)
+        if n is None:
+            n = _XOR_NETWORK_CACHE[key] = cls(key[0], inputCnt, lutSize, maxSharedNodes)
+        return n
+
+    def _addNode(self, operands: Tuple[int, ...]) -> int:
+        v = self.inputCnt + len(self.nodes)
+        self.nodes.append(operands)
+        support = sum(self.support[o] for o in operands)
+        self.support.append(support)
+        if support <= self.lutSize:
+            self.level.append(1)
+        else:
+            self.level.append(max(self.level[o] for o in operands) + 1)
+        return v
+
+    def _shareCommonPairs(self, terms: List[set], maxSharedNodes: Optional[int]):
+        """
+        Greedy pair sharing, replaces the most frequent pair of variables with a new variable
+        until every pair is used at most once, modifies terms in place
+
+        The rows which contain the variable and the variables of the row are kept as bit masks,
+        the use count of all pairs of the variable is then resolved by a bit-sliced counter.
+        The heap contains an upper bound of the use count of the best pair for each variable
+        (the use count of an existing pair can only decrease), only the variable from the top
+        of the heap is evaluated, this avoids the enumeration of all pairs of wide matrices.
+        """
+        lutSize = self.lutSize
+        support = self.support
+        # for each variable the mask of rows which contain it
+        rowsOf: List[int] = [0 for _ in range(self.inputCnt)]
+        # for each row the mask of variables in the row
+        rowVars: List[int] = []
+        for r_i, t in enumerate(terms):
+            rBit = 1 << r_i
+            vs = 0
+            for v in t:
+                rowsOf[v] |= rBit
+                vs |= 1 << v
+            rowVars.append(vs)
+        # mask of variables for each size of support (only the variables which can be shared are stored)
+        supportMask = [0 for _ in range(lutSize)]
+        for v in range(self.inputCnt):
+            supportMask[1] |= 1 << v
+
+        def bestPair(a: int) -> Tuple[int, int]:
+            """
+            :return: tuple (use count, variable) of the most frequent pair of variable a
+            """
+            allowed = 0
+            for s in range(1, lutSize - support[a] + 1):
+                allowed |= supportMask[s]
+            allowed &= ~(1 << a)
+            if not allowed:
+                return 0, None
+            # bit-sliced counter, bit v of cnt[i] is the bit i of the number of rows with a and v
+            cnt = []
+            m = rowsOf[a]
+            while m:
+                low = m & -m
+                m ^= low
+                x = rowVars[low.bit_length() - 1] & allowed
+                for i, c in enumerate(cnt):
+                    cnt[i] = c ^ x
+                    x &= c
+                    if not x:
+                        break
+                if x:
+                    cnt.append(x)
+            # select the variables with the max count
+            best = 0
+            for i in range(len(cnt) - 1, -1, -1):
+                m = allowed & cnt[i]
+                if m:
+                    allowed = m
+                    best |= 1 << i
+            if best < 2:
+                return 0, None
+            return best, (allowed & -allowed).bit_length() - 1
+
+        # (-upper bound of the use count of the best pair, variable)
+        heap = []
+        for v, m in enumerate(rowsOf):
+            c = bin(m).count("1")
+            if c > 1:
+                heap.append((-c, v))
+        heapify(heap)
+
+        sharedNodes = 0
+        while heap and (maxSharedNodes is None or sharedNodes < maxSharedNodes):
+            _, a = heappop(heap)
+            c, b = bestPair(a)
+            if c < 2:
+                continue
+            elif heap and -heap[0][0] > c:
+                # the other variable may have a better pair
+                heappush(heap, (-c, a))
+                continue
+
+            t = self._addNode((a, b) if a < b else (b, a))
+            sharedNodes += 1
+            common = rowsOf[a] & rowsOf[b]
+            rowsOf[a] &= ~common
+            rowsOf[b] &= ~common
+            rowsOf.append(common)
+            abMask = (1 << a) | (1 << b)
+            tBit = 1 << t
+            m = common
+            while m:
+                low = m & -m
+                m ^= low
+                r_i = low.bit_length() - 1
+                rowVars[r_i] = (rowVars[r_i] & ~abMask) | tBit
+            if support[t] < lutSize:
+                supportMask[support[t]] |= tBit
+                heappush(heap, (-c, t))
+            # the count of the best pair of a is lower now, the upper bound of b is still valid
+            heappush(heap, (-c, a))
+
+        for t, vs in zip(terms, rowVars):
+            t.clear()
+            while vs:
+                low = vs & -vs
+                vs ^= low
+                t.add(low.bit_length() - 1)
+
+    def _balancedTree(self, terms: set) -> Optional[int]:
+        if not terms:
+            return None
+        level = self.level
+        # (level, variable), the variables with lowest level are reduced first
+        todo = [(level[v], v) for v in terms]
+        heapify(todo)
+        while len(todo) > 1:
+            operands = tuple(heappop(todo)[1] for _ in range(min(self.lutSize, len(todo))))
+            v = self._addNode(operands)
+            heappush(todo, (level[v], v))
+        return todo[0][1]
+
+    def _inlineSingleUseNodes(self):
+        """
+        Merge the nodes which are used only once to its user if the number of inputs of the user stays <= lutSize
+        (the shared pairs may become used only once after other pair was extracted)
+        """
+        inputCnt = self.inputCnt
+        uses = [0 for _ in range(inputCnt + len(self.nodes))]
+        for operands in self.nodes:
+            for o in operands:
+                uses[o] += 1
+        for o in self.outputs:
+            if o is not None:
+                uses[o] += 1
+
+        nodes = [list(n) for n in self.nodes]
+        removed = set()
+        for operands in nodes:
+            i = 0
+            while i < len(operands):
+                o = operands[i]
+                if o >= inputCnt and uses[o] == 1:
+                    inlined = nodes[o - inputCnt]
+                    if len(operands) - 1 + len(inlined) <= self.lutSize:
+                        operands[i:i + 1] = inlined
+                        removed.add(o)
+                        continue
+                i += 1
+
+        # renumber the remaining nodes
+        newIndex = list(range(inputCnt))
+        self.nodes = []
+        self.level = self.level[:inputCnt]
+        self.support = self.support[:inputCnt]
+        for v, operands in enumerate(nodes, start=inputCnt):
+            if v in removed:
+                newIndex.append(None)
+            else:
+                newIndex.append(self._addNode(tuple(newIndex[o] for o in operands)))
+        self.outputs = [None if o is None else newIndex[o] for o in self.outputs]
+
+    @property
+    def gateCount(self) -> int:
+        """
+        number of 2-input xors in the network
+        """
+        return sum(len(n) - 1 for n in self.nodes)
+
+    @property
+    def depth(self) -> int:
+        """
+        number of levels of logic (xor gates with at most lutSize inputs) from inputs to outputs
+        """
+        return max((self.level[o] for o in self.outputs if o is not None), default=0)
+
+    def apply(self, inBits: List[Union[RtlSignal, HBitsConst]]) -> List[Union[RtlSignal, HBitsConst]]:
+        """
+        Instantiate the network for input signals
+
+        :return: list of output signals
+        """
+        assert len(inBits) == self.inputCnt, (len(inBits), self.inputCnt)
+        vals = list(inBits)
+        for operands in self.nodes:
+            v = vals[operands[0]]
+            for o in operands[1:]:
+                v = v ^ vals[o]
+            vals.append(v)
+
+        return [BIT.from_py(0) if o is None else vals[o] for o in self.outputs]
+
+    def eval(self, inBits: Sequence[int]) -> List[int]:
+        """
+        Evaluate the network for input bit values (for testing purposes)
+        """
+        assert len(inBits) == self.inputCnt, (len(inBits), self.inputCnt)
+        vals = list(inBits)
+        for operands in self.nodes:
+            v = 0
+            for o in operands:
+                v ^= vals[o]
+            vals.append(v)
+
+        return [0 if o is None else vals[o] for o in self.outputs]
+
+    def __repr__(self):
+        return (f"<{self.__class__.__name__:s} inputs:{self.inputCnt:d} outputs:{len(self.outputs):d}"
+                f" gates:{self.gateCount:d} (naive {self.naiveGateCount:d})"
+                f" depth:{self.depth:d} (naive {self.naiveDepth:d}, {self.lutSize:d}-input LUTs)>")
+
+
+if __name__ == "__main__":
+    from hwtLib.logic.crcComb import CrcComb
+    from hwtLib.logic.crcPoly import CRC_32
+    polyBits, PW = CrcComb.parsePoly(CRC_32.POLY, CRC_32.WIDTH)
+    for DW in (8, 32, 64, 128):
+        rows = [s | (d << PW) for s, d in CrcComb.buildCrcXorMatrixPacked(DW, polyBits)]
+        print(DW, XorNetwork.get(rows, PW + DW))
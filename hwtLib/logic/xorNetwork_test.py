@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from random import Random
+from time import perf_counter
+import unittest
+
+from hwtLib.logic.crcComb import CrcComb
+from hwtLib.logic.crcPoly import CRC_32, CRC_16_CCITT
+from hwtLib.logic.xorNetwork import XorNetwork
+
+
+def xor_rows_ref(rows, inBits):
+    v = sum(b << i for i, b in enumerate(inBits))
+    return [bin(row & v).count("1") & 1 for row in rows]
+
+
+class XorNetworkTC(unittest.TestCase):
+
+    def assertNetworkEqual(self, n: XorNetwork, rows, rand: Random, samples=32):
+        for _ in range(samples):
+            inBits = [rand.getrandbits(1) for _ in range(n.inputCnt)]
+            self.assertListEqual(n.eval(inBits), xor_rows_ref(rows, inBits))
+
+    def test_simple(self):
+        rows = [0b0111, 0b1110, 0b0110, 0b0001, 0b0000]
+        n = XorNetwork(rows, 4, lutSize=2)
+        self.assertNetworkEqual(n, rows, Random(0))
+        # x1^x2 is shared
+        self.assertEqual(n.naiveGateCount, 2 + 2 + 1)
+        self.assertEqual(n.gateCount, 3)
+        self.assertEqual(n.outputs[3], 0)
+        self.assertIsNone(n.outputs[4])
+
+    def test_random(self):
+        rand = Random(1)
+        for lutSize in (2, 3, 4, 6):
+            for inputCnt in (1, 5, 17, 64):
+                rows = [rand.getrandbits(inputCnt) for _ in range(rand.randint(1, 20))]
+                n = XorNetwork(rows, inputCnt, lutSize=lutSize)
+                self.assertNetworkEqual(n, rows, rand)
+                for operands in n.nodes:
+                    self.assertLessEqual(len(operands), lutSize)
+                    self.assertGreaterEqual(len(operands), 2)
+                self.assertLessEqual(n.gateCount, n.naiveGateCount)
+
+    def test_crc(self):
+        rand = Random(2)
+        for p in (CRC_32, CRC_16_CCITT):
+            polyBits, PW = CrcComb.parsePoly(p.POLY, p.WIDTH)
+            for DW in (8, 32, 64):
+                rows = [s | (d << PW) for s, d in CrcComb.buildCrcXorMatrixPacked(DW, polyBits)]
+                n = XorNetwork(rows, PW + DW)
+                self.assertNetworkEqual(n, rows, rand)
+                self.assertLess(n.gateCount, n.naiveGateCount)
+
+        polyBits, PW = CrcComb.parsePoly(CRC_32.POLY, CRC_32.WIDTH)
+        rows = [s | (d << PW) for s, d in CrcComb.buildCrcXorMatrixPacked(32, polyBits)]
+        n = XorNetwork(rows, PW + 32)
+        # without sharing 872 xors, every output has 33 inputs at most
+        self.assertLess(n.gateCount, 300)
+        self.assertLessEqual(n.depth, 3)
+
+    def test_crc_wide(self):
+        rand = Random(4)
+        polyBits, PW = CrcComb.parsePoly(CRC_32.POLY, CRC_32.WIDTH)
+        for DW in (256, 512):
+            rows = [s | (d << PW) for s, d in CrcComb.buildCrcXorMatrixPacked(DW, polyBits)]
+            n = XorNetwork(rows, PW + DW)
+            self.assertNetworkEqual(n, rows, rand, samples=8)
+            self.assertLess(n.gateCount, n.naiveGateCount // 2, DW)
+            self.assertLessEqual(n.depth, 4)
+
+    def test_masked_crc_construction_time(self):
+        # the networks for all byte counts of 512b masked CRC-32 (64 matrices)
+        polyBits, PW = CrcComb.parsePoly(CRC_32.POLY, CRC_32.WIDTH)
+        widths = list(range(8, 512 + 1, 8))
+        matrices = CrcComb.buildCrcXorMatricesForWidths(widths, polyBits)
+        start = perf_counter()
+        for DW, m in zip(widths, matrices):
+            rows = [s | (d << PW) for s, d in m]
+            n = XorNetwork(rows, PW + DW)
+            self.assertLess(n.gateCount, n.naiveGateCount, DW)
+        self.assertLess(perf_counter() - start, 10.0)
+
+    def test_maxSharedNodes(self):
+        rand = Random(3)
+        rows = [rand.getrandbits(32) for _ in range(8)]
+        n = XorNetwork(rows, 32, maxSharedNodes=0)
+        self.assertNetworkEqual(n, rows, rand)
+        self.assertEqual(n.gateCount, n.naiveGateCount)
+
+        # only a single shared xor
+        n1 = XorNetwork(rows, 32, lutSize=2, maxSharedNodes=1)
+        self.assertNetworkEqual(n1, rows, rand)
+        self.assertLess(n1.gateCount, n1.naiveGateCount)
+        n = XorNetwork(rows, 32, lutSize=2)
+        self.assertLess(n.gateCount, n1.gateCount)
+
+    def test_cached(self):
+        rows = (0b011, 0b110)
+        self.assertIs(XorNetwork.get(rows, 3), XorNetwork.get(list(rows), 3))
+        self.assertIsNot(XorNetwork.get(rows, 3), XorNetwork.get(rows, 3, lutSize=4))
+
+
+if __name__ == "__main__":
+    testLoader = unittest.TestLoader()
+    # suite = unittest.TestSuite([XorNetworkTC("test_crc")])
+    suite = testLoader.loadTestsFromTestCase(XorNetworkTC)
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
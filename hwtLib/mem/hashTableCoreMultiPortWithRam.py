@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from typing import List
+
+from hwt.code import Concat, If, Or, Switch
+from hwt.hdl.types.bits import HBits
+from hwt.hObjList import HObjList
+from hwt.hwIOs.hwIOArray import HwIOArray
+from hwt.hwIOs.utils import addClkRstn, propagateClkRstn
+from hwt.hwModule import HwModule
+from hwt.hwParam import HwParam
+from hwt.math import log2ceil, isPow2
+from hwt.pyUtils.typingFuture import override
+from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
+from hwtLib.handshaked.builder import HsBuilder
+from hwtLib.handshaked.streamNode import StreamNode
+from hwtLib.logic.crcComb import CrcComb
+from hwtLib.logic.crcPoly import CRC_32
+from hwtLib.mem.hashTableCoreWithRam import HashTableCoreWithRam
+from hwtLib.mem.hashTable_intf import HwIOHashTable, HwIOInsert, \
+    HwIOLookupKey, HwIOLookupResult
+
+
+class HashTableCoreMultiPortWithRam(HwModule):
+    """
+    Hash table with multiple lookup ports, the table is split into RAM banks
+    to allow multiple lookups per clock cycle.
+
+    The bank is selected by the upper bits of the hash, the lower bits of the hash
+    are the index of the item in the bank (the banks are :class:`hwtLib.mem.hashTableCoreWithRam.HashTableCoreWithRam`).
+    Each lookup port has a queue for each bank, each bank processes one lookup per clock
+    and selects the lookup from the queues of the ports in round robin manner.
+    The lookups of different ports to different banks are processed in parallel,
+    the lookups to the same bank wait in the queue (conflicts are resolved by queues).
+
+    The results are returned out of order (as soon as they are available), the lookupId
+    should be used to match the lookup and the result. If IN_ORDER is set the results
+    are reordered in reorder buffer of each port and returned in order of the lookups.
+
+    :note: The hash of the item in insert interface is the global hash (bank index is in upper bits).
+
+    :ivar ~.ITEMS_CNT: number of items in all banks together
+    :ivar ~.KEY_WIDTH: width of the key used by hash table
+    :ivar ~.DATA_WIDTH: width of data, can be zero and then no data
+        interface is instantiated
+    :ivar ~.LOOKUP_ID_WIDTH: width of id signal for lookup (can be 0 if IN_ORDER)
+    :ivar ~.LOOKUP_HASH: flag if lookup result interface should have hash signal
+    :ivar ~.LOOKUP_KEY: flag if lookup result interface should have key signal
+    :ivar ~.POLYNOME: polynome for crc hash used in this table
+    :ivar ~.LOOKUP_PORT_CNT: number of lookup ports (max number of lookups per clock)
+    :ivar ~.BANK_CNT: number of RAM banks (power of 2)
+    :ivar ~.BANK_QUEUE_DEPTH: number of items in queue for each lookup port and bank
+    :ivar ~.IN_ORDER: if True the results are returned in order of the lookups on each port
+    :ivar ~.REORDER_DEPTH: max number of lookups in flight for each port if IN_ORDER (power of 2)
+
+    .. hwt-autodoc:: _example_HashTableCoreMultiPortWithRam
+    """
+
+    def __init__(self, polynome):
+        super(HashTableCoreMultiPortWithRam, self).__init__()
+        self.POLYNOME = polynome
+
+    @override
+    def hwConfig(self):
+        HwIOHashTable.hwConfig(self)
+        self.ITEMS_CNT = 128
+        self.LOOKUP_PORT_CNT = HwParam(2)
+        self.BANK_CNT = HwParam(4)
+        self.BANK_QUEUE_DEPTH = HwParam(2)
+        self.IN_ORDER = HwParam(False)
+        self.REORDER_DEPTH = HwParam(8)
+
+    @override
+    def hwDeclr(self):
+        assert self.LOOKUP_PORT_CNT >= 1, self.LOOKUP_PORT_CNT
+        assert isPow2(self.BANK_CNT), self.BANK_CNT
+        assert self.ITEMS_CNT % self.BANK_CNT == 0, (self.ITEMS_CNT, self.BANK_CNT)
+        assert self.POLYNOME.WIDTH >= log2ceil(self.ITEMS_CNT), (self.POLYNOME, self.ITEMS_CNT)
+        if self.IN_ORDER:
+            assert isPow2(self.REORDER_DEPTH), self.REORDER_DEPTH
+        else:
+            assert self.LOOKUP_ID_WIDTH > 0 or self.LOOKUP_PORT_CNT == 1 and self.BANK_CNT == 1, (
+                "Results are returned out of order, lookupId is required to match them")
+
+        self.HASH_WIDTH = log2ceil(self.ITEMS_CNT)
+        self.BANK_INDEX_WIDTH = log2ceil(self.BANK_CNT) if self.BANK_CNT > 1 else 0
+        self.PORT_INDEX_WIDTH = log2ceil(self.LOOKUP_PORT_CNT) if self.LOOKUP_PORT_CNT > 1 else 0
+        self.TAG_WIDTH = log2ceil(self.REORDER_DEPTH) if self.IN_ORDER else 0
+        # lookupId in banks: Concat(port index, reorder tag, lookupId)
+        self.BANK_LOOKUP_ID_WIDTH = self.PORT_INDEX_WIDTH + self.TAG_WIDTH + self.LOOKUP_ID_WIDTH
+
+        addClkRstn(self)
+        with self._hwParamsShared():
+            self.insert = HwIOInsert()
+            self.insert.HASH_WIDTH = self.HASH_WIDTH
+            self.lookup = HObjList(HwIOLookupKey() for _ in range(self.LOOKUP_PORT_CNT))
+            self.lookupRes = HObjList(HwIOLookupResult()._m() for _ in range(self.LOOKUP_PORT_CNT))
+            for r in self.lookupRes:
+                r.HASH_WIDTH = self.HASH_WIDTH
+
+        self.hash = HObjList(CrcComb() for _ in range(self.LOOKUP_PORT_CNT))
+        for h in self.hash:
+            h.DATA_WIDTH = self.KEY_WIDTH
+            h.setConfig(self.POLYNOME)
+
+        self.banks = HObjList(HashTableCoreWithRam(self.POLYNOME) for _ in range(self.BANK_CNT))
+        for b in self.banks:
+            b._updateHwParamsFrom(self, exclude=({"ITEMS_CNT", "LOOKUP_ID_WIDTH"}, {}))
+            b.ITEMS_CNT = self.ITEMS_CNT // self.BANK_CNT
+            b.LOOKUP_ID_WIDTH = self.BANK_LOOKUP_ID_WIDTH
+
+    def _bankIndex(self, hash_: RtlSignal) -> RtlSignal:
+        return hash_[self.HASH_WIDTH:self.HASH_WIDTH - self.BANK_INDEX_WIDTH]
+
+    def _splitBankLookupId(self, lookupId: RtlSignal):
+        """
+        :return: tuple (port index, reorder tag, lookupId), items can be None if they do not have any bits
+        """
+        if not self.BANK_LOOKUP_ID_WIDTH:
+            return None, None, None
+        IDW = self.LOOKUP_ID_WIDTH
+        TW = self.TAG_WIDTH
+        PW = self.PORT_INDEX_WIDTH
+        _id = lookupId[IDW:] if IDW else None
+        tag = lookupId[IDW + TW:IDW] if TW else None
+        port = lookupId[IDW + TW + PW:IDW + TW] if PW else None
+        return port, tag, _id
+
+    def insertLogic(self):
+        insert = self.insert
+        BANK_HASH_WIDTH = self.HASH_WIDTH - self.BANK_INDEX_WIDTH
+        bankInsert = [b.io.insert for b in self.banks]
+        skipWhen = {}
+        if self.BANK_INDEX_WIDTH:
+            bankIndex = self._bankIndex(insert.hash)
+            for bank_i, i in enumerate(bankInsert):
+                skipWhen[i] = bankIndex != bank_i
+
+        for i in bankInsert:
+            i.hash(insert.hash[BANK_HASH_WIDTH:])
+            i.key(insert.key)
+            if self.DATA_WIDTH:
+                i.data(insert.data)
+            i.item_vld(insert.item_vld)
+
+        StreamNode(masters=[insert], slaves=bankInsert, skipWhen=skipWhen).sync()
+
+    def lookupDispatchLogic(self, tags: List[RtlSignal], tagAllocs):
+        """
+        Hash the key and put the lookup to the queue for the bank selected by the hash
+
+        :param tags: the reorder tag for each port (or None)
+        :param tagAllocs: a (valid, ready) tuple for the allocation of the reorder tag for each port (or None)
+        """
+        queues = []
+        for port_i, (lookup, h, tag, tagAlloc) in enumerate(zip(self.lookup, self.hash, tags, tagAllocs)):
+            h.dataIn(lookup.key)
+            lookupHash = h.dataOut[self.HASH_WIDTH:]
+            queueIn = HwIOArray(HwIOLookupKey() for _ in range(self.BANK_CNT))
+            for q in queueIn:
+                q.KEY_WIDTH = self.KEY_WIDTH
+                q.LOOKUP_ID_WIDTH = self.BANK_LOOKUP_ID_WIDTH
+            setattr(self, f"lookup{port_i:d}_queueIn", queueIn)
+
+            idParts = []
+            if self.PORT_INDEX_WIDTH:
+                idParts.append(HBits(self.PORT_INDEX_WIDTH).from_py(port_i))
+            if tag is not None:
+                idParts.append(tag)
+            if self.LOOKUP_ID_WIDTH:
+                idParts.append(lookup.lookupId)
+
+            skipWhen = {}
+            if self.BANK_INDEX_WIDTH:
+                bankIndex = self._bankIndex(lookupHash)
+                for bank_i, q in enumerate(queueIn):
+                    skipWhen[q] = bankIndex != bank_i
+
+            for q in queueIn:
+                q.key(lookup.key)
+                if idParts:
+                    q.lookupId(Concat(*idParts))
+
+            slaves = list(queueIn)
+            if tagAlloc is not None:
+                slaves.append(tagAlloc)
+            StreamNode(masters=[lookup], slaves=slaves, skipWhen=skipWhen).sync()
+
+            queues.append([
+                HsBuilder(self, q, name=f"lookup{port_i:d}_bank{bank_i:d}_queue").buff(self.BANK_QUEUE_DEPTH).end
+                for bank_i, q in enumerate(queueIn)
+            ])
+
+        # each bank selects one lookup from the queues of all ports
+        for bank_i, bank in enumerate(self.banks):
+            bankQueues = [q[bank_i] for q in queues]
+            if len(bankQueues) == 1:
+                bank.io.lookup(bankQueues[0])
+            else:
+                bank.io.lookup(HsBuilder.join_fair(self, bankQueues, name=f"bank{bank_i:d}_lookup").end)
+
+    def _resultFields(self, res: HwIOLookupResult) -> List[RtlSignal]:
+        """
+        :return: list of data signals of lookup result
+        """
+        fields = []
+        if self.LOOKUP_HASH:
+            fields.append(res.hash)
+        if self.LOOKUP_KEY:
+            fields.append(res.key)
+        if self.DATA_WIDTH:
+            fields.append(res.data)
+        if self.LOOKUP_ID_WIDTH:
+            fields.append(res.lookupId)
+        fields.append(res.found)
+        fields.append(res.occupied)
+        return fields
+
+    def _bankResultValues(self, bankRes: HwIOLookupResult, bank_i: int, lookupId: RtlSignal) -> List[RtlSignal]:
+        """
+        :return: values for :meth:`~._resultFields` from the lookup result of the bank
+        """
+        vals = []
+        if self.LOOKUP_HASH:
+            if self.BANK_INDEX_WIDTH:
+                vals.append(Concat(HBits(self.BANK_INDEX_WIDTH).from_py(bank_i), bankRes.hash))
+            else:
+                vals.append(bankRes.hash)
+        if self.LOOKUP_KEY:
+            vals.append(bankRes.key)
+        if self.DATA_WIDTH:
+            vals.append(bankRes.data)
+        if self.LOOKUP_ID_WIDTH:
+            vals.append(lookupId)
+        vals.append(bankRes.found)
+        vals.append(bankRes.occupied)
+        return vals
+
+    def resultOutOfOrderLogic(self):
+        """
+        Route results from banks to ports, results from banks are selected in round robin manner
+        """
+        PORT_CNT = self.LOOKUP_PORT_CNT
+        resForPort = [[] for _ in range(PORT_CNT)]
+        for bank_i, bank in enumerate(self.banks):
+            bankRes = bank.io.lookupRes
+            port, _, _id = self._splitBankLookupId(bankRes.lookupId)
+            res = HwIOArray(HwIOLookupResult()._updateHwParamsFrom(self.lookupRes[0]) for _ in range(PORT_CNT))
+            setattr(self, f"bank{bank_i:d}_res", res)
+            skipWhen = {}
+            for port_i, r in enumerate(res):
+                for f, v in zip(self._resultFields(r), self._bankResultValues(bankRes, bank_i, _id)):
+                    f(v)
+                if port is not None:
+                    skipWhen[r] = port != port_i
+                resForPort[port_i].append(r)
+
+            StreamNode(masters=[bankRes], slaves=list(res), skipWhen=skipWhen).sync()
+
+        for lookupRes, res in zip(self.lookupRes, resForPort):
+            if len(res) == 1:
+                lookupRes(res[0])
+            else:
+                lookupRes(HsBuilder.join_fair(self, res, name=lookupRes._name).end)
+
+    def reorderLogic(self):
+        """
+        Allocate reorder tags for lookups and store results from banks to reorder buffer of each port,
+        the result is released from the buffer if all results of previous lookups were released
+
+        :return: tuple (tag, tagAlloc) list for each port
+        """
+        D = self.REORDER_DEPTH
+        TW = self.TAG_WIDTH
+        ptr_t = HBits(TW + 1)
+        tags = []
+        tagAllocs = []
+
+        # results from banks, all of them are accepted immediately as they have reserved place in reorder buffer
+        bankResults = []
+        for bank_i, bank in enumerate(self.banks):
+            bankRes = bank.io.lookupRes
+            bankRes.rd(1)
+            port, tag, _id = self._splitBankLookupId(bankRes.lookupId)
+            bankResults.append((port, tag, bankRes.vld, Concat(*self._bankResultValues(bankRes, bank_i, _id))))
+
+        for port_i, lookupRes in enumerate(self.lookupRes):
+            name = lookupRes._name
+            wrPtr = self._reg(f"{name:s}_wrPtr", ptr_t, def_val=0)
+            rdPtr = self._reg(f"{name:s}_rdPtr", ptr_t, def_val=0)
+            full = self._sig(f"{name:s}_full")
+            full((wrPtr[TW] != rdPtr[TW]) & wrPtr[TW:]._eq(rdPtr[TW:]))
+
+            # valid from StreamNode does not contain the ready (~full) of the tag allocation itself
+            tagAlloc = self._sig(f"{name:s}_tagAlloc")
+            If(tagAlloc & ~full,
+               wrPtr(wrPtr + 1)
+            )
+            tags.append(wrPtr[TW:])
+            tagAllocs.append((tagAlloc, ~full))
+
+            resFields = self._resultFields(lookupRes)
+            item_t = HBits(sum(f._dtype.bit_length() for f in resFields))
+            rdIndex = rdPtr[TW:]
+            rdAck = lookupRes.vld & lookupRes.rd
+            items = []
+            dones = []
+            for i in range(D):
+                item = self._reg(f"{name:s}_rob{i:d}", item_t)
+                done = self._reg(f"{name:s}_rob{i:d}_done", def_val=0)
+                wrEns = []
+                for port, tag, vld, itemIn in bankResults:
+                    wrEn = vld & tag._eq(i)
+                    if port is not None:
+                        wrEn = wrEn & port._eq(port_i)
+                    wrEns.append(wrEn)
+                    If(wrEn,
+                       item(itemIn)
+                    )
+                If(Or(*wrEns),
+                   done(1)
+                ).Elif(rdAck & rdIndex._eq(i),
+                   done(0)
+                )
+                items.append(item)
+                dones.append(done)
+
+            # release the results in order
+            doneVec = self._sig(f"{name:s}_robDone", HBits(D))
+            doneVec(Concat(*reversed(dones)))
+            lookupRes.vld(doneVec[rdIndex])
+            If(rdAck,
+               rdPtr(rdPtr + 1)
+            )
+            outItem = self._sig(f"{name:s}_robOut", item_t)
+            Switch(rdIndex).add_cases(
+                (i, outItem(item)) for i, item in enumerate(items)
+            )
+            offset = 0
+            for f in reversed(resFields):
+                w = f._dtype.bit_length()
+                if w == 1 and not f._dtype.force_vector:
+                    f(outItem[offset])
+                else:
+                    f(outItem[offset + w:offset])
+                offset += w
+
+        return tags, tagAllocs
+
+    @override
+    def hwImpl(self):
+        PORT_CNT = self.LOOKUP_PORT_CNT
+        if self.IN_ORDER:
+            tags, tagAllocs = self.reorderLogic()
+        else:
+            tags = [None for _ in range(PORT_CNT)]
+            tagAllocs = [None for _ in range(PORT_CNT)]
+            self.resultOutOfOrderLogic()
+
+        self.lookupDispatchLogic(tags, tagAllocs)
+        self.insertLogic()
+        propagateClkRstn(self)
+
+
+def _example_HashTableCoreMultiPortWithRam():
+    m = HashTableCoreMultiPortWithRam(CRC_32)
+    m.LOOKUP_ID_WIDTH = 4
+    return m
+
+
+if __name__ == "__main__":
+    from hwt.synth import to_rtl_str
+
+    m = _example_HashTableCoreMultiPortWithRam()
+    print(to_rtl_str(m))
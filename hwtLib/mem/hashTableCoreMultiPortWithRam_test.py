@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from binascii import crc_hqx
+import unittest
+
+from hwt.constants import NOP
+from hwt.simulator.simTestCase import SimTestCase
+from hwtLib.logic.crcPoly import CRC_16_CCITT
+from hwtLib.mem.hashTableCoreMultiPortWithRam import HashTableCoreMultiPortWithRam
+from hwtSimApi.constants import CLK_PERIOD
+from pyMathBitPrecise.bit_utils import mask
+
+
+class HashTableCoreMultiPortWithRam_TC(SimTestCase):
+    IN_ORDER = False
+
+    @classmethod
+    def setUpClass(cls):
+        dut = cls.dut = HashTableCoreMultiPortWithRam(CRC_16_CCITT)
+        dut.ITEMS_CNT = 64
+        dut.KEY_WIDTH = 16
+        dut.DATA_WIDTH = 8
+        dut.LOOKUP_ID_WIDTH = 8
+        dut.LOOKUP_PORT_CNT = 3
+        dut.BANK_CNT = 4
+        dut.IN_ORDER = cls.IN_ORDER
+        dut.LOOKUP_HASH = True
+        dut.LOOKUP_KEY = True
+        cls.compileSim(dut)
+
+    def setUp(self):
+        SimTestCase.setUp(self)
+        # clean up memory
+        model = self.rtl_simulator.model
+        for i in range(self.dut.BANK_CNT):
+            mem = getattr(model, f"banks_{i:d}_inst").table_inst.io.ram_memory
+            mem.val = mem.def_val = mem._dtype.from_py(0 for _ in range(mem._dtype.size))
+
+    def get_hash(self, k: int):
+        return crc_hqx(k.to_bytes(self.dut.KEY_WIDTH // 8, "little"),
+                       CRC_16_CCITT.INIT) & mask(self.dut.HASH_WIDTH)
+
+    def checkResults(self, lookups, expected_content):
+        """
+        :param lookups: list of (lookupId, key) for each port
+        :param expected_content: {hash: (key, data)}
+        """
+        dut = self.dut
+        for port_i, (lookup, lookupRes) in enumerate(zip(lookups, dut.lookupRes)):
+            ref = []
+            for _id, k in lookup:
+                h = self.get_hash(k)
+                v = expected_content.get(h, None)
+                if v is None:
+                    ref.append((_id, h, None, None, 0, 0))
+                else:
+                    ref.append((_id, h, v[0], v[1], int(v[0] == k), 1))
+
+            res = []
+            for (_id, h, k, d, found, occupied) in lookupRes._ag.data:
+                if not int(occupied):
+                    k = d = None
+                res.append(tuple(None if v is None else int(v) for v in (_id, h, k, d, found, occupied)))
+
+            if not self.IN_ORDER:
+                # results are out of order, the order is given by the lookupId
+                res.sort(key=lambda r: r[0])
+            self.assertSequenceEqual(res, ref, port_i)
+
+    def test_lookupInEmpty(self, N=16):
+        dut = self.dut
+        r = self._rand
+        lookups = []
+        for lookup in dut.lookup:
+            _lookups = [(i, r.getrandbits(dut.KEY_WIDTH)) for i in range(N)]
+            lookup._ag.data.extend(_lookups)
+            lookups.append(_lookups)
+
+        self.runSim((N * dut.LOOKUP_PORT_CNT + 20) * CLK_PERIOD)
+        self.checkResults(lookups, {})
+
+    def test_insertLookup(self, N=16, randomized=False):
+        dut = self.dut
+        r = self._rand
+        if randomized:
+            for hwIO in [dut.insert, *dut.lookup, *dut.lookupRes]:
+                self.randomize(hwIO)
+
+        # {hash: (key, data)}
+        expected_content = {}
+        keys = []
+        for _ in range(dut.ITEMS_CNT // 2):
+            k = r.getrandbits(dut.KEY_WIDTH)
+            d = r.getrandbits(dut.DATA_WIDTH)
+            h = self.get_hash(k)
+            dut.insert._ag.data.append((h, k, d, 1))
+            expected_content[h] = (k, d)
+            keys.append(k)
+
+        # wait until the items are inserted
+        waitCycles = dut.ITEMS_CNT
+        if randomized:
+            waitCycles *= 3
+        lookups = []
+        for port_i, lookup in enumerate(dut.lookup):
+            _lookups = []
+            for i in range(N):
+                if i % 2:
+                    k = keys[(i * dut.LOOKUP_PORT_CNT + port_i) % len(keys)]
+                else:
+                    k = r.getrandbits(dut.KEY_WIDTH)
+                _lookups.append((i, k))
+            lookup._ag.data.extend(NOP for _ in range(waitCycles))
+            lookup._ag.data.extend(_lookups)
+            lookups.append(_lookups)
+
+        t = waitCycles + N * dut.LOOKUP_PORT_CNT + 20
+        if randomized:
+            t += 2 * N * dut.LOOKUP_PORT_CNT
+        self.runSim(t * CLK_PERIOD)
+        self.checkResults(lookups, expected_content)
+
+    def test_insertLookup_randomized(self, N=16):
+        self.test_insertLookup(N, randomized=True)
+
+
+class HashTableCoreMultiPortWithRam_inOrder_TC(HashTableCoreMultiPortWithRam_TC):
+    IN_ORDER = True
+
+
+HashTableCoreMultiPortWithRam_TCs = [
+    HashTableCoreMultiPortWithRam_TC,
+    HashTableCoreMultiPortWithRam_inOrder_TC,
+]
+
+if __name__ == "__main__":
+    testLoader = unittest.TestLoader()
+    # suite = unittest.TestSuite([HashTableCoreMultiPortWithRam_TC("test_insertLookup")])
+    loadedTcs = [testLoader.loadTestsFromTestCase(tc) for tc in HashTableCoreMultiPortWithRam_TCs]
+    suite = unittest.TestSuite(loadedTcs)
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
@@ -98,15 +98,18 @@ class HwIOLookupKeyAgent(HwIODataRdVldAgent):
     def get_data(self):
         hwIO = self.hwIO
         if self.HAS_LOOKUP_ID:
-            return hwIO.lookup_id.read(), hwIO.key.read()
+            return hwIO.lookupId.read(), hwIO.key.read()
         return hwIO.key.read()
 
     @override
     def set_data(self, data):
         hwIO = self.hwIO
         if self.HAS_LOOKUP_ID:
-            _id, _key = data
-            return hwIO.lookup_id.write(_id), hwIO.key.write(_key)
+            if data is None:
+                _id = _key = None
+            else:
+                _id, _key = data
+            return hwIO.lookupId.write(_id), hwIO.key.write(_key)
 
         self.hwIO.key.write(data)
 
@@ -137,12 +140,13 @@ class HwIOLookupResultAgent(HwIODataRdVldAgent):
     """
     Simulation agent for `.HwIOLookupResult`
     data is stored in .data
-    data format is tuple (hash, key, data, found) but some items
+    data format is tuple (lookupId, hash, key, data, found, occupied) but some items
     can be missing depending on configuration of interface
     """
 
     def __init__(self, sim, hwIO):
         HwIODataRdVldAgent.__init__(self, sim, hwIO)
+        self.hasLookupId = bool(hwIO.LOOKUP_ID_WIDTH)
         self.hasHash = bool(hwIO.LOOKUP_HASH)
         self.hasKey = bool(hwIO.LOOKUP_KEY)
         self.hasData = bool(hwIO.DATA_WIDTH)
@@ -153,6 +157,9 @@ class HwIOLookupResultAgent(HwIODataRdVldAgent):
         append = d.append
         hwIO = self.hwIO
 
+        if self.hasLookupId:
+            append(hwIO.lookupId.read())
+
         if self.hasHash:
             append(hwIO.hash.read())
 
@@ -173,6 +180,9 @@ class HwIOLookupResultAgent(HwIODataRdVldAgent):
 
         dIt = iter(data)
 
+        if self.hasLookupId:
+            hwIO.lookupId.write(next(dIt))
+
         if self.hasHash:
             hwIO.hash.write(next(dIt))
 
@@ -1,9 +1,11 @@
-from typing import List
+from math import ceil
+from typing import List, Optional, Sequence, Tuple, Union
 
-from hwt.code import Concat
-from hwtLib.tools.debug_bus_monitor_ctl import select_bit_range
+from hwt.hdl.types.bits import HBits
+from hwt.hdl.types.bitsConst import HBitsConst
 from hwtSimApi.basic_hdl_simulator.proxy import BasicRtlSimProxy
-from pyMathBitPrecise.bit_utils import int_to_int_list
+from pyMathBitPrecise.bit_utils import mask, ValidityError
+from pyMathBitPrecise.bits3t import Bits3val
 
 
 class SegmentedArrayProxy():
@@ -25,6 +27,13 @@ class SegmentedArrayProxy():
     This object allows to use such a list of memories as a list
     thus removing of manual bit selections and concatenations
     when accessing the items stored in memory.
+
+    The word is a concatenation of items with the same index from all memories.
+    The item may be composed of multiple words (words_per_item) or multiple items
+    may be stored in a single word (items_per_index), item with lower index is in lower bits.
+
+    The proxy supports slices (``proxy[2:10]``, ``proxy[:] = values``) and whole array
+    :meth:`~.load`/:meth:`~.dump`, which access every backing memory only once.
     """
 
     def __init__(self, mems: List[BasicRtlSimProxy], items_per_index=None, words_per_item=None):
@@ -33,7 +42,22 @@ class SegmentedArrayProxy():
         assert items_per_index is None or words_per_item is None, (items_per_index, words_per_item)
         self.items_per_index = items_per_index
         self.words_per_item = words_per_item
-        self.ITEM_WIDTH = mems[0]._dtype.element_t.bit_length() * len(mems)
+        self.SEGMENT_WIDTH = mems[0]._dtype.element_t.bit_length()
+        for m in mems:
+            assert m._dtype.element_t.bit_length() == self.SEGMENT_WIDTH, (
+                "All memories have to have the same width", m, self.SEGMENT_WIDTH)
+        # width of a word (concatenation of items from all memories)
+        self.ITEM_WIDTH = self.SEGMENT_WIDTH * len(mems)
+        self.WORD_CNT = mems[0]._dtype.size
+
+        if items_per_index and items_per_index != 1:
+            assert self.ITEM_WIDTH % items_per_index == 0, (self.ITEM_WIDTH, items_per_index)
+            self._item_width = self.ITEM_WIDTH // items_per_index
+        elif words_per_item and words_per_item != 1:
+            self._item_width = self.ITEM_WIDTH * words_per_item
+        else:
+            self._item_width = self.ITEM_WIDTH
+        self._item_t = HBits(self._item_width)
 
     def clean(self):
         for mem in self.mems:
@@ -43,47 +67,240 @@ class SegmentedArrayProxy():
             mem.val = t.from_py([0 for _ in range(t.size)])
             mem.def_val = t.from_py([0 for _ in range(t.size)])
 
-    def __getitem__(self, i: int):
-        if self.items_per_index and self.items_per_index != 1:
-            raise NotImplementedError()
-        elif self.words_per_item and self.words_per_item != 1:
-            return Concat(*(
-                self._getitem(i * self.words_per_item + i2)
-                for i2 in range(self.words_per_item - 1, -1, -1)
-            ))
-        else:
-            return self._getitem(i)
+    def _readWords(self, start: int, stop: int) -> Tuple[List[int], List[int]]:
+        """
+        :return: tuple (values, validity masks) of words in range [start, stop)
+        """
+        cnt = stop - start
+        vals = [0 for _ in range(cnt)]
+        vlds = [0 for _ in range(cnt)]
+        segW = self.SEGMENT_WIDTH
+        for B_i, data_mem in enumerate(self.mems):
+            shift = B_i * segW
+            items = data_mem.val.val
+            for i in range(cnt):
+                v = items.get(start + i, None)
+                if v is not None and v.vld_mask:
+                    vals[i] |= v.val << shift
+                    vlds[i] |= v.vld_mask << shift
+        return vals, vlds
 
-    def _getitem(self, i: int):
-        res = [data_mem.val[i] for data_mem in reversed(self.mems)]
-        return Concat(*res)
+    def _writeWords(self, start: int, vals: Sequence[int], vlds: Optional[Sequence[int]]):
+        """
+        Write words starting from index start
 
-    def _setitem(self, i, val):
-        for B_i, data_mem  in enumerate(self.mems):
+        :param vlds: validity masks for every word, None if all words are fully valid
+        """
+        segW = self.SEGMENT_WIDTH
+        segMask = mask(segW)
+        for B_i, data_mem in enumerate(self.mems):
             t = data_mem._dtype
-            _data = select_bit_range(val, B_i * 8, 8)
+            element_t = t.element_t
             if data_mem.def_val is None:
                 # a default state before sim execution if there is no default value
                 data_mem.def_val = t.from_py([0 for _ in range(t.size)])
-            data_mem.val[i] = data_mem.def_val[i] = t.element_t.from_py(_data)
+            cur = data_mem.val.val
+            default = data_mem.def_val.val
+            shift = B_i * segW
+            for i, v in enumerate(vals, start=start):
+                if vlds is None:
+                    m = segMask
+                else:
+                    m = (vlds[i - start] >> shift) & segMask
+                _v = element_t._from_py(((v >> shift) & m), m)
+                cur[i] = default[i] = _v
+
+    @staticmethod
+    def _toValAndVld(v: Union[int, Bits3val, None], width: int) -> Tuple[int, int]:
+        if v is None:
+            return 0, 0
+        elif isinstance(v, int):
+            m = mask(width)
+            return v & m, m
+        else:
+            m = v.vld_mask & mask(width)
+            return v.val & m, m
+
+    def _resolveSlice(self, i: Union[int, slice]) -> Tuple[int, int]:
+        start, stop, step = i.indices(len(self))
+        if step != 1:
+            raise NotImplementedError("Slice with step", i)
+        return start, max(start, stop)
+
+    def _readItems(self, start: int, stop: int) -> Tuple[List[int], List[int]]:
+        """
+        :return: tuple (values, validity masks) of items in range [start, stop)
+        """
+        ipi = self.items_per_index
+        wpi = self.words_per_item
+        if ipi and ipi != 1:
+            firstWord = start // ipi
+            vals, vlds = self._readWords(firstWord, ceil(stop / ipi))
+            w = self._item_width
+            m = mask(w)
+            resVals = []
+            resVlds = []
+            for i in range(start, stop):
+                wordI, itemI = divmod(i, ipi)
+                shift = itemI * w
+                resVals.append((vals[wordI - firstWord] >> shift) & m)
+                resVlds.append((vlds[wordI - firstWord] >> shift) & m)
+            return resVals, resVlds
+
+        elif wpi and wpi != 1:
+            vals, vlds = self._readWords(start * wpi, stop * wpi)
+            W = self.ITEM_WIDTH
+            resVals = []
+            resVlds = []
+            for i in range(0, len(vals), wpi):
+                v = 0
+                vld = 0
+                for i2 in range(wpi - 1, -1, -1):
+                    v = (v << W) | vals[i + i2]
+                    vld = (vld << W) | vlds[i + i2]
+                resVals.append(v)
+                resVlds.append(vld)
+            return resVals, resVlds
+
+        else:
+            return self._readWords(start, stop)
+
+    def _writeItems(self, start: int, values: Sequence[Union[int, Bits3val, None]]):
+        w = self._item_width
+        vals = []
+        vlds = []
+        for v in values:
+            v, vld = self._toValAndVld(v, w)
+            vals.append(v)
+            vlds.append(vld)
+
+        stop = start + len(vals)
+        if stop > len(self):
+            raise IndexError(stop, len(self))
+
+        ipi = self.items_per_index
+        wpi = self.words_per_item
+        if ipi and ipi != 1:
+            # read-modify-write of the words which contain the items
+            firstWord = start // ipi
+            wVals, wVlds = self._readWords(firstWord, ceil(stop / ipi))
+            m = mask(w)
+            for i, (v, vld) in enumerate(zip(vals, vlds), start=start):
+                wordI, itemI = divmod(i, ipi)
+                wordI -= firstWord
+                shift = itemI * w
+                wVals[wordI] = (wVals[wordI] & ~(m << shift)) | (v << shift)
+                wVlds[wordI] = (wVlds[wordI] & ~(m << shift)) | (vld << shift)
+            self._writeWords(firstWord, wVals, wVlds)
 
+        elif wpi and wpi != 1:
+            W = self.ITEM_WIDTH
+            m = mask(W)
+            wVals = []
+            wVlds = []
+            for v, vld in zip(vals, vlds):
+                for i2 in range(wpi):
+                    wVals.append((v >> (i2 * W)) & m)
+                    wVlds.append((vld >> (i2 * W)) & m)
+            self._writeWords(start * wpi, wVals, wVlds)
+
+        else:
+            self._writeWords(start, vals, vlds)
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[HBitsConst, List[HBitsConst]]:
+        item_t = self._item_t
+        if isinstance(i, slice):
+            start, stop = self._resolveSlice(i)
+            vals, vlds = self._readItems(start, stop)
+            return [item_t._from_py(v, vld) for v, vld in zip(vals, vlds)]
+
+        if i < 0:
+            i += len(self)
+        if i < 0 or i >= len(self):
+            raise IndexError(i)
+        vals, vlds = self._readItems(i, i + 1)
+        return item_t._from_py(vals[0], vlds[0])
+
+    def __setitem__(self, i: Union[int, slice], val):
+        if isinstance(i, slice):
+            start, stop = self._resolveSlice(i)
+            val = list(val)
+            if len(val) != stop - start:
+                raise ValueError("Size of slice and value does not match", stop - start, len(val))
+            self._writeItems(start, val)
+        else:
+            if i < 0:
+                i += len(self)
+            if i < 0 or i >= len(self):
+                raise IndexError(i)
+            self._writeItems(i, (val,))
         return val
 
-    def __setitem__(self, i: int, val: int):
+    def load(self, values: Sequence[Union[int, Bits3val, None]], offset: int=0):
+        """
+        Write items to memory starting from item index offset
+        """
+        self._writeItems(offset, list(values))
+
+    def dump(self, start: int=0, stop: Optional[int]=None) -> List[Union[int, HBitsConst, None]]:
+        """
+        Read items from memory
+
+        :return: list of items, int for fully valid item, None for fully invalid item
+            and HBitsConst for partially valid item
+        """
+        if stop is None:
+            stop = len(self)
+        vals, vlds = self._readItems(start, stop)
+        m = mask(self._item_width)
+        item_t = self._item_t
+        res = []
+        for v, vld in zip(vals, vlds):
+            if vld == m:
+                res.append(v)
+            elif vld == 0:
+                res.append(None)
+            else:
+                res.append(item_t._from_py(v, vld))
+        return res
+
+    def iter_ints(self, start: int=0, stop: Optional[int]=None, invalid: Optional[int]=None):
+        """
+        Iterate items as plain ints
+
+        :param invalid: value used for items which are not fully valid, if None an exception is raised
+        :raise ValidityError: if an item is not fully valid and invalid is None
+        """
+        for i, v in enumerate(self.dump(start, stop), start=start):
+            if not isinstance(v, int):
+                if invalid is None:
+                    raise ValidityError("Item is not fully valid", i, v)
+                v = invalid
+            yield v
+
+    def to_ndarray(self, start: int=0, stop: Optional[int]=None, dtype=None,
+                   invalid: Optional[int]=None) -> "numpy.ndarray":
+        """
+        Read items as numpy array (items have to fit into 64b)
+
+        :param dtype: numpy dtype of the result, if None the smallest unsigned type is used
+        :param invalid: :see: :meth:`~.iter_ints`
+        """
+        import numpy as np
+        if dtype is None:
+            w = self._item_width
+            if w > 64:
+                raise NotImplementedError("Item is too wide for numpy array", w)
+            dtype = np.uint8 if w <= 8 else np.uint16 if w <= 16 else np.uint32 if w <= 32 else np.uint64
+        return np.array(list(self.iter_ints(start, stop, invalid=invalid)), dtype=dtype)
+
+    def __len__(self):
         if self.items_per_index and self.items_per_index != 1:
-            raise NotImplementedError()
+            return self.WORD_CNT * self.items_per_index
         elif self.words_per_item and self.words_per_item != 1:
-            _i = i * self.words_per_item
-            _data = int_to_int_list(val, self.ITEM_WIDTH, self.words_per_item)
-            for i2, _d in enumerate(_data):
-                self._setitem(_i + i2, _d)
-            return val
+            return self.WORD_CNT // self.words_per_item
         else:
-            return self._setitem(i, val)
-
-    def __len__(self):
-        return len(self.mems[0]) // self.words_per_item
+            return self.WORD_CNT
 
     def __iter__(self):
-        for i in range(len(self)):
-            yield self[i]
+        return iter(self[:])
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from hwt.hdl.types.bitsConst import HBitsConst
+from hwtLib.mem.sim.segmentedArrayProxy import SegmentedArrayProxy
+from hwtSimApi.basic_hdl_simulator.proxy import BasicRtlSimProxy
+from pyMathBitPrecise.array3t import Array3t
+from pyMathBitPrecise.bit_utils import ValidityError
+from pyMathBitPrecise.bits3t import Bits3t
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class SegmentedArrayProxy_TC(unittest.TestCase):
+
+    def mkProxy(self, segCnt=2, size=8, **kwargs):
+        t = Array3t(Bits3t(8, False), size)
+        mems = [BasicRtlSimProxy(None, None, f"mem{i:d}", t, None) for i in range(segCnt)]
+        return mems, SegmentedArrayProxy(mems, **kwargs)
+
+    def test_item(self):
+        mems, p = self.mkProxy()
+        self.assertEqual(len(p), 8)
+        self.assertFalse(p[0]._is_full_valid())
+        p[1] = 0x1234
+        self.assertEqual(p[1].val, 0x1234)
+        self.assertTrue(p[1]._is_full_valid())
+        self.assertEqual(mems[0].val.val[1].val, 0x34)
+        self.assertEqual(mems[1].def_val.val[1].val, 0x12)
+        p[-1] = 0xabcd
+        self.assertEqual(int(p[7]), 0xabcd)
+        # same type as a Concat of the memory items
+        self.assertIsInstance(p[7], HBitsConst)
+        self.assertEqual(p[7]._dtype.bit_length(), 16)
+        for v in p[6:8]:
+            self.assertIsInstance(v, HBitsConst)
+        with self.assertRaises(IndexError):
+            p[8]
+
+    def test_slice_and_dump(self):
+        _, p = self.mkProxy()
+        p[2:5] = [1, 2, 3]
+        self.assertSequenceEqual([int(v) for v in p[2:5]], [1, 2, 3])
+        self.assertSequenceEqual(p.dump(0, 6), [None, None, 1, 2, 3, None])
+        p.load(range(8))
+        self.assertSequenceEqual(p.dump(), list(range(8)))
+        self.assertSequenceEqual(list(p.iter_ints()), list(range(8)))
+        self.assertEqual(len(list(p)), 8)
+
+    def test_iter_ints_invalid(self):
+        _, p = self.mkProxy()
+        p[0] = 1
+        with self.assertRaises(ValidityError):
+            list(p.iter_ints())
+        self.assertSequenceEqual(list(p.iter_ints(0, 3, invalid=-1)), [1, -1, -1])
+
+    def test_words_per_item(self):
+        _, p = self.mkProxy(words_per_item=2)
+        self.assertEqual(len(p), 4)
+        p[1] = 0x11223344
+        p[2:4] = [0xaabbccdd, 0x01020304]
+        self.assertEqual(p[1].val, 0x11223344)
+        self.assertSequenceEqual(p.dump(1, 4), [0x11223344, 0xaabbccdd, 0x01020304])
+        _, p2 = self.mkProxy()
+        p2.mems = p.mems
+        self.assertSequenceEqual(p2.dump(2, 4), [0x3344, 0x1122])
+
+    def test_items_per_index(self):
+        _, p = self.mkProxy(items_per_index=4)
+        self.assertEqual(len(p), 32)
+        p[5] = 0xa
+        v = p.dump(4, 6)
+        self.assertIsNone(v[0])
+        self.assertEqual(v[1], 0xa)
+        p.load([1, 2, 3], offset=3)
+        self.assertSequenceEqual(p.dump(3, 7), [1, 2, 3, None])
+        _, p2 = self.mkProxy()
+        p2.mems = p.mems
+        v = p2[1]
+        self.assertEqual(v.val, 0x0032)
+        self.assertEqual(v.vld_mask, 0x00ff)
+
+    @unittest.skipIf(np is None, "numpy not installed")
+    def test_ndarray(self):
+        _, p = self.mkProxy()
+        p.load([i * 0x101 for i in range(8)])
+        a = p.to_ndarray()
+        self.assertEqual(a.dtype, np.uint16)
+        self.assertSequenceEqual(a.tolist(), [i * 0x101 for i in range(8)])
+
+
+if __name__ == "__main__":
+    testLoader = unittest.TestLoader()
+    # suite = unittest.TestSuite([SegmentedArrayProxy_TC("test_items_per_index")])
+    suite = testLoader.loadTestsFromTestCase(SegmentedArrayProxy_TC)
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
@@ -0,0 +1,262 @@
+import struct
+from typing import BinaryIO, Callable, Generator, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Union
+
+from hwtSimApi.constants import Time
+from hwtSimApi.hdlSimulator import HdlSimulator
+from hwtSimApi.triggers import Timer
+
+
+class PCAP_LINKTYPE:
+    ETHERNET = 1
+    RAW = 101  # raw IPv4/IPv6 without link layer header
+
+
+class PcapPacket(NamedTuple):
+    """
+    A packet stored in pcap/pcapng file
+
+    :ivar ~.timestamp: time of the capture in ns
+    :ivar ~.data: captured bytes (may be truncated to snaplen)
+    :ivar ~.origLen: original length of the packet
+    :ivar ~.linkType: :class:`~.PCAP_LINKTYPE` of the interface on which the packet was captured
+    """
+    timestamp: int
+    data: bytes
+    origLen: int
+    linkType: int = PCAP_LINKTYPE.ETHERNET
+
+
+class PcapReader():
+    """
+    Reader of packet capture files in classic libpcap (microsecond/nanosecond, any byte order)
+    and pcapng format (Enhanced/Simple Packet Blocks, multiple interfaces and sections)
+
+    .. code-block:: python
+
+        with open("trace.pcapng", "rb") as f:
+            for p in PcapReader(f):
+                ...
+
+    :ivar ~.file: binary file with the capture
+    """
+    PCAP_MAGIC_US = 0xa1b2c3d4
+    PCAP_MAGIC_NS = 0xa1b23c4d
+    PCAPNG_SHB = 0x0A0D0D0A
+    PCAPNG_BYTE_ORDER_MAGIC = 0x1A2B3C4D
+    PCAPNG_IDB = 0x00000001
+    PCAPNG_SPB = 0x00000003
+    PCAPNG_EPB = 0x00000006
+    PCAPNG_OPT_IF_TSRESOL = 9
+
+    def __init__(self, file: BinaryIO):
+        self.file = file
+
+    def __iter__(self) -> Iterator[PcapPacket]:
+        head = self.file.read(4)
+        if len(head) < 4:
+            return
+        if struct.unpack("<I", head)[0] == self.PCAPNG_SHB:
+            yield from self._iterPcapNg(head)
+        else:
+            yield from self._iterPcap(head)
+
+    def _iterPcap(self, magic: bytes):
+        f = self.file
+        for endian in ("<", ">"):
+            m, = struct.unpack(endian + "I", magic)
+            if m in (self.PCAP_MAGIC_US, self.PCAP_MAGIC_NS):
+                break
+        else:
+            raise ValueError("Not a pcap file", magic)
+
+        tsMul = 1000 if m == self.PCAP_MAGIC_US else 1
+        _, _, _, _, snaplen, linkType = struct.unpack(endian + "HHiIII", f.read(20))
+        recHeader = struct.Struct(endian + "IIII")
+        while True:
+            h = f.read(recHeader.size)
+            if len(h) < recHeader.size:
+                return
+            tsSec, tsFrac, inclLen, origLen = recHeader.unpack(h)
+            data = f.read(inclLen)
+            if len(data) != inclLen:
+                raise ValueError("Truncated pcap record")
+            yield PcapPacket(tsSec * 1000_000_000 + tsFrac * tsMul, data, origLen, linkType)
+
+    @classmethod
+    def _parseTsResol(cls, options: bytes, endian: str) -> tuple[int, int]:
+        """
+        :return: tuple (multiplier, divisor) to convert timestamp units to ns
+        """
+        i = 0
+        while i + 4 <= len(options):
+            code, length = struct.unpack_from(endian + "HH", options, i)
+            i += 4
+            if code == 0:
+                break
+            if code == cls.PCAPNG_OPT_IF_TSRESOL and length == 1:
+                v = options[i]
+                if v & 0x80:
+                    return 1000_000_000, 1 << (v & 0x7f)
+                else:
+                    return 10 ** 9, 10 ** v
+            i += (length + 3) & ~3
+        return 1000, 1  # default resolution is 1us
+
+    def _iterPcapNg(self, firstType: bytes):
+        f = self.file
+        blockType = firstType
+        endian = "<"
+        interfaces: List[tuple] = []  # (linkType, snaplen, (tsMul, tsDiv))
+        while True:
+            if len(blockType) < 4:
+                return
+            lenRaw = f.read(4)
+            if blockType == b"\x0A\x0D\x0D\x0A":
+                bom = f.read(4)
+                endian = "<" if struct.unpack("<I", bom)[0] == self.PCAPNG_BYTE_ORDER_MAGIC else ">"
+                totalLen, = struct.unpack(endian + "I", lenRaw)
+                f.read(totalLen - 12)
+                interfaces = []
+            else:
+                bt, = struct.unpack(endian + "I", blockType)
+                totalLen, = struct.unpack(endian + "I", lenRaw)
+                body = f.read(totalLen - 12)
+                f.read(4)
+                if bt == self.PCAPNG_IDB:
+                    linkType, _, snaplen = struct.unpack_from(endian + "HHI", body)
+                    interfaces.append((linkType, snaplen, self._parseTsResol(body[8:], endian)))
+                elif bt == self.PCAPNG_EPB:
+                    ifId, tsHigh, tsLow, capLen, origLen = struct.unpack_from(endian + "IIIII", body)
+                    linkType, _, (tsMul, tsDiv) = interfaces[ifId]
+                    ts = (tsHigh << 32) | tsLow
+                    yield PcapPacket(ts * tsMul // tsDiv, bytes(body[20:20 + capLen]), origLen, linkType)
+                elif bt == self.PCAPNG_SPB:
+                    origLen, = struct.unpack_from(endian + "I", body)
+                    linkType, snaplen, _ = interfaces[0]
+                    capLen = min(origLen, snaplen) if snaplen else origLen
+                    yield PcapPacket(0, bytes(body[4:4 + capLen]), origLen, linkType)
+                # other blocks (name resolution, statistics, ...) are ignored
+
+            blockType = f.read(4)
+
+
+class PcapWriter():
+    """
+    Writer of packet capture files (classic libpcap with nanosecond timestamps or pcapng)
+
+    :ivar ~.file: binary file opened for writing
+    :ivar ~.linkType: :class:`~.PCAP_LINKTYPE` written to file header
+    :ivar ~.pcapng: if True the pcapng format is used
+    :ivar ~.snaplen: maximum number of stored bytes of the packet (longer packets are truncated), 0 for unlimited
+    """
+
+    def __init__(self, file: BinaryIO, linkType: int=PCAP_LINKTYPE.ETHERNET, pcapng: bool=False, snaplen: int=0xffff):
+        self.file = file
+        self.linkType = linkType
+        self.pcapng = pcapng
+        self.snaplen = snaplen
+        if pcapng:
+            # section header block
+            file.write(struct.pack("<IIIHHqI", PcapReader.PCAPNG_SHB, 28, PcapReader.PCAPNG_BYTE_ORDER_MAGIC,
+                                   1, 0, -1, 28))
+            # interface description block with if_tsresol=9 (ns)
+            opts = struct.pack("<HHB3xHH", PcapReader.PCAPNG_OPT_IF_TSRESOL, 1, 9, 0, 0)
+            blockLen = 20 + len(opts)
+            file.write(struct.pack("<IIHHI", PcapReader.PCAPNG_IDB, blockLen, linkType, 0, snaplen))
+            file.write(opts)
+            file.write(struct.pack("<I", blockLen))
+        else:
+            file.write(struct.pack("<IHHiIII", PcapReader.PCAP_MAGIC_NS, 2, 4, 0, 0, snaplen, linkType))
+
+    def write(self, data: Union[bytes, Sequence[int]], timestamp: int=0, origLen: Optional[int]=None):
+        """
+        :param data: bytes of the packet (truncated to snaplen)
+        :param timestamp: time of the capture in ns
+        :param origLen: original length of the packet, if None the length of data is used
+        """
+        data = bytes(data)
+        if origLen is None:
+            origLen = len(data)
+        snaplen = self.snaplen
+        if snaplen and len(data) > snaplen:
+            data = data[:snaplen]
+        f = self.file
+        if self.pcapng:
+            pad = (-len(data)) & 3
+            blockLen = 32 + len(data) + pad
+            f.write(struct.pack("<IIIIIII", PcapReader.PCAPNG_EPB, blockLen, 0,
+                                timestamp >> 32, timestamp & 0xffffffff, len(data), origLen))
+            f.write(data)
+            f.write(b"\x00" * pad)
+            f.write(struct.pack("<I", blockLen))
+        else:
+            sec, ns = divmod(timestamp, 1000_000_000)
+            f.write(struct.pack("<IIII", sec, ns, len(data), origLen))
+            f.write(data)
+
+    def writeAll(self, packets: Iterable[PcapPacket]):
+        for p in packets:
+            self.write(p.data, p.timestamp, p.origLen)
+
+
+def pcap_replay_proc(sim: HdlSimulator, packets: Iterable[PcapPacket],
+                     sendFrame: Callable[[bytes], None],
+                     timeScale: Optional[float]=1.0,
+                     interFrameGap: int=0) -> Generator[Timer, None, None]:
+    """
+    Simulation process which passes packets to a driver agent with a pacing derived from the capture timestamps.
+
+    .. code-block:: python
+
+        # RmiiRxChannelAgent
+        send = lambda d: dut.eth.rx._ag._append_frame(list(d))
+        # Axi4Stream agent
+        send = lambda d: axi4s_send_bytes(dut.rx, d)
+        self.procs.append(pcap_replay_proc(self.rtl_simulator, PcapReader(f), send))
+
+    :param sendFrame: function which appends the frame to the agent
+    :param timeScale: multiplier of time differences between the packets (0.5 = 2x faster replay),
+        if None the timestamps are ignored and the frames are send as soon as possible
+    :param interFrameGap: minimal time between two frames in simulation time units (:see: hwtSimApi.constants.Time)
+    :note: The frame is appended to agent at this time, the agent may send it later
+        if it is still busy with the previous frame.
+    """
+    firstTs = None
+    start = sim.now
+    lastSent = None
+    for p in packets:
+        t = sim.now
+        if timeScale is not None:
+            if firstTs is None:
+                firstTs = p.timestamp
+            t = max(t, start + int((p.timestamp - firstTs) * Time.ns * timeScale))
+        if lastSent is not None:
+            t = max(t, lastSent + interFrameGap)
+        if t > sim.now:
+            yield Timer(t - sim.now)
+        sendFrame(p.data)
+        lastSent = sim.now
+
+
+def pcap_capture_callback(sim: HdlSimulator, writer: PcapWriter) -> Callable[[Union[bytes, Sequence[int], tuple]], None]:
+    """
+    Create a function which writes received frames to pcap with the actual simulation time as a timestamp.
+    The function can be used as a callback of :class:`hwtLib.abstract.simFrameStream.SimFrameSink`.
+
+    .. code-block:: python
+
+        fu = Axi4StreamSimFrameUtils.from_HwIO(dut.tx)
+        dut.tx._ag.data = SimFrameSink(fu, pcap_capture_callback(self.rtl_simulator, w))
+        # RmiiTxChannelAgent collects frames in "frames" deque
+        dut.eth.tx._ag.frames = SimFrameSink(None, pcap_capture_callback(self.rtl_simulator, w))
+
+    :note: Tuples (offset, data, ...) from :meth:`hwtLib.abstract.simFrameUtils.SimFrameUtils.receive_bytes`
+        are accepted as well, the data is the second item of the tuple.
+    """
+
+    def capture(frame):
+        if isinstance(frame, tuple):
+            frame = frame[1]
+        writer.write([int(b) for b in frame], sim.now // Time.ns)
+
+    return capture
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from io import BytesIO
+from math import ceil
+import struct
+import unittest
+
+from hwt.simulator.simTestCase import SimTestCase
+from hwtLib.abstract.simFrameStream import SimFrameSink
+from hwtLib.amba.axi4s import Axi4Stream
+from hwtLib.amba.axi4sSimFrameUtils import Axi4StreamSimFrameUtils, axi4s_send_bytes
+from hwtLib.amba.axis_comp.reg import Axi4SReg
+from hwtLib.peripheral.ethernet.pcap import PcapReader, PcapWriter, PcapPacket, \
+    pcap_replay_proc, pcap_capture_callback, PCAP_LINKTYPE
+from hwtSimApi.constants import Time, CLK_PERIOD
+from hwtSimApi.triggers import Timer
+
+
+class _FakeSim():
+
+    def __init__(self):
+        self.now = 0
+
+    def run(self, proc):
+        for t in proc:
+            self.now += t.time
+
+
+class Pcap_TC(unittest.TestCase):
+    PACKETS = [
+        PcapPacket(1_600_000_000_123_456_789, bytes(range(60)), 60),
+        PcapPacket(1_600_000_000_123_457_789, b"\xff" * 61, 1514),
+        PcapPacket(1_600_000_001_000_000_000, b"\x01\x02\x03", 3),
+    ]
+
+    def _roundtrip(self, pcapng: bool):
+        f = BytesIO()
+        PcapWriter(f, pcapng=pcapng).writeAll(self.PACKETS)
+        f.seek(0)
+        return list(PcapReader(f))
+
+    def test_pcap_roundtrip(self):
+        self.assertSequenceEqual(self._roundtrip(False), self.PACKETS)
+
+    def test_pcapng_roundtrip(self):
+        self.assertSequenceEqual(self._roundtrip(True), self.PACKETS)
+
+    def test_snaplen(self):
+        for pcapng in (False, True):
+            f = BytesIO()
+            w = PcapWriter(f, pcapng=pcapng, snaplen=16)
+            w.write(bytes(range(40)), 10)
+            w.write(bytes(range(8)), 20, origLen=100)
+            f.seek(0)
+            self.assertSequenceEqual(list(PcapReader(f)), [
+                PcapPacket(10, bytes(range(16)), 40),
+                PcapPacket(20, bytes(range(8)), 100),
+            ], pcapng)
+
+    def test_pcap_big_endian_us(self):
+        f = BytesIO()
+        f.write(struct.pack(">IHHiIII", PcapReader.PCAP_MAGIC_US, 2, 4, 0, 0, 0xffff, PCAP_LINKTYPE.RAW))
+        f.write(struct.pack(">IIII", 10, 5, 2, 2))
+        f.write(b"\xab\xcd")
+        f.seek(0)
+        self.assertSequenceEqual(list(PcapReader(f)), [
+            PcapPacket(10 * 1000_000_000 + 5000, b"\xab\xcd", 2, PCAP_LINKTYPE.RAW)
+        ])
+
+    def test_replay_and_capture(self):
+        sim = _FakeSim()
+        out = BytesIO()
+        w = PcapWriter(out)
+        capture = pcap_capture_callback(sim, w)
+        sent = []
+
+        def send(data):
+            sent.append(sim.now)
+            capture((0, list(data)))
+
+        sim.run(pcap_replay_proc(sim, self.PACKETS, send, interFrameGap=2000 * Time.ns))
+        self.assertSequenceEqual(sent, [0, 2000 * Time.ns, (1_000_000_000 - 123_456_789) * Time.ns])
+
+        out.seek(0)
+        captured = list(PcapReader(out))
+        self.assertSequenceEqual([p.data for p in captured], [p.data for p in self.PACKETS])
+        self.assertSequenceEqual([p.timestamp for p in captured], [t // Time.ns for t in sent])
+
+        sim = _FakeSim()
+        sent = []
+        sim.run(pcap_replay_proc(sim, self.PACKETS, send, timeScale=None))
+        self.assertSequenceEqual(sent, [0, 0, 0])
+
+
+class PcapAxi4Stream_TC(SimTestCase):
+    """
+    Replay of packets to a driver and capture from a monitor of real Axi4Stream agents
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        dut = cls.dut = Axi4SReg(Axi4Stream)
+        dut.DATA_WIDTH = 32
+        dut.USE_KEEP = True
+        cls.compileSim(dut)
+
+    def test_replay_and_capture(self):
+        dut = self.dut
+        packets = [
+            PcapPacket(1_000_000, bytes(range(1, 8)), 7),
+            PcapPacket(1_000_200, bytes(range(20, 33)), 13),
+            # sent while the previous frame is still in the agent
+            PcapPacket(1_000_210, b"\xaa", 1),
+            PcapPacket(1_000_500, bytes(range(64)), 64),
+        ]
+        out = BytesIO()
+        fu = Axi4StreamSimFrameUtils.from_HwIO(dut.dataOut)
+        dut.dataOut._ag.data = SimFrameSink(fu, pcap_capture_callback(self.rtl_simulator, PcapWriter(out, snaplen=32)))
+        START = 10 * CLK_PERIOD
+
+        def replay():
+            # wait until the reset is finished
+            yield Timer(START)
+            yield from pcap_replay_proc(self.rtl_simulator, packets, lambda d: axi4s_send_bytes(dut.dataIn, d))
+
+        self.procs.append(replay())
+        self.runSim(START + 1000 * Time.ns)
+
+        out.seek(0)
+        captured = list(PcapReader(out))
+        self.assertSequenceEqual([(p.data, p.origLen) for p in captured],
+                                 [(p.data[:32], len(p.data)) for p in packets])
+        firstTs = packets[0].timestamp - START // Time.ns
+        lastTs = None
+        for p, c in zip(packets, captured):
+            # the frame is captured once its last word passes through the register
+            sendTs = p.timestamp - firstTs
+            self.assertGreater(c.timestamp, sendTs)
+            if lastTs is not None:
+                self.assertGreater(c.timestamp, lastTs)
+            lastTs = c.timestamp
+        # the frames which were not delayed by the previous frame have a constant latency
+        latency = [c.timestamp - (p.timestamp - firstTs) - ceil(len(p.data) / 4) * CLK_PERIOD // Time.ns
+                   for p, c in zip(packets, captured)]
+        self.assertEqual(latency[0], latency[1])
+        self.assertEqual(latency[0], latency[3])
+
+
+if __name__ == "__main__":
+    testLoader = unittest.TestLoader()
+    # suite = unittest.TestSuite([Pcap_TC("test_replay_and_capture")])
+    suite = unittest.TestSuite([testLoader.loadTestsFromTestCase(tc) for tc in (Pcap_TC, PcapAxi4Stream_TC)])
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
@@ -9,10 +9,11 @@ from hwt.hdl.types.bitsConst import HBitsConst
 from hwt.hdl.types.hdlType import HdlType
 from hwt.constants import NOT_SPECIFIED
 from hwtLib.logic.crcPoly import CRC_5_USB, CRC_16_USB
-from hwtLib.logic.crc_test_utils import NaiveCrcAccumulator
+from hwtLib.logic.crc_test_utils import NaiveCrcAccumulator, TableCrcEngine
 from hwtLib.peripheral.usb.constants import usb_packet_token_t, USB_PID
 from hwtLib.peripheral.usb.descriptors.bundle import UsbDescriptorBundle
 from hwtLib.types.ctypes import uint8_t
+from pyMathBitPrecise.bit_utils import reverse_bits
 
 
 class UsbPacketToken():
@@ -82,10 +83,11 @@ class UsbPacketData():
         self.data = data
 
     def crc16(self):
-        r = NaiveCrcAccumulator(CRC_16_USB)
-        for d in self.data:
-            r.takeWord(d, 8)
-        return r.getFinalValue()
+        data = self.data
+        if not isinstance(data, bytes):
+            data = bytes(int(d) for d in data)
+        # bit reversed to match the NaiveCrcAccumulator (crc5) which returns reflected value for REFIN+REFOUT CRCs
+        return reverse_bits(TableCrcEngine.get(CRC_16_USB).crc(data), 16)
 
     def unpack(self, t: HdlType):
         """
@@ -4,7 +4,6 @@
 from math import ceil
 
 from hwt.code import StaticForEach
-from hwt.hdl.frameTmpl import FrameTmpl
 from hwt.hdl.transTmpl import TransTmpl
 from hwt.hdl.types.struct import HStruct
 from hwt.hwIOs.hwIOStruct import HwIOStruct
@@ -13,7 +12,8 @@ from hwt.hwIOs.utils import propagateClkRstn, addClkRstn
 from hwt.hwModule import HwModule
 from hwt.hwParam import HwParam
 from hwt.pyUtils.typingFuture import override
-from hwtLib.abstract.template_configured import TemplateConfigured
+from hwtLib.abstract.template_configured import TemplateConfigured, \
+    FrameTmpl_framesFromTransTmpl_cached
 from hwtLib.amba.axis_comp.frame_parser import Axi4S_frameParser
 from hwtLib.amba.datapump.intf import HwIOAxiRDatapump, AddrSizeHs
 from hwtLib.handshaked.builder import HsBuilder
@@ -79,14 +79,12 @@ class StructReader(Axi4S_frameParser):
             self._tmpl = TransTmpl(self._structT)
         if self._frames is None:
             DW = self.DATA_WIDTH
-            frames = FrameTmpl.framesFromTransTmpl(
+            self._frames = FrameTmpl_framesFromTransTmpl_cached(
                         self._tmpl,
                         DW,
                         trimPaddingWordsOnStart=True,
                         trimPaddingWordsOnEnd=True)
 
-            self._frames = list(frames)
-
     @override
     def hwDeclr(self):
         addClkRstn(self)
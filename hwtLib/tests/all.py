@@ -1,16 +1,28 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import os
 import sys
-from typing import Optional
+from typing import List, Optional
 from unittest import TestLoader, TextTestRunner, TestSuite
 
+from hwt.simulator.rtlSimulatorVcd import BasicRtlSimulatorVcd
 from hwt.simulator.simTestCase import SimTestCase
 from hwtLib.abstract.busEndpoint_test import BusEndpointTC
 from hwtLib.abstract.frame_utils.alignment_utils_test import FrameAlignmentUtilsTC
 from hwtLib.abstract.frame_utils.join.test import FrameJoinUtilsTC
+from hwtLib.abstract.simFrameStream_test import SimFrameStream_TC
+from hwtLib.abstract.persistent_cache_test import PersistentCache_TC
+from hwtLib.abstract.sim_ram_allocator_test import SimRamAllocator_TC
+from hwtLib.abstract.sim_ram_mmap_test import SimRamMmapStorage_TC
+from hwtLib.abstract.sim_ram_monitor_test import SimRamAccessMonitor_TC
+from hwtLib.abstract.sim_ram_paged_test import SimRamPagedStorage_TC
+from hwtLib.abstract.sim_ram_test import SimRamBulkAccess_TCs
+from hwtLib.abstract.sim_ram_timing_test import SimRamTimingModel_TC
 from hwtLib.abstract.template_configured_test import TemplateConfigured_TC
 from hwtLib.amba.axi4SSegmented_simAgent_test import Axi4StreamSegmentedAgent_TC
+from hwtLib.amba.axi4sSimFrameUtils_test import Axi4StreamSimFrameUtils_TC
+from hwtLib.amba.axi4SSegmentedSimFrameUtils_test import Axi4StreamSegmentedFrameUtils_TC
 from hwtLib.amba.axiLite_comp.buff_test import AxiRegTC
 from hwtLib.amba.axiLite_comp.endpoint_arr_test import AxiLiteEndpointArrTCs
 from hwtLib.amba.axiLite_comp.endpoint_fromInterfaces_test import \
@@ -63,8 +75,10 @@ from hwtLib.avalon.endpoint_test import AvalonMmEndpointTCs
 from hwtLib.avalon.mm_buff_test import AvalonMmBuff_TC
 from hwtLib.avalon.sim.mmAgent_test import AvalonMmAgentTC
 from hwtLib.avalon.sim.stAgent_test import AvalonStAgentTC
+from hwtLib.avalon.stSimFrameUtils_test import AvalonStSimFrameUtils_TC
 from hwtLib.avalon.st_comp.avalonStLatencyAdapter_test import AvalonStCastReadyLatencyAndAllowance_TCs
 from hwtLib.avalon.st_comp.avalonStToAxi4s_test import AvalonStToAxi4streamAndBack_TC
+from hwtLib.benchmarks.sim_benchmark_test import SimBenchmark_TC
 from hwtLib.cesnet.mi32.axi4Lite_bridges_test import Mi32Axi4LiteBrigesTC
 from hwtLib.cesnet.mi32.endpoint_test import Mi32EndpointTCs
 from hwtLib.cesnet.mi32.interconnectMatrix_test import Mi32InterconnectMatrixTC
@@ -162,11 +176,13 @@ from hwtLib.logic.binToOneHot import BinToOneHotTC
 from hwtLib.logic.bitonicSorter import BitonicSorterTC
 from hwtLib.logic.cntrGray import GrayCntrTC
 from hwtLib.logic.countLeading_test import CountLeadingTC
-from hwtLib.logic.crcComb_test import CrcCombTC
+from hwtLib.logic.crcComb_test import CrcCombTC, CrcCombXorMatrixTC
 from hwtLib.logic.crcUtils_test import CrcUtilsTC
-from hwtLib.logic.crc_test import CrcTC
+from hwtLib.logic.crc_test_utils_test import TableCrcEngine_TC
+from hwtLib.logic.crc_test import CrcTC, CrcElaborationTC, CrcPipelineMatricesTC
 from hwtLib.logic.lfsr import LfsrTC
 from hwtLib.logic.oneHotToBin_test import OneHotToBinTC
+from hwtLib.logic.xorNetwork_test import XorNetworkTC
 from hwtLib.mem.atomic.flipCntr_test import FlipCntrTC
 from hwtLib.mem.atomic.flipRam_test import FlipRamTC
 from hwtLib.mem.atomic.flipReg_test import FlipRegTC
@@ -177,15 +193,18 @@ from hwtLib.mem.fifoArray_test import FifoArrayTC
 from hwtLib.mem.fifoAsync_test import FifoAsyncTC
 from hwtLib.mem.fifoPtrLogic_test import FifoPtrLogicc_TCs
 from hwtLib.mem.fifo_test import FIFO_TCs
+from hwtLib.mem.hashTableCoreMultiPortWithRam_test import HashTableCoreMultiPortWithRam_TCs
 from hwtLib.mem.hashTableCoreWithRam_test import HashTableCoreWithRamTC
 from hwtLib.mem.lutRam_test import LutRamTC
 from hwtLib.mem.ramTransactional_test import RamTransactionalTCs
+from hwtLib.mem.sim.segmentedArrayProxy_test import SegmentedArrayProxy_TC
 from hwtLib.mem.ramXor_test import RamXorSingleClockTC
 from hwtLib.mem.ram_test import RamTC
 from hwtLib.peripheral.displays.hd44780.driver_test import Hd44780Driver8bTC
 from hwtLib.peripheral.displays.segment7_test import Segment7TC
 from hwtLib.peripheral.ethernet.mac_rx_test import EthernetMac_rx_TCs
 from hwtLib.peripheral.ethernet.mac_tx_test import EthernetMac_tx_TCs
+from hwtLib.peripheral.ethernet.pcap_test import Pcap_TC, PcapAxi4Stream_TC
 from hwtLib.peripheral.ethernet.rmii_adapter_test import RmiiAdapterTC
 from hwtLib.peripheral.i2c.masterBitCntrl_test import I2CMasterBitCntrlTC
 from hwtLib.peripheral.mdio.master_test import MdioMasterTC
@@ -241,6 +260,12 @@ from hwtLib.tests.synthesizer.rtlLevel.statements_consistency_test import Statem
 from hwtLib.tests.synthesizer.statementTreesInternal_test import StatementTreesInternalTC
 from hwtLib.tests.synthesizer.statementTrees_test import StatementTreesTC
 from hwtLib.tests.synthesizer.statements_test import StatementsTC
+from hwtLib.tests.parallel_test_scheduler import TestTimingDb, fork_for_tests_lpt
+from hwtLib.tests.parallel_test_scheduler_test import ParallelTestScheduler_TC
+from hwtLib.tests.sim_model_cache import BasicRtlSimulatorVcdCached
+from hwtLib.tests.sim_model_cache_test import SimModelCache_TC
+from hwtLib.tests.test_impact import git_changed_files, select_affected_tests
+from hwtLib.tests.test_impact_test import TestImpact_TC
 from hwtLib.tests.time_logging_test_runner import TimeLoggingTestRunner
 from hwtLib.tests.transTmpl_test import TransTmpl_TC
 from hwtLib.tests.types.bitsSlicing_test import BitsSlicingTC
@@ -331,6 +356,7 @@ suite = testSuiteFromTCs(
     SerializerHdlRename_TC,
     VhdlVectorAutoCastExampleTC,
     TransTmpl_TC,
+    ParallelTestScheduler_TC,
     HUnionTC,
     HwIOUnionTC,
     ResourceAnalyzer_TC,
@@ -352,6 +378,14 @@ suite = testSuiteFromTCs(
     ConstConditionTC,
     TemplateConfigured_TC,
     FrameAlignmentUtilsTC,
+    SimRamPagedStorage_TC,
+    SimRamAllocator_TC,
+    *SimRamBulkAccess_TCs,
+    SimRamMmapStorage_TC,
+    SimRamTimingModel_TC,
+    SimRamAccessMonitor_TC,
+    SimFrameStream_TC,
+    PersistentCache_TC,
     FrameJoinUtilsTC,
     HwExceptionCatch_TC,
     PseudoLru_TC,
@@ -366,6 +400,7 @@ suite = testSuiteFromTCs(
     SimpleSubHwModuleTC,
     RamTC,
     RamXorSingleClockTC,
+    SegmentedArrayProxy_TC,
     *RamTransactionalTCs,
     BramWireTC,
     LutRamTC,
@@ -424,11 +459,18 @@ suite = testSuiteFromTCs(
     I2CMasterBitCntrlTC,
     *EthernetMac_rx_TCs,
     *EthernetMac_tx_TCs,
+    Pcap_TC,
+    PcapAxi4Stream_TC,
     MdioMasterTC,
     Hd44780Driver8bTC,
     CrcUtilsTC,
     CrcCombTC,
+    CrcCombXorMatrixTC,
+    TableCrcEngine_TC,
     CrcTC,
+    CrcElaborationTC,
+    CrcPipelineMatricesTC,
+    XorNetworkTC,
     UsbAgentTC,
     *UlpiAgent_TCs,
     *UtmiAgentTCs,
@@ -448,6 +490,7 @@ suite = testSuiteFromTCs(
     AvalonMmBram_TC,
     *AxiToAvalonMm_TCs,
     AvalonStAgentTC,
+    AvalonStSimFrameUtils_TC,
     *AvalonStCastReadyLatencyAndAllowance_TCs,
     AvalonStToAxi4streamAndBack_TC,
     AvalonMmBuff_TC,
@@ -505,6 +548,8 @@ suite = testSuiteFromTCs(
     
     Axi_ag_TC,
     Axi4StreamSegmentedAgent_TC,
+    Axi4StreamSimFrameUtils_TC,
+    Axi4StreamSegmentedFrameUtils_TC,
     Axi4_streamToMemTC,
     ArrayItemGetterTC,
     ArrayItemGetter2in1WordTC,
@@ -538,6 +583,7 @@ suite = testSuiteFromTCs(
     HwModuleWrapperTC,
     IpCorePackagerTC,
     HashTableCoreWithRamTC,
+    *HashTableCoreMultiPortWithRam_TCs,
     *CuckooHashTableWithRamTCs,
     Axi4SPingResponderTC,
     DebugBusMonitorExampleAxiTC,
@@ -547,20 +593,58 @@ suite = testSuiteFromTCs(
     HsSlrCrossingTC,
     *Dsp48e1Add_TCs,
     *BasicRtlSimulatorVcdTmpDirs_TCs,
+    SimModelCache_TC,
+    TestImpact_TC,
+    SimBenchmark_TC,
 )
 
 
-def unittestMain(suite: TestSuite, runnerKwargs=dict(verbosity=3), useParallelTest=None, runnerCls=TimeLoggingTestRunner, printTopLongest:Optional[int]=20):
+def unittestMain(suite: TestSuite, runnerKwargs=dict(verbosity=3), useParallelTest=None, runnerCls=TimeLoggingTestRunner, printTopLongest:Optional[int]=20,
+                 timingDb: Optional[TestTimingDb]=None, useSimModelCache=True,
+                 changedFiles: Optional[List[str]]=None, fallbackToFull=True):
+    """
+    :param timingDb: database of test durations from previous runs used for scheduling of tests
+        in parallel run and updated by the results of this run (if None :meth:`TestTimingDb.default` is used)
+    :param useSimModelCache: if True the simulation models are loaded from :class:`hwtLib.tests.sim_model_cache.SimModelCache`
+        (shared between forked workers and test runs)
+    :param changedFiles: if specified only the tests which depend on these files are executed
+        (paths relative to the directory with hwtLib package, :see: :func:`hwtLib.tests.test_impact.select_affected_tests`)
+    :param fallbackToFull: if True the whole suite is executed if the changedFiles contains a file
+        which can not be mapped to a module of hwtLib
+
+    Command line arguments:
+
+    * --singlethread disables the parallel execution of tests
+    * --affected[=REV] runs only the tests affected by changes against the git revision (default HEAD)
+    * --no-fallback do not run the whole suite if the change can not be mapped to hwtLib modules
+    """
     # runner = TextTestRunner(verbosity=2, failfast=True)
     # runner = TextTestRunner(verbosity=2)
     runner = runnerCls(**runnerKwargs)
+    if timingDb is None:
+        timingDb = TestTimingDb.default()
+    if useSimModelCache and SimTestCase.DEFAULT_SIMULATOR is BasicRtlSimulatorVcd:
+        SimTestCase.DEFAULT_SIMULATOR = BasicRtlSimulatorVcdCached
+
+    argv = sys.argv[1:]
+    if "--no-fallback" in argv:
+        fallbackToFull = False
+    for a in argv:
+        if changedFiles is None and (a == "--affected" or a.startswith("--affected=")):
+            base = a[len("--affected="):] if "=" in a else "HEAD"
+            changedFiles = git_changed_files(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), base)
 
-    if len(sys.argv) > 1 and sys.argv[1] == "--singlethread":
+    if changedFiles is not None:
+        allTestCnt = suite.countTestCases()
+        suite = select_affected_tests(suite, changedFiles, fallbackToFull=fallbackToFull)
+        print(f"Running {suite.countTestCases():d}/{allTestCnt:d} tests affected by {len(changedFiles):d} changed files")
+
+    if "--singlethread" in argv:
         useParallelTest = False
     else:
         if useParallelTest is None or useParallelTest:
             try:
-                from concurrencytest import ConcurrentTestSuite, fork_for_tests
+                from concurrencytest import ConcurrentTestSuite
                 useParallelTest = True
             except ImportError:
                 # concurrencytest is not installed, use regular test runner
@@ -569,10 +653,15 @@ def unittestMain(suite: TestSuite, runnerKwargs=dict(verbosity=3), useParallelTe
                 useParallelTest = False
 
     if useParallelTest:
-        concurrent_suite = ConcurrentTestSuite(suite, fork_for_tests())
+        concurrent_suite = ConcurrentTestSuite(suite, fork_for_tests_lpt(timingDb))
         res = runner.run(concurrent_suite)
     else:
         res = runner.run(suite)
+
+    test_id_timings = getattr(res, "test_id_timings", None)
+    if test_id_timings:
+        timingDb.update(test_id_timings)
+        timingDb.save()
     if printTopLongest:
         print(f"-------------------- Top {printTopLongest} longest tests --------------------")
         res.printTop(n=printTopLongest)
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from heapq import heapify, heappop, heappush
+import json
+import os
+from statistics import median
+from typing import Dict, Iterable, List, Optional, Tuple
+import unittest
+
+
+class TestTimingDb():
+    """
+    Database of test durations persisted in a json file,
+    used to schedule tests for parallel execution (:see: :func:`~.partition_tests_lpt`)
+
+    :ivar ~.path: path of the json file, if None the database is not persisted
+    :ivar ~.timings: dictionary test id -> duration in seconds
+    :ivar ~.SMOOTHING: weight of a new measurement in the stored value (exponential moving average)
+    """
+    FORMAT_VERSION = 1
+    SMOOTHING = 0.5
+
+    def __init__(self, path: Optional[str]=None):
+        self.path = path
+        self.timings: Dict[str, float] = {}
+        if path is not None:
+            self.load()
+
+    @classmethod
+    def default(cls) -> "TestTimingDb":
+        """
+        Load the database from a location specified by HWTLIB_TEST_TIMINGS_DB environment variable
+        (default ~/.cache/hwtLib/test_timings.json)
+        """
+        path = os.environ.get("HWTLIB_TEST_TIMINGS_DB", None)
+        if path is None:
+            path = os.path.join(os.path.expanduser("~"), ".cache", "hwtLib", "test_timings.json")
+        return cls(path)
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                d = json.load(f)
+        except (OSError, ValueError):
+            # missing or corrupted file
+            return
+        if d.get("version", None) == self.FORMAT_VERSION:
+            self.timings = {k: float(v) for k, v in d["timings"].items()}
+
+    def save(self):
+        if self.path is None:
+            return
+        tmp = f"{self.path:s}.{os.getpid():d}.tmp"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(tmp, "w") as f:
+                json.dump({"version": self.FORMAT_VERSION, "timings": self.timings}, f, indent=0, sort_keys=True)
+            os.replace(tmp, self.path)
+        except OSError:
+            # the database is only an optimization
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+    def update(self, timings: Iterable[Tuple[str, float]]):
+        """
+        :param timings: tuples (test id, duration in seconds)
+        """
+        t = self.timings
+        a = self.SMOOTHING
+        for testId, elapsed in timings:
+            prev = t.get(testId, None)
+            if prev is None:
+                t[testId] = elapsed
+            else:
+                t[testId] = a * elapsed + (1 - a) * prev
+
+    def estimate(self, testId: str, default: float) -> float:
+        return self.timings.get(testId, default)
+
+    def defaultEstimate(self) -> float:
+        """
+        :return: duration used for tests which were never executed
+        """
+        if self.timings:
+            return median(self.timings.values())
+        else:
+            return 1.0
+
+
+def iter_tests(suite: unittest.TestSuite):
+    """
+    Iterate all test cases in possibly hierarchical test suite
+    """
+    if isinstance(suite, unittest.TestSuite):
+        for t in suite:
+            yield from iter_tests(t)
+    else:
+        yield suite
+
+
+def group_tests_by_class(suite: unittest.TestSuite) -> Dict[Tuple[str, str], List[unittest.TestCase]]:
+    """
+    Group tests by a class, the tests of the same class should be executed in the same process
+    because they may share the setUpClass (e.g. compilation of the simulation model in SimTestCase).
+    """
+    groups: Dict[Tuple[str, str], List[unittest.TestCase]] = {}
+    for t in iter_tests(suite):
+        cls = t.__class__
+        k = (cls.__module__, cls.__qualname__)
+        g = groups.get(k, None)
+        if g is None:
+            groups[k] = [t, ]
+        else:
+            g.append(t)
+    return groups
+
+
+def schedule_tests_lpt(suite: unittest.TestSuite, workerCnt: int, db: TestTimingDb)\
+        ->List[Tuple[float, List[unittest.TestCase]]]:
+    """
+    Assign the groups of tests (:see: :func:`~.group_tests_by_class`) to workers
+    using longest-processing-time-first scheduling, the makespan is at most 4/3 of optimum.
+
+    :return: list of tuples (estimated duration, tests) for each worker
+    """
+    assert workerCnt > 0, workerCnt
+    default = db.defaultEstimate()
+    groups = []
+    for i, tests in enumerate(group_tests_by_class(suite).values()):
+        groups.append((sum(db.estimate(t.id(), default) for t in tests), i, tests))
+    # longest first, the index keeps the order deterministic for groups of same duration
+    groups.sort(key=lambda g: (-g[0], g[1]))
+
+    workers = [(0.0, i, []) for i in range(workerCnt)]
+    heapify(workers)
+    for duration, _, tests in groups:
+        load, i, workerTests = heappop(workers)
+        workerTests.extend(tests)
+        heappush(workers, (load + duration, i, workerTests))
+
+    workers.sort(key=lambda w: w[1])
+    return [(load, tests) for (load, _, tests) in workers if tests]
+
+
+def partition_tests_lpt(db: TestTimingDb):
+    """
+    :return: function which can be used as a partition_func in :func:`concurrencytest.fork_for_tests`
+    """
+
+    def partition_tests(suite: unittest.TestSuite, workerCnt: int) -> List[List[unittest.TestCase]]:
+        return [tests for _, tests in schedule_tests_lpt(suite, workerCnt, db)]
+
+    return partition_tests
+
+
+def fork_for_tests_lpt(db: TestTimingDb, workerCnt: Optional[int]=None):
+    """
+    :func:`concurrencytest.fork_for_tests` which uses timings from previous runs to balance the load of workers
+    """
+    from concurrencytest import fork_for_tests
+    try:
+        return fork_for_tests(workerCnt, partition_func=partition_tests_lpt(db))
+    except TypeError:
+        # old concurrencytest without partition_func (splits tests round-robin by class)
+        if workerCnt is None:
+            return fork_for_tests()
+        return fork_for_tests(workerCnt)
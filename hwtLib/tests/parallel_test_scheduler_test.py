@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from datetime import datetime, timedelta
+import io
+import os
+from tempfile import TemporaryDirectory
+import unittest
+
+from hwtLib.tests.parallel_test_scheduler import TestTimingDb, schedule_tests_lpt, \
+    partition_tests_lpt
+from hwtLib.tests.time_logging_test_runner import TimeLoggingTestResult
+
+
+class _SchedulerDummy():
+    """
+    Container of test classes used as a workload for the scheduler
+    (nested so they are not collected as a regular tests)
+    """
+
+    class A_TC(unittest.TestCase):
+
+        def test_0(self):
+            pass
+
+        def test_1(self):
+            pass
+
+    class B_TC(A_TC):
+        pass
+
+    class C_TC(A_TC):
+        pass
+
+    class D_TC(A_TC):
+        pass
+
+
+class ParallelTestScheduler_TC(unittest.TestCase):
+
+    def _suite(self):
+        loader = unittest.TestLoader()
+        return unittest.TestSuite([
+            loader.loadTestsFromTestCase(tc) for tc in
+            [_SchedulerDummy.A_TC, _SchedulerDummy.B_TC, _SchedulerDummy.C_TC, _SchedulerDummy.D_TC]
+        ])
+
+    def _db(self, timings):
+        db = TestTimingDb()
+        db.timings = {f"{__name__:s}._SchedulerDummy.{cls:s}.test_{i:d}": t for (cls, i), t in timings.items()}
+        return db
+
+    def test_lpt_keeps_classes_together(self):
+        db = self._db({
+            ("A_TC", 0): 5.0,
+            ("A_TC", 1): 4.0,
+            ("B_TC", 0): 3.0,
+            ("B_TC", 1): 3.0,
+            ("C_TC", 0): 1.0,
+            ("C_TC", 1): 1.0,
+            ("D_TC", 0): 2.0,
+            ("D_TC", 1): 2.0,
+        })
+        workers = schedule_tests_lpt(self._suite(), 2, db)
+        self.assertEqual(len(workers), 2)
+        # A=9, B=6, D=4, C=2 -> [A, C], [B, D]
+        self.assertEqual(sorted(load for load, _ in workers), [10.0, 11.0])
+        for _, tests in workers:
+            classes = [t.__class__ for t in tests]
+            for cls in set(classes):
+                self.assertEqual(classes.count(cls), 2)
+
+        parts = partition_tests_lpt(db)(self._suite(), 8)
+        self.assertEqual(len(parts), 4, "Empty workers are not spawned")
+        self.assertEqual(sum(len(p) for p in parts), 8)
+
+    def test_unknown_tests_use_median(self):
+        db = self._db({("A_TC", 0): 10.0, ("A_TC", 1): 2.0, ("B_TC", 0): 4.0})
+        self.assertEqual(db.defaultEstimate(), 4.0)
+        workers = schedule_tests_lpt(self._suite(), 1, db)
+        self.assertEqual(workers[0][0], 10.0 + 2.0 + 4.0 + 5 * 4.0)
+        self.assertEqual(TestTimingDb().defaultEstimate(), 1.0)
+
+    def test_db_persistence(self):
+        with TemporaryDirectory() as d:
+            path = os.path.join(d, "sub", "timings.json")
+            db = TestTimingDb(path)
+            self.assertEqual(db.timings, {})
+            db.update([("a", 2.0), ("b", 1.0)])
+            db.save()
+            db = TestTimingDb(path)
+            self.assertEqual(db.timings, {"a": 2.0, "b": 1.0})
+            db.update([("a", 4.0)])
+            self.assertEqual(db.timings["a"], 3.0)
+
+            with open(path, "w") as f:
+                f.write("{corrupted")
+            self.assertEqual(TestTimingDb(path).timings, {})
+
+    def test_result_uses_reported_time(self):
+        res = TimeLoggingTestResult(io.StringIO(), False, 0)
+        t = _SchedulerDummy.A_TC("test_0")
+        start = datetime(2020, 1, 1)
+        res.time(start)
+        res.startTest(t)
+        res.time(start + timedelta(seconds=3))
+        res.addSuccess(t)
+        res.stopTest(t)
+        self.assertEqual(res.test_id_timings, [(t.id(), 3.0)])
+
+
+if __name__ == "__main__":
+    testLoader = unittest.TestLoader()
+    # suite = unittest.TestSuite([ParallelTestScheduler_TC("test_lpt_keeps_classes_together")])
+    suite = testLoader.loadTestsFromTestCase(ParallelTestScheduler_TC)
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
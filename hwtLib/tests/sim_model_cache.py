@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from hashlib import sha256
+from io import StringIO
+import os
+import sys
+from types import ModuleType
+from typing import Optional, Tuple, List
+
+from hwt.hwModule import HwModule
+from hwt.serializer.serializer_filter import SerializerFilterDoNotExclude
+from hwt.serializer.simModel import SimModelSerializer
+from hwt.serializer.store_manager import SaveToStream, StoreManager
+from hwt.simulator.rtlSimulatorVcd import BasicRtlSimulatorVcd
+from hwt.synth import to_rtl
+from hwt.synthesizer.dummyPlatform import DummyPlatform
+from hwtLib.abstract.persistent_cache import PersistentCache
+
+
+class _SaveDeferred(StoreManager):
+    """
+    Store manager which elaborates the component (and resolves the names with the serializer name scope)
+    but only records the produced objects, they are serialized by :meth:`~.serialize`
+    only if the serialized model is not already in cache.
+    """
+
+    def __init__(self, serializer_cls, _filter=None):
+        super(_SaveDeferred, self).__init__(serializer_cls, _filter=_filter)
+        self._rootNameScope = self.name_scope
+        self.objs = []
+
+    def write(self, obj):
+        self.objs.append((self.name_scope, obj))
+
+    def serialize(self) -> str:
+        """
+        :return: the source code of the recorded objects
+        """
+        buff = StringIO()
+        s = SaveToStream(self.serializer_cls, buff, _filter=self.filter, name_scope=self._rootNameScope)
+        for nameScope, obj in self.objs:
+            s.name_scope = nameScope
+            s.write(obj)
+        return buff.getvalue()
+
+
+def _tree_fingerprint(pkg: ModuleType) -> str:
+    """
+    :return: string which changes if any python file in the package is modified
+    """
+    root = os.path.dirname(pkg.__file__)
+    items = []
+    for d, _, files in os.walk(root):
+        for fn in files:
+            if fn.endswith(".py"):
+                p = os.path.join(d, fn)
+                try:
+                    st = os.stat(p)
+                except OSError:
+                    continue
+                items.append(f"{os.path.relpath(p, root):s}:{st.st_mtime_ns:d}:{st.st_size:d}")
+    items.sort()
+    return f"{pkg.__name__:s}:{sha256(';'.join(items).encode()).hexdigest():s}"
+
+
+def _hwIO_signal_names(obj) -> List[str]:
+    """
+    :return: names of the signals of the top level interfaces (used to reconnect the DUT to the simulation model)
+    """
+    names = []
+    for hwIO in obj._hwIOs:
+        if hwIO._hwIOs:
+            names.extend(_hwIO_signal_names(hwIO))
+        else:
+            names.append(hwIO._sigInside._name)
+    return names
+
+
+class SimModelCache(PersistentCache):
+    """
+    Cache of serialized simulation models shared between processes and test runs.
+
+    The key is the class of the component, values of its :class:`hwt.hwParam.HwParam` and
+    all other public attributes set by the constructor (e.g. the HStruct type of
+    :class:`hwtLib.abstract.template_configured.TemplateConfigured`),
+    the target platform and the fingerprint of the source code of hwt, hwtSimApi and hwtLib.
+    The component has to be elaborated in every process because the simulation agents are connected
+    to its interfaces, but the serialization to a simulation model and its compilation is spared.
+
+    The cache can be configured by environment variables:
+
+    * HWTLIB_SIM_MODEL_CACHE=0 disables the cache
+    * HWTLIB_SIM_MODEL_CACHE_DIR sets the directory (default ~/.cache/hwtLib/sim_models)
+    * HWTLIB_SIM_MODEL_CACHE_SIZE sets the size limit in bytes
+    """
+    # attributes of an unconfigured component which are not a part of the configuration
+    _HWMODULE_INTERNAL_ATTRS = None
+    _fingerprint = None
+
+    def __init__(self, path: Optional[str]=None, maxSize: Optional[int]=None, enabled: Optional[bool]=None):
+        env = os.environ
+        if path is None:
+            path = env.get("HWTLIB_SIM_MODEL_CACHE_DIR", None)
+            if path is None:
+                path = os.path.join(os.path.expanduser("~"), ".cache", "hwtLib", "sim_models")
+        if maxSize is None:
+            maxSize = int(env.get("HWTLIB_SIM_MODEL_CACHE_SIZE", 1024 * 1024 * 1024))
+        if enabled is None:
+            enabled = env.get("HWTLIB_SIM_MODEL_CACHE", "1") not in ("0", "", "false", "False")
+        super(SimModelCache, self).__init__(path, maxSize, enabled)
+
+    @classmethod
+    def fingerprint(cls) -> str:
+        """
+        :return: fingerprint of the libraries which generate the simulation model
+        """
+        fp = SimModelCache._fingerprint
+        if fp is None:
+            import hwt
+            import hwtSimApi
+            import hwtLib
+            fp = SimModelCache._fingerprint = ";".join(_tree_fingerprint(p) for p in (hwt, hwtSimApi, hwtLib))
+        return fp
+
+    @classmethod
+    def moduleConfig(cls, module: HwModule) -> tuple:
+        """
+        :return: the configuration of the component before elaboration
+        """
+        internal = SimModelCache._HWMODULE_INTERNAL_ATTRS
+        if internal is None:
+            internal = SimModelCache._HWMODULE_INTERNAL_ATTRS = frozenset(vars(HwModule()).keys())
+        params = sorted((p._name, p.get_value()) for p in module._hwParams)
+        paramNames = set(n for n, _ in params)
+        other = sorted((k, v) for k, v in vars(module).items()
+                       if k not in internal and k not in paramNames and not k.startswith("__"))
+        return (module.__class__, params, other)
+
+    def moduleKey(self, module: HwModule, simulatorCls: type, target_platform) -> str:
+        """
+        :raise TypeError: if the configuration can not be used as a key
+        """
+        deps = []
+        for c in module.__class__.__mro__:
+            m = sys.modules.get(c.__module__, None)
+            if m is not None and m not in deps:
+                deps.append(m)
+
+        return self.key("sim_model",
+                        (self.moduleConfig(module), simulatorCls, target_platform.__class__, self.fingerprint()),
+                        deps)
+
+
+class BasicRtlSimulatorVcdCached(BasicRtlSimulatorVcd):
+    """
+    :class:`hwt.simulator.rtlSimulatorVcd.BasicRtlSimulatorVcd` which loads the simulation model
+    from :class:`~.SimModelCache` if available.
+
+    .. code-block:: python
+
+        SimTestCase.DEFAULT_SIMULATOR = BasicRtlSimulatorVcdCached
+
+    :note: Only in memory models (build_dir=None) are cached.
+    :cvar CACHE: the cache used by this simulator
+    """
+    CACHE = SimModelCache()
+
+    @classmethod
+    def _buildFromSource(cls, module: HwModule, topName: str, source: str):
+        simModule = ModuleType('simModule_' + topName)
+        exec(compile(source, f"<sim model {topName:s}>", "exec"), simModule.__dict__)
+        model_cls = simModule.__dict__[topName]
+        return cls(model_cls, module)
+
+    @classmethod
+    def build(cls,
+              module: HwModule,
+              unique_name: str,
+              build_dir: Optional[str],
+              target_platform=DummyPlatform(),
+              do_compile=True) -> "BasicRtlSimulatorVcdCached":
+        cache = cls.CACHE
+        if build_dir is not None or not do_compile or not cache.enabled:
+            return super(BasicRtlSimulatorVcdCached, cls).build(
+                module, unique_name, build_dir, target_platform=target_platform, do_compile=do_compile)
+
+        if unique_name is None:
+            unique_name = module._getDefaultName()
+
+        try:
+            key = cache.moduleKey(module, cls, target_platform)
+        except TypeError:
+            key = None
+
+        cached: Optional[Tuple[str, str, List[str]]] = None
+        if key is not None:
+            cached = cache.get(key)
+
+        # the component is elaborated only once, the serialization is performed only if the model is not in cache
+        store = _SaveDeferred(SimModelSerializer, _filter=SerializerFilterDoNotExclude())
+        to_rtl(module,
+               name=unique_name,
+               target_platform=target_platform,
+               store_manager=store)
+        ioNames = _hwIO_signal_names(module)
+        if cached is not None:
+            cachedTopName, cachedSource, cachedIoNames = cached
+            if cachedIoNames == ioNames:
+                cache.hits += 1
+                return cls._buildFromSource(module, cachedTopName, cachedSource)
+            # stale record which does not match the component, it is replaced by a newly serialized model
+            cache.remove(key)
+
+        source = store.serialize()
+        if key is not None:
+            cache.misses += 1
+            cache.set(key, (module._name, source, ioNames))
+
+        return cls._buildFromSource(module, module._name, source)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from tempfile import TemporaryDirectory
+
+from hwt.hwIOs.std import HwIODataRdVld
+from hwt.synthesizer.dummyPlatform import DummyPlatform
+from hwtLib.examples.builders.hsBuilderSplit import HsBuilderSplit
+from hwtLib.examples.builders.hsBuilderSplit_test import HsBuilderSplit_TC
+from hwtLib.handshaked.joinFair import HsJoinFairShare
+from hwtLib.tests.sim_model_cache import BasicRtlSimulatorVcdCached, \
+    SimModelCache
+
+
+class SimModelCache_TC(HsBuilderSplit_TC):
+    """
+    The HsBuilderSplit_TC executed on a simulation model loaded from the cache
+    """
+    DEFAULT_BUILD_DIR = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls._cacheDir = TemporaryDirectory()
+
+        class Sim(BasicRtlSimulatorVcdCached):
+            CACHE = SimModelCache(cls._cacheDir.name, enabled=True)
+
+        cls.DEFAULT_SIMULATOR = Sim
+        # first build stores the model to cache, second loads it
+        super(SimModelCache_TC, cls).setUpClass()
+        super(SimModelCache_TC, cls).setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super(SimModelCache_TC, cls).tearDownClass()
+        cls._cacheDir.cleanup()
+
+    def test_hit_miss(self):
+        c = self.DEFAULT_SIMULATOR.CACHE
+        self.assertEqual((c.hits, c.misses), (1, 1))
+        self.assertGreater(c.size(), 0)
+
+    def test_stale_record(self):
+        c = self.DEFAULT_SIMULATOR.CACHE
+        sim = self.DEFAULT_SIMULATOR
+        m = HsBuilderSplit()
+        key = c.moduleKey(m, sim, DummyPlatform())
+        topName, source, ioNames = c.get(key)
+        # record which does not match the component (e.g. produced by a different version of the code)
+        c.set(key, (topName, source, ioNames[1:]))
+        misses = c.misses
+        sim.build(m, None, None)
+        # the model is rebuilt and the record is replaced
+        self.assertEqual(c.misses, misses + 1)
+        self.assertSequenceEqual(c.get(key)[2], ioNames)
+
+    def test_moduleKey(self):
+        c = self.DEFAULT_SIMULATOR.CACHE
+        sim = self.DEFAULT_SIMULATOR
+        p = DummyPlatform()
+
+        def mk(DATA_WIDTH):
+            m = HsJoinFairShare(HwIODataRdVld)
+            m.DATA_WIDTH = DATA_WIDTH
+            return m
+
+        self.assertEqual(c.moduleKey(mk(8), sim, p), c.moduleKey(mk(8), sim, p))
+        self.assertNotEqual(c.moduleKey(mk(8), sim, p), c.moduleKey(mk(16), sim, p))
+        self.assertNotEqual(c.moduleKey(mk(8), sim, p), c.moduleKey(HsBuilderSplit(), sim, p))
+
+
+if __name__ == "__main__":
+    import unittest
+
+    testLoader = unittest.TestLoader()
+    # suite = unittest.TestSuite([SimModelCache_TC("test_hit_miss")])
+    suite = testLoader.loadTestsFromTestCase(SimModelCache_TC)
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
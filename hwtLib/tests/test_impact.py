@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import ast
+import json
+import os
+import subprocess
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import unittest
+
+from hwtLib.tests.parallel_test_scheduler import iter_tests
+
+
+class ImportGraph():
+    """
+    Static graph of imports between the modules of a python package,
+    the imports are resolved from the source code (:mod:`ast`), the modules are not executed.
+    The imports of each file are cached in a json file and parsed again only if the file was modified.
+
+    :ivar ~.root: directory which contains the package directory
+    :ivar ~.package: name of the package
+    :ivar ~.cachePath: path of the json file with cached imports, if None the cache is not used
+    :ivar ~.imports: dictionary module name -> set of names of imported modules of this package
+        (including the modules which do not exist because they were removed or renamed)
+    :ivar ~.moduleFiles: dictionary module name -> path of the file relative to root
+    """
+    FORMAT_VERSION = 1
+
+    def __init__(self, root: str, package: str, cachePath: Optional[str]=None):
+        self.root = root
+        self.package = package
+        self.cachePath = cachePath
+        self.imports: Dict[str, Set[str]] = {}
+        self.moduleFiles: Dict[str, str] = {}
+        self._importedBy: Optional[Dict[str, Set[str]]] = None
+
+    @classmethod
+    def default(cls) -> "ImportGraph":
+        """
+        Import graph of hwtLib cached in a location specified by HWTLIB_IMPORT_GRAPH_CACHE environment variable
+        (default ~/.cache/hwtLib/import_graph.json)
+        """
+        import hwtLib
+        path = os.environ.get("HWTLIB_IMPORT_GRAPH_CACHE", None)
+        if path is None:
+            path = os.path.join(os.path.expanduser("~"), ".cache", "hwtLib", "import_graph.json")
+        root = os.path.dirname(os.path.dirname(os.path.abspath(hwtLib.__file__)))
+        g = cls(root, "hwtLib", path)
+        g.build()
+        return g
+
+    @staticmethod
+    def fileToModuleName(relPath: str) -> str:
+        p = os.path.splitext(relPath)[0].replace(os.sep, "/").split("/")
+        if p[-1] == "__init__":
+            p.pop()
+        return ".".join(p)
+
+    def _loadCache(self) -> Dict[str, list]:
+        if self.cachePath is None:
+            return {}
+        try:
+            with open(self.cachePath) as f:
+                d = json.load(f)
+        except (OSError, ValueError):
+            # missing or corrupted file
+            return {}
+        if d.get("version", None) != self.FORMAT_VERSION or d.get("root", None) != self.root:
+            return {}
+        return d["files"]
+
+    def _saveCache(self, files: Dict[str, list]):
+        if self.cachePath is None:
+            return
+        tmp = f"{self.cachePath:s}.{os.getpid():d}.tmp"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.cachePath)), exist_ok=True)
+            with open(tmp, "w") as f:
+                json.dump({"version": self.FORMAT_VERSION, "root": self.root, "files": files}, f)
+            os.replace(tmp, self.cachePath)
+        except OSError:
+            # the cache is only an optimization
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+    @staticmethod
+    def parseImports(source: str, moduleName: str, isPackage: bool) -> List[str]:
+        """
+        :return: names of all modules which may be imported by the source code
+            (including the imports in functions, "from a import b" produces "a" and "a.b" as b may be a module)
+        """
+        tree = ast.parse(source)
+        res = []
+        if isPackage:
+            pkg = moduleName.split(".")
+        else:
+            pkg = moduleName.split(".")[:-1]
+
+        for n in ast.walk(tree):
+            if isinstance(n, ast.Import):
+                for a in n.names:
+                    res.append(a.name)
+            elif isinstance(n, ast.ImportFrom):
+                if n.level:
+                    base = pkg[:len(pkg) - n.level + 1]
+                    if n.module:
+                        base = base + n.module.split(".")
+                    base = ".".join(base)
+                else:
+                    base = n.module
+                res.append(base)
+                for a in n.names:
+                    if a.name != "*":
+                        res.append(f"{base:s}.{a.name:s}")
+        return res
+
+    def build(self):
+        """
+        Resolve imports of all modules in package (using the cache for the files which were not modified)
+        """
+        cached = self._loadCache()
+        files = {}
+        rawImports: Dict[str, List[str]] = {}
+        pkgDir = os.path.join(self.root, self.package)
+        for d, dirs, fileNames in os.walk(pkgDir):
+            dirs[:] = sorted(_d for _d in dirs if _d != "__pycache__")
+            for fn in sorted(fileNames):
+                if not fn.endswith(".py"):
+                    continue
+                p = os.path.join(d, fn)
+                relPath = os.path.relpath(p, self.root)
+                try:
+                    st = os.stat(p)
+                except OSError:
+                    continue
+
+                modName = self.fileToModuleName(relPath)
+                rec = cached.get(relPath, None)
+                if rec is not None and rec[0] == st.st_mtime_ns and rec[1] == st.st_size:
+                    imports = rec[2]
+                else:
+                    try:
+                        with open(p, "rb") as f:
+                            imports = self.parseImports(f.read(), modName, fn == "__init__.py")
+                    except (OSError, SyntaxError, ValueError):
+                        # the test which imports this module will fail anyway
+                        imports = []
+                    rec = [st.st_mtime_ns, st.st_size, imports]
+                files[relPath] = rec
+                rawImports[modName] = imports
+                self.moduleFiles[modName] = relPath
+
+        modules = self.moduleFiles
+        packages = set(m for m, f in modules.items() if os.path.basename(f) == "__init__.py")
+        pkgPrefix = self.package + "."
+        for modName, imports in rawImports.items():
+            deps = set()
+            for imp in imports:
+                # importing a module executes also __init__ of all parent packages
+                parts = imp.split(".")
+                for i in range(1, len(parts) + 1):
+                    m = ".".join(parts[:i])
+                    if m == modName:
+                        continue
+                    if m in modules:
+                        deps.add(m)
+                    elif m.startswith(pkgPrefix):
+                        parent = ".".join(parts[:i - 1])
+                        if parent in packages:
+                            # the module does not exist (e.g. it was removed or renamed),
+                            # but the change of it has to affect this module
+                            # (the rest of the name is a member of this module or of its submodule)
+                            deps.add(m)
+                        break
+            self.imports[modName] = deps
+
+        self._importedBy = None
+        if files != cached:
+            self._saveCache(files)
+
+    def importedBy(self) -> Dict[str, Set[str]]:
+        """
+        :return: reversed import graph, module name -> names of modules which import it
+        """
+        ib = self._importedBy
+        if ib is None:
+            ib = self._importedBy = {m: set() for m in self.imports}
+            for m, deps in self.imports.items():
+                for d in deps:
+                    imp = ib.get(d, None)
+                    if imp is None:
+                        # imported module which does not exist
+                        imp = ib[d] = set()
+                    imp.add(m)
+        return ib
+
+    def dependents(self, modules: Iterable[str]) -> Set[str]:
+        """
+        :return: the modules and all modules which transitively import any of them
+        """
+        ib = self.importedBy()
+        res = set()
+        toSearch = [m for m in modules if m in ib]
+        while toSearch:
+            m = toSearch.pop()
+            if m in res:
+                continue
+            res.add(m)
+            toSearch.extend(ib[m])
+        return res
+
+    def changedModules(self, changedFiles: Iterable[str]) -> Tuple[Set[str], List[str]]:
+        """
+        Translate paths of changed files to names of modules
+
+        :param changedFiles: paths relative to :attr:`~.root`
+        :return: tuple (names of changed modules, changed files which can not be mapped to modules)
+            the non-python files in package are mapped to all modules in the same directory
+            (as they are usually the resources loaded by these modules)
+        """
+        modules = set()
+        unknown = []
+        pkgPrefix = self.package + "/"
+        for f in changedFiles:
+            f = f.replace(os.sep, "/")
+            if not f.startswith(pkgPrefix):
+                unknown.append(f)
+            elif f.endswith(".py"):
+                m = self.fileToModuleName(f)
+                # a removed module may be still imported by something
+                modules.add(m)
+            else:
+                d = os.path.dirname(f)
+                for m, mf in self.moduleFiles.items():
+                    if os.path.dirname(mf.replace(os.sep, "/")) == d:
+                        modules.add(m)
+        return modules, unknown
+
+
+# changes of these documentation files outside of the package do not affect the tests
+# (other files e.g. requirements.txt may affect all tests)
+IMPACT_IGNORED_FILE_SUFFIXES = (".md", ".rst")
+IMPACT_IGNORED_DIRS = ("docs/",)
+
+
+def git_changed_files(root: str, base: str="HEAD") -> List[str]:
+    """
+    :return: files modified in working tree (staged or not) against the base revision and untracked files,
+        paths are relative to root of the git repository
+    :raise subprocess.CalledProcessError: if git fails (e.g. root is not in git repository)
+    """
+
+    def git(*args):
+        return subprocess.run(("git", *args), cwd=root, check=True,
+                              stdout=subprocess.PIPE, universal_newlines=True).stdout
+
+    top = git("rev-parse", "--show-toplevel").strip()
+    files = git("diff", "--name-only", base).splitlines()
+    files.extend(git("ls-files", "--others", "--exclude-standard", "--full-name").splitlines())
+    # convert to paths relative to root
+    res = []
+    for f in files:
+        if f:
+            res.append(os.path.relpath(os.path.join(top, f), root))
+    return res
+
+
+def select_affected_tests(suite: unittest.TestSuite, changedFiles: Iterable[str],
+                          graph: Optional[ImportGraph]=None, fallbackToFull=True) -> unittest.TestSuite:
+    """
+    Filter the test suite to contain only the test classes which depend on changed files.
+    The test class depends on the module where it is defined (and modules of its base classes)
+    and on all modules imported transitively from them.
+
+    :param changedFiles: paths of changed files relative to :attr:`ImportGraph.root`
+    :param fallbackToFull: if True the whole suite is returned if some of the changed files can not be mapped
+        to a module of the package (e.g. setup.py), otherwise such files are ignored
+    """
+    if graph is None:
+        graph = ImportGraph.default()
+    changedModules, unknownFiles = graph.changedModules(changedFiles)
+    unknownFiles = [
+        f for f in unknownFiles
+        if not f.endswith(IMPACT_IGNORED_FILE_SUFFIXES) and not f.startswith(IMPACT_IGNORED_DIRS)
+    ]
+    if unknownFiles and fallbackToFull:
+        return suite
+
+    affected = graph.dependents(changedModules)
+    clsAffected: Dict[type, bool] = {}
+    res = unittest.TestSuite()
+    for t in iter_tests(suite):
+        cls = t.__class__
+        a = clsAffected.get(cls, None)
+        if a is None:
+            a = clsAffected[cls] = any(c.__module__ in affected for c in cls.__mro__)
+        if a:
+            res.addTest(t)
+    return res
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+from tempfile import TemporaryDirectory
+import unittest
+
+from hwtLib.tests.test_impact import ImportGraph, select_affected_tests
+
+
+def _write(root: str, relPath: str, content: str):
+    p = os.path.join(root, relPath)
+    os.makedirs(os.path.dirname(p), exist_ok=True)
+    with open(p, "w") as f:
+        f.write(content)
+
+
+class _ImpactDummy():
+    """
+    Container for the test cases used as an input for the test selection
+    (not a part of the test suite)
+    """
+
+    class A_TC(unittest.TestCase):
+
+        def test_0(self):
+            pass
+
+        def test_1(self):
+            pass
+
+    class B_TC(unittest.TestCase):
+
+        def test_0(self):
+            pass
+
+    class C_TC(B_TC):
+        pass
+
+
+class TestImpact_TC(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = TemporaryDirectory()
+        root = self.root = self._dir.name
+        _write(root, "pkg/__init__.py", "")
+        _write(root, "pkg/a.py", "import os\n")
+        _write(root, "pkg/b.py", "from pkg.a import x\n")
+        _write(root, "pkg/sub/__init__.py", "from .c import y\n")
+        _write(root, "pkg/sub/c.py", "from ..b import z\n")
+        _write(root, "pkg/sub/d.py", "def f():\n    from pkg import a\n")
+        _write(root, "pkg/sub/res.vhd", "")
+        _write(root, "pkg/a_test.py", "from pkg import a\n")
+        _write(root, "pkg/b_test.py", "from pkg.sub.d import f\n")
+        self.cachePath = os.path.join(root, "cache", "import_graph.json")
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def _graph(self):
+        g = ImportGraph(self.root, "pkg", self.cachePath)
+        g.build()
+        return g
+
+    def test_imports(self):
+        g = self._graph()
+        self.assertDictEqual(g.imports, {
+            "pkg": set(),
+            "pkg.a": set(),
+            "pkg.b": {"pkg", "pkg.a"},
+            "pkg.sub": {"pkg", "pkg.sub.c"},
+            "pkg.sub.c": {"pkg", "pkg.b"},
+            "pkg.sub.d": {"pkg", "pkg.a"},
+            "pkg.a_test": {"pkg", "pkg.a"},
+            "pkg.b_test": {"pkg", "pkg.sub", "pkg.sub.d"},
+        })
+        self.assertSetEqual(g.dependents(["pkg.b"]), {"pkg.b", "pkg.sub.c", "pkg.sub", "pkg.b_test"})
+        self.assertSetEqual(g.dependents(["pkg.a_test"]), {"pkg.a_test"})
+
+    def test_changedModules(self):
+        g = self._graph()
+        m, unknown = g.changedModules(["pkg/a.py", "pkg/sub/res.vhd", "setup.py"])
+        self.assertSetEqual(m, {"pkg.a", "pkg.sub", "pkg.sub.c", "pkg.sub.d"})
+        self.assertListEqual(unknown, ["setup.py"])
+
+    def test_cache(self):
+        self._graph()
+        self.assertTrue(os.path.isfile(self.cachePath))
+        _write(self.root, "pkg/a.py", "from pkg.sub import c\n")
+        g = self._graph()
+        self.assertSetEqual(g.imports["pkg.a"], {"pkg", "pkg.sub", "pkg.sub.c"})
+        self.assertSetEqual(g.imports["pkg.b"], {"pkg", "pkg.a"})
+
+    def test_removed_module(self):
+        os.remove(os.path.join(self.root, "pkg", "a.py"))
+        g = self._graph()
+        self.assertNotIn("pkg.a", g.moduleFiles)
+        self.assertSetEqual(g.imports["pkg.b"], {"pkg", "pkg.a"})
+        # the removed module is still imported by its former dependents
+        self.assertSetEqual(g.dependents(g.changedModules(["pkg/a.py"])[0]), {
+            "pkg.a", "pkg.b", "pkg.sub.c", "pkg.sub", "pkg.sub.d", "pkg.a_test", "pkg.b_test"})
+
+        # renamed module, the module which imported it was updated
+        _write(self.root, "pkg/a2.py", "import os\n")
+        _write(self.root, "pkg/b.py", "from pkg.a2 import x\n")
+        g = self._graph()
+        self.assertSetEqual(g.dependents(g.changedModules(["pkg/a.py", "pkg/a2.py", "pkg/b.py"])[0]), {
+            "pkg.a", "pkg.a2", "pkg.b", "pkg.sub.c", "pkg.sub", "pkg.sub.d", "pkg.a_test", "pkg.b_test"})
+
+    def test_select_affected_tests(self):
+        g = self._graph()
+        A_TC = _ImpactDummy.A_TC
+        B_TC = _ImpactDummy.B_TC
+        C_TC = _ImpactDummy.C_TC
+        # pretend the test cases are defined in the test modules of the package
+        origModules = [(c, c.__module__) for c in (A_TC, B_TC, C_TC)]
+        A_TC.__module__ = "pkg.a_test"
+        B_TC.__module__ = "pkg.b_test"
+        C_TC.__module__ = "pkg.other_test"
+        try:
+            testLoader = unittest.TestLoader()
+            suite = unittest.TestSuite([testLoader.loadTestsFromTestCase(tc) for tc in (A_TC, B_TC, C_TC)])
+
+            def selected(changedFiles, fallbackToFull=True):
+                s = select_affected_tests(suite, changedFiles, g, fallbackToFull=fallbackToFull)
+                return sorted(t.__class__.__name__ for t in s)
+
+            # A_TC depends on pkg.a directly, B_TC and C_TC (subclass of B_TC) on pkg.sub.d which imports pkg.a
+            self.assertListEqual(selected(["pkg/a.py"]), ["A_TC", "A_TC", "B_TC", "C_TC"])
+            self.assertListEqual(selected(["pkg/sub/d.py"]), ["B_TC", "C_TC"])
+            self.assertListEqual(selected(["pkg/a_test.py", "README.md"]), ["A_TC", "A_TC"])
+            self.assertListEqual(selected(["docs/index.txt", "docs/img.png"]), [])
+            # dependency pins may affect everything
+            self.assertIs(select_affected_tests(suite, ["requirements.txt"], g), suite)
+            self.assertListEqual(selected([]), [])
+            # unknown file
+            self.assertIs(select_affected_tests(suite, ["setup.py"], g), suite)
+            self.assertListEqual(selected(["setup.py"], fallbackToFull=False), [])
+        finally:
+            for c, m in origModules:
+                c.__module__ = m
+
+
+if __name__ == "__main__":
+    testLoader = unittest.TestLoader()
+    # suite = unittest.TestSuite([TestImpact_TC("test_select_affected_tests")])
+    suite = testLoader.loadTestsFromTestCase(TestImpact_TC)
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
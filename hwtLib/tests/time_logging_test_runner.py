@@ -12,16 +12,33 @@ class TimeLoggingTestResult(TextTestResult):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.test_timings = []
+        # list of tuples (test id, elapsed time), used to update :class:`hwtLib.tests.parallel_test_scheduler.TestTimingDb`
+        self.test_id_timings = []
+        self._reported_time = None
+        self._test_started_at_reported = None
+
+    def time(self, a_datetime):
+        """
+        Timestamp reported by testtools/subunit for tests executed in other process
+        (the events of such a test are delivered at once, the local time can not be used)
+        """
+        self._reported_time = a_datetime
 
     @override
     def startTest(self, test):
         self._test_started_at = time.time()
+        self._test_started_at_reported = self._reported_time
         super().startTest(test)
 
     def _calladdResultMethodWithTimeLog(self, addResultMethod, *args):
-        elapsed = time.time() - self._test_started_at
-        name = self.getDescription(args[0])
+        if self._test_started_at_reported is not None and self._reported_time is not None:
+            elapsed = (self._reported_time - self._test_started_at_reported).total_seconds()
+        else:
+            elapsed = time.time() - self._test_started_at
+        test = args[0]
+        name = self.getDescription(test)
         self.test_timings.append((name, elapsed))
+        self.test_id_timings.append((test.id(), elapsed))
         addResultMethod(*args)
         if self.showAll:
             self.stream.write("ok")